@@ -1,23 +1,34 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from supabase import create_client, Client
+from jose import JWTError
 from app.config import settings
+from app.db import db, db_public
+from app.services.cache import TTLCache
+from app.services.jwt_verifier import JWTVerifier
 from typing import Optional
+import time
 
-# Client Supabase normal (publishable key) - pour users authentifies
-supabase: Client = create_client(
-    settings.supabase_url,
-    settings.supabase_publishable_key
-)
+# Security scheme pour Bearer token
+security = HTTPBearer()
 
-# Client Supabase admin (secret key) - pour operations admin (bypass RLS)
-supabase_admin: Client = create_client(
-    settings.supabase_url,
-    settings.supabase_secret_key
+# Verification locale des tokens (AUTH_VERIFICATION_MODE=local)
+jwt_verifier = JWTVerifier(
+    jwks_url=f"{settings.supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json",
+    jwt_secret=settings.supabase_jwt_secret,
+    refresh_interval=settings.jwks_refresh_interval
 )
 
-# Security scheme pour Bearer token
-security = HTTPBearer()
+# Sessions dont la non-revocation a ete verifiee recemment aupres de Supabase Auth
+_revocation_checks = TTLCache(
+    maxsize=10000,
+    ttl=max(settings.auth_revocation_check_interval, 1)
+)
+# Profil actif choisi via switch_profile: user_id -> (profile_id, timestamp)
+_active_profile_overrides = TTLCache(maxsize=10000, ttl=3600)
+# Premier profil des utilisateurs sans profil actif en metadata
+_default_profile_cache = TTLCache(maxsize=10000, ttl=300)
+# Type de profil par profile_id (resolution des roles)
+_profile_type_cache = TTLCache(maxsize=10000, ttl=300)
 
 
 class CurrentUser:
@@ -37,6 +48,121 @@ class CurrentUser:
         self.active_profile_id = active_profile_id
 
 
+async def _get_default_profile_id(user_id: str) -> Optional[str]:
+    """Premier profil de l'utilisateur (si pas de profil actif en metadata)"""
+    cached = _default_profile_cache.get(user_id)
+    if cached:
+        return cached
+    try:
+        profile_response = await db.table("profile")\
+            .select("id")\
+            .eq("user_uid", user_id)\
+            .limit(1)\
+            .execute()
+
+        if profile_response.data:
+            profile_id = profile_response.data[0]["id"]
+            _default_profile_cache.set(user_id, profile_id)
+            return profile_id
+    except:
+        pass
+    return None
+
+
+def remember_active_profile(user_id: str, profile_id: str) -> None:
+    """
+    Memorise un changement de profil actif (appele par switch_profile).
+    En mode local, les metadata du token restent celles de son emission
+    jusqu'au prochain refresh: cette valeur les remplace en attendant.
+    """
+    _active_profile_overrides.set(user_id, (profile_id, time.time()))
+
+
+async def _get_user_remote(token: str) -> CurrentUser:
+    """Verifie le token aupres de Supabase Auth (un appel reseau par requete)"""
+    response = await db_public.auth.get_user(token)
+    user = response.user if response else None
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token invalide",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Recuperer metadata
+    metadata = user.user_metadata or {}
+    active_profile_id = metadata.get("active_profile_id")
+
+    # Si pas de profil actif, prendre le premier profil de l'utilisateur
+    if not active_profile_id:
+        active_profile_id = await _get_default_profile_id(user.id)
+
+    return CurrentUser(
+        id=user.id,
+        email=user.email,
+        first_name=metadata.get("first_name"),
+        last_name=metadata.get("last_name"),
+        active_profile_id=active_profile_id
+    )
+
+
+async def _get_user_local(token: str) -> CurrentUser:
+    """
+    Verifie le token localement (signature + expiration) et construit
+    l'utilisateur depuis les claims. Supabase Auth n'est interroge que
+    pour la verification de revocation, au plus une fois par intervalle.
+    """
+    try:
+        claims = await jwt_verifier.verify(token)
+    except JWTError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Token invalide: {str(e)}",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    user_id = claims.get("sub")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token invalide",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Verification de revocation (logout, suppression user) a intervalle regulier
+    if settings.auth_revocation_check_interval > 0:
+        check_key = claims.get("session_id") or token
+        if _revocation_checks.get(check_key) is None:
+            response = await db_public.auth.get_user(token)
+            if not response or not response.user:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Session revoquee",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+            _revocation_checks.set(check_key, True)
+
+    metadata = claims.get("user_metadata") or {}
+    active_profile_id = metadata.get("active_profile_id")
+
+    # Profil change depuis l'emission du token
+    override = _active_profile_overrides.get(user_id)
+    if override and override[1] >= claims.get("iat", 0):
+        active_profile_id = override[0]
+
+    if not active_profile_id:
+        active_profile_id = await _get_default_profile_id(user_id)
+
+    return CurrentUser(
+        id=user_id,
+        email=claims.get("email"),
+        first_name=metadata.get("first_name"),
+        last_name=metadata.get("last_name"),
+        active_profile_id=active_profile_id
+    )
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> CurrentUser:
@@ -44,6 +170,10 @@ async def get_current_user(
     Verifie le token JWT et retourne l'utilisateur courant.
     A utiliser avec Depends() dans les routes protegees.
 
+    Le mode de verification depend de AUTH_VERIFICATION_MODE:
+    - remote: appel Supabase Auth a chaque requete
+    - local: verification de la signature en local (cles JWKS en cache)
+
     Example:
         @router.get("/protected")
         async def protected_route(user: CurrentUser = Depends(get_current_user)):
@@ -52,44 +182,9 @@ async def get_current_user(
     token = credentials.credentials
 
     try:
-        # Verifier token avec Supabase
-        response = supabase.auth.get_user(token)
-        user = response.user
-
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token invalide",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
-        # Recuperer metadata
-        metadata = user.user_metadata or {}
-        first_name = metadata.get("first_name")
-        last_name = metadata.get("last_name")
-        active_profile_id = metadata.get("active_profile_id")
-
-        # Si pas de profil actif, prendre le premier profil de l'utilisateur
-        if not active_profile_id:
-            try:
-                profile_response = supabase_admin.table("profile")\
-                    .select("id")\
-                    .eq("user_uid", user.id)\
-                    .limit(1)\
-                    .execute()
-
-                if profile_response.data:
-                    active_profile_id = profile_response.data[0]["id"]
-            except:
-                pass
-
-        return CurrentUser(
-            id=user.id,
-            email=user.email,
-            first_name=first_name,
-            last_name=last_name,
-            active_profile_id=active_profile_id
-        )
+        if settings.auth_verification_mode == "local":
+            return await _get_user_local(token)
+        return await _get_user_remote(token)
 
     except HTTPException:
         raise
@@ -128,175 +223,87 @@ COACH_PROFILE_TYPE_ID = 3
 NAVIGANT_PROFILE_TYPE_ID = 4
 
 
-async def require_admin(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+async def get_profile_type_id(profile_id: str) -> Optional[int]:
     """
-    Verifie que l'utilisateur connecte est un admin (type_profile_id = 1).
-    Leve une erreur 403 si ce n'est pas le cas.
-
-    Example:
-        @router.delete("/resource/{id}")
-        async def delete_resource(id: int, admin: CurrentUser = Depends(require_admin)):
-            # Seul un admin peut supprimer
-            ...
+    Retourne le type_profile_id d'un profil.
+    Le resultat est mis en cache (le type ne change que via les endpoints admin).
     """
-    if not user.active_profile_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acces refuse: profil requis"
-        )
-
-    try:
-        profile_response = supabase_admin.table("profile")\
-            .select("type_profile_id")\
-            .eq("id", user.active_profile_id)\
-            .execute()
+    cached = _profile_type_cache.get(profile_id)
+    if cached is not None:
+        return cached
 
-        if not profile_response.data:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Acces refuse: profil non trouve"
-            )
+    profile_response = await db.table("profile")\
+        .select("type_profile_id")\
+        .eq("id", profile_id)\
+        .execute()
 
-        type_profile_id = profile_response.data[0].get("type_profile_id")
+    if not profile_response.data:
+        return None
 
-        if type_profile_id != ADMIN_PROFILE_TYPE_ID:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Acces refuse: droits admin requis"
-            )
+    type_profile_id = profile_response.data[0].get("type_profile_id")
+    _profile_type_cache.set(profile_id, type_profile_id)
+    return type_profile_id
 
-        return user
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erreur verification admin: {str(e)}"
-        )
+def invalidate_profile_type(*profile_ids: Optional[str]) -> None:
+    """Invalide le cache des types de profil (modification/suppression de profil)"""
+    for profile_id in profile_ids:
+        if profile_id:
+            _profile_type_cache.pop(profile_id)
 
 
-async def require_super_coach(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+def require_role(*type_profile_ids: int, label: str):
     """
-    Verifie que l'utilisateur connecte est un Super Coach (type_profile_id = 2).
+    Fabrique une dependance qui verifie que le profil actif est d'un des types donnes.
     Leve une erreur 403 si ce n'est pas le cas.
-    """
-    if not user.active_profile_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acces refuse: profil requis"
-        )
-
-    try:
-        profile_response = supabase_admin.table("profile")\
-            .select("type_profile_id")\
-            .eq("id", user.active_profile_id)\
-            .execute()
-
-        if not profile_response.data:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Acces refuse: profil non trouve"
-            )
-
-        type_profile_id = profile_response.data[0].get("type_profile_id")
-
-        if type_profile_id != SUPER_COACH_PROFILE_TYPE_ID:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Acces refuse: droits Super Coach requis"
-            )
-
-        return user
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erreur verification Super Coach: {str(e)}"
-        )
 
+    Example:
+        require_staff = require_role(SUPER_COACH_PROFILE_TYPE_ID, COACH_PROFILE_TYPE_ID, label="Staff")
 
-async def require_coach(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
-    """
-    Verifie que l'utilisateur connecte est un Coach (type_profile_id = 3).
-    Leve une erreur 403 si ce n'est pas le cas.
+        @router.get("/resource")
+        async def get_resource(user: CurrentUser = Depends(require_staff)):
+            ...
     """
-    if not user.active_profile_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acces refuse: profil requis"
-        )
-
-    try:
-        profile_response = supabase_admin.table("profile")\
-            .select("type_profile_id")\
-            .eq("id", user.active_profile_id)\
-            .execute()
-
-        if not profile_response.data:
+    async def dependency(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+        if not user.active_profile_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="Acces refuse: profil non trouve"
+                detail="Acces refuse: profil requis"
             )
 
-        type_profile_id = profile_response.data[0].get("type_profile_id")
+        try:
+            type_profile_id = await get_profile_type_id(user.active_profile_id)
 
-        if type_profile_id != COACH_PROFILE_TYPE_ID:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Acces refuse: droits Coach requis"
-            )
+            if type_profile_id is None:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Acces refuse: profil non trouve"
+                )
 
-        return user
+            if type_profile_id not in type_profile_ids:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=f"Acces refuse: droits {label} requis"
+                )
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erreur verification Coach: {str(e)}"
-        )
+            return user
 
-
-async def require_navigant(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
-    """
-    Verifie que l'utilisateur connecte est un Navigant (type_profile_id = 4).
-    Leve une erreur 403 si ce n'est pas le cas.
-    """
-    if not user.active_profile_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acces refuse: profil requis"
-        )
-
-    try:
-        profile_response = supabase_admin.table("profile")\
-            .select("type_profile_id")\
-            .eq("id", user.active_profile_id)\
-            .execute()
-
-        if not profile_response.data:
+        except HTTPException:
+            raise
+        except Exception as e:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Acces refuse: profil non trouve"
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Erreur verification {label}: {str(e)}"
             )
 
-        type_profile_id = profile_response.data[0].get("type_profile_id")
-
-        if type_profile_id != NAVIGANT_PROFILE_TYPE_ID:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Acces refuse: droits Navigant requis"
-            )
+    return dependency
 
-        return user
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erreur verification Navigant: {str(e)}"
-        )
+# Verifie que l'utilisateur connecte est un admin (type_profile_id = 1)
+require_admin = require_role(ADMIN_PROFILE_TYPE_ID, label="admin")
+# Verifie que l'utilisateur connecte est un Super Coach (type_profile_id = 2)
+require_super_coach = require_role(SUPER_COACH_PROFILE_TYPE_ID, label="Super Coach")
+# Verifie que l'utilisateur connecte est un Coach (type_profile_id = 3)
+require_coach = require_role(COACH_PROFILE_TYPE_ID, label="Coach")
+# Verifie que l'utilisateur connecte est un Navigant (type_profile_id = 4)
+require_navigant = require_role(NAVIGANT_PROFILE_TYPE_ID, label="Navigant")
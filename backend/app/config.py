@@ -16,12 +16,109 @@ class Settings(BaseSettings):
     supabase_url: str = os.getenv("SUPABASE_URL", "")
     supabase_publishable_key: str = os.getenv("SUPABASE_PUBLISHABLE_KEY", "")
     supabase_secret_key: str = os.getenv("SUPABASE_SECRET_KEY", "")
+    supabase_jwt_secret: str = os.getenv("SUPABASE_JWT_SECRET", "")  # HS256 (self-hosted / legacy)
+
+    # Pool de connexions HTTP vers Supabase (PostgREST, Storage, Auth)
+    db_max_connections: int = int(os.getenv("DB_MAX_CONNECTIONS", "100"))
+    db_max_keepalive_connections: int = int(os.getenv("DB_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    db_timeout: float = float(os.getenv("DB_TIMEOUT", "30"))
+    # Deduplication des lectures identiques au sein d'une requete HTTP
+    query_memo_enabled: bool = os.getenv("QUERY_MEMO_ENABLED", "true").lower() == "true"
+    # Duree de vie (secondes) du cache des tables de reference (types)
+    reference_cache_ttl: float = float(os.getenv("REFERENCE_CACHE_TTL", "300"))
+    # Cache des URLs signees Storage: nombre d'entrees, et validite restante
+    # minimale (secondes) pour qu'une URL deja signee soit reutilisee
+    signed_url_cache_size: int = int(os.getenv("SIGNED_URL_CACHE_SIZE", "20000"))
+    signed_url_min_remaining: int = int(os.getenv("SIGNED_URL_MIN_REMAINING", "900"))
+    # URLs des medias
+    # "storage": URLs signees par Supabase Storage
+    # "local": URLs signees par l'API (HMAC secret_key), servies par /api/files/media
+    media_url_mode: str = os.getenv("MEDIA_URL_MODE", "storage")
+    # URL publique de l'API (base des URLs de medias en mode local)
+    public_api_url: str = os.getenv("PUBLIC_API_URL", "")
+    # Connexions max vers Storage pour les telechargements relayes par l'API
+    # (mode local): pool distinct de DB_MAX_CONNECTIONS, une lecture video
+    # occupe une connexion pendant tout le transfert
+    media_proxy_max_connections: int = int(os.getenv("MEDIA_PROXY_MAX_CONNECTIONS", "50"))
+    # Uploads simultanes vers Storage par worker (les suivants attendent)
+    max_concurrent_uploads: int = int(os.getenv("MAX_CONCURRENT_UPLOADS", "4"))
+    # Deduplication des uploads par contenu (SHA-256): un fichier identique a
+    # un fichier deja traite reutilise son objet Storage et ses derives
+    file_dedup: bool = os.getenv("FILE_DEDUP", "true").lower() == "true"
+    # Worker de traitements media (python -m app.worker)
+    # Processus par voie (videos / images) et threads FFmpeg par encodage,
+    # 0 = deduit du nombre de coeurs
+    media_video_processes: int = int(os.getenv("MEDIA_VIDEO_PROCESSES", "0"))
+    media_image_processes: int = int(os.getenv("MEDIA_IMAGE_PROCESSES", "0"))
+    media_ffmpeg_threads: int = int(os.getenv("MEDIA_FFMPEG_THREADS", "0"))
+    # Priorite reduite des processus de traitement (nice, 0 = inchangee)
+    media_worker_nice: int = int(os.getenv("MEDIA_WORKER_NICE", "10"))
+    # Intervalle (secondes) du journal d'etat des files (0 = desactive)
+    media_worker_status_interval: int = int(os.getenv("MEDIA_WORKER_STATUS_INTERVAL", "60"))
+    # Attente (secondes) quand la file est vide
+    media_job_poll_interval: float = float(os.getenv("MEDIA_JOB_POLL_INTERVAL", "2"))
+    # Reservation d'un job sans nouvelles du worker (secondes) avant remise en file
+    media_job_lock_timeout: int = int(os.getenv("MEDIA_JOB_LOCK_TIMEOUT", "300"))
+    # Duree max d'un job (secondes, 0 = sans limite): au-dela (FFmpeg bloque...),
+    # les processus de sa voie sont tues et le job passe en echec
+    media_job_timeout: int = int(os.getenv("MEDIA_JOB_TIMEOUT", "7200"))
+    # Delai avant nouvel essai (secondes): base * 2^(essai - 1), plafonne
+    media_job_retry_base: int = int(os.getenv("MEDIA_JOB_RETRY_BASE", "30"))
+    media_job_retry_max: int = int(os.getenv("MEDIA_JOB_RETRY_MAX", "3600"))
+    # Upload direct jamais finalise (ligne 'pending_upload'): ligne et objet
+    # Storage supprimes par le worker apres ce delai (secondes), au-dela des
+    # 2 h de validite de l'URL d'upload signee Supabase
+    pending_upload_max_age: int = int(os.getenv("PENDING_UPLOAD_MAX_AGE", "21600"))
+    # Declinaisons des images: plus grand cote (px) de chaque taille, et
+    # formats (webp, avif, jpeg; le dernier sert de repli au navigateur)
+    image_derivative_sizes: str = os.getenv("IMAGE_DERIVATIVE_SIZES", "200,400,1200")
+    image_derivative_formats: str = os.getenv("IMAGE_DERIVATIVE_FORMATS", "webp,jpeg")
+    # Videos deja lisibles par les navigateurs (H.264 / AAC, <= 1080p):
+    # debit max (bits/s) pour les conserver sans re-encodage (remux; un
+    # telephone filme en 1080p a 15-18 Mbit/s, le re-encodage divise la
+    # taille par 3 environ pour bien plus de CPU), taille max (octets) d'un
+    # clip court garde tel quel
+    video_remux_max_bitrate: int = int(os.getenv("VIDEO_REMUX_MAX_BITRATE", "20000000"))
+    video_skip_max_size: int = int(os.getenv("VIDEO_SKIP_MAX_SIZE", "5242880"))
+    # Planche d'apercus des videos (survol / navigation sans telecharger la
+    # video): une image toutes les N secondes, nombre max d'images (l'intervalle
+    # est allonge pour les longues videos)
+    video_sprite_interval: float = float(os.getenv("VIDEO_SPRITE_INTERVAL", "2"))
+    video_sprite_max_frames: int = int(os.getenv("VIDEO_SPRITE_MAX_FRAMES", "100"))
+    # HLS (lecture adaptative des longues videos, en plus du MP4): active,
+    # echelons (plus petit cote, px, limites a la source), duree min (s),
+    # duree des segments (s), uploads simultanes des segments vers Storage
+    video_hls: bool = os.getenv("VIDEO_HLS", "false").lower() == "true"
+    video_hls_renditions: str = os.getenv("VIDEO_HLS_RENDITIONS", "360,720,1080")
+    video_hls_min_duration: float = float(os.getenv("VIDEO_HLS_MIN_DURATION", "60"))
+    video_hls_segment_seconds: int = int(os.getenv("VIDEO_HLS_SEGMENT_SECONDS", "6"))
+    video_hls_upload_concurrency: int = int(os.getenv("VIDEO_HLS_UPLOAD_CONCURRENCY", "4"))
+    # Flux des statuts de traitement (GET /api/files/status/stream)
+    # Abonnement Supabase Realtime aux changements de files (sinon lecture
+    # periodique), intervalle de lecture sans Realtime et de resynchronisation
+    # avec Realtime (secondes), commentaire keep-alive (secondes), fichiers par flux
+    file_events_realtime: bool = os.getenv("FILE_EVENTS_REALTIME", "true").lower() == "true"
+    file_events_poll_interval: float = float(os.getenv("FILE_EVENTS_POLL_INTERVAL", "2"))
+    file_events_resync_interval: float = float(os.getenv("FILE_EVENTS_RESYNC_INTERVAL", "30"))
+    file_events_keepalive: float = float(os.getenv("FILE_EVENTS_KEEPALIVE", "15"))
+    file_events_max_ids: int = int(os.getenv("FILE_EVENTS_MAX_IDS", "100"))
+
+    # Verification des tokens
+    # "remote": appel Supabase Auth a chaque requete
+    # "local": verification de la signature JWT en local (JWKS ou secret partage)
+    auth_verification_mode: str = os.getenv("AUTH_VERIFICATION_MODE", "remote")
+    jwks_refresh_interval: int = int(os.getenv("JWKS_REFRESH_INTERVAL", "600"))  # secondes
+    # Intervalle entre deux verifications de revocation aupres de Supabase Auth (0 = desactive)
+    auth_revocation_check_interval: int = int(os.getenv("AUTH_REVOCATION_CHECK_INTERVAL", "300"))
 
     class Config:
         env_file = ".env"
 
 settings = Settings()
 
+# Bucket Supabase Storage des fichiers (API et worker media)
+BUCKET_NAME = "rise4tlg-files"
+
 # Verifications au demarrage
 if not settings.supabase_url:
     raise ValueError("SUPABASE_URL manquant dans .env")
@@ -29,3 +126,15 @@ if not settings.supabase_publishable_key:
     raise ValueError("SUPABASE_PUBLISHABLE_KEY manquant dans .env")
 if not settings.supabase_secret_key:
     raise ValueError("SUPABASE_SECRET_KEY manquant dans .env")
+if settings.auth_verification_mode not in ("remote", "local"):
+    raise ValueError("AUTH_VERIFICATION_MODE doit valoir 'remote' ou 'local'")
+if settings.media_url_mode not in ("storage", "local"):
+    raise ValueError("MEDIA_URL_MODE doit valoir 'storage' ou 'local'")
+if not set(settings.image_derivative_formats.split(",")) <= {"webp", "avif", "jpeg"}:
+    raise ValueError("IMAGE_DERIVATIVE_FORMATS: formats acceptes 'webp', 'avif', 'jpeg'")
+if settings.media_url_mode == "local" and not settings.public_api_url:
+    raise ValueError("PUBLIC_API_URL manquant dans .env (requis avec MEDIA_URL_MODE=local)")
+if not set(settings.video_hls_renditions.split(",")) <= {"240", "360", "480", "720", "1080"}:
+    raise ValueError("VIDEO_HLS_RENDITIONS: echelons acceptes 240, 360, 480, 720, 1080")
+if settings.video_hls and not settings.public_api_url:
+    raise ValueError("PUBLIC_API_URL manquant dans .env (requis avec VIDEO_HLS=true)")
@@ -0,0 +1,79 @@
+"""
+Couche d'acces aux donnees.
+
+Les routes sont declarees `async def`: elles utilisent les clients Supabase
+asynchrones ci-dessous (`await db.table(...)...execute()`) pour que les
+requetes concurrentes recouvrent leurs entrees/sorties au lieu de bloquer
+la boucle d'evenements. Tous les clients async partagent un meme pool de
+connexions httpx (keep-alive) vers PostgREST, Storage et Auth.
+
+Le transport deduplique les lectures PostgREST identiques au sein d'une meme
+requete HTTP (voir app.services.query_memo).
+
+Les medias relayes par l'API (MEDIA_URL_MODE=local) ont leur propre pool
+(media_http_client): chaque lecture garde une connexion pendant tout le
+transfert et ne doit pas priver les requetes PostgREST de connexions.
+"""
+from httpx import AsyncClient as AsyncHttpxClient, AsyncHTTPTransport, Limits, Timeout
+from supabase import AsyncClient, AsyncClientOptions, Client, create_client
+from supabase_auth import AsyncMemoryStorage
+from app.config import settings
+from app.services.query_memo import MemoTransport
+
+# Pool de connexions partage par tous les clients async
+_transport = AsyncHTTPTransport(
+    limits=Limits(
+        max_connections=settings.db_max_connections,
+        max_keepalive_connections=settings.db_max_keepalive_connections,
+        keepalive_expiry=30
+    )
+)
+_http_client = AsyncHttpxClient(
+    transport=MemoTransport(_transport) if settings.query_memo_enabled else _transport,
+    timeout=Timeout(settings.db_timeout),
+    follow_redirects=True
+)
+# Client httpx partage, pour les appels directs (uploads TUS vers Storage)
+http_client: AsyncHttpxClient = _http_client
+
+# Pool dedie aux telechargements relayes par l'API (app.services.media_urls)
+media_http_client = AsyncHttpxClient(
+    limits=Limits(
+        max_connections=settings.media_proxy_max_connections,
+        max_keepalive_connections=settings.db_max_keepalive_connections,
+        keepalive_expiry=30
+    ),
+    timeout=Timeout(settings.db_timeout),
+    follow_redirects=True
+)
+
+
+def _async_client(key: str) -> AsyncClient:
+    return AsyncClient(
+        settings.supabase_url,
+        key,
+        options=AsyncClientOptions(
+            storage=AsyncMemoryStorage(),
+            httpx_client=_http_client
+        )
+    )
+
+
+# Client admin async (secret key) - bypass RLS, utilise par tous les routers
+db: AsyncClient = _async_client(settings.supabase_secret_key)
+
+# Client public async (publishable key) - operations Supabase Auth utilisateur
+db_public: AsyncClient = _async_client(settings.supabase_publishable_key)
+
+# Client admin synchrone - reserve au code execute hors de la boucle asyncio
+# (worker de traitements media, python -m app.worker)
+supabase_admin: Client = create_client(
+    settings.supabase_url,
+    settings.supabase_secret_key
+)
+
+
+async def close() -> None:
+    """Ferme les pools de connexions (arret de l'application)"""
+    await _http_client.aclose()
+    await media_http_client.aclose()
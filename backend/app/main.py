@@ -1,11 +1,51 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+import logging
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from app.config import settings
+from app.auth import jwt_verifier
+from app import db
+from app.services.file_events import file_status_hub
+from app.services.query_memo import request_scope
+from app.services.reference_cache import reference_cache
+from app.services.signed_urls import cache_stats as signed_url_cache_stats
 from app.routers import auth, admin, profile, type_profile, type_support, type_seance, work_lead_type, project, group, file, work_lead_master, session_master, coach, navigant
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Rotation des cles JWKS en arriere-plan (verification locale des tokens)
+    key_rotation_task = None
+    if settings.auth_verification_mode == "local":
+        key_rotation_task = asyncio.create_task(jwt_verifier.run_key_rotation())
+
+    # Prechargement des tables de reference
+    await reference_cache.load_all()
+
+    # Suivi des statuts de traitement des fichiers (Realtime / lecture periodique)
+    await file_status_hub.start()
+
+    yield
+
+    await file_status_hub.stop()
+
+    if key_rotation_task:
+        key_rotation_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await key_rotation_task
+
+    # Fermer les pools de connexions Supabase (requetes et medias relayes)
+    await db.close()
+
+
 app = FastAPI(
     title="Starter API",
     description="API avec authentification multi-profil",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS - Adapter selon vos domaines
@@ -25,6 +65,16 @@ app.add_middleware(
     max_age=3600,
 )
 
+# Deduplication des requetes Supabase par requete HTTP + compteurs
+@app.middleware("http")
+async def query_scope_middleware(request: Request, call_next):
+    with request_scope() as scope:
+        response = await call_next(request)
+    response.headers["X-DB-Queries"] = str(scope.issued)
+    response.headers["X-DB-Queries-Reused"] = str(scope.served)
+    logger.debug(f"{request.method} {request.url.path} requetes Supabase: {scope.stats()}")
+    return response
+
 # Routers - Authentification
 app.include_router(auth.router)
 
@@ -67,4 +117,8 @@ def root():
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "auth": "enabled"}
+    return {
+        "status": "ok",
+        "auth": "enabled",
+        "signed_url_cache": signed_url_cache_stats()
+    }
@@ -90,5 +90,26 @@ class ProfileListResponse(BaseModel):
     total: int
 
 
+# ============================================
+# MEDIA JOBS (worker de traitements media)
+# ============================================
+class MediaJobStats(BaseModel):
+    """File d'un type de job: profondeur et durees des jobs termines (derniere heure)"""
+    job_type: str
+    queued: int
+    ready: int  # En file et sans delai de nouvel essai en cours
+    processing: int
+    failed: int
+    oldest_queued_at: Optional[datetime] = None
+    done_last_hour: int
+    avg_duration_ms: Optional[int] = None
+    p95_duration_ms: Optional[int] = None
+
+
+class MediaJobStatsResponse(BaseModel):
+    """Etat des files de traitements media"""
+    queues: List[MediaJobStats]
+
+
 # Mise a jour des forward references
 UserWithProfiles.model_rebuild()
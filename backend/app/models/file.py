@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 from enum import Enum
 
@@ -27,6 +27,7 @@ class FileType(str, Enum):
 
 
 class ProcessingStatus(str, Enum):
+    pending_upload = "pending_upload"
     ready = "ready"
     pending = "pending"
     processing = "processing"
@@ -61,14 +62,45 @@ class FileResponse(BaseModel):
     # Thumbnail and processing fields
     thumbnail_path: Optional[str] = None
     thumbnail_url: Optional[str] = None
+    # Declinaisons d'image par format: {"webp": "url 200w, url 400w, ...", "jpeg": ...}
+    srcset: Optional[Dict[str, str]] = None
+    # Videos: planche d'apercus (disposition dans media_info.sprite) et son
+    # index WebVTT (servi par l'API, cues vers la planche signee)
+    sprite_url: Optional[str] = None
+    vtt_url: Optional[str] = None
+    # Videos longues: playlist HLS principale (lecture adaptative, servie par l'API)
+    hls_path: Optional[str] = None
+    hls_url: Optional[str] = None
+    # SHA-256 du contenu envoye (les doublons partagent objet Storage et derives)
+    content_hash: Optional[str] = None
     processing_status: str = "ready"
     processing_error: Optional[str] = None
     original_file_size: Optional[int] = None
+    # Videos: duree, dimensions affichees, codecs, debit (ffprobe) et action
+    media_info: Optional[Dict[str, Any]] = None
 
     class Config:
         from_attributes = True
 
 
+class FileUploadRequest(BaseModel):
+    """Demande d'upload direct vers Storage (etape 1)"""
+    origin_entity_type: EntityType
+    origin_entity_id: str
+    file_name: str
+    mime_type: Optional[str] = None
+    file_type: Optional[FileType] = None
+
+
+class FileUploadTicket(BaseModel):
+    """URL d'upload signee: le client envoie le fichier directement a Storage"""
+    file_id: str
+    bucket: str
+    file_path: str
+    upload_url: str
+    token: str
+
+
 class FileReferenceCreate(BaseModel):
     files_id: str
     entity_type: EntityType
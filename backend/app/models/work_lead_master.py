@@ -31,7 +31,7 @@ class WorkLeadMasterResponse(BaseModel):
     work_lead_type_parent_name: Optional[str] = None
     name: str
     content: Optional[str] = None
-    current_status: str = "NEW"  # NEW, TODO, WORKING, DANGER, OK - derive de la table pivot
+    current_status: str = "NEW"  # NEW, TODO, WORKING, DANGER, OK - maintenu par trigger depuis la table pivot
     is_archived: bool
     is_deleted: bool
     created_at: datetime
@@ -2,61 +2,17 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from typing import List
 from app.models.admin import (
     UserCreate, UserIdentityUpdate, UserBasic, UserWithProfiles, UserListResponse,
-    ProfileCreate, ProfileUpdate, ProfileBasic, ProfileListResponse
+    ProfileCreate, ProfileUpdate, ProfileBasic, ProfileListResponse,
+    MediaJobStatsResponse
 )
-from app.auth import get_current_user, CurrentUser, supabase_admin, supabase
+from app.auth import require_admin, invalidate_profile_type, CurrentUser
+from app.db import db, db_public
+from app.services.media_jobs import get_job_stats
 import secrets
 import string
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
-# ID du type de profil admin
-ADMIN_PROFILE_ID = 1
-
-
-async def require_admin(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
-    """
-    Verifie que l'utilisateur connecte est un admin.
-    Leve une erreur 403 si ce n'est pas le cas.
-    """
-    if not user.active_profile_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acces refuse: profile requis"
-        )
-
-    try:
-        # Recuperer le type de profil de l'utilisateur
-        profile_response = supabase_admin.table("profile")\
-            .select("type_profile_id")\
-            .eq("id", user.active_profile_id)\
-            .execute()
-
-        if not profile_response.data:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Acces refuse: profile non trouve"
-            )
-
-        profile = profile_response.data[0]
-        type_profile_id = profile.get("type_profile_id")
-
-        if type_profile_id != ADMIN_PROFILE_ID:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Acces refuse: droits admin requis"
-            )
-
-        return user
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erreur verification admin: {str(e)}"
-        )
-
 
 def generate_temp_password(length: int = 16) -> str:
     """Genere un mot de passe temporaire securise"""
@@ -75,14 +31,14 @@ async def list_users(admin: CurrentUser = Depends(require_admin)):
     """
     try:
         # Recuperer tous les users de Supabase Auth
-        auth_response = supabase_admin.auth.admin.list_users()
+        auth_response = await db.auth.admin.list_users()
 
         users = []
         for auth_user in auth_response:
             metadata = auth_user.user_metadata or {}
 
             # Recuperer les profils de cet utilisateur
-            profiles_response = supabase_admin.table("profile")\
+            profiles_response = await db.table("profile")\
                 .select("id, user_uid, type_profile_id, created_at, type_profile(name)")\
                 .eq("user_uid", auth_user.id)\
                 .execute()
@@ -137,7 +93,7 @@ async def create_user(
         if user_data.last_name:
             user_metadata["last_name"] = user_data.last_name
 
-        auth_response = supabase_admin.auth.admin.create_user({
+        auth_response = await db.auth.admin.create_user({
             "email": user_data.email,
             "password": temp_password,
             "email_confirm": True,
@@ -185,7 +141,7 @@ async def get_user(
     Reserve aux admins.
     """
     try:
-        auth_user = supabase_admin.auth.admin.get_user_by_id(user_id)
+        auth_user = await db.auth.admin.get_user_by_id(user_id)
 
         if not auth_user.user:
             raise HTTPException(
@@ -196,7 +152,7 @@ async def get_user(
         metadata = auth_user.user.user_metadata or {}
 
         # Recuperer les profils
-        profiles_response = supabase_admin.table("profile")\
+        profiles_response = await db.table("profile")\
             .select("id, user_uid, type_profile_id, created_at, type_profile(name)")\
             .eq("user_uid", user_id)\
             .execute()
@@ -241,7 +197,7 @@ async def update_user_identity(
     Reserve aux admins.
     """
     try:
-        auth_user = supabase_admin.auth.admin.get_user_by_id(user_id)
+        auth_user = await db.auth.admin.get_user_by_id(user_id)
 
         if not auth_user.user:
             raise HTTPException(
@@ -265,7 +221,7 @@ async def update_user_identity(
 
         new_metadata = {**current_metadata, **update_metadata}
 
-        supabase_admin.auth.admin.update_user_by_id(
+        await db.auth.admin.update_user_by_id(
             user_id,
             {"user_metadata": new_metadata}
         )
@@ -278,7 +234,7 @@ async def update_user_identity(
             profile_update["last_name"] = update_metadata["last_name"]
 
         if profile_update:
-            supabase_admin.table("profile")\
+            await db.table("profile")\
                 .update(profile_update)\
                 .eq("user_uid", user_id)\
                 .execute()
@@ -310,7 +266,7 @@ async def delete_user(
                 detail="Vous ne pouvez pas supprimer votre propre compte"
             )
 
-        supabase_admin.auth.admin.delete_user(user_id)
+        await db.auth.admin.delete_user(user_id)
         return None
 
     except HTTPException:
@@ -332,7 +288,7 @@ async def resend_invite(
     Reserve aux admins.
     """
     try:
-        auth_user = supabase_admin.auth.admin.get_user_by_id(user_id)
+        auth_user = await db.auth.admin.get_user_by_id(user_id)
 
         if not auth_user.user:
             raise HTTPException(
@@ -340,7 +296,7 @@ async def resend_invite(
                 detail="Utilisateur non trouve"
             )
 
-        supabase.auth.reset_password_email(auth_user.user.email)
+        await db_public.auth.reset_password_email(auth_user.user.email)
 
         return {"message": f"Email de reinitialisation envoye a {auth_user.user.email}"}
 
@@ -366,13 +322,13 @@ async def list_profiles(
     Reserve aux admins.
     """
     try:
-        query = supabase_admin.table("profile")\
+        query = db.table("profile")\
             .select("id, user_uid, type_profile_id, created_at, type_profile(name)")
 
         if user_id:
             query = query.eq("user_uid", user_id)
 
-        response = query.order("created_at", desc=True).execute()
+        response = await query.order("created_at", desc=True).execute()
 
         profiles = []
         for p in response.data:
@@ -407,7 +363,7 @@ async def create_profile(
     try:
         # Verifier que l'utilisateur existe
         try:
-            auth_user = supabase_admin.auth.admin.get_user_by_id(profile_data.user_uid)
+            auth_user = await db.auth.admin.get_user_by_id(profile_data.user_uid)
             if not auth_user.user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -435,7 +391,7 @@ async def create_profile(
         if profile_data.type_profile_id:
             insert_data["type_profile_id"] = profile_data.type_profile_id
 
-        response = supabase_admin.table("profile")\
+        response = await db.table("profile")\
             .insert(insert_data)\
             .execute()
 
@@ -451,7 +407,7 @@ async def create_profile(
         type_profile_name = None
         if profile_data.type_profile_id:
             try:
-                type_response = supabase_admin.table("type_profile")\
+                type_response = await db.table("type_profile")\
                     .select("name")\
                     .eq("id", profile_data.type_profile_id)\
                     .execute()
@@ -492,7 +448,7 @@ async def get_profile(
     Reserve aux admins.
     """
     try:
-        response = supabase_admin.table("profile")\
+        response = await db.table("profile")\
             .select("id, user_uid, type_profile_id, created_at, type_profile(name)")\
             .eq("id", profile_id)\
             .execute()
@@ -542,7 +498,7 @@ async def update_profile(
                 detail="Aucune donnee a mettre a jour"
             )
 
-        response = supabase_admin.table("profile")\
+        response = await db.table("profile")\
             .update(update_data)\
             .eq("id", profile_id)\
             .execute()
@@ -553,6 +509,8 @@ async def update_profile(
                 detail="Profil non trouve"
             )
 
+        invalidate_profile_type(profile_id)
+
         return await get_profile(profile_id, admin)
 
     except HTTPException:
@@ -580,7 +538,7 @@ async def delete_profile(
     """
     try:
         # Verifier que ce n'est pas le dernier profil de l'utilisateur
-        profile_response = supabase_admin.table("profile")\
+        profile_response = await db.table("profile")\
             .select("user_uid")\
             .eq("id", profile_id)\
             .execute()
@@ -594,7 +552,7 @@ async def delete_profile(
         user_uid = profile_response.data[0]["user_uid"]
 
         # Compter les profils de l'utilisateur
-        count_response = supabase_admin.table("profile")\
+        count_response = await db.table("profile")\
             .select("id")\
             .eq("user_uid", user_uid)\
             .execute()
@@ -606,10 +564,11 @@ async def delete_profile(
             )
 
         # Supprimer le profil
-        supabase_admin.table("profile")\
+        await db.table("profile")\
             .delete()\
             .eq("id", profile_id)\
             .execute()
+        invalidate_profile_type(profile_id)
 
         return None
 
@@ -620,3 +579,25 @@ async def delete_profile(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur: {str(e)}"
         )
+
+
+# ============================================
+# MEDIA JOBS
+# ============================================
+@router.get("/media-jobs/stats", response_model=MediaJobStatsResponse)
+async def media_job_stats(admin: CurrentUser = Depends(require_admin)):
+    """
+    Profondeur des files de traitements media (videos, images) et durees
+    des jobs termines sur la derniere heure.
+    Reserve aux admins.
+    """
+    try:
+        return MediaJobStatsResponse(queues=await get_job_stats())
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur: {str(e)}"
+        )
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from app.models.user import UserLogin, AuthResponse, UserResponse
-from app.auth import supabase, supabase_admin, get_current_user, CurrentUser
+from app.auth import get_current_user, CurrentUser
+from app.db import db_public
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
@@ -14,7 +15,7 @@ async def login(data: UserLogin):
         AuthResponse avec access_token et infos user
     """
     try:
-        response = supabase.auth.sign_in_with_password({
+        response = await db_public.auth.sign_in_with_password({
             "email": data.email,
             "password": data.password
         })
@@ -53,7 +54,7 @@ async def logout(user: CurrentUser = Depends(get_current_user)):
     Se deconnecter.
     """
     try:
-        supabase.auth.sign_out()
+        await db_public.auth.sign_out()
         return {"message": "Deconnecte avec succes"}
     except:
         return {"message": "Deconnecte"}
@@ -78,7 +79,7 @@ async def refresh_token(refresh_token: str):
     Rafraichir l'access token avec un refresh token.
     """
     try:
-        response = supabase.auth.refresh_session(refresh_token)
+        response = await db_public.auth.refresh_session(refresh_token)
 
         return {
             "access_token": response.session.access_token,
@@ -98,7 +99,7 @@ async def request_password_reset(email: str):
     Demander un reset de mot de passe.
     """
     try:
-        supabase.auth.reset_password_email(email)
+        await db_public.auth.reset_password_email(email)
         return {"message": "Email de reinitialisation envoye"}
     except Exception as e:
         return {"message": "Si cet email existe, un email de reinitialisation a ete envoye"}
@@ -113,7 +114,7 @@ async def update_password(
     Mettre a jour le mot de passe de l'utilisateur connecte.
     """
     try:
-        supabase.auth.update_user({
+        await db_public.auth.update_user({
             "password": new_password
         })
         return {"message": "Mot de passe mis a jour"}
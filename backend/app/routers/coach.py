@@ -1,8 +1,10 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status, Query
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
-from app.auth import get_current_user, require_coach, CurrentUser, supabase_admin
+from app.auth import get_current_user, require_coach, CurrentUser
+from app.db import db
+from app.services.reference_cache import reference_cache, not_modified_response
 
 router = APIRouter(prefix="/api/coach", tags=["coach"])
 
@@ -68,7 +70,7 @@ class GroupWorkLead(BaseModel):
     work_lead_type_parent_id: Optional[str] = None
     work_lead_type_parent_name: Optional[str] = None
     content: Optional[str] = None
-    current_status: str = "NEW"  # NEW, TODO, WORKING, DANGER, OK - derive de la table pivot
+    current_status: str = "NEW"  # NEW, TODO, WORKING, DANGER, OK - maintenu par trigger depuis la table pivot
     is_deleted: bool = False
     is_archived: bool = False
     created_at: datetime
@@ -128,12 +130,12 @@ def _format_user_name(first_name: str = None, last_name: str = None) -> str:
     return None
 
 
-def _get_user_info(user_uid: str) -> dict:
+async def _get_user_info(user_uid: str) -> dict:
     """Recupere les infos utilisateur depuis auth.users (DEPRECATED - utiliser les colonnes profile)"""
     # NOTE: Cette fonction est conservee pour les cas ou on a besoin de l'email
     # Pour first_name/last_name, utiliser directement les colonnes de profile
     try:
-        user_response = supabase_admin.auth.admin.get_user_by_id(user_uid)
+        user_response = await db.auth.admin.get_user_by_id(user_uid)
         if user_response and user_response.user:
             metadata = user_response.user.user_metadata or {}
             return {
@@ -148,7 +150,7 @@ def _get_user_info(user_uid: str) -> dict:
 
 async def _verify_coach_in_group(profile_id: str, group_id: str) -> bool:
     """Verifie que le coach appartient au groupe"""
-    response = supabase_admin.table("group_profile")\
+    response = await db.table("group_profile")\
         .select("group_id")\
         .eq("profile_id", profile_id)\
         .eq("group_id", group_id)\
@@ -156,12 +158,12 @@ async def _verify_coach_in_group(profile_id: str, group_id: str) -> bool:
     return len(response.data) > 0
 
 
-def _get_coach_name(profile_id: Optional[str]) -> Optional[str]:
+async def _get_coach_name(profile_id: Optional[str]) -> Optional[str]:
     """Recupere le nom du coach depuis son profile_id"""
     if not profile_id:
         return None
     try:
-        profile = supabase_admin.table("profile")\
+        profile = await db.table("profile")\
             .select("first_name, last_name")\
             .eq("id", profile_id)\
             .execute()
@@ -173,25 +175,20 @@ def _get_coach_name(profile_id: Optional[str]) -> Optional[str]:
     return None
 
 
-def _get_work_lead_types_lookup() -> dict:
+async def _get_work_lead_types_lookup() -> dict:
     """Recupere tous les types d'axes de travail pour le lookup des parents"""
     try:
-        response = supabase_admin.table("work_lead_type")\
-            .select("id, name, parent_id")\
-            .is_("project_id", "null")\
-            .eq("is_deleted", False)\
-            .execute()
-        return {t["id"]: t for t in response.data}
+        return await reference_cache.work_lead_types_lookup()
     except:
         return {}
 
 
-def _get_session_projects(session_master_id: str) -> list:
+async def _get_session_projects(session_master_id: str) -> list:
     """Recupere les projets lies a une session_master via la table session"""
     try:
         # Requete sur session pour trouver les projets participants
         # Inclut first_name et last_name directement depuis profile
-        response = supabase_admin.table("session")\
+        response = await db.table("session")\
             .select("id, project_id, project(id, name, profile(first_name, last_name))")\
             .eq("session_master_id", session_master_id)\
             .eq("is_deleted", False)\
@@ -221,214 +218,6 @@ def _get_session_projects(session_master_id: str) -> list:
         return []
 
 
-def _get_current_status_for_work_lead_master(work_lead_master_id: str) -> str:
-    """
-    Calcule le statut courant d'un work_lead_master depuis la table pivot.
-    - Pas d'entree dans session_master_work_lead_master => NEW
-    - Entrees existantes => statut de l'entree la plus recente (updated_at)
-    """
-    try:
-        response = supabase_admin.table("session_master_work_lead_master")\
-            .select("status, updated_at")\
-            .eq("work_lead_master_id", work_lead_master_id)\
-            .order("updated_at", desc=True)\
-            .limit(1)\
-            .execute()
-
-        if response.data and len(response.data) > 0:
-            return response.data[0]["status"]
-        return "NEW"
-    except:
-        return "NEW"
-
-
-def _propagate_work_lead_master_to_projects(
-    session_master_id: str,
-    work_lead_master_id: str,
-    new_status: str,
-    profile_id: str
-):
-    """
-    Propage un work_lead_master vers les work_leads des projets lies a la session_master.
-
-    Pour chaque projet lie a la session_master:
-    1. Cherche un work_lead existant (inclut archives) lie au work_lead_master
-    2. Si non trouve, cree le work_lead en copiant name, content, work_lead_type_id
-       et partage les fichiers via files_reference
-    3. Met a jour session_work_lead si override_master = FALSE ou nouvelle entree
-    """
-    try:
-        # Recuperer les infos du work_lead_master
-        wlm_response = supabase_admin.table("work_lead_master")\
-            .select("id, name, content, work_lead_type_id")\
-            .eq("id", work_lead_master_id)\
-            .execute()
-
-        if not wlm_response.data:
-            return
-
-        work_lead_master = wlm_response.data[0]
-
-        # Recuperer les sessions individuelles liees a cette session_master
-        # (et donc les projets)
-        sessions_response = supabase_admin.table("session")\
-            .select("id, project_id")\
-            .eq("session_master_id", session_master_id)\
-            .eq("is_deleted", False)\
-            .execute()
-
-        if not sessions_response.data:
-            return
-
-        for session_data in sessions_response.data:
-            session_id = session_data["id"]
-            project_id = session_data["project_id"]
-
-            # Chercher un work_lead existant pour ce projet et ce work_lead_master
-            # (inclure les archives)
-            existing_wl = supabase_admin.table("work_lead")\
-                .select("id")\
-                .eq("project_id", project_id)\
-                .eq("work_lead_master_id", work_lead_master_id)\
-                .eq("is_deleted", False)\
-                .execute()
-
-            work_lead_id = None
-
-            if existing_wl.data:
-                # Work lead existe deja
-                work_lead_id = existing_wl.data[0]["id"]
-            else:
-                # Creer le work_lead
-                new_wl = supabase_admin.table("work_lead")\
-                    .insert({
-                        "project_id": project_id,
-                        "work_lead_master_id": work_lead_master_id,
-                        "work_lead_type_id": work_lead_master["work_lead_type_id"],
-                        "name": work_lead_master["name"],
-                        "content": work_lead_master.get("content")
-                    })\
-                    .execute()
-
-                if new_wl.data:
-                    work_lead_id = new_wl.data[0]["id"]
-
-                    # Copier les fichiers via files_reference
-                    # 1. Fichiers sources du work_lead_master
-                    source_files = supabase_admin.table("files")\
-                        .select("id")\
-                        .eq("origin_entity_type", "work_lead_master")\
-                        .eq("origin_entity_id", work_lead_master_id)\
-                        .execute()
-
-                    for file_record in source_files.data:
-                        supabase_admin.table("files_reference")\
-                            .insert({
-                                "files_id": file_record["id"],
-                                "entity_type": "work_lead",
-                                "entity_id": work_lead_id
-                            })\
-                            .execute()
-
-                    # 2. Fichiers partages avec le work_lead_master
-                    shared_files = supabase_admin.table("files_reference")\
-                        .select("files_id")\
-                        .eq("entity_type", "work_lead_master")\
-                        .eq("entity_id", work_lead_master_id)\
-                        .execute()
-
-                    for ref_record in shared_files.data:
-                        supabase_admin.table("files_reference")\
-                            .insert({
-                                "files_id": ref_record["files_id"],
-                                "entity_type": "work_lead",
-                                "entity_id": work_lead_id
-                            })\
-                            .execute()
-
-            if work_lead_id:
-                # Verifier si une entree session_work_lead existe deja
-                existing_swl = supabase_admin.table("session_work_lead")\
-                    .select("session_id, override_master")\
-                    .eq("session_id", session_id)\
-                    .eq("work_lead_id", work_lead_id)\
-                    .execute()
-
-                if existing_swl.data:
-                    # Entree existe - ne synchroniser que si override_master = FALSE
-                    if existing_swl.data[0].get("override_master") == False:
-                        supabase_admin.table("session_work_lead")\
-                            .update({
-                                "status": new_status,
-                                "profile_id": profile_id
-                            })\
-                            .eq("session_id", session_id)\
-                            .eq("work_lead_id", work_lead_id)\
-                            .execute()
-                else:
-                    # Nouvelle entree - creer avec override_master = FALSE
-                    supabase_admin.table("session_work_lead")\
-                        .insert({
-                            "session_id": session_id,
-                            "work_lead_id": work_lead_id,
-                            "status": new_status,
-                            "override_master": False,
-                            "profile_id": profile_id
-                        })\
-                        .execute()
-
-    except Exception as e:
-        # Log l'erreur mais ne pas faire echouer l'operation principale
-        print(f"Erreur propagation work_lead_master: {str(e)}")
-
-
-def _remove_work_lead_master_from_projects(
-    session_master_id: str,
-    work_lead_master_id: str
-):
-    """
-    Supprime les session_work_lead lies a un work_lead_master pour une session_master.
-    Ne supprime que les entrees avec override_master = FALSE.
-    """
-    try:
-        # Recuperer les sessions individuelles liees a cette session_master
-        sessions_response = supabase_admin.table("session")\
-            .select("id, project_id")\
-            .eq("session_master_id", session_master_id)\
-            .eq("is_deleted", False)\
-            .execute()
-
-        if not sessions_response.data:
-            return
-
-        for session_data in sessions_response.data:
-            session_id = session_data["id"]
-            project_id = session_data["project_id"]
-
-            # Trouver le work_lead lie au work_lead_master pour ce projet
-            existing_wl = supabase_admin.table("work_lead")\
-                .select("id")\
-                .eq("project_id", project_id)\
-                .eq("work_lead_master_id", work_lead_master_id)\
-                .eq("is_deleted", False)\
-                .execute()
-
-            if existing_wl.data:
-                work_lead_id = existing_wl.data[0]["id"]
-
-                # Supprimer session_work_lead seulement si override_master = FALSE
-                supabase_admin.table("session_work_lead")\
-                    .delete()\
-                    .eq("session_id", session_id)\
-                    .eq("work_lead_id", work_lead_id)\
-                    .eq("override_master", False)\
-                    .execute()
-
-    except Exception as e:
-        # Log l'erreur mais ne pas faire echouer l'operation principale
-        print(f"Erreur suppression session_work_lead: {str(e)}")
-
-
 # ============================================
 # GROUPS
 # ============================================
@@ -438,7 +227,7 @@ async def list_my_groups(user: CurrentUser = Depends(require_coach)):
     """Liste les groupes auxquels le coach a acces"""
     try:
         # Recuperer les group_ids du coach
-        groups_response = supabase_admin.table("group_profile")\
+        groups_response = await db.table("group_profile")\
             .select("group_id")\
             .eq("profile_id", user.active_profile_id)\
             .execute()
@@ -448,9 +237,9 @@ async def list_my_groups(user: CurrentUser = Depends(require_coach)):
         if not group_ids:
             return []
 
-        # Recuperer les details des groupes
-        groups = supabase_admin.table("group")\
-            .select("*, type_support(name)")\
+        # Recuperer les groupes avec leurs compteurs (vue group_summary)
+        groups = await db.table("group_summary")\
+            .select("*")\
             .in_("id", group_ids)\
             .eq("is_deleted", False)\
             .order("name")\
@@ -458,27 +247,14 @@ async def list_my_groups(user: CurrentUser = Depends(require_coach)):
 
         result = []
         for g in groups.data:
-            # Compteur projets
-            projects_count = supabase_admin.table("group_project")\
-                .select("project_id", count="exact")\
-                .eq("group_id", g["id"])\
-                .execute()
-
-            # Compteur sessions (session_master avec group_id)
-            sessions_count = supabase_admin.table("session_master")\
-                .select("id", count="exact")\
-                .eq("group_id", g["id"])\
-                .eq("is_deleted", False)\
-                .execute()
-
             result.append(CoachGroup(
                 id=g["id"],
                 name=g["name"],
                 description=g.get("description"),
                 type_support_id=g.get("type_support_id"),
-                type_support_name=g["type_support"]["name"] if g.get("type_support") else None,
-                projects_count=projects_count.count or 0,
-                sessions_count=sessions_count.count or 0
+                type_support_name=g.get("type_support_name"),
+                projects_count=g.get("projects_count") or 0,
+                sessions_count=g.get("sessions_count") or 0
             ))
 
         return result
@@ -506,7 +282,7 @@ async def get_my_group_basic(group_id: str, user: CurrentUser = Depends(require_
                 detail="Acces refuse a ce groupe"
             )
 
-        response = supabase_admin.table("group")\
+        response = await db.table("group")\
             .select("id, name, type_support(name)")\
             .eq("id", group_id)\
             .eq("is_deleted", False)\
@@ -545,9 +321,9 @@ async def get_my_group(group_id: str, user: CurrentUser = Depends(require_coach)
                 detail="Acces refuse a ce groupe"
             )
 
-        # Recuperer le groupe
-        response = supabase_admin.table("group")\
-            .select("*, type_support(name)")\
+        # Recuperer le groupe (avec compteur de sessions, vue group_summary)
+        response = await db.table("group_summary")\
+            .select("*")\
             .eq("id", group_id)\
             .eq("is_deleted", False)\
             .execute()
@@ -561,7 +337,7 @@ async def get_my_group(group_id: str, user: CurrentUser = Depends(require_coach)
         g = response.data[0]
 
         # Recuperer les projets (avec first_name/last_name depuis profile)
-        projects_response = supabase_admin.table("group_project")\
+        projects_response = await db.table("group_project")\
             .select("project(id, name, type_support(name), profile(first_name, last_name))")\
             .eq("group_id", group_id)\
             .execute()
@@ -584,21 +360,14 @@ async def get_my_group(group_id: str, user: CurrentUser = Depends(require_coach)
                     "navigant_email": None  # Email non charge pour performance
                 })
 
-        # Compteurs
-        sessions_count = supabase_admin.table("session_master")\
-            .select("id", count="exact")\
-            .eq("group_id", group_id)\
-            .eq("is_deleted", False)\
-            .execute()
-
         return CoachGroupDetails(
             id=g["id"],
             name=g["name"],
             description=g.get("description"),
             type_support_id=g.get("type_support_id"),
-            type_support_name=g["type_support"]["name"] if g.get("type_support") else None,
+            type_support_name=g.get("type_support_name"),
             projects_count=len(projects),
-            sessions_count=sessions_count.count or 0,
+            sessions_count=g.get("sessions_count") or 0,
             projects=projects
         )
 
@@ -629,14 +398,14 @@ async def list_group_sessions(
                 detail="Acces refuse a ce groupe"
             )
 
-        query = supabase_admin.table("session_master")\
+        query = db.table("session_master")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("group_id", group_id)
 
         if not include_deleted:
             query = query.eq("is_deleted", False)
 
-        response = query.order("date_start", desc=True).execute()
+        response = await query.order("date_start", desc=True).execute()
 
         sessions = []
         for s in response.data:
@@ -682,13 +451,7 @@ async def create_group_session(
             )
 
         # Verifier que le type_seance existe
-        type_check = supabase_admin.table("type_seance")\
-            .select("id")\
-            .eq("id", data.type_seance_id)\
-            .eq("is_deleted", False)\
-            .execute()
-
-        if not type_check.data:
+        if not await reference_cache.exists("type_seance", data.type_seance_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Type de seance non trouve"
@@ -707,7 +470,7 @@ async def create_group_session(
             "content": data.content
         }
 
-        response = supabase_admin.table("session_master")\
+        response = await db.table("session_master")\
             .insert(insert_data)\
             .execute()
 
@@ -722,7 +485,7 @@ async def create_group_session(
         # Creer les sessions individuelles pour chaque projet selectionne
         if data.project_ids and len(data.project_ids) > 0:
             # Recuperer les projets du groupe avec leur profile_id
-            group_projects = supabase_admin.table("group_project")\
+            group_projects = await db.table("group_project")\
                 .select("project_id, project(profile_id)")\
                 .eq("group_id", group_id)\
                 .execute()
@@ -734,38 +497,38 @@ async def create_group_session(
 
             valid_project_ids = set(project_profiles.keys())
 
-            for project_id in data.project_ids:
-                if project_id not in valid_project_ids:
-                    continue  # Ignorer les projets non valides
+            # Ignorer les projets non valides (et les doublons)
+            selected_project_ids = [
+                pid for pid in dict.fromkeys(data.project_ids) if pid in valid_project_ids
+            ]
 
-                # Creer la session individuelle
-                session_insert = {
-                    "name": data.name,
-                    "project_id": project_id,
-                    "session_master_id": session_master_id,
-                    "type_seance_id": data.type_seance_id,
-                    "date_start": data.date_start.isoformat() if data.date_start else None,
-                    "date_end": data.date_end.isoformat() if data.date_end else None,
-                    "location": data.location
-                }
-
-                session_response = supabase_admin.table("session")\
-                    .insert(session_insert)\
+            if selected_project_ids:
+                # Creer les sessions individuelles (insert multi-lignes)
+                session_response = await db.table("session")\
+                    .insert([{
+                        "name": data.name,
+                        "project_id": project_id,
+                        "session_master_id": session_master_id,
+                        "type_seance_id": data.type_seance_id,
+                        "date_start": data.date_start.isoformat() if data.date_start else None,
+                        "date_end": data.date_end.isoformat() if data.date_end else None,
+                        "location": data.location
+                    } for project_id in selected_project_ids])\
                     .execute()
 
                 # Ajouter l'equipage initial (profile du projet = navigant)
-                if session_response.data and project_profiles.get(project_id):
-                    session_id = session_response.data[0]["id"]
-                    profile_id = project_profiles[project_id]
-                    supabase_admin.table("session_profile")\
-                        .insert({
-                            "session_id": session_id,
-                            "profile_id": profile_id
-                        })\
+                crew_rows = [
+                    {"session_id": new_session["id"], "profile_id": project_profiles[new_session["project_id"]]}
+                    for new_session in session_response.data
+                    if project_profiles.get(new_session["project_id"])
+                ]
+                if crew_rows:
+                    await db.table("session_profile")\
+                        .insert(crew_rows)\
                         .execute()
 
         # Recuperer avec jointure
-        session = supabase_admin.table("session_master")\
+        session = await db.table("session_master")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("id", session_master_id)\
             .execute()
@@ -811,7 +574,7 @@ async def get_group_session(
                 detail="Acces refuse a ce groupe"
             )
 
-        response = supabase_admin.table("session_master")\
+        response = await db.table("session_master")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("id", session_id)\
             .eq("group_id", group_id)\
@@ -827,10 +590,10 @@ async def get_group_session(
         type_seance = s.get("type_seance")
 
         # Recuperer le nom du coach
-        coach_name = _get_coach_name(s.get("coach_id"))
+        coach_name = await _get_coach_name(s.get("coach_id"))
 
         # Recuperer les projets lies
-        projects = _get_session_projects(s["id"])
+        projects = await _get_session_projects(s["id"])
 
         return GroupSession(
             id=s["id"],
@@ -883,7 +646,7 @@ async def update_group_session(
             "content": data.content
         }
 
-        response = supabase_admin.table("session_master")\
+        response = await db.table("session_master")\
             .update(update_data)\
             .eq("id", session_id)\
             .eq("group_id", group_id)\
@@ -920,7 +683,7 @@ async def delete_group_session(
                 detail="Acces refuse a ce groupe"
             )
 
-        response = supabase_admin.table("session_master")\
+        response = await db.table("session_master")\
             .update({"is_deleted": True})\
             .eq("id", session_id)\
             .eq("group_id", group_id)\
@@ -963,7 +726,7 @@ async def list_group_work_leads(
                 detail="Acces refuse a ce groupe"
             )
 
-        query = supabase_admin.table("work_lead_master")\
+        query = db.table("work_lead_master")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .eq("group_id", group_id)
 
@@ -973,10 +736,10 @@ async def list_group_work_leads(
         if not include_archived:
             query = query.eq("is_archived", False)
 
-        response = query.order("name").execute()
+        response = await query.order("name").execute()
 
         # Lookup des types pour resoudre les parents
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
 
         work_leads = []
         for w in response.data:
@@ -994,7 +757,7 @@ async def list_group_work_leads(
                 work_lead_type_parent_id=parent_id,
                 work_lead_type_parent_name=parent_name,
                 content=w.get("content"),
-                current_status=_get_current_status_for_work_lead_master(w["id"]),
+                current_status=w.get("current_status") or "NEW",
                 is_deleted=w.get("is_deleted", False),
                 is_archived=w.get("is_archived", False),
                 created_at=w["created_at"],
@@ -1027,13 +790,7 @@ async def create_group_work_lead(
             )
 
         # Verifier que le work_lead_type existe
-        type_check = supabase_admin.table("work_lead_type")\
-            .select("id")\
-            .eq("id", data.work_lead_type_id)\
-            .eq("is_deleted", False)\
-            .execute()
-
-        if not type_check.data:
+        if not await reference_cache.exists("work_lead_type", data.work_lead_type_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Type d'axe de travail non trouve"
@@ -1046,7 +803,7 @@ async def create_group_work_lead(
             "content": data.content
         }
 
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .insert(insert_data)\
             .execute()
 
@@ -1057,7 +814,7 @@ async def create_group_work_lead(
             )
 
         # Recuperer avec jointure
-        work_lead = supabase_admin.table("work_lead_master")\
+        work_lead = await db.table("work_lead_master")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .eq("id", response.data[0]["id"])\
             .execute()
@@ -1066,7 +823,7 @@ async def create_group_work_lead(
         work_lead_type = w.get("work_lead_type")
 
         # Lookup des types pour resoudre le parent
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
         parent_id = work_lead_type.get("parent_id") if work_lead_type else None
         parent_name = None
         if parent_id and types_lookup.get(parent_id):
@@ -1110,7 +867,7 @@ async def get_group_work_lead(
                 detail="Acces refuse a ce groupe"
             )
 
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .eq("id", work_lead_id)\
             .eq("group_id", group_id)\
@@ -1126,7 +883,7 @@ async def get_group_work_lead(
         work_lead_type = w.get("work_lead_type")
 
         # Lookup des types pour resoudre le parent
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
         parent_id = work_lead_type.get("parent_id") if work_lead_type else None
         parent_name = None
         if parent_id and types_lookup.get(parent_id):
@@ -1140,7 +897,7 @@ async def get_group_work_lead(
             work_lead_type_parent_id=parent_id,
             work_lead_type_parent_name=parent_name,
             content=w.get("content"),
-            current_status=_get_current_status_for_work_lead_master(w["id"]),
+            current_status=w.get("current_status") or "NEW",
             is_deleted=w.get("is_deleted", False),
             is_archived=w.get("is_archived", False),
             created_at=w["created_at"],
@@ -1173,7 +930,7 @@ async def get_group_work_lead_sessions(
             )
 
         # Verify work_lead_master exists and belongs to group
-        wl_check = supabase_admin.table("work_lead_master")\
+        wl_check = await db.table("work_lead_master")\
             .select("id")\
             .eq("id", work_lead_id)\
             .eq("group_id", group_id)\
@@ -1186,7 +943,7 @@ async def get_group_work_lead_sessions(
             )
 
         # Get all session_master_ids and statuses from pivot table
-        pivot_response = supabase_admin.table("session_master_work_lead_master")\
+        pivot_response = await db.table("session_master_work_lead_master")\
             .select("session_master_id, status")\
             .eq("work_lead_master_id", work_lead_id)\
             .execute()
@@ -1203,7 +960,7 @@ async def get_group_work_lead_sessions(
         status_map = {p["session_master_id"]: p["status"] for p in pivot_response.data}
 
         # Get total count (excluding deleted sessions)
-        count_response = supabase_admin.table("session_master")\
+        count_response = await db.table("session_master")\
             .select("id", count="exact")\
             .in_("id", session_ids)\
             .eq("is_deleted", False)\
@@ -1211,7 +968,7 @@ async def get_group_work_lead_sessions(
         total = count_response.count or 0
 
         # Get session_masters ordered by date_start DESC with pagination
-        sessions_response = supabase_admin.table("session_master")\
+        sessions_response = await db.table("session_master")\
             .select("id, name, date_start")\
             .in_("id", session_ids)\
             .eq("is_deleted", False)\
@@ -1265,7 +1022,7 @@ async def update_group_work_lead(
             "content": data.content
         }
 
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .update(update_data)\
             .eq("id", work_lead_id)\
             .eq("group_id", group_id)\
@@ -1302,7 +1059,7 @@ async def delete_group_work_lead(
                 detail="Acces refuse a ce groupe"
             )
 
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .update({"is_deleted": True})\
             .eq("id", work_lead_id)\
             .eq("group_id", group_id)\
@@ -1340,7 +1097,7 @@ async def archive_group_work_lead(
                 detail="Acces refuse a ce groupe"
             )
 
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .update({"is_archived": True})\
             .eq("id", work_lead_id)\
             .eq("group_id", group_id)\
@@ -1379,7 +1136,7 @@ async def unarchive_group_work_lead(
                 detail="Acces refuse a ce groupe"
             )
 
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .update({"is_archived": False})\
             .eq("id", work_lead_id)\
             .eq("group_id", group_id)\
@@ -1418,7 +1175,7 @@ async def restore_group_work_lead(
                 detail="Acces refuse a ce groupe"
             )
 
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .update({"is_deleted": False})\
             .eq("id", work_lead_id)\
             .eq("group_id", group_id)\
@@ -1460,7 +1217,7 @@ async def list_group_projects(
             )
 
         # Inclure first_name/last_name directement depuis profile (evite N+1 sur Auth API)
-        response = supabase_admin.table("group_project")\
+        response = await db.table("group_project")\
             .select("project(id, name, type_support(name), profile(first_name, last_name))")\
             .eq("group_id", group_id)\
             .execute()
@@ -1596,7 +1353,7 @@ class ProjectSessionDetail(BaseModel):
 
 async def _verify_project_in_group(project_id: str, group_id: str) -> bool:
     """Verifie que le projet appartient au groupe"""
-    response = supabase_admin.table("group_project")\
+    response = await db.table("group_project")\
         .select("project_id")\
         .eq("project_id", project_id)\
         .eq("group_id", group_id)\
@@ -1604,32 +1361,11 @@ async def _verify_project_in_group(project_id: str, group_id: str) -> bool:
     return len(response.data) > 0
 
 
-def _get_current_status_for_work_lead(work_lead_id: str) -> str:
-    """
-    Calcule le statut courant d'un work_lead depuis la table pivot session_work_lead.
-    - Pas d'entree => NEW
-    - Entrees existantes => statut de l'entree la plus recente (updated_at)
-    """
-    try:
-        response = supabase_admin.table("session_work_lead")\
-            .select("status, updated_at")\
-            .eq("work_lead_id", work_lead_id)\
-            .order("updated_at", desc=True)\
-            .limit(1)\
-            .execute()
-
-        if response.data and len(response.data) > 0:
-            return response.data[0]["status"]
-        return "NEW"
-    except:
-        return "NEW"
-
-
-def _get_session_crew(session_id: str) -> List[CoachCrewMember]:
+async def _get_session_crew(session_id: str) -> List[CoachCrewMember]:
     """Recupere l'equipage d'une session"""
     try:
         # Inclure first_name/last_name directement depuis profile
-        response = supabase_admin.table("session_profile")\
+        response = await db.table("session_profile")\
             .select("profile_id, profile(first_name, last_name)")\
             .eq("session_id", session_id)\
             .execute()
@@ -1650,16 +1386,16 @@ def _get_session_crew(session_id: str) -> List[CoachCrewMember]:
         return []
 
 
-def _get_session_work_leads_for_project(session_id: str) -> List[CoachSessionWorkLeadItem]:
+async def _get_session_work_leads_for_project(session_id: str) -> List[CoachSessionWorkLeadItem]:
     """Recupere les work_leads associes a une session avec leur status"""
     try:
-        response = supabase_admin.table("session_work_lead")\
+        response = await db.table("session_work_lead")\
             .select("*, work_lead(id, name, work_lead_type_id, work_lead_master_id, work_lead_type(id, name, parent_id))")\
             .eq("session_id", session_id)\
             .execute()
 
         # Lookup des types pour resoudre les parents
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
 
         items = []
         for swl in response.data:
@@ -1690,10 +1426,10 @@ def _get_session_work_leads_for_project(session_id: str) -> List[CoachSessionWor
         return []
 
 
-def _get_session_master_info_for_project(session_master_id: str) -> Optional[CoachSessionMasterInfo]:
+async def _get_session_master_info_for_project(session_master_id: str) -> Optional[CoachSessionMasterInfo]:
     """Recupere les infos de la session_master"""
     try:
-        response = supabase_admin.table("session_master")\
+        response = await db.table("session_master")\
             .select("id, name, coach_id, content")\
             .eq("id", session_master_id)\
             .limit(1)\
@@ -1705,7 +1441,7 @@ def _get_session_master_info_for_project(session_master_id: str) -> Optional[Coa
         sm = response.data[0]
         coach_name = None
         if sm.get("coach_id"):
-            coach_name = _get_coach_name(sm["coach_id"])
+            coach_name = await _get_coach_name(sm["coach_id"])
 
         return CoachSessionMasterInfo(
             id=sm["id"],
@@ -1741,7 +1477,7 @@ async def get_project_detail(
             )
 
         # Recuperer le projet avec ses relations (first_name/last_name depuis profile)
-        response = supabase_admin.table("project")\
+        response = await db.table("project")\
             .select("id, name, type_support(name), profile(first_name, last_name)")\
             .eq("id", project_id)\
             .eq("is_deleted", False)\
@@ -1762,14 +1498,14 @@ async def get_project_detail(
             navigant_name = _format_user_name(profile.get("first_name"), profile.get("last_name"))
 
         # Compter les sessions
-        sessions_count = supabase_admin.table("session")\
+        sessions_count = await db.table("session")\
             .select("id", count="exact")\
             .eq("project_id", project_id)\
             .eq("is_deleted", False)\
             .execute()
 
         # Compter les work_leads
-        work_leads_count = supabase_admin.table("work_lead")\
+        work_leads_count = await db.table("work_lead")\
             .select("id", count="exact")\
             .eq("project_id", project_id)\
             .eq("is_deleted", False)\
@@ -1777,7 +1513,7 @@ async def get_project_detail(
             .execute()
 
         # Compter les periods
-        periods_count = supabase_admin.table("period")\
+        periods_count = await db.table("period")\
             .select("id", count="exact")\
             .eq("project_id", project_id)\
             .eq("is_deleted", False)\
@@ -1828,14 +1564,14 @@ async def list_project_sessions(
                 detail="Projet non trouve dans ce groupe"
             )
 
-        query = supabase_admin.table("session")\
+        query = db.table("session")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("project_id", project_id)
 
         if not include_deleted:
             query = query.eq("is_deleted", False)
 
-        response = query.order("date_start", desc=True).execute()
+        response = await query.order("date_start", desc=True).execute()
 
         sessions = []
         for s in response.data:
@@ -1890,7 +1626,7 @@ async def get_project_session_detail(
             )
 
         # Recuperer la session
-        response = supabase_admin.table("session")\
+        response = await db.table("session")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("id", session_id)\
             .eq("project_id", project_id)\
@@ -1906,7 +1642,7 @@ async def get_project_session_detail(
         type_seance = s.get("type_seance")
 
         # Recuperer le nom du projet
-        project_response = supabase_admin.table("project")\
+        project_response = await db.table("project")\
             .select("name")\
             .eq("id", project_id)\
             .execute()
@@ -1915,13 +1651,13 @@ async def get_project_session_detail(
         # Recuperer session_master si liee
         session_master = None
         if s.get("session_master_id"):
-            session_master = _get_session_master_info_for_project(s["session_master_id"])
+            session_master = await _get_session_master_info_for_project(s["session_master_id"])
 
         # Recuperer equipage
-        crew = _get_session_crew(session_id)
+        crew = await _get_session_crew(session_id)
 
         # Recuperer work_leads
-        work_leads = _get_session_work_leads_for_project(session_id)
+        work_leads = await _get_session_work_leads_for_project(session_id)
 
         return ProjectSessionDetail(
             id=s["id"],
@@ -1985,13 +1721,7 @@ async def create_project_session(
             )
 
         # Verifier que le type_seance existe
-        type_check = supabase_admin.table("type_seance")\
-            .select("id")\
-            .eq("id", data.type_seance_id)\
-            .eq("is_deleted", False)\
-            .execute()
-
-        if not type_check.data:
+        if not await reference_cache.exists("type_seance", data.type_seance_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Type de seance non trouve"
@@ -2006,7 +1736,7 @@ async def create_project_session(
             "location": data.location
         }
 
-        response = supabase_admin.table("session")\
+        response = await db.table("session")\
             .insert(insert_data)\
             .execute()
 
@@ -2019,13 +1749,13 @@ async def create_project_session(
         session_id = response.data[0]["id"]
 
         # Ajouter l'equipage initial (le navigant du projet)
-        project_response = supabase_admin.table("project")\
+        project_response = await db.table("project")\
             .select("profile_id")\
             .eq("id", project_id)\
             .execute()
 
         if project_response.data and project_response.data[0].get("profile_id"):
-            supabase_admin.table("session_profile")\
+            await db.table("session_profile")\
                 .insert({
                     "session_id": session_id,
                     "profile_id": project_response.data[0]["profile_id"]
@@ -2033,7 +1763,7 @@ async def create_project_session(
                 .execute()
 
         # Recuperer avec jointure
-        session = supabase_admin.table("session")\
+        session = await db.table("session")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("id", session_id)\
             .execute()
@@ -2097,7 +1827,7 @@ async def update_project_session(
             "location": data.location
         }
 
-        response = supabase_admin.table("session")\
+        response = await db.table("session")\
             .update(update_data)\
             .eq("id", session_id)\
             .eq("project_id", project_id)\
@@ -2110,7 +1840,7 @@ async def update_project_session(
             )
 
         # Recuperer avec jointure
-        session = supabase_admin.table("session")\
+        session = await db.table("session")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("id", session_id)\
             .execute()
@@ -2165,7 +1895,7 @@ async def delete_project_session(
                 detail="Projet non trouve dans ce groupe"
             )
 
-        response = supabase_admin.table("session")\
+        response = await db.table("session")\
             .update({"is_deleted": True})\
             .eq("id", session_id)\
             .eq("project_id", project_id)\
@@ -2217,7 +1947,7 @@ async def get_project_session_work_leads(
             )
 
         # Verifier que la session appartient au projet
-        session_check = supabase_admin.table("session")\
+        session_check = await db.table("session")\
             .select("id")\
             .eq("id", session_id)\
             .eq("project_id", project_id)\
@@ -2229,7 +1959,7 @@ async def get_project_session_work_leads(
                 detail="Session non trouvee"
             )
 
-        return _get_session_work_leads_for_project(session_id)
+        return await _get_session_work_leads_for_project(session_id)
 
     except HTTPException:
         raise
@@ -2272,7 +2002,7 @@ async def update_project_session_work_lead(
             )
 
         # Verifier que la session appartient au projet
-        session_check = supabase_admin.table("session")\
+        session_check = await db.table("session")\
             .select("id")\
             .eq("id", session_id)\
             .eq("project_id", project_id)\
@@ -2285,7 +2015,7 @@ async def update_project_session_work_lead(
             )
 
         # Verifier que le work_lead appartient au projet
-        wl_check = supabase_admin.table("work_lead")\
+        wl_check = await db.table("work_lead")\
             .select("id")\
             .eq("id", work_lead_id)\
             .eq("project_id", project_id)\
@@ -2299,7 +2029,7 @@ async def update_project_session_work_lead(
 
         # Si status est null, supprimer l'entree
         if data.status is None:
-            supabase_admin.table("session_work_lead")\
+            await db.table("session_work_lead")\
                 .delete()\
                 .eq("session_id", session_id)\
                 .eq("work_lead_id", work_lead_id)\
@@ -2325,7 +2055,7 @@ async def update_project_session_work_lead(
             )
 
         # Verifier si l'entree existe deja (table pivot avec cle composite session_id + work_lead_id)
-        existing = supabase_admin.table("session_work_lead")\
+        existing = await db.table("session_work_lead")\
             .select("session_id, work_lead_id, override_master")\
             .eq("session_id", session_id)\
             .eq("work_lead_id", work_lead_id)\
@@ -2340,14 +2070,14 @@ async def update_project_session_work_lead(
             if existing.data[0].get("override_master") is False:
                 update_data["override_master"] = True
 
-            supabase_admin.table("session_work_lead")\
+            await db.table("session_work_lead")\
                 .update(update_data)\
                 .eq("session_id", session_id)\
                 .eq("work_lead_id", work_lead_id)\
                 .execute()
         else:
             # Creation - override_master = NULL (work lead cree directement, pas de master)
-            supabase_admin.table("session_work_lead")\
+            await db.table("session_work_lead")\
                 .insert({
                     "session_id": session_id,
                     "work_lead_id": work_lead_id,
@@ -2358,7 +2088,7 @@ async def update_project_session_work_lead(
                 .execute()
 
         # Recuperer et retourner l'item mis a jour
-        result = supabase_admin.table("session_work_lead")\
+        result = await db.table("session_work_lead")\
             .select("*, work_lead(id, name, work_lead_type_id, work_lead_master_id, work_lead_type(id, name, parent_id))")\
             .eq("session_id", session_id)\
             .eq("work_lead_id", work_lead_id)\
@@ -2376,7 +2106,7 @@ async def update_project_session_work_lead(
         composite_id = f"{swl['session_id']}_{swl['work_lead_id']}"
 
         # Lookup des types pour resoudre le parent
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
         parent_id = wlt.get("parent_id") if wlt else None
         parent_name = None
         if parent_id and types_lookup.get(parent_id):
@@ -2428,7 +2158,7 @@ async def list_project_work_leads(
                 detail="Projet non trouve dans ce groupe"
             )
 
-        query = supabase_admin.table("work_lead")\
+        query = db.table("work_lead")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .eq("project_id", project_id)
 
@@ -2438,10 +2168,10 @@ async def list_project_work_leads(
         if not include_archived:
             query = query.eq("is_archived", False)
 
-        response = query.order("name").execute()
+        response = await query.order("name").execute()
 
         # Lookup des types pour resoudre les parents
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
 
         work_leads = []
         for w in response.data:
@@ -2459,7 +2189,7 @@ async def list_project_work_leads(
                 work_lead_type_parent_id=parent_id,
                 work_lead_type_parent_name=parent_name,
                 content=w.get("content"),
-                current_status=_get_current_status_for_work_lead(w["id"]),
+                current_status=w.get("current_status") or "NEW",
                 is_deleted=w.get("is_deleted", False),
                 is_archived=w.get("is_archived", False),
                 created_at=w["created_at"],
@@ -2500,7 +2230,7 @@ async def get_project_work_lead(
                 detail="Projet non trouve dans ce groupe"
             )
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .eq("id", work_lead_id)\
             .eq("project_id", project_id)\
@@ -2516,7 +2246,7 @@ async def get_project_work_lead(
         work_lead_type = w.get("work_lead_type")
 
         # Lookup des types pour resoudre le parent
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
         parent_id = work_lead_type.get("parent_id") if work_lead_type else None
         parent_name = None
         if parent_id and types_lookup.get(parent_id):
@@ -2530,7 +2260,7 @@ async def get_project_work_lead(
             work_lead_type_parent_id=parent_id,
             work_lead_type_parent_name=parent_name,
             content=w.get("content"),
-            current_status=_get_current_status_for_work_lead(w["id"]),
+            current_status=w.get("current_status") or "NEW",
             is_deleted=w.get("is_deleted", False),
             is_archived=w.get("is_archived", False),
             created_at=w["created_at"],
@@ -2571,7 +2301,7 @@ async def get_project_work_lead_sessions(
             )
 
         # Verify work_lead exists and belongs to project
-        wl_check = supabase_admin.table("work_lead")\
+        wl_check = await db.table("work_lead")\
             .select("id")\
             .eq("id", work_lead_id)\
             .eq("project_id", project_id)\
@@ -2584,7 +2314,7 @@ async def get_project_work_lead_sessions(
             )
 
         # Get all session_ids and statuses from pivot table
-        pivot_response = supabase_admin.table("session_work_lead")\
+        pivot_response = await db.table("session_work_lead")\
             .select("session_id, status")\
             .eq("work_lead_id", work_lead_id)\
             .execute()
@@ -2601,7 +2331,7 @@ async def get_project_work_lead_sessions(
         status_map = {p["session_id"]: p["status"] for p in pivot_response.data}
 
         # Get total count (excluding deleted sessions)
-        count_response = supabase_admin.table("session")\
+        count_response = await db.table("session")\
             .select("id", count="exact")\
             .in_("id", session_ids)\
             .eq("is_deleted", False)\
@@ -2609,7 +2339,7 @@ async def get_project_work_lead_sessions(
         total = count_response.count or 0
 
         # Get sessions ordered by date_start DESC with pagination
-        sessions_response = supabase_admin.table("session")\
+        sessions_response = await db.table("session")\
             .select("id, name, date_start")\
             .in_("id", session_ids)\
             .eq("is_deleted", False)\
@@ -2671,13 +2401,7 @@ async def create_project_work_lead(
             )
 
         # Verifier que le work_lead_type existe
-        type_check = supabase_admin.table("work_lead_type")\
-            .select("id")\
-            .eq("id", data.work_lead_type_id)\
-            .eq("is_deleted", False)\
-            .execute()
-
-        if not type_check.data:
+        if not await reference_cache.exists("work_lead_type", data.work_lead_type_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Type d'axe de travail non trouve"
@@ -2689,7 +2413,7 @@ async def create_project_work_lead(
             "work_lead_type_id": data.work_lead_type_id
         }
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .insert(insert_data)\
             .execute()
 
@@ -2700,7 +2424,7 @@ async def create_project_work_lead(
             )
 
         # Recuperer avec jointure
-        work_lead = supabase_admin.table("work_lead")\
+        work_lead = await db.table("work_lead")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .eq("id", response.data[0]["id"])\
             .execute()
@@ -2709,7 +2433,7 @@ async def create_project_work_lead(
         work_lead_type = w.get("work_lead_type")
 
         # Lookup des types pour resoudre le parent
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
         parent_id = work_lead_type.get("parent_id") if work_lead_type else None
         parent_name = None
         if parent_id and types_lookup.get(parent_id):
@@ -2768,7 +2492,7 @@ async def update_project_work_lead(
             "work_lead_type_id": data.work_lead_type_id
         }
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .update(update_data)\
             .eq("id", work_lead_id)\
             .eq("project_id", project_id)\
@@ -2781,7 +2505,7 @@ async def update_project_work_lead(
             )
 
         # Recuperer avec jointure
-        work_lead = supabase_admin.table("work_lead")\
+        work_lead = await db.table("work_lead")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .eq("id", work_lead_id)\
             .execute()
@@ -2790,7 +2514,7 @@ async def update_project_work_lead(
         work_lead_type = w.get("work_lead_type")
 
         # Lookup des types pour resoudre le parent
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
         parent_id = work_lead_type.get("parent_id") if work_lead_type else None
         parent_name = None
         if parent_id and types_lookup.get(parent_id):
@@ -2804,7 +2528,7 @@ async def update_project_work_lead(
             work_lead_type_parent_id=parent_id,
             work_lead_type_parent_name=parent_name,
             content=w.get("content"),
-            current_status=_get_current_status_for_work_lead(w["id"]),
+            current_status=w.get("current_status") or "NEW",
             is_deleted=w.get("is_deleted", False),
             is_archived=w.get("is_archived", False),
             created_at=w["created_at"],
@@ -2843,7 +2567,7 @@ async def delete_project_work_lead(
                 detail="Projet non trouve dans ce groupe"
             )
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .update({"is_deleted": True})\
             .eq("id", work_lead_id)\
             .eq("project_id", project_id)\
@@ -2890,7 +2614,7 @@ async def archive_project_work_lead(
                 detail="Projet non trouve dans ce groupe"
             )
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .update({"is_archived": True})\
             .eq("id", work_lead_id)\
             .eq("project_id", project_id)\
@@ -2938,7 +2662,7 @@ async def unarchive_project_work_lead(
                 detail="Projet non trouve dans ce groupe"
             )
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .update({"is_archived": False})\
             .eq("id", work_lead_id)\
             .eq("project_id", project_id)\
@@ -2986,7 +2710,7 @@ async def restore_project_work_lead(
                 detail="Projet non trouve dans ce groupe"
             )
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .update({"is_deleted": False})\
             .eq("id", work_lead_id)\
             .eq("project_id", project_id)\
@@ -3015,16 +2739,21 @@ async def restore_project_work_lead(
 # ============================================
 
 @router.get("/type-seances")
-async def list_type_seances(user: CurrentUser = Depends(require_coach)):
+async def list_type_seances(
+    request: Request,
+    response: Response,
+    user: CurrentUser = Depends(require_coach)
+):
     """Liste les types de seances pour les dropdowns"""
     try:
-        response = supabase_admin.table("type_seance")\
-            .select("id, name, is_sailing")\
-            .eq("is_deleted", False)\
-            .order("name")\
-            .execute()
+        if await reference_cache.not_modified(request, response, "type_seance"):
+            return not_modified_response(response)
 
-        return response.data
+        return [
+            {"id": r["id"], "name": r["name"], "is_sailing": r["is_sailing"]}
+            for r in await reference_cache.rows("type_seance")
+            if not r.get("is_deleted", False)
+        ]
 
     except Exception as e:
         raise HTTPException(
@@ -3038,16 +2767,21 @@ async def list_type_seances(user: CurrentUser = Depends(require_coach)):
 # ============================================
 
 @router.get("/work-lead-types")
-async def list_work_lead_types(user: CurrentUser = Depends(require_coach)):
+async def list_work_lead_types(
+    request: Request,
+    response: Response,
+    user: CurrentUser = Depends(require_coach)
+):
     """Liste les types d'axes de travail pour les dropdowns"""
     try:
-        response = supabase_admin.table("work_lead_type")\
-            .select("id, name")\
-            .eq("is_deleted", False)\
-            .order("name")\
-            .execute()
+        if await reference_cache.not_modified(request, response, "work_lead_type"):
+            return not_modified_response(response)
 
-        return response.data
+        return [
+            {"id": r["id"], "name": r["name"]}
+            for r in await reference_cache.rows("work_lead_type")
+            if not r.get("is_deleted", False)
+        ]
 
     except Exception as e:
         raise HTTPException(
@@ -3068,7 +2802,7 @@ class WorkLeadModel(BaseModel):
     work_lead_type_parent_id: Optional[str] = None
     work_lead_type_parent_name: Optional[str] = None
     content: Optional[str] = None
-    current_status: str = "NEW"  # NEW, TODO, WORKING, DANGER, OK - derive de la table pivot
+    current_status: str = "NEW"  # NEW, TODO, WORKING, DANGER, OK - maintenu par trigger depuis la table pivot
     created_at: datetime
     updated_at: datetime
 
@@ -3081,7 +2815,7 @@ class WorkLeadImportRequest(BaseModel):
 async def list_work_lead_models(user: CurrentUser = Depends(require_coach)):
     """Liste les modeles d'axes de travail disponibles pour import (group_id=NULL)"""
     try:
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .is_("group_id", "null")\
             .eq("is_deleted", False)\
@@ -3090,7 +2824,7 @@ async def list_work_lead_models(user: CurrentUser = Depends(require_coach)):
             .execute()
 
         # Lookup des types pour resoudre les parents
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
 
         models = []
         for m in response.data:
@@ -3108,7 +2842,7 @@ async def list_work_lead_models(user: CurrentUser = Depends(require_coach)):
                 work_lead_type_parent_id=parent_id,
                 work_lead_type_parent_name=parent_name,
                 content=m.get("content"),
-                current_status=_get_current_status_for_work_lead_master(m["id"]),
+                current_status=m.get("current_status") or "NEW",
                 created_at=m["created_at"],
                 updated_at=m["updated_at"]
             ))
@@ -3138,7 +2872,7 @@ async def import_work_lead_model(
             )
 
         # Recuperer le modele source
-        source = supabase_admin.table("work_lead_master")\
+        source = await db.table("work_lead_master")\
             .select("*")\
             .eq("id", data.model_id)\
             .is_("group_id", "null")\
@@ -3162,7 +2896,7 @@ async def import_work_lead_model(
             "content": model.get("content")
         }
 
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .insert(insert_data)\
             .execute()
 
@@ -3175,7 +2909,7 @@ async def import_work_lead_model(
         new_work_lead_id = response.data[0]["id"]
 
         # Recuperer les fichiers associes au modele source
-        files_response = supabase_admin.table("files")\
+        files_response = await db.table("files")\
             .select("id")\
             .eq("origin_entity_type", "work_lead_master")\
             .eq("origin_entity_id", data.model_id)\
@@ -3184,7 +2918,7 @@ async def import_work_lead_model(
         # Creer les references de fichiers pour le nouvel axe
         if files_response.data:
             for file_record in files_response.data:
-                supabase_admin.table("files_reference")\
+                await db.table("files_reference")\
                     .insert({
                         "files_id": file_record["id"],
                         "entity_type": "work_lead_master",
@@ -3193,7 +2927,7 @@ async def import_work_lead_model(
                     .execute()
 
         # Recuperer l'axe cree avec jointure
-        work_lead = supabase_admin.table("work_lead_master")\
+        work_lead = await db.table("work_lead_master")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .eq("id", new_work_lead_id)\
             .execute()
@@ -3202,7 +2936,7 @@ async def import_work_lead_model(
         work_lead_type = w.get("work_lead_type")
 
         # Lookup des types pour resoudre le parent
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
         parent_id = work_lead_type.get("parent_id") if work_lead_type else None
         parent_name = None
         if parent_id and types_lookup.get(parent_id):
@@ -3257,7 +2991,7 @@ async def list_group_coaches(
 
         # Recuperer les profiles de type Coach (type_profile_id=3) lies au groupe
         # Inclure first_name/last_name directement depuis profile
-        response = supabase_admin.table("group_profile")\
+        response = await db.table("group_profile")\
             .select("profile_id, profile(type_profile_id, first_name, last_name)")\
             .eq("group_id", group_id)\
             .execute()
@@ -3309,7 +3043,7 @@ async def update_session_participants(
             )
 
         # Recuperer la session_master avec ses infos
-        session_master = supabase_admin.table("session_master")\
+        session_master = await db.table("session_master")\
             .select("*")\
             .eq("id", session_id)\
             .eq("group_id", group_id)\
@@ -3325,7 +3059,7 @@ async def update_session_participants(
         sm = session_master.data[0]
 
         # Recuperer les projets valides du groupe avec leur profile_id
-        group_projects = supabase_admin.table("group_project")\
+        group_projects = await db.table("group_project")\
             .select("project_id, project(profile_id)")\
             .eq("group_id", group_id)\
             .execute()
@@ -3338,7 +3072,7 @@ async def update_session_participants(
         filtered_project_ids = set(pid for pid in data.project_ids if pid in valid_project_ids)
 
         # Recuperer les projets actuellement lies via la table session
-        current_sessions = supabase_admin.table("session")\
+        current_sessions = await db.table("session")\
             .select("id, project_id")\
             .eq("session_master_id", session_id)\
             .eq("is_deleted", False)\
@@ -3351,44 +3085,41 @@ async def update_session_participants(
         to_add = filtered_project_ids - current_project_ids
         to_remove = current_project_ids - filtered_project_ids
 
-        # Soft-delete les sessions des projets retires
-        for project_id in to_remove:
-            session_to_delete = project_to_session.get(project_id)
-            if session_to_delete:
-                supabase_admin.table("session")\
-                    .update({"is_deleted": True})\
-                    .eq("id", session_to_delete)\
-                    .execute()
+        # Soft-delete les sessions des projets retires (une requete)
+        sessions_to_delete = [project_to_session[pid] for pid in to_remove if project_to_session.get(pid)]
+        if sessions_to_delete:
+            await db.table("session")\
+                .update({"is_deleted": True})\
+                .in_("id", sessions_to_delete)\
+                .execute()
 
-        # Creer les sessions pour les nouveaux projets
-        for project_id in to_add:
-            # Creer la session individuelle
-            session_insert = {
-                "name": sm["name"],
-                "project_id": project_id,
-                "session_master_id": session_id,
-                "type_seance_id": sm["type_seance_id"],
-                "date_start": sm.get("date_start"),
-                "date_end": sm.get("date_end"),
-                "location": sm.get("location")
-            }
-            session_response = supabase_admin.table("session")\
-                .insert(session_insert)\
+        # Creer les sessions pour les nouveaux projets (insert multi-lignes)
+        if to_add:
+            session_response = await db.table("session")\
+                .insert([{
+                    "name": sm["name"],
+                    "project_id": project_id,
+                    "session_master_id": session_id,
+                    "type_seance_id": sm["type_seance_id"],
+                    "date_start": sm.get("date_start"),
+                    "date_end": sm.get("date_end"),
+                    "location": sm.get("location")
+                } for project_id in to_add])\
                 .execute()
 
             # Ajouter l'equipage initial (navigant du projet)
-            if session_response.data and project_profiles.get(project_id):
-                new_session_id = session_response.data[0]["id"]
-                profile_id = project_profiles[project_id]
-                supabase_admin.table("session_profile")\
-                    .insert({
-                        "session_id": new_session_id,
-                        "profile_id": profile_id
-                    })\
+            crew_rows = [
+                {"session_id": new_session["id"], "profile_id": project_profiles[new_session["project_id"]]}
+                for new_session in session_response.data
+                if project_profiles.get(new_session["project_id"])
+            ]
+            if crew_rows:
+                await db.table("session_profile")\
+                    .insert(crew_rows)\
                     .execute()
 
         # Mettre a jour le coach_id
-        supabase_admin.table("session_master")\
+        await db.table("session_master")\
             .update({"coach_id": data.coach_id})\
             .eq("id", session_id)\
             .execute()
@@ -3434,7 +3165,7 @@ async def update_session_dates(
             "date_end": data.date_end.isoformat() if data.date_end else None
         }
 
-        response = supabase_admin.table("session_master")\
+        response = await db.table("session_master")\
             .update(update_data)\
             .eq("id", session_id)\
             .eq("group_id", group_id)\
@@ -3492,7 +3223,7 @@ async def get_session_work_lead_masters(
             )
 
         # Verifier que la session appartient au groupe
-        session_check = supabase_admin.table("session_master")\
+        session_check = await db.table("session_master")\
             .select("id")\
             .eq("id", session_id)\
             .eq("group_id", group_id)\
@@ -3505,13 +3236,13 @@ async def get_session_work_lead_masters(
             )
 
         # Recuperer les associations depuis la table pivot
-        response = supabase_admin.table("session_master_work_lead_master")\
+        response = await db.table("session_master_work_lead_master")\
             .select("work_lead_master_id, status, work_lead_master(id, name, work_lead_type_id, work_lead_type(id, name, parent_id))")\
             .eq("session_master_id", session_id)\
             .execute()
 
         # Lookup des types pour resoudre les parents
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
 
         result = []
         for item in response.data:
@@ -3560,7 +3291,7 @@ async def update_session_work_lead_master(
             )
 
         # Verifier que la session appartient au groupe
-        session_check = supabase_admin.table("session_master")\
+        session_check = await db.table("session_master")\
             .select("id")\
             .eq("id", session_id)\
             .eq("group_id", group_id)\
@@ -3573,7 +3304,7 @@ async def update_session_work_lead_master(
             )
 
         # Verifier que le work_lead_master appartient au groupe
-        wlm_check = supabase_admin.table("work_lead_master")\
+        wlm_check = await db.table("work_lead_master")\
             .select("id")\
             .eq("id", data.work_lead_master_id)\
             .eq("group_id", group_id)\
@@ -3586,65 +3317,24 @@ async def update_session_work_lead_master(
                 detail="Axe de travail non trouve dans ce groupe"
             )
 
-        if data.status is None:
-            # Supprimer les session_work_lead lies (seulement si override_master = FALSE)
-            _remove_work_lead_master_from_projects(
-                session_master_id=session_id,
-                work_lead_master_id=data.work_lead_master_id
+        if data.status is not None and data.status not in ['TODO', 'WORKING', 'DANGER', 'OK']:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Status invalide. Valeurs acceptees: TODO, WORKING, DANGER, OK"
             )
 
-            # Supprimer l'association
-            supabase_admin.table("session_master_work_lead_master")\
-                .delete()\
-                .eq("session_master_id", session_id)\
-                .eq("work_lead_master_id", data.work_lead_master_id)\
-                .execute()
-            return {"message": "Association supprimee"}
-        else:
-            # Valider le status
-            if data.status not in ['TODO', 'WORKING', 'DANGER', 'OK']:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Status invalide. Valeurs acceptees: TODO, WORKING, DANGER, OK"
-                )
+        # Association + propagation vers les work_leads des projets lies,
+        # en une transaction cote Postgres (status None = suppression)
+        await db.rpc("propagate_work_lead_master_status", {
+            "p_session_master_id": session_id,
+            "p_work_lead_master_id": data.work_lead_master_id,
+            "p_status": data.status,
+            "p_profile_id": user.active_profile_id
+        }).execute()
 
-            # Upsert: verifier si existe deja
-            existing = supabase_admin.table("session_master_work_lead_master")\
-                .select("session_master_id")\
-                .eq("session_master_id", session_id)\
-                .eq("work_lead_master_id", data.work_lead_master_id)\
-                .execute()
-
-            if existing.data:
-                # Update
-                supabase_admin.table("session_master_work_lead_master")\
-                    .update({
-                        "status": data.status,
-                        "profile_id": user.active_profile_id
-                    })\
-                    .eq("session_master_id", session_id)\
-                    .eq("work_lead_master_id", data.work_lead_master_id)\
-                    .execute()
-            else:
-                # Insert
-                supabase_admin.table("session_master_work_lead_master")\
-                    .insert({
-                        "session_master_id": session_id,
-                        "work_lead_master_id": data.work_lead_master_id,
-                        "status": data.status,
-                        "profile_id": user.active_profile_id
-                    })\
-                    .execute()
-
-            # Propager vers les work_leads des projets lies
-            _propagate_work_lead_master_to_projects(
-                session_master_id=session_id,
-                work_lead_master_id=data.work_lead_master_id,
-                new_status=data.status,
-                profile_id=user.active_profile_id
-            )
-
-            return {"message": "Association mise a jour", "status": data.status}
+        if data.status is None:
+            return {"message": "Association supprimee"}
+        return {"message": "Association mise a jour", "status": data.status}
 
     except HTTPException:
         raise
@@ -3725,7 +3415,8 @@ async def get_group_periods(
                 detail="Acces refuse a ce groupe"
             )
 
-        query = supabase_admin.table("period_master")\
+        # Createur et compteurs calcules en base (vue period_master_summary)
+        query = db.table("period_master_summary")\
             .select("*")\
             .eq("group_id", group_id)\
             .order("date_start", desc=True)
@@ -3733,42 +3424,23 @@ async def get_group_periods(
         if not include_deleted:
             query = query.eq("is_deleted", False)
 
-        response = query.execute()
+        response = await query.execute()
 
         result = []
         for pm in response.data:
-            # Get creator name using existing helper
-            creator_name = _get_coach_name(pm["profile_id"])
-
-            # Count projects linked via period
-            project_count = supabase_admin.table("period")\
-                .select("id", count="exact")\
-                .eq("period_master_id", pm["id"])\
-                .eq("is_deleted", False)\
-                .execute()
-
-            # Count session_masters in date range
-            session_count = supabase_admin.table("session_master")\
-                .select("id", count="exact")\
-                .eq("group_id", group_id)\
-                .eq("is_deleted", False)\
-                .gte("date_start", pm["date_start"])\
-                .lte("date_start", pm["date_end"])\
-                .execute()
-
             result.append(GroupPeriod(
                 id=pm["id"],
                 name=pm["name"],
                 profile_id=pm["profile_id"],
-                profile_name=creator_name,
+                profile_name=pm.get("profile_name"),
                 date_start=pm["date_start"],
                 date_end=pm["date_end"],
                 content=pm.get("content"),
                 is_deleted=pm.get("is_deleted", False),
                 created_at=pm["created_at"],
                 updated_at=pm["updated_at"],
-                project_count=project_count.count or 0,
-                session_master_count=session_count.count or 0
+                project_count=pm.get("project_count") or 0,
+                session_master_count=pm.get("session_master_count") or 0
             ))
 
         return result
@@ -3806,7 +3478,7 @@ async def create_group_period(
             "content": data.content
         }
 
-        response = supabase_admin.table("period_master")\
+        response = await db.table("period_master")\
             .insert(period_master_data)\
             .execute()
 
@@ -3822,54 +3494,43 @@ async def create_group_period(
         # Create periods for selected projects
         projects_info = []
         if data.project_ids:
-            for project_id in data.project_ids:
-                # Verify project belongs to group
-                check = supabase_admin.table("group_project")\
-                    .select("project_id")\
-                    .eq("group_id", group_id)\
-                    .eq("project_id", project_id)\
-                    .execute()
-
-                if not check.data:
-                    continue
-
-                # Get project info
-                project = supabase_admin.table("project")\
-                    .select("id, name, profile_id")\
-                    .eq("id", project_id)\
-                    .single()\
-                    .execute()
-
-                if not project.data:
-                    continue
-
-                # Get navigant name using existing helper
-                navigant_name = _get_coach_name(project.data["profile_id"])
-
-                # Create period for this project
-                period_data = {
-                    "name": data.name,
-                    "project_id": project_id,
-                    "period_master_id": period_master_id,
-                    "date_start": data.date_start.isoformat(),
-                    "date_end": data.date_end.isoformat()
-                }
-
-                period_response = supabase_admin.table("period")\
-                    .insert(period_data)\
+            # Projects of the group with navigant name (membership checked once)
+            group_projects = await db.table("group_project")\
+                .select("project(id, name, profile(first_name, last_name))")\
+                .eq("group_id", group_id)\
+                .in_("project_id", list(set(data.project_ids)))\
+                .execute()
+            projects_by_id = {
+                gp["project"]["id"]: gp["project"] for gp in group_projects.data if gp.get("project")
+            }
+            selected_project_ids = [pid for pid in dict.fromkeys(data.project_ids) if pid in projects_by_id]
+
+            # Create periods for selected projects (multi-row insert)
+            period_ids = {}
+            if selected_project_ids:
+                period_response = await db.table("period")\
+                    .insert([{
+                        "name": data.name,
+                        "project_id": project_id,
+                        "period_master_id": period_master_id,
+                        "date_start": data.date_start.isoformat(),
+                        "date_end": data.date_end.isoformat()
+                    } for project_id in selected_project_ids])\
                     .execute()
+                period_ids = {p["project_id"]: p["id"] for p in period_response.data}
 
-                period_id = period_response.data[0]["id"] if period_response.data else None
-
+            for project_id in selected_project_ids:
+                project = projects_by_id[project_id]
+                profile = project.get("profile")
                 projects_info.append(GroupPeriodProject(
                     project_id=project_id,
-                    project_name=project.data["name"],
-                    navigant_name=navigant_name,
-                    period_id=period_id
+                    project_name=project["name"],
+                    navigant_name=_format_user_name(profile.get("first_name"), profile.get("last_name")) if profile else None,
+                    period_id=period_ids.get(project_id)
                 ))
 
         # Get creator name using existing helper
-        creator_name = _get_coach_name(user.active_profile_id)
+        creator_name = await _get_coach_name(user.active_profile_id)
 
         return GroupPeriodDetail(
             id=period_master_id,
@@ -3911,7 +3572,7 @@ async def get_group_period(
             )
 
         # Get period_master
-        response = supabase_admin.table("period_master")\
+        response = await db.table("period_master")\
             .select("*")\
             .eq("id", period_id)\
             .eq("group_id", group_id)\
@@ -3927,10 +3588,10 @@ async def get_group_period(
         pm = response.data
 
         # Get creator name using existing helper
-        creator_name = _get_coach_name(pm["profile_id"])
+        creator_name = await _get_coach_name(pm["profile_id"])
 
         # Get projects with their periods
-        periods = supabase_admin.table("period")\
+        periods = await db.table("period")\
             .select("id, project_id")\
             .eq("period_master_id", period_id)\
             .eq("is_deleted", False)\
@@ -3938,7 +3599,7 @@ async def get_group_period(
 
         projects_info = []
         for p in periods.data:
-            project = supabase_admin.table("project")\
+            project = await db.table("project")\
                 .select("id, name, profile_id")\
                 .eq("id", p["project_id"])\
                 .single()\
@@ -3946,7 +3607,7 @@ async def get_group_period(
 
             if project.data:
                 # Get navigant name using existing helper
-                navigant_name = _get_coach_name(project.data["profile_id"])
+                navigant_name = await _get_coach_name(project.data["profile_id"])
 
                 projects_info.append(GroupPeriodProject(
                     project_id=project.data["id"],
@@ -3956,7 +3617,7 @@ async def get_group_period(
                 ))
 
         # Count session_masters in date range
-        session_count = supabase_admin.table("session_master")\
+        session_count = await db.table("session_master")\
             .select("id", count="exact")\
             .eq("group_id", group_id)\
             .eq("is_deleted", False)\
@@ -4019,7 +3680,7 @@ async def update_group_period(
             return await get_group_period(group_id, period_id, user)
 
         # Update period_master
-        response = supabase_admin.table("period_master")\
+        response = await db.table("period_master")\
             .update(update_data)\
             .eq("id", period_id)\
             .eq("group_id", group_id)\
@@ -4042,7 +3703,7 @@ async def update_group_period(
             propagate_data["date_end"] = data.date_end.isoformat()
 
         if propagate_data:
-            supabase_admin.table("period")\
+            await db.table("period")\
                 .update(propagate_data)\
                 .eq("period_master_id", period_id)\
                 .eq("is_deleted", False)\
@@ -4074,7 +3735,7 @@ async def delete_group_period(
             )
 
         # Soft delete period_master
-        response = supabase_admin.table("period_master")\
+        response = await db.table("period_master")\
             .update({"is_deleted": True})\
             .eq("id", period_id)\
             .eq("group_id", group_id)\
@@ -4087,7 +3748,7 @@ async def delete_group_period(
             )
 
         # Also soft delete linked periods
-        supabase_admin.table("period")\
+        await db.table("period")\
             .update({"is_deleted": True})\
             .eq("period_master_id", period_id)\
             .execute()
@@ -4117,7 +3778,7 @@ async def restore_group_period(
                 detail="Acces refuse a ce groupe"
             )
 
-        response = supabase_admin.table("period_master")\
+        response = await db.table("period_master")\
             .update({"is_deleted": False})\
             .eq("id", period_id)\
             .eq("group_id", group_id)\
@@ -4130,7 +3791,7 @@ async def restore_group_period(
             )
 
         # Also restore linked periods
-        supabase_admin.table("period")\
+        await db.table("period")\
             .update({"is_deleted": False})\
             .eq("period_master_id", period_id)\
             .execute()
@@ -4161,7 +3822,7 @@ async def get_period_session_masters(
             )
 
         # Get period dates
-        period = supabase_admin.table("period_master")\
+        period = await db.table("period_master")\
             .select("date_start, date_end")\
             .eq("id", period_id)\
             .eq("group_id", group_id)\
@@ -4176,7 +3837,7 @@ async def get_period_session_masters(
             )
 
         # Get session_masters in date range
-        sessions = supabase_admin.table("session_master")\
+        sessions = await db.table("session_master")\
             .select("id, name, date_start, type_seance_id")\
             .eq("group_id", group_id)\
             .eq("is_deleted", False)\
@@ -4189,13 +3850,9 @@ async def get_period_session_masters(
         for s in sessions.data:
             type_seance_name = None
             if s.get("type_seance_id"):
-                ts = supabase_admin.table("type_seance")\
-                    .select("name")\
-                    .eq("id", s["type_seance_id"])\
-                    .single()\
-                    .execute()
-                if ts.data:
-                    type_seance_name = ts.data["name"]
+                ts = await reference_cache.get("type_seance", s["type_seance_id"])
+                if ts:
+                    type_seance_name = ts["name"]
 
             result.append(PeriodSessionMasterItem(
                 session_master_id=s["id"],
@@ -4231,7 +3888,7 @@ async def update_period_participants(
             )
 
         # Get period_master
-        pm = supabase_admin.table("period_master")\
+        pm = await db.table("period_master")\
             .select("*")\
             .eq("id", period_id)\
             .eq("group_id", group_id)\
@@ -4246,7 +3903,7 @@ async def update_period_participants(
             )
 
         # Get current periods
-        current_periods = supabase_admin.table("period")\
+        current_periods = await db.table("period")\
             .select("id, project_id")\
             .eq("period_master_id", period_id)\
             .eq("is_deleted", False)\
@@ -4260,36 +3917,32 @@ async def update_period_participants(
         # Projects to remove
         to_remove = current_project_ids - new_project_ids
 
-        # Add new periods
-        for project_id in to_add:
-            # Verify project belongs to group
-            check = supabase_admin.table("group_project")\
+        # Add new periods (only projects of the group, checked once)
+        if to_add:
+            group_projects = await db.table("group_project")\
                 .select("project_id")\
                 .eq("group_id", group_id)\
-                .eq("project_id", project_id)\
+                .in_("project_id", list(to_add))\
                 .execute()
+            valid_project_ids = [gp["project_id"] for gp in group_projects.data]
 
-            if not check.data:
-                continue
-
-            period_data = {
-                "name": pm.data["name"],
-                "project_id": project_id,
-                "period_master_id": period_id,
-                "date_start": pm.data["date_start"],
-                "date_end": pm.data["date_end"]
-            }
-
-            supabase_admin.table("period")\
-                .insert(period_data)\
-                .execute()
+            if valid_project_ids:
+                await db.table("period")\
+                    .insert([{
+                        "name": pm.data["name"],
+                        "project_id": project_id,
+                        "period_master_id": period_id,
+                        "date_start": pm.data["date_start"],
+                        "date_end": pm.data["date_end"]
+                    } for project_id in valid_project_ids])\
+                    .execute()
 
         # Soft delete removed periods
-        for project_id in to_remove:
-            supabase_admin.table("period")\
+        if to_remove:
+            await db.table("period")\
                 .update({"is_deleted": True})\
                 .eq("period_master_id", period_id)\
-                .eq("project_id", project_id)\
+                .in_("project_id", list(to_remove))\
                 .execute()
 
         return await get_group_period(group_id, period_id, user)
@@ -4376,7 +4029,8 @@ async def get_project_periods(
                 detail="Projet non trouve dans ce groupe"
             )
 
-        query = supabase_admin.table("period")\
+        # Compteur de sessions calcule en base (vue period_summary)
+        query = db.table("period_summary")\
             .select("*")\
             .eq("project_id", project_id)\
             .order("date_start", desc=True)
@@ -4384,19 +4038,10 @@ async def get_project_periods(
         if not include_deleted:
             query = query.eq("is_deleted", False)
 
-        response = query.execute()
+        response = await query.execute()
 
         result = []
         for p in response.data:
-            # Count sessions in date range
-            session_count = supabase_admin.table("session")\
-                .select("id", count="exact")\
-                .eq("project_id", project_id)\
-                .eq("is_deleted", False)\
-                .gte("date_start", p["date_start"])\
-                .lte("date_start", p["date_end"])\
-                .execute()
-
             result.append(ProjectPeriod(
                 id=p["id"],
                 name=p["name"],
@@ -4408,7 +4053,7 @@ async def get_project_periods(
                 is_deleted=p.get("is_deleted", False),
                 created_at=p["created_at"],
                 updated_at=p["updated_at"],
-                session_count=session_count.count or 0
+                session_count=p.get("session_count") or 0
             ))
 
         return result
@@ -4451,7 +4096,7 @@ async def create_project_period(
             "content": data.content
         }
 
-        response = supabase_admin.table("period")\
+        response = await db.table("period")\
             .insert(period_data)\
             .execute()
 
@@ -4493,7 +4138,7 @@ async def get_project_period(
                 detail="Projet non trouve dans ce groupe"
             )
 
-        response = supabase_admin.table("period")\
+        response = await db.table("period")\
             .select("*")\
             .eq("id", period_id)\
             .eq("project_id", project_id)\
@@ -4509,7 +4154,7 @@ async def get_project_period(
         p = response.data
 
         # Get project name
-        project = supabase_admin.table("project")\
+        project = await db.table("project")\
             .select("name")\
             .eq("id", project_id)\
             .single()\
@@ -4519,7 +4164,7 @@ async def get_project_period(
         # Get period_master info if exists
         period_master_info = None
         if p.get("period_master_id"):
-            pm = supabase_admin.table("period_master")\
+            pm = await db.table("period_master")\
                 .select("id, name, content, profile_id")\
                 .eq("id", p["period_master_id"])\
                 .single()\
@@ -4527,7 +4172,7 @@ async def get_project_period(
 
             if pm.data:
                 # Get profile name using existing helper
-                profile_name = _get_coach_name(pm.data["profile_id"])
+                profile_name = await _get_coach_name(pm.data["profile_id"])
 
                 period_master_info = ProjectPeriodMasterInfo(
                     id=pm.data["id"],
@@ -4538,7 +4183,7 @@ async def get_project_period(
                 )
 
         # Count sessions in date range
-        session_count = supabase_admin.table("session")\
+        session_count = await db.table("session")\
             .select("id", count="exact")\
             .eq("project_id", project_id)\
             .eq("is_deleted", False)\
@@ -4594,7 +4239,7 @@ async def update_project_period(
             )
 
         # Check if period has master
-        period = supabase_admin.table("period")\
+        period = await db.table("period")\
             .select("period_master_id")\
             .eq("id", period_id)\
             .eq("project_id", project_id)\
@@ -4632,7 +4277,7 @@ async def update_project_period(
         if not update_data:
             return await get_project_period(group_id, project_id, period_id, user)
 
-        supabase_admin.table("period")\
+        await db.table("period")\
             .update(update_data)\
             .eq("id", period_id)\
             .eq("project_id", project_id)\
@@ -4670,7 +4315,7 @@ async def delete_project_period(
                 detail="Projet non trouve dans ce groupe"
             )
 
-        response = supabase_admin.table("period")\
+        response = await db.table("period")\
             .update({"is_deleted": True})\
             .eq("id", period_id)\
             .eq("project_id", project_id)\
@@ -4714,7 +4359,7 @@ async def restore_project_period(
                 detail="Projet non trouve dans ce groupe"
             )
 
-        response = supabase_admin.table("period")\
+        response = await db.table("period")\
             .update({"is_deleted": False})\
             .eq("id", period_id)\
             .eq("project_id", project_id)\
@@ -4759,7 +4404,7 @@ async def get_project_period_sessions(
             )
 
         # Get period dates
-        period = supabase_admin.table("period")\
+        period = await db.table("period")\
             .select("date_start, date_end")\
             .eq("id", period_id)\
             .eq("project_id", project_id)\
@@ -4774,7 +4419,7 @@ async def get_project_period_sessions(
             )
 
         # Get sessions in date range
-        sessions = supabase_admin.table("session")\
+        sessions = await db.table("session")\
             .select("id, name, date_start, type_seance_id")\
             .eq("project_id", project_id)\
             .eq("is_deleted", False)\
@@ -4787,13 +4432,9 @@ async def get_project_period_sessions(
         for s in sessions.data:
             type_seance_name = None
             if s.get("type_seance_id"):
-                ts = supabase_admin.table("type_seance")\
-                    .select("name")\
-                    .eq("id", s["type_seance_id"])\
-                    .single()\
-                    .execute()
-                if ts.data:
-                    type_seance_name = ts.data["name"]
+                ts = await reference_cache.get("type_seance", s["type_seance_id"])
+                if ts:
+                    type_seance_name = ts["name"]
 
             result.append(PeriodSessionItem(
                 session_id=s["id"],
@@ -1,17 +1,35 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Query, status, BackgroundTasks
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
+from typing import Dict, Iterable, List, Optional
 from app.models.file import (
-    EntityType, FileType, FileResponse, FileListResponse, FileReferenceCreate,
-    FileReferenceResponse, SignedUrlRequest, SignedUrlResponse, FileDeleteInfo
+    EntityType, FileType, ProcessingStatus, FileResponse, FileListResponse, FileReferenceCreate,
+    FileReferenceResponse, FileUploadRequest, FileUploadTicket, SignedUrlRequest, SignedUrlResponse,
+    FileDeleteInfo
 )
-from app.auth import get_current_user, get_current_profile_id, CurrentUser, supabase_admin
-from app.services.media_processor import process_image_thumbnail, process_video
+from app.auth import get_current_user, get_current_profile_id, CurrentUser
+from app.config import BUCKET_NAME, settings
+from app.db import db
+from app.services.content_dedup import delete_file_row, find_duplicate, reuse_content
+from app.services.file_events import TERMINAL_STATUSES, fetch_file_statuses, file_status_hub
+from app.services.hls_playlists import (
+    PLAYLIST_CONTENT_TYPE, VTT_CONTENT_TYPE, load_playlist, playlist_uris, rewrite_playlist, rewrite_vtt, vtt_uris
+)
+from app.services.media_jobs import enqueue_content_hash_job, enqueue_media_job
+from app.services.query_memo import detached
+from app.services.signed_urls import create_signed_url, create_signed_urls, forget as forget_signed_urls
+from app.services.storage_upload import hash_upload, upload_stream
+from app.services.media_urls import (
+    HLS_ROUTE, VTT_ROUTE, sign_media_url, sign_media_urls, verify_media_signature, stream_storage_object
+)
+import asyncio
+import json
 import uuid
 
 router = APIRouter(prefix="/api/files", tags=["files"])
 
-BUCKET_NAME = "rise4tlg-files"
 SIGNED_URL_EXPIRY = 3600  # 1 heure
+HLS_URL_EXPIRY = 4 * 3600  # Segments HLS: valables pendant toute la lecture (playlists VOD non rechargees)
+STORAGE_REMOVE_BATCH = 1000  # Chemins max par suppression Storage
 
 
 def _detect_file_type(mime_type: str) -> FileType:
@@ -29,38 +47,173 @@ def _detect_file_type(mime_type: str) -> FileType:
     return FileType.document
 
 
-def _get_signed_url(file_path: str) -> Optional[str]:
+async def _sign_paths(
+    paths: Iterable[Optional[str]], expires_in: int = SIGNED_URL_EXPIRY
+) -> Dict[str, Optional[str]]:
+    """URLs signees {path: url}: par l'API (MEDIA_URL_MODE=local) ou par Storage"""
+    if settings.media_url_mode == "local":
+        return sign_media_urls(BUCKET_NAME, paths, expires_in)
+    return await create_signed_urls(BUCKET_NAME, paths, expires_in)
+
+
+async def _get_signed_url(file_path: str) -> Optional[str]:
     """Genere une URL signee pour un fichier"""
-    try:
-        result = supabase_admin.storage.from_(BUCKET_NAME).create_signed_url(
-            file_path, SIGNED_URL_EXPIRY
-        )
-        return result.get("signedURL") or result.get("signedUrl")
-    except Exception:
+    if settings.media_url_mode == "local":
+        return sign_media_url(BUCKET_NAME, file_path, SIGNED_URL_EXPIRY)
+    return await create_signed_url(BUCKET_NAME, file_path, SIGNED_URL_EXPIRY)
+
+
+def _derivative_paths(file_data: dict) -> List[str]:
+    return [d["path"] for d in file_data.get("derivatives") or []]
+
+
+def _sprite_paths(file_data: dict) -> List[str]:
+    """Planche d'apercus d'une video et son index WebVTT (media_info.sprite)"""
+    sprite = (file_data.get("media_info") or {}).get("sprite") or {}
+    return [p for p in (sprite.get("path"), sprite.get("vtt_path")) if p]
+
+
+def _hls_paths(file_data: dict) -> List[str]:
+    """Playlists et segments HLS d'une video (media_info.hls)"""
+    hls_path = file_data.get("hls_path")
+    if not hls_path:
+        return []
+    prefix = hls_path.rsplit("/", 1)[0]
+    paths = [hls_path]
+    for rendition in (file_data.get("media_info") or {}).get("hls") or []:
+        paths.append(f"{prefix}/{rendition['name']}/index.m3u8")
+        paths += [f"{prefix}/{rendition['name']}/seg_{i:03d}.ts" for i in range(rendition["segments"])]
+    return paths
+
+
+def _hls_url(hls_path: Optional[str]) -> Optional[str]:
+    """URL signee de la playlist HLS principale (servie par l'API)"""
+    if not hls_path or not settings.public_api_url:
         return None
+    return sign_media_url(BUCKET_NAME, hls_path, SIGNED_URL_EXPIRY, route=HLS_ROUTE)
 
 
-def _get_thumbnail_url(thumbnail_path: Optional[str]) -> Optional[str]:
-    """Genere une URL signee pour un thumbnail"""
-    if not thumbnail_path:
+def _vtt_url(file_data: dict) -> Optional[str]:
+    """URL signee de l'index WebVTT de la planche d'apercus (servi par l'API)"""
+    vtt_path = ((file_data.get("media_info") or {}).get("sprite") or {}).get("vtt_path")
+    if not vtt_path or not settings.public_api_url:
         return None
-    return _get_signed_url(thumbnail_path)
+    return sign_media_url(BUCKET_NAME, vtt_path, SIGNED_URL_EXPIRY, route=VTT_ROUTE)
 
 
-def _add_urls_to_file(file_data: dict) -> dict:
+def _build_srcset(derivatives: Optional[List[dict]], urls: Dict[str, Optional[str]]) -> Optional[Dict[str, str]]:
+    """{format: "url 200w, url 400w, ..."} a partir des declinaisons signees"""
+    entries: Dict[str, List[str]] = {}
+    for d in sorted(derivatives or [], key=lambda d: d["width"]):
+        url = urls.get(d["path"])
+        if url:
+            entries.setdefault(d["format"], []).append(f"{url} {d['width']}w")
+    return {fmt: ", ".join(items) for fmt, items in entries.items()} or None
+
+
+async def _add_urls_to_files(files: List[dict]) -> List[dict]:
+    """
+    Ajoute signed_url, thumbnail_url, srcset (declinaisons par format),
+    sprite_url et vtt_url (planche d'apercus des videos et son index WebVTT)
+    et hls_url (lecture adaptative) a une liste de fichiers (signature groupee)
+    """
+    paths = [
+        p for f in files
+        for p in (f["file_path"], f.get("thumbnail_path"), *_derivative_paths(f), *_sprite_paths(f)[:1])
+    ]
+    urls = await _sign_paths(paths)
+    for file_data in files:
+        file_data["signed_url"] = urls.get(file_data["file_path"])
+        thumbnail_path = file_data.get("thumbnail_path")
+        file_data["thumbnail_url"] = urls.get(thumbnail_path) if thumbnail_path else None
+        file_data["srcset"] = _build_srcset(file_data.get("derivatives"), urls)
+        sprite_paths = _sprite_paths(file_data)
+        file_data["sprite_url"] = urls.get(sprite_paths[0]) if sprite_paths else None
+        file_data["vtt_url"] = _vtt_url(file_data)
+        file_data["hls_url"] = _hls_url(file_data.get("hls_path"))
+    return files
+
+
+async def _add_urls_to_file(file_data: dict) -> dict:
     """Ajoute signed_url et thumbnail_url a un fichier"""
-    file_data["signed_url"] = _get_signed_url(file_data["file_path"])
-    file_data["thumbnail_url"] = _get_thumbnail_url(file_data.get("thumbnail_path"))
+    await _add_urls_to_files([file_data])
     return file_data
 
 
+def _build_file_path(entity_type: EntityType, entity_id: str, file_id: str, file_name: Optional[str]) -> str:
+    """Chemin Storage d'un nouveau fichier (nom nettoye)"""
+    safe_filename = file_name.replace(" ", "_") if file_name else "file"
+    return f"{entity_type.value}/{entity_id}/{file_id}_{safe_filename}"
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _status_events(file_ids: List[str]):
+    """
+    Evenements SSE du suivi de traitement: statut initial puis changements,
+    fichier complet (URLs signees) des qu'il est traite. Se termine quand
+    plus aucun fichier n'est en cours.
+    """
+    queue = file_status_hub.watch(file_ids)
+    try:
+        # Lecture initiale apres l'abonnement: aucun changement perdu
+        changes = await fetch_file_statuses(file_ids)
+        found = {row["id"] for row in changes}
+        pending = set(file_ids)
+        for file_id in file_ids:
+            if file_id not in found:
+                pending.discard(file_id)
+                yield _sse("removed", {"id": file_id})
+
+        known: Dict[str, str] = {}
+        while pending:
+            finished = []
+            for row in changes:
+                file_id = row["id"]
+                if file_id not in pending or known.get(file_id) == row["processing_status"]:
+                    continue
+                known[file_id] = row["processing_status"]
+                yield _sse("status", row)
+                if row["processing_status"] in TERMINAL_STATUSES:
+                    pending.discard(file_id)
+                    finished.append(file_id)
+
+            if finished:
+                with detached():
+                    response = await db.table("files")\
+                        .select("*")\
+                        .in_("id", finished)\
+                        .execute()
+                files = await _add_urls_to_files(response.data)
+                for f in files:
+                    f["is_reference"] = False
+                    yield _sse("file", FileResponse.model_validate(f).model_dump(mode="json"))
+            if not pending:
+                break
+
+            try:
+                changes = [await asyncio.wait_for(queue.get(), timeout=settings.file_events_keepalive)]
+            except asyncio.TimeoutError:
+                # Commentaire SSE: garde la connexion ouverte (proxies)
+                yield ": keepalive\n\n"
+                changes = []
+            while not queue.empty():
+                changes.append(queue.get_nowait())
+    except Exception as e:
+        # En-tetes deja envoyes: l'erreur est transmise dans le flux
+        yield _sse("error", {"detail": f"Erreur: {str(e)}"})
+    finally:
+        file_status_hub.unwatch(queue, file_ids)
+
+
 # ============================================
 # ROUTES STATIQUES (doivent etre AVANT les routes dynamiques)
 # ============================================
 
 @router.post("/upload", response_model=FileResponse, status_code=status.HTTP_201_CREATED)
 async def upload_file(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     origin_entity_type: EntityType = Form(...),
     origin_entity_id: str = Form(...),
@@ -68,78 +221,86 @@ async def upload_file(
     profile_id: str = Depends(get_current_profile_id),
     user: CurrentUser = Depends(get_current_user)
 ):
-    """Upload un fichier vers Supabase Storage et cree l'enregistrement en base"""
+    """
+    Upload un fichier vers Supabase Storage et cree l'enregistrement en base.
+    Un contenu identique a un fichier deja pret (meme SHA-256) n'est pas
+    renvoye a Storage: le nouveau fichier reprend son objet et ses derives.
+    """
     try:
         # Generer un ID unique et le chemin du fichier
         file_id = str(uuid.uuid4())
-        # Nettoyer le nom du fichier
-        safe_filename = file.filename.replace(" ", "_") if file.filename else "file"
-        file_path = f"{origin_entity_type.value}/{origin_entity_id}/{file_id}_{safe_filename}"
-
-        # Lire le contenu du fichier
-        content = await file.read()
-        file_size = len(content)
+        file_path = _build_file_path(origin_entity_type, origin_entity_id, file_id, file.filename)
 
         # Detecter le type si non fourni
         detected_file_type = file_type or _detect_file_type(file.content_type)
 
+        identity = {
+            "id": file_id,
+            "origin_entity_type": origin_entity_type.value,
+            "origin_entity_id": origin_entity_id,
+            "file_type": detected_file_type.value,
+            "file_name": file.filename or "file",
+            "uploaded_by": profile_id
+        }
+
+        # Empreinte du contenu (fichier spoole): doublon d'un fichier pret ?
+        content_hash = await hash_upload(file) if settings.file_dedup else None
+        duplicate = await find_duplicate(content_hash) if content_hash else None
+        if duplicate:
+            # Ligne provisoire (rien dans Storage), reprise atomique du contenu
+            await db.table("files").insert({
+                **identity,
+                "file_path": file_path,
+                "mime_type": file.content_type,
+                "content_hash": content_hash,
+                "processing_status": ProcessingStatus.pending_upload.value
+            }).execute()
+            reused = await reuse_content(file_id, content_hash)
+            if reused:
+                result = await _add_urls_to_file(reused)
+                result["is_reference"] = False
+                return result
+            # Fichier identique supprime entre-temps: upload normal
+            await db.table("files").delete().eq("id", file_id).execute()
+
         # Determiner le status de processing initial
         # Images et videos necessitent un traitement (thumbnail + compression video)
         needs_processing = detected_file_type in (FileType.image, FileType.video)
         processing_status = "pending" if needs_processing else "ready"
 
-        # Upload vers Supabase Storage
-        storage_response = supabase_admin.storage.from_(BUCKET_NAME).upload(
+        # Upload en flux vers Supabase Storage (par blocs, memoire bornee)
+        file_size = await upload_stream(
+            BUCKET_NAME,
             file_path,
-            content,
-            {"content-type": file.content_type or "application/octet-stream"}
+            file,
+            file.content_type or "application/octet-stream"
         )
 
         # Creer l'enregistrement en base
         file_data = {
-            "id": file_id,
-            "origin_entity_type": origin_entity_type.value,
-            "origin_entity_id": origin_entity_id,
-            "file_type": detected_file_type.value,
-            "file_name": file.filename or "file",
+            **identity,
             "file_path": file_path,
             "file_size": file_size,
             "mime_type": file.content_type,
-            "uploaded_by": profile_id,
+            "content_hash": content_hash,
             "processing_status": processing_status
         }
 
-        response = supabase_admin.table("files").insert(file_data).execute()
+        response = await db.table("files").insert(file_data).execute()
 
         if not response.data:
             # Rollback: supprimer le fichier du storage
-            supabase_admin.storage.from_(BUCKET_NAME).remove([file_path])
+            await db.storage.from_(BUCKET_NAME).remove([file_path])
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Erreur lors de l'enregistrement du fichier"
             )
 
-        # Declencher le traitement en arriere-plan
-        if detected_file_type == FileType.image:
-            background_tasks.add_task(
-                process_image_thumbnail,
-                supabase_admin,
-                file_id,
-                file_path,
-                BUCKET_NAME
-            )
-        elif detected_file_type == FileType.video:
-            background_tasks.add_task(
-                process_video,
-                supabase_admin,
-                file_id,
-                file_path,
-                BUCKET_NAME,
-                file_size
-            )
+        # Enfiler le traitement (execute par le worker media)
+        await enqueue_media_job(file_id, detected_file_type, file_size)
 
         result = response.data[0]
-        result["signed_url"] = _get_signed_url(file_path)
+        result["signed_url"] = await _get_signed_url(file_path)
         result["thumbnail_url"] = None  # Pas encore de thumbnail
         result["is_reference"] = False
 
@@ -154,6 +315,61 @@ async def upload_file(
         )
 
 
+@router.post("/upload-url", response_model=FileUploadTicket, status_code=status.HTTP_201_CREATED)
+async def create_upload_url(
+    data: FileUploadRequest,
+    profile_id: str = Depends(get_current_profile_id),
+    user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Upload direct vers Storage, etape 1: cree l'enregistrement en 'pending_upload'
+    et retourne une URL d'upload signee. Le client envoie le fichier a Storage
+    puis appelle POST /api/files/{file_id}/complete. Sans finalisation, le
+    worker supprime la ligne et l'objet (settings.pending_upload_max_age).
+    """
+    try:
+        file_id = str(uuid.uuid4())
+        file_path = _build_file_path(data.origin_entity_type, data.origin_entity_id, file_id, data.file_name)
+
+        signed = await db.storage.from_(BUCKET_NAME).create_signed_upload_url(file_path)
+
+        file_data = {
+            "id": file_id,
+            "origin_entity_type": data.origin_entity_type.value,
+            "origin_entity_id": data.origin_entity_id,
+            "file_type": (data.file_type or _detect_file_type(data.mime_type)).value,
+            "file_name": data.file_name or "file",
+            "file_path": file_path,
+            "mime_type": data.mime_type,
+            "uploaded_by": profile_id,
+            "processing_status": ProcessingStatus.pending_upload.value
+        }
+
+        response = await db.table("files").insert(file_data).execute()
+
+        if not response.data:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erreur lors de l'enregistrement du fichier"
+            )
+
+        return FileUploadTicket(
+            file_id=file_id,
+            bucket=BUCKET_NAME,
+            file_path=file_path,
+            upload_url=signed["signed_url"],
+            token=signed["token"]
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur upload: {str(e)}"
+        )
+
+
 @router.post("/resolve-urls", response_model=SignedUrlResponse)
 async def resolve_urls(
     request: SignedUrlRequest,
@@ -164,11 +380,8 @@ async def resolve_urls(
     Utilise pour rafraichir les URLs dans le contenu de l'editeur.
     """
     try:
-        urls = {}
-        for path in request.paths:
-            signed_url = _get_signed_url(path)
-            if signed_url:
-                urls[path] = signed_url
+        signed = await _sign_paths(request.paths)
+        urls = {path: url for path, url in signed.items() if url}
 
         return SignedUrlResponse(urls=urls)
 
@@ -179,6 +392,125 @@ async def resolve_urls(
         )
 
 
+@router.get("/hls/{file_path:path}")
+async def get_hls_playlist(
+    file_path: str,
+    exp: int = Query(...),
+    sig: str = Query(...)
+):
+    """
+    Playlist HLS d'une video via une URL signee par l'API (hls_url).
+    Les chemins relatifs de la playlist stockee sont remplaces par des URLs
+    signees: playlists de variante vers ce endpoint, segments comme les
+    autres medias (Storage ou /media selon MEDIA_URL_MODE).
+    """
+    if not file_path.startswith("hls/") or not file_path.endswith(".m3u8") \
+            or not verify_media_signature(BUCKET_NAME, file_path, exp, sig):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="URL invalide ou expiree"
+        )
+    try:
+        text = await load_playlist(BUCKET_NAME, file_path)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Playlist non trouvee"
+        )
+    try:
+        uris = playlist_uris(text, file_path)
+        urls = {
+            p: sign_media_url(BUCKET_NAME, p, HLS_URL_EXPIRY, route=HLS_ROUTE)
+            for p in uris if p.endswith(".m3u8")
+        }
+        urls.update(await _sign_paths([p for p in uris if p not in urls], HLS_URL_EXPIRY))
+        if not all(urls.get(p) for p in uris):
+            raise Exception("signature des segments incomplete")
+        return Response(
+            rewrite_playlist(text, file_path, urls),
+            media_type=PLAYLIST_CONTENT_TYPE,
+            headers={"Cache-Control": "private, max-age=300"}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Erreur Storage: {str(e)}"
+        )
+
+
+@router.get("/vtt/{file_path:path}")
+async def get_sprite_vtt(
+    file_path: str,
+    exp: int = Query(...),
+    sig: str = Query(...)
+):
+    """
+    Index WebVTT de la planche d'apercus d'une video via une URL signee par
+    l'API (vtt_url). Le nom relatif de la planche dans chaque cue est
+    remplace par son URL signee (Storage ou /media selon MEDIA_URL_MODE).
+    """
+    if not file_path.startswith("thumbnails/") or not file_path.endswith(".vtt") \
+            or not verify_media_signature(BUCKET_NAME, file_path, exp, sig):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="URL invalide ou expiree"
+        )
+    try:
+        text = await load_playlist(BUCKET_NAME, file_path)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Index non trouve"
+        )
+    try:
+        uris = vtt_uris(text, file_path)
+        urls = await _sign_paths(uris)
+        if not all(urls.get(p) for p in uris):
+            raise Exception("signature de la planche impossible")
+        return Response(
+            rewrite_vtt(text, file_path, urls),
+            media_type=VTT_CONTENT_TYPE,
+            headers={"Cache-Control": "private, max-age=300"}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Erreur Storage: {str(e)}"
+        )
+
+
+@router.get("/media/{file_path:path}")
+async def download_media(
+    file_path: str,
+    request: Request,
+    exp: int = Query(...),
+    sig: str = Query(...)
+):
+    """
+    Telechargement d'un media via une URL signee par l'API (MEDIA_URL_MODE=local).
+    Pas d'authentification: la signature HMAC tient lieu d'autorisation,
+    comme pour les URLs signees Storage (balises img / video).
+    """
+    if not verify_media_signature(BUCKET_NAME, file_path, exp, sig):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="URL invalide ou expiree"
+        )
+    try:
+        response = await stream_storage_object(BUCKET_NAME, file_path, request, exp)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Erreur Storage: {str(e)}"
+        )
+    if response is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Fichier non trouve"
+        )
+    return response
+
+
 @router.get("/info/{file_id}", response_model=FileResponse)
 async def get_file(
     file_id: str,
@@ -186,7 +518,7 @@ async def get_file(
 ):
     """Recupere un fichier par son ID avec une URL signee fraiche"""
     try:
-        response = supabase_admin.table("files")\
+        response = await db.table("files")\
             .select("*")\
             .eq("id", file_id)\
             .execute()
@@ -198,7 +530,7 @@ async def get_file(
             )
 
         result = response.data[0]
-        _add_urls_to_file(result)
+        await _add_urls_to_file(result)
         result["is_reference"] = False
 
         return result
@@ -212,6 +544,46 @@ async def get_file(
         )
 
 
+@router.get("/status/stream")
+async def stream_processing_status(
+    ids: str = Query(..., description="IDs des fichiers a suivre, separes par des virgules"),
+    user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Flux SSE (text/event-stream) des changements de statut de traitement
+    d'un ensemble de fichiers, a la place du rechargement periodique de la liste.
+
+    Evenements:
+    - status: {id, processing_status, processing_error}, a l'ouverture puis a
+      chaque changement
+    - file: fichier complet (FileResponse, URLs signees) passe en ready ou failed
+    - removed: {id} fichier introuvable (supprime)
+    - error: {detail} erreur pendant le suivi (fin du flux)
+
+    Le flux se termine quand tous les fichiers sont traites.
+    """
+    file_ids = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if not file_ids or len(file_ids) > settings.file_events_max_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Entre 1 et {settings.file_events_max_ids} fichiers par flux"
+        )
+    for file_id in file_ids:
+        try:
+            uuid.UUID(file_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"ID de fichier invalide: {file_id}"
+            )
+
+    return StreamingResponse(
+        _status_events(file_ids),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/delete-info/{file_id}", response_model=FileDeleteInfo)
 async def get_delete_info(
     file_id: str,
@@ -225,7 +597,7 @@ async def get_delete_info(
     """
     try:
         # Verifier si le fichier existe
-        file_response = supabase_admin.table("files")\
+        file_response = await db.table("files")\
             .select("origin_entity_type, origin_entity_id")\
             .eq("id", file_id)\
             .execute()
@@ -247,7 +619,7 @@ async def get_delete_info(
             )
 
         # Compter les references
-        ref_count_response = supabase_admin.table("files_reference")\
+        ref_count_response = await db.table("files_reference")\
             .select("id", count="exact")\
             .eq("files_id", file_id)\
             .execute()
@@ -286,14 +658,15 @@ async def list_files(
         files = []
 
         # 1. Compter les sources et references
-        source_count_resp = supabase_admin.table("files")\
+        source_count_resp = await db.table("files")\
             .select("id", count="exact")\
             .eq("origin_entity_type", entity_type.value)\
             .eq("origin_entity_id", entity_id)\
+            .neq("processing_status", ProcessingStatus.pending_upload.value)\
             .execute()
         sources_count = source_count_resp.count or 0
 
-        ref_count_resp = supabase_admin.table("files_reference")\
+        ref_count_resp = await db.table("files_reference")\
             .select("id", count="exact")\
             .eq("entity_type", entity_type.value)\
             .eq("entity_id", entity_id)\
@@ -306,16 +679,16 @@ async def list_files(
         source_take = 0
         if offset < sources_count:
             source_take = min(limit, sources_count - offset)
-            source_response = supabase_admin.table("files")\
+            source_response = await db.table("files")\
                 .select("*")\
                 .eq("origin_entity_type", entity_type.value)\
                 .eq("origin_entity_id", entity_id)\
+                .neq("processing_status", ProcessingStatus.pending_upload.value)\
                 .order("created_at", desc=True)\
                 .range(offset, offset + source_take - 1)\
                 .execute()
 
             for f in source_response.data:
-                _add_urls_to_file(f)
                 f["is_reference"] = False
                 f["reference_id"] = None
                 files.append(f)
@@ -324,7 +697,7 @@ async def list_files(
         remaining = limit - source_take
         if remaining > 0:
             ref_offset = max(0, offset - sources_count)
-            ref_response = supabase_admin.table("files_reference")\
+            ref_response = await db.table("files_reference")\
                 .select("*, files(*)")\
                 .eq("entity_type", entity_type.value)\
                 .eq("entity_id", entity_id)\
@@ -335,11 +708,13 @@ async def list_files(
             for ref in ref_response.data:
                 if ref.get("files"):
                     f = ref["files"]
-                    _add_urls_to_file(f)
                     f["is_reference"] = True
                     f["reference_id"] = ref["id"]
                     files.append(f)
 
+        # 4. Signer toutes les URLs de la page en un seul appel Storage
+        await _add_urls_to_files(files)
+
         return FileListResponse(
             items=files,
             total=total,
@@ -365,22 +740,22 @@ async def list_images(
         files = []
 
         # Fichiers sources de type image
-        source_response = supabase_admin.table("files")\
+        source_response = await db.table("files")\
             .select("*")\
             .eq("origin_entity_type", entity_type.value)\
             .eq("origin_entity_id", entity_id)\
+            .neq("processing_status", ProcessingStatus.pending_upload.value)\
             .eq("file_type", "image")\
             .order("created_at", desc=True)\
             .execute()
 
         for f in source_response.data:
-            _add_urls_to_file(f)
             f["is_reference"] = False
             f["reference_id"] = None
             files.append(f)
 
         # Fichiers references de type image
-        ref_response = supabase_admin.table("files_reference")\
+        ref_response = await db.table("files_reference")\
             .select("*, files(*)")\
             .eq("entity_type", entity_type.value)\
             .eq("entity_id", entity_id)\
@@ -390,11 +765,11 @@ async def list_images(
         for ref in ref_response.data:
             if ref.get("files") and ref["files"].get("file_type") == "image":
                 f = ref["files"]
-                _add_urls_to_file(f)
                 f["is_reference"] = True
                 f["reference_id"] = ref["id"]
                 files.append(f)
 
+        await _add_urls_to_files(files)
         return files
 
     except Exception as e:
@@ -418,7 +793,7 @@ async def delete_file(
     """
     try:
         # Recuperer le fichier
-        file_response = supabase_admin.table("files")\
+        file_response = await db.table("files")\
             .select("*")\
             .eq("id", file_id)\
             .execute()
@@ -439,33 +814,38 @@ async def delete_file(
                 file_data["origin_entity_id"] == entity_id
             )
 
-        if is_source:
+        # Supprimer l'enregistrement et ses references (RPC): l'objet Storage
+        # partage avec un doublon n'est supprime qu'avec le dernier fichier
+        deleted = await delete_file_row(file_id) if is_source else None
+        if deleted:
+            file_data = deleted
             # Supprimer du Storage (fichier principal)
-            supabase_admin.storage.from_(BUCKET_NAME).remove([file_data["file_path"]])
-
-            # Supprimer le thumbnail s'il existe
-            if file_data.get("thumbnail_path"):
+            await db.storage.from_(BUCKET_NAME).remove([file_data["file_path"]])
+
+            # Supprimer le thumbnail, les declinaisons, la planche d'apercus et
+            # les segments HLS s'ils existent
+            generated_paths = [
+                p for p in (
+                    file_data.get("thumbnail_path"),
+                    *_derivative_paths(file_data),
+                    *_sprite_paths(file_data),
+                    *_hls_paths(file_data)
+                )
+                if p
+            ]
+            for i in range(0, len(generated_paths), STORAGE_REMOVE_BATCH):
                 try:
-                    supabase_admin.storage.from_(BUCKET_NAME).remove([file_data["thumbnail_path"]])
+                    await db.storage.from_(BUCKET_NAME).remove(generated_paths[i:i + STORAGE_REMOVE_BATCH])
                 except Exception:
-                    pass  # Ignorer les erreurs de suppression du thumbnail
+                    pass  # Ignorer les erreurs de suppression des fichiers generes
 
-            # Supprimer les references (cascade devrait le faire, mais on s'assure)
-            supabase_admin.table("files_reference")\
-                .delete()\
-                .eq("files_id", file_id)\
-                .execute()
-
-            # Supprimer l'enregistrement
-            supabase_admin.table("files")\
-                .delete()\
-                .eq("id", file_id)\
-                .execute()
+            forget_signed_urls(BUCKET_NAME, file_data["file_path"], *generated_paths)
 
+        if is_source:
             return {"message": "Fichier supprime", "deleted_type": "source"}
         else:
             # Supprimer uniquement la reference
-            supabase_admin.table("files_reference")\
+            await db.table("files_reference")\
                 .delete()\
                 .eq("files_id", file_id)\
                 .eq("entity_type", entity_type)\
@@ -492,7 +872,7 @@ async def share_file(
     """Partage un fichier vers une autre entite (cree une reference)"""
     try:
         # Verifier que le fichier existe
-        file_response = supabase_admin.table("files")\
+        file_response = await db.table("files")\
             .select("*")\
             .eq("id", file_id)\
             .execute()
@@ -503,8 +883,14 @@ async def share_file(
                 detail="Fichier non trouve"
             )
 
+        if file_response.data[0].get("processing_status") == ProcessingStatus.pending_upload.value:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Upload du fichier non termine"
+            )
+
         # Verifier qu'une reference n'existe pas deja
-        existing = supabase_admin.table("files_reference")\
+        existing = await db.table("files_reference")\
             .select("id")\
             .eq("files_id", file_id)\
             .eq("entity_type", share_data.entity_type.value)\
@@ -525,7 +911,7 @@ async def share_file(
             "entity_id": share_data.entity_id
         }
 
-        response = supabase_admin.table("files_reference")\
+        response = await db.table("files_reference")\
             .insert(ref_data)\
             .execute()
 
@@ -537,7 +923,7 @@ async def share_file(
 
         result = response.data[0]
         result["file"] = file_response.data[0]
-        _add_urls_to_file(result["file"])
+        await _add_urls_to_file(result["file"])
 
         return result
 
@@ -548,3 +934,92 @@ async def share_file(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur: {str(e)}"
         )
+
+
+@router.post("/{file_id}/complete", response_model=FileResponse)
+async def complete_upload(
+    file_id: str,
+    profile_id: str = Depends(get_current_profile_id),
+    user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Upload direct vers Storage, etape 2: verifie que l'objet a ete recu,
+    enregistre taille et MIME reels et declenche le traitement media
+    (ou, sans traitement, le calcul de l'empreinte par le worker).
+    Idempotent: un fichier deja finalise est simplement renvoye.
+    """
+    try:
+        file_response = await db.table("files")\
+            .select("*")\
+            .eq("id", file_id)\
+            .execute()
+
+        if not file_response.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Fichier non trouve"
+            )
+
+        file_data = file_response.data[0]
+
+        if file_data["uploaded_by"] != profile_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Upload initie par un autre profil"
+            )
+
+        if file_data["processing_status"] == ProcessingStatus.pending_upload.value:
+            # Verifier l'objet dans Storage
+            try:
+                info = await db.storage.from_(BUCKET_NAME).info(file_data["file_path"])
+            except Exception:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Fichier non recu par le stockage"
+                )
+            metadata = info.get("metadata") or {}
+            file_size = info.get("size") or metadata.get("size") or metadata.get("contentLength")
+            mime_type = info.get("content_type") or metadata.get("mimetype") or file_data.get("mime_type")
+            file_type = FileType(file_data["file_type"])
+
+            needs_processing = file_type in (FileType.image, FileType.video)
+            update_data = {
+                "file_size": file_size,
+                "mime_type": mime_type,
+                "processing_status": "pending" if needs_processing else "ready"
+            }
+
+            response = await db.table("files")\
+                .update(update_data)\
+                .eq("id", file_id)\
+                .eq("processing_status", ProcessingStatus.pending_upload.value)\
+                .execute()
+
+            if response.data:
+                file_data = response.data[0]
+                await enqueue_media_job(file_id, file_type, file_size)
+                if not needs_processing and settings.file_dedup:
+                    # Empreinte calculee par le worker (images et videos: par leur job)
+                    await enqueue_content_hash_job(file_id)
+            else:
+                # Finalise entre-temps par un autre appel, ou upload expire (purge)
+                current = await db.table("files").select("*").eq("id", file_id).execute()
+                if not current.data:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Fichier non trouve"
+                    )
+                file_data = current.data[0]
+
+        await _add_urls_to_file(file_data)
+        file_data["is_reference"] = False
+
+        return file_data
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur: {str(e)}"
+        )
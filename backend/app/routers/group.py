@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from typing import List
 from app.models.group import Group, GroupCreate, GroupUpdate, GroupDetails, CoachInfo, ProjectInfo
-from app.auth import get_current_user, require_super_coach, CurrentUser, supabase_admin, COACH_PROFILE_TYPE_ID
+from app.auth import get_current_user, require_super_coach, CurrentUser, COACH_PROFILE_TYPE_ID
+from app.db import db
 
 router = APIRouter(prefix="/api/groups", tags=["groups"])
 
@@ -13,11 +14,11 @@ def _format_user_name(first_name: str = None, last_name: str = None) -> str:
     return None
 
 
-def _get_user_info(user_uid: str) -> dict:
+async def _get_user_info(user_uid: str) -> dict:
     """Recupere les infos utilisateur depuis auth.users (DEPRECATED - utiliser les colonnes profile)"""
     # NOTE: Cette fonction est conservee pour les cas ou on a besoin de l'email
     try:
-        user_response = supabase_admin.auth.admin.get_user_by_id(user_uid)
+        user_response = await db.auth.admin.get_user_by_id(user_uid)
         if user_response and user_response.user:
             metadata = user_response.user.user_metadata or {}
             return {
@@ -58,13 +59,13 @@ async def list_groups(
 ):
     """Liste tous les groupes (Super Coach uniquement)"""
     try:
-        query = supabase_admin.table("group")\
+        query = db.table("group")\
             .select("*, type_support(name), group_profile(profile_id), group_project(project_id)")
 
         if not include_deleted:
             query = query.eq("is_deleted", False)
 
-        response = query.order("name").execute()
+        response = await query.order("name").execute()
 
         groups = []
         for g in response.data:
@@ -85,7 +86,7 @@ async def list_coaches(
     """Liste tous les profils de type Coach pour le dropdown"""
     try:
         # Inclure first_name/last_name directement depuis profile
-        response = supabase_admin.table("profile")\
+        response = await db.table("profile")\
             .select("id, first_name, last_name")\
             .eq("type_profile_id", COACH_PROFILE_TYPE_ID)\
             .execute()
@@ -114,7 +115,7 @@ async def get_group(
 ):
     """Recuperer un groupe par ID avec details (coachs et projets)"""
     try:
-        response = supabase_admin.table("group")\
+        response = await db.table("group")\
             .select("*, type_support(name)")\
             .eq("id", group_id)\
             .execute()
@@ -134,7 +135,7 @@ async def get_group(
             del group_data["type_support"]
 
         # Recuperer les coachs du groupe (first_name/last_name depuis profile)
-        coaches_response = supabase_admin.table("group_profile")\
+        coaches_response = await db.table("group_profile")\
             .select("profile_id, profile(first_name, last_name)")\
             .eq("group_id", group_id)\
             .execute()
@@ -152,7 +153,7 @@ async def get_group(
         group_data["coaches_count"] = len(coaches)
 
         # Recuperer les projets du groupe (first_name/last_name depuis profile)
-        projects_response = supabase_admin.table("group_project")\
+        projects_response = await db.table("group_project")\
             .select("project_id, project(id, name, type_support_id, type_support(name), profile_id, profile(first_name, last_name))")\
             .eq("group_id", group_id)\
             .execute()
@@ -196,7 +197,7 @@ async def create_group(
     """Creer un nouveau groupe (Super Coach uniquement)"""
     try:
         insert_data = group_data.model_dump()
-        response = supabase_admin.table("group")\
+        response = await db.table("group")\
             .insert(insert_data)\
             .execute()
 
@@ -208,7 +209,7 @@ async def create_group(
 
         # Recuperer le groupe avec jointure
         group_id = response.data[0]["id"]
-        get_response = supabase_admin.table("group")\
+        get_response = await db.table("group")\
             .select("*, type_support(name), group_profile(profile_id), group_project(project_id)")\
             .eq("id", group_id)\
             .execute()
@@ -240,7 +241,7 @@ async def update_group(
                 detail="Aucune donnee a mettre a jour"
             )
 
-        response = supabase_admin.table("group")\
+        response = await db.table("group")\
             .update(update_data)\
             .eq("id", group_id)\
             .eq("is_deleted", False)\
@@ -253,7 +254,7 @@ async def update_group(
             )
 
         # Recuperer le groupe mis a jour avec jointure
-        get_response = supabase_admin.table("group")\
+        get_response = await db.table("group")\
             .select("*, type_support(name), group_profile(profile_id), group_project(project_id)")\
             .eq("id", group_id)\
             .execute()
@@ -276,7 +277,7 @@ async def delete_group(
 ):
     """Soft delete un groupe (Super Coach uniquement)"""
     try:
-        response = supabase_admin.table("group")\
+        response = await db.table("group")\
             .update({"is_deleted": True})\
             .eq("id", group_id)\
             .eq("is_deleted", False)\
@@ -305,7 +306,7 @@ async def restore_group(
 ):
     """Restaurer un groupe supprime (Super Coach uniquement)"""
     try:
-        response = supabase_admin.table("group")\
+        response = await db.table("group")\
             .update({"is_deleted": False})\
             .eq("id", group_id)\
             .eq("is_deleted", True)\
@@ -317,7 +318,7 @@ async def restore_group(
                 detail="Groupe non trouve ou non supprime"
             )
 
-        get_response = supabase_admin.table("group")\
+        get_response = await db.table("group")\
             .select("*, type_support(name), group_profile(profile_id), group_project(project_id)")\
             .eq("id", group_id)\
             .execute()
@@ -346,7 +347,7 @@ async def add_coach_to_group(
     """Ajouter un coach au groupe"""
     try:
         # Verifier que le groupe existe
-        group_check = supabase_admin.table("group")\
+        group_check = await db.table("group")\
             .select("id")\
             .eq("id", group_id)\
             .eq("is_deleted", False)\
@@ -359,7 +360,7 @@ async def add_coach_to_group(
             )
 
         # Verifier que le profil est un Coach
-        profile_check = supabase_admin.table("profile")\
+        profile_check = await db.table("profile")\
             .select("type_profile_id")\
             .eq("id", profile_id)\
             .execute()
@@ -377,7 +378,7 @@ async def add_coach_to_group(
             )
 
         # Ajouter la relation
-        response = supabase_admin.table("group_profile")\
+        response = await db.table("group_profile")\
             .insert({"group_id": group_id, "profile_id": profile_id})\
             .execute()
 
@@ -405,7 +406,7 @@ async def remove_coach_from_group(
 ):
     """Retirer un coach du groupe"""
     try:
-        response = supabase_admin.table("group_profile")\
+        response = await db.table("group_profile")\
             .delete()\
             .eq("group_id", group_id)\
             .eq("profile_id", profile_id)\
@@ -433,7 +434,7 @@ async def list_available_projects(
     """Liste les projets non encore dans ce groupe"""
     try:
         # Recuperer les IDs des projets deja dans le groupe
-        existing = supabase_admin.table("group_project")\
+        existing = await db.table("group_project")\
             .select("project_id")\
             .eq("group_id", group_id)\
             .execute()
@@ -441,11 +442,11 @@ async def list_available_projects(
         existing_ids = [p["project_id"] for p in existing.data]
 
         # Recuperer tous les projets actifs (first_name/last_name depuis profile)
-        query = supabase_admin.table("project")\
+        query = db.table("project")\
             .select("id, name, type_support(name), profile(first_name, last_name)")\
             .eq("is_deleted", False)
 
-        response = query.order("name").execute()
+        response = await query.order("name").execute()
 
         projects = []
         for project in response.data:
@@ -482,7 +483,7 @@ async def add_project_to_group(
     """Ajouter un projet au groupe"""
     try:
         # Verifier que le groupe existe
-        group_check = supabase_admin.table("group")\
+        group_check = await db.table("group")\
             .select("id")\
             .eq("id", group_id)\
             .eq("is_deleted", False)\
@@ -495,7 +496,7 @@ async def add_project_to_group(
             )
 
         # Verifier que le projet existe
-        project_check = supabase_admin.table("project")\
+        project_check = await db.table("project")\
             .select("id")\
             .eq("id", project_id)\
             .eq("is_deleted", False)\
@@ -508,7 +509,7 @@ async def add_project_to_group(
             )
 
         # Ajouter la relation
-        response = supabase_admin.table("group_project")\
+        response = await db.table("group_project")\
             .insert({"group_id": group_id, "project_id": project_id})\
             .execute()
 
@@ -536,7 +537,7 @@ async def remove_project_from_group(
 ):
     """Retirer un projet du groupe"""
     try:
-        response = supabase_admin.table("group_project")\
+        response = await db.table("group_project")\
             .delete()\
             .eq("group_id", group_id)\
             .eq("project_id", project_id)\
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status, Query
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
-from app.auth import get_current_user, require_navigant, CurrentUser, supabase_admin
+from app.auth import get_current_user, require_navigant, CurrentUser
+from app.db import db
+from app.services.reference_cache import reference_cache, not_modified_response
 
 router = APIRouter(prefix="/api/navigant", tags=["navigant"])
 
@@ -139,7 +141,7 @@ class NavigantSessionDetail(BaseModel):
 
 async def _get_navigant_project(profile_id: str) -> Optional[dict]:
     """Recupere le projet du navigant (projet dont profile_id = navigant)"""
-    response = supabase_admin.table("project")\
+    response = await db.table("project")\
         .select("*, type_support(name)")\
         .eq("profile_id", profile_id)\
         .eq("is_deleted", False)\
@@ -153,7 +155,7 @@ async def _get_navigant_project(profile_id: str) -> Optional[dict]:
 
 async def _get_navigant_projects(profile_id: str) -> List[dict]:
     """Recupere TOUS les projets du navigant (projets dont profile_id = navigant)"""
-    response = supabase_admin.table("project")\
+    response = await db.table("project")\
         .select("*, type_support(name)")\
         .eq("profile_id", profile_id)\
         .eq("is_deleted", False)\
@@ -164,7 +166,7 @@ async def _get_navigant_projects(profile_id: str) -> List[dict]:
 
 async def _verify_navigant_owns_project(profile_id: str, project_id: str) -> bool:
     """Verifie que le navigant possede ce projet"""
-    response = supabase_admin.table("project")\
+    response = await db.table("project")\
         .select("id")\
         .eq("id", project_id)\
         .eq("profile_id", profile_id)\
@@ -175,7 +177,7 @@ async def _verify_navigant_owns_project(profile_id: str, project_id: str) -> boo
 
 async def _get_navigant_project_by_id(profile_id: str, project_id: str) -> Optional[dict]:
     """Recupere un projet specifique du navigant"""
-    response = supabase_admin.table("project")\
+    response = await db.table("project")\
         .select("*, type_support(name)")\
         .eq("id", project_id)\
         .eq("profile_id", profile_id)\
@@ -188,7 +190,7 @@ async def _get_navigant_project_by_id(profile_id: str, project_id: str) -> Optio
 
 async def _verify_session_belongs_to_project(session_id: str, project_id: str) -> bool:
     """Verifie que la session appartient au projet"""
-    response = supabase_admin.table("session")\
+    response = await db.table("session")\
         .select("id")\
         .eq("id", session_id)\
         .eq("project_id", project_id)\
@@ -198,7 +200,7 @@ async def _verify_session_belongs_to_project(session_id: str, project_id: str) -
 
 async def _verify_work_lead_belongs_to_project(work_lead_id: str, project_id: str) -> bool:
     """Verifie que le work_lead appartient au projet"""
-    response = supabase_admin.table("work_lead")\
+    response = await db.table("work_lead")\
         .select("id")\
         .eq("id", work_lead_id)\
         .eq("project_id", project_id)\
@@ -206,36 +208,10 @@ async def _verify_work_lead_belongs_to_project(work_lead_id: str, project_id: st
     return len(response.data) > 0
 
 
-def _get_current_status_for_work_lead(work_lead_id: str) -> str:
-    """
-    Calcule le statut courant d'un work_lead depuis la table pivot session_work_lead.
-    - Pas d'entree => NEW
-    - Entrees existantes => statut de l'entree la plus recente (updated_at)
-    """
-    try:
-        response = supabase_admin.table("session_work_lead")\
-            .select("status, updated_at")\
-            .eq("work_lead_id", work_lead_id)\
-            .order("updated_at", desc=True)\
-            .limit(1)\
-            .execute()
-
-        if response.data and len(response.data) > 0:
-            return response.data[0]["status"]
-        return "NEW"
-    except:
-        return "NEW"
-
-
-def _get_work_lead_types_lookup() -> dict:
+async def _get_work_lead_types_lookup() -> dict:
     """Recupere tous les types d'axes de travail pour le lookup des parents"""
     try:
-        response = supabase_admin.table("work_lead_type")\
-            .select("id, name, parent_id")\
-            .is_("project_id", "null")\
-            .eq("is_deleted", False)\
-            .execute()
-        return {t["id"]: t for t in response.data}
+        return await reference_cache.work_lead_types_lookup()
     except:
         return {}
 
@@ -247,11 +223,11 @@ def _format_user_name(first_name: str = None, last_name: str = None) -> str:
     return None
 
 
-def _get_user_info(user_uid: str) -> dict:
+async def _get_user_info(user_uid: str) -> dict:
     """Recupere les infos utilisateur depuis auth.users (DEPRECATED - utiliser les colonnes profile)"""
     # NOTE: Cette fonction est conservee pour les cas ou on a besoin de l'email
     try:
-        user_response = supabase_admin.auth.admin.get_user_by_id(user_uid)
+        user_response = await db.auth.admin.get_user_by_id(user_uid)
         if user_response and user_response.user:
             metadata = user_response.user.user_metadata or {}
             return {
@@ -264,10 +240,10 @@ def _get_user_info(user_uid: str) -> dict:
     return {"email": None, "first_name": None, "last_name": None}
 
 
-def _get_profile_name(profile_id: str) -> Optional[str]:
+async def _get_profile_name(profile_id: str) -> Optional[str]:
     """Recupere le nom d'un profil directement depuis profile"""
     try:
-        response = supabase_admin.table("profile")\
+        response = await db.table("profile")\
             .select("first_name, last_name")\
             .eq("id", profile_id)\
             .limit(1)\
@@ -280,10 +256,10 @@ def _get_profile_name(profile_id: str) -> Optional[str]:
         return None
 
 
-def _get_session_crew(session_id: str) -> List[CrewMember]:
+async def _get_session_crew(session_id: str) -> List[CrewMember]:
     """Recupere l'equipage d'une session (first_name/last_name depuis profile)"""
     try:
-        response = supabase_admin.table("session_profile")\
+        response = await db.table("session_profile")\
             .select("profile_id, profile(first_name, last_name)")\
             .eq("session_id", session_id)\
             .execute()
@@ -304,16 +280,16 @@ def _get_session_crew(session_id: str) -> List[CrewMember]:
         return []
 
 
-def _get_session_work_leads(session_id: str) -> List[SessionWorkLeadItem]:
+async def _get_session_work_leads(session_id: str) -> List[SessionWorkLeadItem]:
     """Recupere les work_leads associes a une session avec leur status"""
     try:
-        response = supabase_admin.table("session_work_lead")\
+        response = await db.table("session_work_lead")\
             .select("*, work_lead(id, name, work_lead_type_id, work_lead_master_id, work_lead_type(id, name, parent_id))")\
             .eq("session_id", session_id)\
             .execute()
 
         # Lookup des types pour resoudre les parents
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
 
         items = []
         for swl in response.data:
@@ -344,10 +320,10 @@ def _get_session_work_leads(session_id: str) -> List[SessionWorkLeadItem]:
         return []
 
 
-def _get_session_master_info(session_master_id: str) -> Optional[SessionMasterInfo]:
+async def _get_session_master_info(session_master_id: str) -> Optional[SessionMasterInfo]:
     """Recupere les infos de la session_master"""
     try:
-        response = supabase_admin.table("session_master")\
+        response = await db.table("session_master")\
             .select("id, name, coach_id, content")\
             .eq("id", session_master_id)\
             .limit(1)\
@@ -359,7 +335,7 @@ def _get_session_master_info(session_master_id: str) -> Optional[SessionMasterIn
         sm = response.data[0]
         coach_name = None
         if sm.get("coach_id"):
-            coach_name = _get_profile_name(sm["coach_id"])
+            coach_name = await _get_profile_name(sm["coach_id"])
 
         return SessionMasterInfo(
             id=sm["id"],
@@ -447,14 +423,14 @@ async def list_sessions(
                 detail="Aucun projet associe"
             )
 
-        query = supabase_admin.table("session")\
+        query = db.table("session")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("project_id", project["id"])
 
         if not include_deleted:
             query = query.eq("is_deleted", False)
 
-        response = query.order("date_start", desc=True).execute()
+        response = await query.order("date_start", desc=True).execute()
 
         sessions = []
         for s in response.data:
@@ -499,7 +475,7 @@ async def get_session(
                 detail="Aucun projet associe"
             )
 
-        response = supabase_admin.table("session")\
+        response = await db.table("session")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("id", session_id)\
             .eq("project_id", project["id"])\
@@ -552,7 +528,7 @@ async def get_session_detail(
                 detail="Aucun projet associe"
             )
 
-        response = supabase_admin.table("session")\
+        response = await db.table("session")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("id", session_id)\
             .eq("project_id", project["id"])\
@@ -570,13 +546,13 @@ async def get_session_detail(
         # Recuperer session_master si liee
         session_master = None
         if s.get("session_master_id"):
-            session_master = _get_session_master_info(s["session_master_id"])
+            session_master = await _get_session_master_info(s["session_master_id"])
 
         # Recuperer equipage
-        crew = _get_session_crew(session_id)
+        crew = await _get_session_crew(session_id)
 
         # Recuperer work_leads
-        work_leads = _get_session_work_leads(session_id)
+        work_leads = await _get_session_work_leads(session_id)
 
         return NavigantSessionDetail(
             id=s["id"],
@@ -623,13 +599,7 @@ async def create_session(
             )
 
         # Verifier que le type_seance existe
-        type_check = supabase_admin.table("type_seance")\
-            .select("id")\
-            .eq("id", data.type_seance_id)\
-            .eq("is_deleted", False)\
-            .execute()
-
-        if not type_check.data:
+        if not await reference_cache.exists("type_seance", data.type_seance_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Type de seance non trouve"
@@ -647,7 +617,7 @@ async def create_session(
             "content": data.content
         }
 
-        response = supabase_admin.table("session")\
+        response = await db.table("session")\
             .insert(insert_data)\
             .execute()
 
@@ -660,7 +630,7 @@ async def create_session(
         session_id = response.data[0]["id"]
 
         # Ajouter l'equipage initial (le navigant lui-meme)
-        supabase_admin.table("session_profile")\
+        await db.table("session_profile")\
             .insert({
                 "session_id": session_id,
                 "profile_id": user.active_profile_id
@@ -668,7 +638,7 @@ async def create_session(
             .execute()
 
         # Recuperer avec jointure
-        session = supabase_admin.table("session")\
+        session = await db.table("session")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("id", session_id)\
             .execute()
@@ -730,7 +700,7 @@ async def update_session(
             "content": data.content
         }
 
-        response = supabase_admin.table("session")\
+        response = await db.table("session")\
             .update(update_data)\
             .eq("id", session_id)\
             .eq("project_id", project["id"])\
@@ -773,7 +743,7 @@ async def delete_session(
                 detail="Acces refuse a cette session"
             )
 
-        response = supabase_admin.table("session")\
+        response = await db.table("session")\
             .update({"is_deleted": True})\
             .eq("id", session_id)\
             .eq("project_id", project["id"])\
@@ -821,7 +791,7 @@ async def get_session_work_leads(
                 detail="Acces refuse a cette session"
             )
 
-        return _get_session_work_leads(session_id)
+        return await _get_session_work_leads(session_id)
 
     except HTTPException:
         raise
@@ -869,7 +839,7 @@ async def update_session_work_lead(
 
         # Si status est null, supprimer l'entree
         if data.status is None:
-            supabase_admin.table("session_work_lead")\
+            await db.table("session_work_lead")\
                 .delete()\
                 .eq("session_id", session_id)\
                 .eq("work_lead_id", work_lead_id)\
@@ -894,7 +864,7 @@ async def update_session_work_lead(
             )
 
         # Verifier si l'entree existe deja (table pivot avec cle composite session_id + work_lead_id)
-        existing = supabase_admin.table("session_work_lead")\
+        existing = await db.table("session_work_lead")\
             .select("session_id, work_lead_id, override_master")\
             .eq("session_id", session_id)\
             .eq("work_lead_id", work_lead_id)\
@@ -909,14 +879,14 @@ async def update_session_work_lead(
             if existing.data[0].get("override_master") is False:
                 update_data["override_master"] = True
 
-            supabase_admin.table("session_work_lead")\
+            await db.table("session_work_lead")\
                 .update(update_data)\
                 .eq("session_id", session_id)\
                 .eq("work_lead_id", work_lead_id)\
                 .execute()
         else:
             # Creation - override_master = NULL (work lead cree directement, pas de master)
-            supabase_admin.table("session_work_lead")\
+            await db.table("session_work_lead")\
                 .insert({
                     "session_id": session_id,
                     "work_lead_id": work_lead_id,
@@ -927,7 +897,7 @@ async def update_session_work_lead(
                 .execute()
 
         # Recuperer et retourner l'item mis a jour
-        result = supabase_admin.table("session_work_lead")\
+        result = await db.table("session_work_lead")\
             .select("*, work_lead(id, name, work_lead_type_id, work_lead_master_id, work_lead_type(id, name, parent_id))")\
             .eq("session_id", session_id)\
             .eq("work_lead_id", work_lead_id)\
@@ -945,7 +915,7 @@ async def update_session_work_lead(
         composite_id = f"{swl['session_id']}_{swl['work_lead_id']}"
 
         # Lookup des types pour resoudre le parent
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
         parent_id = wlt.get("parent_id") if wlt else None
         parent_name = None
         if parent_id and types_lookup.get(parent_id):
@@ -992,7 +962,7 @@ async def list_work_leads(
                 detail="Aucun projet associe"
             )
 
-        query = supabase_admin.table("work_lead")\
+        query = db.table("work_lead")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .eq("project_id", project["id"])
 
@@ -1002,10 +972,10 @@ async def list_work_leads(
         if not include_archived:
             query = query.eq("is_archived", False)
 
-        response = query.order("name").execute()
+        response = await query.order("name").execute()
 
         # Lookup des types pour resoudre les parents
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
 
         work_leads = []
         for w in response.data:
@@ -1023,7 +993,7 @@ async def list_work_leads(
                 work_lead_type_parent_id=parent_id,
                 work_lead_type_parent_name=parent_name,
                 content=w.get("content"),
-                current_status=_get_current_status_for_work_lead(w["id"]),
+                current_status=w.get("current_status") or "NEW",
                 is_deleted=w.get("is_deleted", False),
                 is_archived=w.get("is_archived", False),
                 created_at=w["created_at"],
@@ -1055,7 +1025,7 @@ async def get_work_lead(
                 detail="Aucun projet associe"
             )
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .eq("id", work_lead_id)\
             .eq("project_id", project["id"])\
@@ -1071,7 +1041,7 @@ async def get_work_lead(
         work_lead_type = w.get("work_lead_type")
 
         # Lookup des types pour resoudre le parent
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
         parent_id = work_lead_type.get("parent_id") if work_lead_type else None
         parent_name = None
         if parent_id and types_lookup.get(parent_id):
@@ -1085,7 +1055,7 @@ async def get_work_lead(
             work_lead_type_parent_id=parent_id,
             work_lead_type_parent_name=parent_name,
             content=w.get("content"),
-            current_status=_get_current_status_for_work_lead(w["id"]),
+            current_status=w.get("current_status") or "NEW",
             is_deleted=w.get("is_deleted", False),
             is_archived=w.get("is_archived", False),
             created_at=w["created_at"],
@@ -1116,13 +1086,7 @@ async def create_work_lead(
             )
 
         # Verifier que le work_lead_type existe
-        type_check = supabase_admin.table("work_lead_type")\
-            .select("id")\
-            .eq("id", data.work_lead_type_id)\
-            .eq("is_deleted", False)\
-            .execute()
-
-        if not type_check.data:
+        if not await reference_cache.exists("work_lead_type", data.work_lead_type_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Type d'axe de travail non trouve"
@@ -1137,7 +1101,7 @@ async def create_work_lead(
             "content": data.content
         }
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .insert(insert_data)\
             .execute()
 
@@ -1148,7 +1112,7 @@ async def create_work_lead(
             )
 
         # Recuperer avec jointure
-        work_lead = supabase_admin.table("work_lead")\
+        work_lead = await db.table("work_lead")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .eq("id", response.data[0]["id"])\
             .execute()
@@ -1157,7 +1121,7 @@ async def create_work_lead(
         work_lead_type = w.get("work_lead_type")
 
         # Lookup des types pour resoudre le parent
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
         parent_id = work_lead_type.get("parent_id") if work_lead_type else None
         parent_name = None
         if parent_id and types_lookup.get(parent_id):
@@ -1214,7 +1178,7 @@ async def update_work_lead(
             "content": data.content
         }
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .update(update_data)\
             .eq("id", work_lead_id)\
             .eq("project_id", project["id"])\
@@ -1257,7 +1221,7 @@ async def delete_work_lead(
                 detail="Acces refuse a cet axe de travail"
             )
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .update({"is_deleted": True})\
             .eq("id", work_lead_id)\
             .eq("project_id", project["id"])\
@@ -1301,7 +1265,7 @@ async def archive_work_lead(
                 detail="Acces refuse a cet axe de travail"
             )
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .update({"is_archived": True})\
             .eq("id", work_lead_id)\
             .eq("project_id", project["id"])\
@@ -1346,7 +1310,7 @@ async def unarchive_work_lead(
                 detail="Acces refuse a cet axe de travail"
             )
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .update({"is_archived": False})\
             .eq("id", work_lead_id)\
             .eq("project_id", project["id"])\
@@ -1391,7 +1355,7 @@ async def restore_work_lead(
                 detail="Acces refuse a cet axe de travail"
             )
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .update({"is_deleted": False})\
             .eq("id", work_lead_id)\
             .eq("project_id", project["id"])\
@@ -1433,14 +1397,14 @@ async def list_project_sessions(
                 detail="Acces refuse a ce projet"
             )
 
-        query = supabase_admin.table("session")\
+        query = db.table("session")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("project_id", project_id)
 
         if not include_deleted:
             query = query.eq("is_deleted", False)
 
-        response = query.order("date_start", desc=True).execute()
+        response = await query.order("date_start", desc=True).execute()
 
         sessions = []
         for s in response.data:
@@ -1485,7 +1449,7 @@ async def get_project_session(
                 detail="Acces refuse a ce projet"
             )
 
-        response = supabase_admin.table("session")\
+        response = await db.table("session")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("id", session_id)\
             .eq("project_id", project_id)\
@@ -1539,7 +1503,7 @@ async def get_project_session_detail(
                 detail="Acces refuse a ce projet"
             )
 
-        response = supabase_admin.table("session")\
+        response = await db.table("session")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("id", session_id)\
             .eq("project_id", project_id)\
@@ -1557,13 +1521,13 @@ async def get_project_session_detail(
         # Recuperer session_master si liee
         session_master = None
         if s.get("session_master_id"):
-            session_master = _get_session_master_info(s["session_master_id"])
+            session_master = await _get_session_master_info(s["session_master_id"])
 
         # Recuperer equipage
-        crew = _get_session_crew(session_id)
+        crew = await _get_session_crew(session_id)
 
         # Recuperer work_leads
-        work_leads = _get_session_work_leads(session_id)
+        work_leads = await _get_session_work_leads(session_id)
 
         return NavigantSessionDetail(
             id=s["id"],
@@ -1610,13 +1574,7 @@ async def create_project_session(
             )
 
         # Verifier que le type_seance existe
-        type_check = supabase_admin.table("type_seance")\
-            .select("id")\
-            .eq("id", data.type_seance_id)\
-            .eq("is_deleted", False)\
-            .execute()
-
-        if not type_check.data:
+        if not await reference_cache.exists("type_seance", data.type_seance_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Type de seance non trouve"
@@ -1634,7 +1592,7 @@ async def create_project_session(
             "content": data.content
         }
 
-        response = supabase_admin.table("session")\
+        response = await db.table("session")\
             .insert(insert_data)\
             .execute()
 
@@ -1647,7 +1605,7 @@ async def create_project_session(
         session_id = response.data[0]["id"]
 
         # Ajouter l'equipage initial (le navigant lui-meme)
-        supabase_admin.table("session_profile")\
+        await db.table("session_profile")\
             .insert({
                 "session_id": session_id,
                 "profile_id": user.active_profile_id
@@ -1655,7 +1613,7 @@ async def create_project_session(
             .execute()
 
         # Recuperer avec jointure
-        session = supabase_admin.table("session")\
+        session = await db.table("session")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("id", session_id)\
             .execute()
@@ -1717,7 +1675,7 @@ async def update_project_session(
             "content": data.content
         }
 
-        response = supabase_admin.table("session")\
+        response = await db.table("session")\
             .update(update_data)\
             .eq("id", session_id)\
             .eq("project_id", project_id)\
@@ -1760,7 +1718,7 @@ async def delete_project_session(
                 detail="Acces refuse a cette session"
             )
 
-        response = supabase_admin.table("session")\
+        response = await db.table("session")\
             .update({"is_deleted": True})\
             .eq("id", session_id)\
             .eq("project_id", project_id)\
@@ -1804,7 +1762,7 @@ async def get_project_session_work_leads(
                 detail="Acces refuse a cette session"
             )
 
-        return _get_session_work_leads(session_id)
+        return await _get_session_work_leads(session_id)
 
     except HTTPException:
         raise
@@ -1845,7 +1803,7 @@ async def update_project_session_work_lead(
 
         # Si status est null, supprimer l'entree
         if data.status is None:
-            supabase_admin.table("session_work_lead")\
+            await db.table("session_work_lead")\
                 .delete()\
                 .eq("session_id", session_id)\
                 .eq("work_lead_id", work_lead_id)\
@@ -1870,7 +1828,7 @@ async def update_project_session_work_lead(
             )
 
         # Verifier si l'entree existe deja
-        existing = supabase_admin.table("session_work_lead")\
+        existing = await db.table("session_work_lead")\
             .select("session_id, work_lead_id, override_master")\
             .eq("session_id", session_id)\
             .eq("work_lead_id", work_lead_id)\
@@ -1884,13 +1842,13 @@ async def update_project_session_work_lead(
             if existing.data[0].get("override_master") is False:
                 update_data["override_master"] = True
 
-            supabase_admin.table("session_work_lead")\
+            await db.table("session_work_lead")\
                 .update(update_data)\
                 .eq("session_id", session_id)\
                 .eq("work_lead_id", work_lead_id)\
                 .execute()
         else:
-            supabase_admin.table("session_work_lead")\
+            await db.table("session_work_lead")\
                 .insert({
                     "session_id": session_id,
                     "work_lead_id": work_lead_id,
@@ -1901,7 +1859,7 @@ async def update_project_session_work_lead(
                 .execute()
 
         # Recuperer et retourner l'item mis a jour
-        result = supabase_admin.table("session_work_lead")\
+        result = await db.table("session_work_lead")\
             .select("*, work_lead(id, name, work_lead_type_id, work_lead_master_id, work_lead_type(id, name, parent_id))")\
             .eq("session_id", session_id)\
             .eq("work_lead_id", work_lead_id)\
@@ -1919,7 +1877,7 @@ async def update_project_session_work_lead(
         composite_id = f"{swl['session_id']}_{swl['work_lead_id']}"
 
         # Lookup des types pour resoudre le parent
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
         parent_id = wlt.get("parent_id") if wlt else None
         parent_name = None
         if parent_id and types_lookup.get(parent_id):
@@ -1966,7 +1924,7 @@ async def list_project_work_leads(
                 detail="Acces refuse a ce projet"
             )
 
-        query = supabase_admin.table("work_lead")\
+        query = db.table("work_lead")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .eq("project_id", project_id)
 
@@ -1976,10 +1934,10 @@ async def list_project_work_leads(
         if not include_archived:
             query = query.eq("is_archived", False)
 
-        response = query.order("name").execute()
+        response = await query.order("name").execute()
 
         # Lookup des types pour resoudre les parents
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
 
         work_leads = []
         for w in response.data:
@@ -1997,7 +1955,7 @@ async def list_project_work_leads(
                 work_lead_type_parent_id=parent_id,
                 work_lead_type_parent_name=parent_name,
                 content=w.get("content"),
-                current_status=_get_current_status_for_work_lead(w["id"]),
+                current_status=w.get("current_status") or "NEW",
                 is_deleted=w.get("is_deleted", False),
                 is_archived=w.get("is_archived", False),
                 created_at=w["created_at"],
@@ -2029,7 +1987,7 @@ async def get_project_work_lead(
                 detail="Acces refuse a ce projet"
             )
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .eq("id", work_lead_id)\
             .eq("project_id", project_id)\
@@ -2045,7 +2003,7 @@ async def get_project_work_lead(
         work_lead_type = w.get("work_lead_type")
 
         # Lookup des types pour resoudre le parent
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
         parent_id = work_lead_type.get("parent_id") if work_lead_type else None
         parent_name = None
         if parent_id and types_lookup.get(parent_id):
@@ -2059,7 +2017,7 @@ async def get_project_work_lead(
             work_lead_type_parent_id=parent_id,
             work_lead_type_parent_name=parent_name,
             content=w.get("content"),
-            current_status=_get_current_status_for_work_lead(w["id"]),
+            current_status=w.get("current_status") or "NEW",
             is_deleted=w.get("is_deleted", False),
             is_archived=w.get("is_archived", False),
             created_at=w["created_at"],
@@ -2092,7 +2050,7 @@ async def get_project_work_lead_sessions(
             )
 
         # Verify work_lead exists and belongs to project
-        wl_check = supabase_admin.table("work_lead")\
+        wl_check = await db.table("work_lead")\
             .select("id")\
             .eq("id", work_lead_id)\
             .eq("project_id", project_id)\
@@ -2105,7 +2063,7 @@ async def get_project_work_lead_sessions(
             )
 
         # Get all session_ids and statuses from pivot table
-        pivot_response = supabase_admin.table("session_work_lead")\
+        pivot_response = await db.table("session_work_lead")\
             .select("session_id, status")\
             .eq("work_lead_id", work_lead_id)\
             .execute()
@@ -2122,7 +2080,7 @@ async def get_project_work_lead_sessions(
         status_map = {p["session_id"]: p["status"] for p in pivot_response.data}
 
         # Get total count (excluding deleted sessions)
-        count_response = supabase_admin.table("session")\
+        count_response = await db.table("session")\
             .select("id", count="exact")\
             .in_("id", session_ids)\
             .eq("is_deleted", False)\
@@ -2130,7 +2088,7 @@ async def get_project_work_lead_sessions(
         total = count_response.count or 0
 
         # Get sessions ordered by date_start DESC with pagination
-        sessions_response = supabase_admin.table("session")\
+        sessions_response = await db.table("session")\
             .select("id, name, date_start")\
             .in_("id", session_ids)\
             .eq("is_deleted", False)\
@@ -2178,13 +2136,7 @@ async def create_project_work_lead(
             )
 
         # Verifier que le work_lead_type existe
-        type_check = supabase_admin.table("work_lead_type")\
-            .select("id")\
-            .eq("id", data.work_lead_type_id)\
-            .eq("is_deleted", False)\
-            .execute()
-
-        if not type_check.data:
+        if not await reference_cache.exists("work_lead_type", data.work_lead_type_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Type d'axe de travail non trouve"
@@ -2199,7 +2151,7 @@ async def create_project_work_lead(
             "content": data.content
         }
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .insert(insert_data)\
             .execute()
 
@@ -2210,7 +2162,7 @@ async def create_project_work_lead(
             )
 
         # Recuperer avec jointure
-        work_lead = supabase_admin.table("work_lead")\
+        work_lead = await db.table("work_lead")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .eq("id", response.data[0]["id"])\
             .execute()
@@ -2219,7 +2171,7 @@ async def create_project_work_lead(
         work_lead_type = w.get("work_lead_type")
 
         # Lookup des types pour resoudre le parent
-        types_lookup = _get_work_lead_types_lookup()
+        types_lookup = await _get_work_lead_types_lookup()
         parent_id = work_lead_type.get("parent_id") if work_lead_type else None
         parent_name = None
         if parent_id and types_lookup.get(parent_id):
@@ -2276,7 +2228,7 @@ async def update_project_work_lead(
             "content": data.content
         }
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .update(update_data)\
             .eq("id", work_lead_id)\
             .eq("project_id", project_id)\
@@ -2319,7 +2271,7 @@ async def delete_project_work_lead(
                 detail="Acces refuse a cet axe de travail"
             )
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .update({"is_deleted": True})\
             .eq("id", work_lead_id)\
             .eq("project_id", project_id)\
@@ -2363,7 +2315,7 @@ async def archive_project_work_lead(
                 detail="Acces refuse a cet axe de travail"
             )
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .update({"is_archived": True})\
             .eq("id", work_lead_id)\
             .eq("project_id", project_id)\
@@ -2408,7 +2360,7 @@ async def unarchive_project_work_lead(
                 detail="Acces refuse a cet axe de travail"
             )
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .update({"is_archived": False})\
             .eq("id", work_lead_id)\
             .eq("project_id", project_id)\
@@ -2453,7 +2405,7 @@ async def restore_project_work_lead(
                 detail="Acces refuse a cet axe de travail"
             )
 
-        response = supabase_admin.table("work_lead")\
+        response = await db.table("work_lead")\
             .update({"is_deleted": False})\
             .eq("id", work_lead_id)\
             .eq("project_id", project_id)\
@@ -2543,7 +2495,8 @@ async def get_periods(
                 detail="Acces refuse a ce projet"
             )
 
-        query = supabase_admin.table("period")\
+        # Compteur de sessions calcule en base (vue period_summary)
+        query = db.table("period_summary")\
             .select("*")\
             .eq("project_id", project_id)\
             .order("date_start", desc=True)
@@ -2551,19 +2504,10 @@ async def get_periods(
         if not include_deleted:
             query = query.eq("is_deleted", False)
 
-        response = query.execute()
+        response = await query.execute()
 
         result = []
         for p in response.data:
-            # Count sessions in date range
-            session_count = supabase_admin.table("session")\
-                .select("id", count="exact")\
-                .eq("project_id", project_id)\
-                .eq("is_deleted", False)\
-                .gte("date_start", p["date_start"])\
-                .lte("date_start", p["date_end"])\
-                .execute()
-
             result.append(NavigantPeriod(
                 id=p["id"],
                 name=p["name"],
@@ -2575,7 +2519,7 @@ async def get_periods(
                 is_deleted=p.get("is_deleted", False),
                 created_at=p["created_at"],
                 updated_at=p["updated_at"],
-                session_count=session_count.count or 0
+                session_count=p.get("session_count") or 0
             ))
 
         return result
@@ -2611,7 +2555,7 @@ async def create_period(
             "content": data.content
         }
 
-        response = supabase_admin.table("period")\
+        response = await db.table("period")\
             .insert(period_data)\
             .execute()
 
@@ -2646,7 +2590,7 @@ async def get_period_detail(
                 detail="Acces refuse a ce projet"
             )
 
-        response = supabase_admin.table("period")\
+        response = await db.table("period")\
             .select("*")\
             .eq("id", period_id)\
             .eq("project_id", project_id)\
@@ -2662,7 +2606,7 @@ async def get_period_detail(
         p = response.data
 
         # Get project name
-        project = supabase_admin.table("project")\
+        project = await db.table("project")\
             .select("name")\
             .eq("id", project_id)\
             .single()\
@@ -2672,7 +2616,7 @@ async def get_period_detail(
         # Get period_master info if exists
         period_master_info = None
         if p.get("period_master_id"):
-            pm = supabase_admin.table("period_master")\
+            pm = await db.table("period_master")\
                 .select("id, name, content, profile_id")\
                 .eq("id", p["period_master_id"])\
                 .single()\
@@ -2681,7 +2625,7 @@ async def get_period_detail(
             if pm.data:
                 # Get profile name directly from profile table
                 profile_name = None
-                profile = supabase_admin.table("profile")\
+                profile = await db.table("profile")\
                     .select("first_name, last_name")\
                     .eq("id", pm.data["profile_id"])\
                     .single()\
@@ -2698,7 +2642,7 @@ async def get_period_detail(
                 )
 
         # Count sessions in date range
-        session_count = supabase_admin.table("session")\
+        session_count = await db.table("session")\
             .select("id", count="exact")\
             .eq("project_id", project_id)\
             .eq("is_deleted", False)\
@@ -2747,7 +2691,7 @@ async def update_period(
             )
 
         # Check if period has master
-        period = supabase_admin.table("period")\
+        period = await db.table("period")\
             .select("period_master_id")\
             .eq("id", period_id)\
             .eq("project_id", project_id)\
@@ -2785,7 +2729,7 @@ async def update_period(
         if not update_data:
             return await get_period_detail(project_id, period_id, user)
 
-        supabase_admin.table("period")\
+        await db.table("period")\
             .update(update_data)\
             .eq("id", period_id)\
             .eq("project_id", project_id)\
@@ -2816,7 +2760,7 @@ async def delete_period(
                 detail="Acces refuse a ce projet"
             )
 
-        response = supabase_admin.table("period")\
+        response = await db.table("period")\
             .update({"is_deleted": True})\
             .eq("id", period_id)\
             .eq("project_id", project_id)\
@@ -2853,7 +2797,7 @@ async def restore_period(
                 detail="Acces refuse a ce projet"
             )
 
-        response = supabase_admin.table("period")\
+        response = await db.table("period")\
             .update({"is_deleted": False})\
             .eq("id", period_id)\
             .eq("project_id", project_id)\
@@ -2892,7 +2836,7 @@ async def get_period_sessions(
             )
 
         # Get period dates
-        period = supabase_admin.table("period")\
+        period = await db.table("period")\
             .select("date_start, date_end")\
             .eq("id", period_id)\
             .eq("project_id", project_id)\
@@ -2907,7 +2851,7 @@ async def get_period_sessions(
             )
 
         # Get sessions in date range
-        sessions = supabase_admin.table("session")\
+        sessions = await db.table("session")\
             .select("id, name, date_start, type_seance_id")\
             .eq("project_id", project_id)\
             .eq("is_deleted", False)\
@@ -2920,13 +2864,9 @@ async def get_period_sessions(
         for s in sessions.data:
             type_seance_name = None
             if s.get("type_seance_id"):
-                ts = supabase_admin.table("type_seance")\
-                    .select("name")\
-                    .eq("id", s["type_seance_id"])\
-                    .single()\
-                    .execute()
-                if ts.data:
-                    type_seance_name = ts.data["name"]
+                ts = await reference_cache.get("type_seance", s["type_seance_id"])
+                if ts:
+                    type_seance_name = ts["name"]
 
             result.append(NavigantPeriodSessionItem(
                 session_id=s["id"],
@@ -2951,16 +2891,21 @@ async def get_period_sessions(
 # ============================================
 
 @router.get("/type-seances")
-async def list_type_seances(user: CurrentUser = Depends(require_navigant)):
+async def list_type_seances(
+    request: Request,
+    response: Response,
+    user: CurrentUser = Depends(require_navigant)
+):
     """Liste les types de seances pour les dropdowns"""
     try:
-        response = supabase_admin.table("type_seance")\
-            .select("id, name, is_sailing")\
-            .eq("is_deleted", False)\
-            .order("name")\
-            .execute()
+        if await reference_cache.not_modified(request, response, "type_seance"):
+            return not_modified_response(response)
 
-        return response.data
+        return [
+            {"id": r["id"], "name": r["name"], "is_sailing": r["is_sailing"]}
+            for r in await reference_cache.rows("type_seance")
+            if not r.get("is_deleted", False)
+        ]
 
     except Exception as e:
         raise HTTPException(
@@ -2974,16 +2919,21 @@ async def list_type_seances(user: CurrentUser = Depends(require_navigant)):
 # ============================================
 
 @router.get("/work-lead-types")
-async def list_work_lead_types(user: CurrentUser = Depends(require_navigant)):
+async def list_work_lead_types(
+    request: Request,
+    response: Response,
+    user: CurrentUser = Depends(require_navigant)
+):
     """Liste les types d'axes de travail pour les dropdowns"""
     try:
-        response = supabase_admin.table("work_lead_type")\
-            .select("id, name")\
-            .eq("is_deleted", False)\
-            .order("name")\
-            .execute()
+        if await reference_cache.not_modified(request, response, "work_lead_type"):
+            return not_modified_response(response)
 
-        return response.data
+        return [
+            {"id": r["id"], "name": r["name"]}
+            for r in await reference_cache.rows("work_lead_type")
+            if not r.get("is_deleted", False)
+        ]
 
     except Exception as e:
         raise HTTPException(
@@ -1,6 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from app.models.pivot import ProfileSummary, MyProfilesResponse
-from app.auth import get_current_user, CurrentUser, supabase_admin
+from app.auth import (
+    get_current_user, CurrentUser, remember_active_profile, invalidate_profile_type
+)
+from app.db import db
 
 router = APIRouter(prefix="/api/profiles", tags=["profiles"])
 
@@ -12,7 +15,7 @@ router = APIRouter(prefix="/api/profiles", tags=["profiles"])
 async def get_my_profiles(user: CurrentUser = Depends(get_current_user)):
     """Recuperer tous les profils de l'utilisateur connecte"""
     try:
-        response = supabase_admin.table("profile")\
+        response = await db.table("profile")\
             .select("id, type_profile_id, type_profile(name)")\
             .eq("user_uid", user.id)\
             .execute()
@@ -45,7 +48,7 @@ async def switch_profile(
     """Changer de profil actif"""
     try:
         # Verifier que le profil appartient bien a l'utilisateur
-        profile_response = supabase_admin.table("profile")\
+        profile_response = await db.table("profile")\
             .select("id, type_profile_id, type_profile(name)")\
             .eq("id", profile_id)\
             .eq("user_uid", user.id)\
@@ -61,10 +64,13 @@ async def switch_profile(
         type_profile = profile.pop("type_profile", None)
 
         # Mettre a jour le profil actif dans les metadata Supabase Auth
-        supabase_admin.auth.admin.update_user_by_id(
+        await db.auth.admin.update_user_by_id(
             user.id,
             {"user_metadata": {"active_profile_id": profile_id}}
         )
+        remember_active_profile(user.id, profile_id)
+        # Le type du profil est relu depuis la base au prochain controle de role
+        invalidate_profile_type(user.active_profile_id, profile_id)
 
         return ProfileSummary(
             id=profile["id"],
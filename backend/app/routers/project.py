@@ -1,12 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from typing import List, Optional
 from app.models.project import Project, ProjectCreate, ProjectUpdate, ProjectNavigant
-from app.auth import get_current_user, require_super_coach, CurrentUser, supabase_admin, NAVIGANT_PROFILE_TYPE_ID
+from app.auth import get_current_user, require_super_coach, CurrentUser, NAVIGANT_PROFILE_TYPE_ID
+from app.db import db
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
 
-def _enrich_project(project_data: dict) -> dict:
+async def _enrich_project(project_data: dict) -> dict:
     """Enrichit un projet avec les infos du type de support et du navigant"""
     # Type support name
     if project_data.get("type_support"):
@@ -27,7 +28,7 @@ def _enrich_project(project_data: dict) -> dict:
         }
         if user_uid:
             try:
-                user_response = supabase_admin.auth.admin.get_user_by_id(user_uid)
+                user_response = await db.auth.admin.get_user_by_id(user_uid)
                 if user_response and user_response.user:
                     navigant_data["user_email"] = user_response.user.email
                     metadata = user_response.user.user_metadata or {}
@@ -49,17 +50,17 @@ async def list_projects(
 ):
     """Liste tous les projets (Super Coach uniquement)"""
     try:
-        query = supabase_admin.table("project")\
+        query = db.table("project")\
             .select("*, type_support(name), profile(id, user_uid)")
 
         if not include_deleted:
             query = query.eq("is_deleted", False)
 
-        response = query.order("name").execute()
+        response = await query.order("name").execute()
 
         projects = []
         for p in response.data:
-            projects.append(_enrich_project(p))
+            projects.append(await _enrich_project(p))
 
         return projects
     except Exception as e:
@@ -76,7 +77,7 @@ async def list_navigants(
     """Liste tous les profils de type Navigant pour le dropdown de creation de projet"""
     try:
         # Recuperer tous les profils de type Navigant
-        response = supabase_admin.table("profile")\
+        response = await db.table("profile")\
             .select("id, user_uid")\
             .eq("type_profile_id", NAVIGANT_PROFILE_TYPE_ID)\
             .execute()
@@ -91,7 +92,7 @@ async def list_navigants(
             }
             # Recuperer les infos user
             try:
-                user_response = supabase_admin.auth.admin.get_user_by_id(profile["user_uid"])
+                user_response = await db.auth.admin.get_user_by_id(profile["user_uid"])
                 if user_response and user_response.user:
                     navigant_data["user_email"] = user_response.user.email
                     metadata = user_response.user.user_metadata or {}
@@ -116,7 +117,7 @@ async def get_project(
 ):
     """Recuperer un projet par ID"""
     try:
-        response = supabase_admin.table("project")\
+        response = await db.table("project")\
             .select("*, type_support(name), profile(id, user_uid)")\
             .eq("id", project_id)\
             .execute()
@@ -127,7 +128,7 @@ async def get_project(
                 detail="Projet non trouve"
             )
 
-        return _enrich_project(response.data[0])
+        return await _enrich_project(response.data[0])
     except HTTPException:
         raise
     except Exception as e:
@@ -145,7 +146,7 @@ async def create_project(
     """Creer un nouveau projet (Super Coach uniquement)"""
     try:
         # Verifier que le profile_id est bien un Navigant
-        profile_check = supabase_admin.table("profile")\
+        profile_check = await db.table("profile")\
             .select("type_profile_id")\
             .eq("id", project_data.profile_id)\
             .execute()
@@ -164,7 +165,7 @@ async def create_project(
 
         # Creer le projet
         insert_data = project_data.model_dump()
-        response = supabase_admin.table("project")\
+        response = await db.table("project")\
             .insert(insert_data)\
             .execute()
 
@@ -208,7 +209,7 @@ async def update_project(
                 detail="Aucune donnee a mettre a jour"
             )
 
-        response = supabase_admin.table("project")\
+        response = await db.table("project")\
             .update(update_data)\
             .eq("id", project_id)\
             .eq("is_deleted", False)\
@@ -238,7 +239,7 @@ async def delete_project(
 ):
     """Soft delete un projet (Super Coach uniquement)"""
     try:
-        response = supabase_admin.table("project")\
+        response = await db.table("project")\
             .update({"is_deleted": True})\
             .eq("id", project_id)\
             .eq("is_deleted", False)\
@@ -267,7 +268,7 @@ async def restore_project(
 ):
     """Restaurer un projet supprime (Super Coach uniquement)"""
     try:
-        response = supabase_admin.table("project")\
+        response = await db.table("project")\
             .update({"is_deleted": False})\
             .eq("id", project_id)\
             .eq("is_deleted", True)\
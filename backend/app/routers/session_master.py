@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status
 from typing import List
 from app.models.session_master import (
     SessionMasterModelCreate, SessionMasterModelUpdate, SessionMasterModelResponse
 )
-from app.auth import get_current_user, require_super_coach, CurrentUser, supabase_admin
+from app.auth import get_current_user, require_super_coach, CurrentUser
+from app.db import db
+from app.services.reference_cache import reference_cache, not_modified_response
 
 router = APIRouter(prefix="/api/session-masters", tags=["session-masters"])
 
@@ -28,7 +30,7 @@ async def list_models(
     Ces modeles servent de templates pour creer des seances dans les groupes.
     """
     try:
-        query = supabase_admin.table("session_master")\
+        query = db.table("session_master")\
             .select("*, type_seance(name, is_sailing)")\
             .is_("profile_id", "null")\
             .is_("group_id", "null")
@@ -36,7 +38,7 @@ async def list_models(
         if not include_deleted:
             query = query.eq("is_deleted", False)
 
-        response = query.order("name").execute()
+        response = await query.order("name").execute()
 
         models = []
         for m in response.data:
@@ -58,7 +60,7 @@ async def get_model(
 ):
     """Recuperer un modele de seance par ID"""
     try:
-        response = supabase_admin.table("session_master")\
+        response = await db.table("session_master")\
             .select("*, type_seance(name, is_sailing)")\
             .eq("id", model_id)\
             .is_("profile_id", "null")\
@@ -90,13 +92,7 @@ async def create_model(
     """Creer un nouveau modele de seance (profile_id = NULL, group_id = NULL)"""
     try:
         # Verifier que le type_seance existe et n'est pas supprime
-        type_check = supabase_admin.table("type_seance")\
-            .select("id")\
-            .eq("id", data.type_seance_id)\
-            .eq("is_deleted", False)\
-            .execute()
-
-        if not type_check.data:
+        if not await reference_cache.exists("type_seance", data.type_seance_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Type de seance non trouve"
@@ -114,7 +110,7 @@ async def create_model(
             "location": None
         }
 
-        response = supabase_admin.table("session_master")\
+        response = await db.table("session_master")\
             .insert(insert_data)\
             .execute()
 
@@ -153,19 +149,13 @@ async def update_model(
 
         # Verifier le type si modifie
         if "type_seance_id" in update_data:
-            type_check = supabase_admin.table("type_seance")\
-                .select("id")\
-                .eq("id", update_data["type_seance_id"])\
-                .eq("is_deleted", False)\
-                .execute()
-
-            if not type_check.data:
+            if not await reference_cache.exists("type_seance", update_data["type_seance_id"]):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Type de seance non trouve"
                 )
 
-        response = supabase_admin.table("session_master")\
+        response = await db.table("session_master")\
             .update(update_data)\
             .eq("id", model_id)\
             .is_("profile_id", "null")\
@@ -197,7 +187,7 @@ async def delete_model(
 ):
     """Soft delete un modele de seance"""
     try:
-        response = supabase_admin.table("session_master")\
+        response = await db.table("session_master")\
             .update({"is_deleted": True})\
             .eq("id", model_id)\
             .is_("profile_id", "null")\
@@ -229,7 +219,7 @@ async def restore_model(
 ):
     """Restaurer un modele supprime"""
     try:
-        response = supabase_admin.table("session_master")\
+        response = await db.table("session_master")\
             .update({"is_deleted": False})\
             .eq("id", model_id)\
             .is_("profile_id", "null")\
@@ -256,17 +246,20 @@ async def restore_model(
 
 @router.get("/type-seances")
 async def list_type_seances(
+    request: Request,
+    response: Response,
     user: CurrentUser = Depends(require_super_coach)
 ):
     """Liste les types de seances pour les dropdowns"""
     try:
-        response = supabase_admin.table("type_seance")\
-            .select("id, name, is_sailing")\
-            .eq("is_deleted", False)\
-            .order("name")\
-            .execute()
-
-        return response.data
+        if await reference_cache.not_modified(request, response, "type_seance"):
+            return not_modified_response(response)
+
+        return [
+            {"id": r["id"], "name": r["name"], "is_sailing": r["is_sailing"]}
+            for r in await reference_cache.rows("type_seance")
+            if not r.get("is_deleted", False)
+        ]
 
     except Exception as e:
         raise HTTPException(
@@ -1,22 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status
 from typing import List
 from app.models.type_profile import TypeProfile, TypeProfileCreate, TypeProfileUpdate
-from app.auth import get_current_user, require_admin, CurrentUser, supabase_admin
+from app.auth import get_current_user, require_admin, CurrentUser
+from app.db import db
+from app.services.reference_cache import reference_cache, not_modified_response
 
 router = APIRouter(prefix="/api/type-profiles", tags=["type-profiles"])
 
 
 @router.get("/", response_model=List[TypeProfile])
 async def list_type_profiles(
+    request: Request,
+    response: Response,
     user: CurrentUser = Depends(get_current_user)
 ):
     """Liste tous les types de profil"""
     try:
-        response = supabase_admin.table("type_profile")\
-            .select("*")\
-            .order("name")\
-            .execute()
-        return response.data
+        if await reference_cache.not_modified(request, response, "type_profile"):
+            return not_modified_response(response)
+        return await reference_cache.rows("type_profile")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -31,17 +33,14 @@ async def get_type_profile(
 ):
     """Recuperer un type de profil par ID"""
     try:
-        response = supabase_admin.table("type_profile")\
-            .select("*")\
-            .eq("id", type_profile_id)\
-            .execute()
+        type_profile = await reference_cache.get("type_profile", type_profile_id)
 
-        if not response.data:
+        if not type_profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Type de profil non trouve"
             )
-        return response.data[0]
+        return type_profile
     except HTTPException:
         raise
     except Exception as e:
@@ -58,9 +57,10 @@ async def create_type_profile(
 ):
     """Creer un nouveau type de profil (admin uniquement)"""
     try:
-        response = supabase_admin.table("type_profile")\
+        response = await db.table("type_profile")\
             .insert(type_profile_data.model_dump())\
             .execute()
+        reference_cache.invalidate("type_profile")
 
         if not response.data:
             raise HTTPException(
@@ -93,10 +93,11 @@ async def update_type_profile(
                 detail="Aucune donnee a mettre a jour"
             )
 
-        response = supabase_admin.table("type_profile")\
+        response = await db.table("type_profile")\
             .update(update_data)\
             .eq("id", type_profile_id)\
             .execute()
+        reference_cache.invalidate("type_profile")
 
         if not response.data:
             raise HTTPException(
@@ -120,10 +121,11 @@ async def delete_type_profile(
 ):
     """Supprimer un type de profil (admin uniquement)"""
     try:
-        response = supabase_admin.table("type_profile")\
+        response = await db.table("type_profile")\
             .delete()\
             .eq("id", type_profile_id)\
             .execute()
+        reference_cache.invalidate("type_profile")
 
         if not response.data:
             raise HTTPException(
@@ -1,25 +1,29 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status
 from typing import List
 from app.models.type_seance import TypeSeance, TypeSeanceCreate, TypeSeanceUpdate
-from app.auth import get_current_user, require_admin, CurrentUser, supabase_admin
+from app.auth import get_current_user, require_admin, CurrentUser
+from app.db import db
+from app.services.reference_cache import reference_cache, not_modified_response
 
 router = APIRouter(prefix="/api/type-seances", tags=["type-seances"])
 
 
 @router.get("/", response_model=List[TypeSeance])
 async def list_type_seances(
+    request: Request,
+    response: Response,
     user: CurrentUser = Depends(get_current_user),
     include_deleted: bool = False
 ):
     """Liste tous les types de seance (soft delete: is_deleted)"""
     try:
-        query = supabase_admin.table("type_seance").select("*")
+        if await reference_cache.not_modified(request, response, "type_seance"):
+            return not_modified_response(response)
 
+        rows = await reference_cache.rows("type_seance")
         if not include_deleted:
-            query = query.eq("is_deleted", False)
-
-        response = query.order("name").execute()
-        return response.data
+            rows = [r for r in rows if not r.get("is_deleted", False)]
+        return rows
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -34,17 +38,14 @@ async def get_type_seance(
 ):
     """Recuperer un type de seance par ID"""
     try:
-        response = supabase_admin.table("type_seance")\
-            .select("*")\
-            .eq("id", type_seance_id)\
-            .execute()
+        type_seance = await reference_cache.get("type_seance", type_seance_id)
 
-        if not response.data:
+        if not type_seance:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Type de seance non trouve"
             )
-        return response.data[0]
+        return type_seance
     except HTTPException:
         raise
     except Exception as e:
@@ -61,9 +62,10 @@ async def create_type_seance(
 ):
     """Creer un nouveau type de seance (admin uniquement)"""
     try:
-        response = supabase_admin.table("type_seance")\
+        response = await db.table("type_seance")\
             .insert(type_seance_data.model_dump())\
             .execute()
+        reference_cache.invalidate("type_seance")
 
         if not response.data:
             raise HTTPException(
@@ -101,10 +103,11 @@ async def update_type_seance(
                 detail="Aucune donnee a mettre a jour"
             )
 
-        response = supabase_admin.table("type_seance")\
+        response = await db.table("type_seance")\
             .update(update_data)\
             .eq("id", type_seance_id)\
             .execute()
+        reference_cache.invalidate("type_seance")
 
         if not response.data:
             raise HTTPException(
@@ -134,11 +137,12 @@ async def delete_type_seance(
     """Soft delete un type de seance (admin uniquement)"""
     try:
         # Soft delete: set is_deleted = true
-        response = supabase_admin.table("type_seance")\
+        response = await db.table("type_seance")\
             .update({"is_deleted": True})\
             .eq("id", type_seance_id)\
             .eq("is_deleted", False)\
             .execute()
+        reference_cache.invalidate("type_seance")
 
         if not response.data:
             raise HTTPException(
@@ -162,11 +166,12 @@ async def restore_type_seance(
 ):
     """Restaurer un type de seance supprime (admin uniquement)"""
     try:
-        response = supabase_admin.table("type_seance")\
+        response = await db.table("type_seance")\
             .update({"is_deleted": False})\
             .eq("id", type_seance_id)\
             .eq("is_deleted", True)\
             .execute()
+        reference_cache.invalidate("type_seance")
 
         if not response.data:
             raise HTTPException(
@@ -1,22 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status
 from typing import List
 from app.models.type_support import TypeSupport, TypeSupportCreate, TypeSupportUpdate
-from app.auth import get_current_user, require_admin, CurrentUser, supabase_admin
+from app.auth import get_current_user, require_admin, CurrentUser
+from app.db import db
+from app.services.reference_cache import reference_cache, not_modified_response
 
 router = APIRouter(prefix="/api/type-supports", tags=["type-supports"])
 
 
 @router.get("/", response_model=List[TypeSupport])
 async def list_type_supports(
+    request: Request,
+    response: Response,
     user: CurrentUser = Depends(get_current_user)
 ):
     """Liste tous les types de support"""
     try:
-        response = supabase_admin.table("type_support")\
-            .select("*")\
-            .order("name")\
-            .execute()
-        return response.data
+        if await reference_cache.not_modified(request, response, "type_support"):
+            return not_modified_response(response)
+        return await reference_cache.rows("type_support")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -31,17 +33,14 @@ async def get_type_support(
 ):
     """Recuperer un type de support par ID"""
     try:
-        response = supabase_admin.table("type_support")\
-            .select("*")\
-            .eq("id", type_support_id)\
-            .execute()
+        type_support = await reference_cache.get("type_support", type_support_id)
 
-        if not response.data:
+        if not type_support:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Type de support non trouve"
             )
-        return response.data[0]
+        return type_support
     except HTTPException:
         raise
     except Exception as e:
@@ -58,9 +57,10 @@ async def create_type_support(
 ):
     """Creer un nouveau type de support (admin uniquement)"""
     try:
-        response = supabase_admin.table("type_support")\
+        response = await db.table("type_support")\
             .insert(type_support_data.model_dump())\
             .execute()
+        reference_cache.invalidate("type_support")
 
         if not response.data:
             raise HTTPException(
@@ -98,10 +98,11 @@ async def update_type_support(
                 detail="Aucune donnee a mettre a jour"
             )
 
-        response = supabase_admin.table("type_support")\
+        response = await db.table("type_support")\
             .update(update_data)\
             .eq("id", type_support_id)\
             .execute()
+        reference_cache.invalidate("type_support")
 
         if not response.data:
             raise HTTPException(
@@ -130,10 +131,11 @@ async def delete_type_support(
 ):
     """Supprimer un type de support (admin uniquement)"""
     try:
-        response = supabase_admin.table("type_support")\
+        response = await db.table("type_support")\
             .delete()\
             .eq("id", type_support_id)\
             .execute()
+        reference_cache.invalidate("type_support")
 
         if not response.data:
             raise HTTPException(
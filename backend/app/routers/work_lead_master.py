@@ -3,33 +3,14 @@ from typing import List
 from app.models.work_lead_master import (
     WorkLeadMasterCreate, WorkLeadMasterUpdate, WorkLeadMasterResponse
 )
-from app.auth import get_current_user, require_super_coach, CurrentUser, supabase_admin
+from app.auth import get_current_user, require_super_coach, CurrentUser
+from app.db import db
+from app.services.reference_cache import reference_cache
 
 router = APIRouter(prefix="/api/work-lead-masters", tags=["work-lead-masters"])
 
 
-def _get_current_status(work_lead_master_id: str) -> str:
-    """
-    Calcule le statut courant d'un work_lead_master depuis la table pivot.
-    - Pas d'entree dans session_master_work_lead_master => NEW
-    - Entrees existantes => statut de l'entree la plus recente (updated_at)
-    """
-    try:
-        response = supabase_admin.table("session_master_work_lead_master")\
-            .select("status, updated_at")\
-            .eq("work_lead_master_id", work_lead_master_id)\
-            .order("updated_at", desc=True)\
-            .limit(1)\
-            .execute()
-
-        if response.data and len(response.data) > 0:
-            return response.data[0]["status"]
-        return "NEW"
-    except:
-        return "NEW"
-
-
-def _enrich_work_lead_master(data: dict, types_lookup: dict = None) -> dict:
+async def _enrich_work_lead_master(data: dict, types_lookup: dict = None) -> dict:
     """Enrichit un work_lead_master avec le nom du type, le parent et le statut courant"""
     if data.get("work_lead_type"):
         data["work_lead_type_name"] = data["work_lead_type"].get("name")
@@ -44,21 +25,16 @@ def _enrich_work_lead_master(data: dict, types_lookup: dict = None) -> dict:
     else:
         data["work_lead_type_parent_name"] = None
 
-    # Calculer le statut courant depuis la table pivot
-    data["current_status"] = _get_current_status(data["id"])
+    # Statut courant maintenu par trigger depuis la table pivot
+    data["current_status"] = data.get("current_status") or "NEW"
 
     return data
 
 
-def _get_types_lookup() -> dict:
+async def _get_types_lookup() -> dict:
     """Recupere tous les types d'axes de travail pour le lookup des parents"""
     try:
-        response = supabase_admin.table("work_lead_type")\
-            .select("id, name, parent_id")\
-            .is_("project_id", "null")\
-            .eq("is_deleted", False)\
-            .execute()
-        return {t["id"]: t for t in response.data}
+        return await reference_cache.work_lead_types_lookup()
     except:
         return {}
 
@@ -74,7 +50,7 @@ async def list_models(
     Ces modeles servent de templates pour creer des axes dans les groupes.
     """
     try:
-        query = supabase_admin.table("work_lead_master")\
+        query = db.table("work_lead_master")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .is_("group_id", "null")
 
@@ -84,14 +60,14 @@ async def list_models(
         if not include_archived:
             query = query.eq("is_archived", False)
 
-        response = query.order("name").execute()
+        response = await query.order("name").execute()
 
         # Lookup des types pour resoudre les parents
-        types_lookup = _get_types_lookup()
+        types_lookup = await _get_types_lookup()
 
         models = []
         for m in response.data:
-            models.append(_enrich_work_lead_master(m, types_lookup))
+            models.append(await _enrich_work_lead_master(m, types_lookup))
 
         return models
 
@@ -109,7 +85,7 @@ async def get_model(
 ):
     """Recuperer un modele d'axe de travail par ID"""
     try:
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .select("*, work_lead_type(id, name, parent_id)")\
             .eq("id", model_id)\
             .is_("group_id", "null")\
@@ -122,9 +98,9 @@ async def get_model(
             )
 
         # Lookup des types pour resoudre le parent
-        types_lookup = _get_types_lookup()
+        types_lookup = await _get_types_lookup()
 
-        return _enrich_work_lead_master(response.data[0], types_lookup)
+        return await _enrich_work_lead_master(response.data[0], types_lookup)
 
     except HTTPException:
         raise
@@ -143,12 +119,7 @@ async def create_model(
     """Creer un nouveau modele d'axe de travail (group_id = NULL)"""
     try:
         # Verifier que le work_lead_type existe
-        type_check = supabase_admin.table("work_lead_type")\
-            .select("id")\
-            .eq("id", data.work_lead_type_id)\
-            .execute()
-
-        if not type_check.data:
+        if not await reference_cache.exists("work_lead_type", data.work_lead_type_id, include_deleted=True):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Type d'axe de travail non trouve"
@@ -161,7 +132,7 @@ async def create_model(
             "group_id": None  # Modele template
         }
 
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .insert(insert_data)\
             .execute()
 
@@ -200,18 +171,13 @@ async def update_model(
 
         # Verifier le type si modifie
         if "work_lead_type_id" in update_data:
-            type_check = supabase_admin.table("work_lead_type")\
-                .select("id")\
-                .eq("id", update_data["work_lead_type_id"])\
-                .execute()
-
-            if not type_check.data:
+            if not await reference_cache.exists("work_lead_type", update_data["work_lead_type_id"], include_deleted=True):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Type d'axe de travail non trouve"
                 )
 
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .update(update_data)\
             .eq("id", model_id)\
             .is_("group_id", "null")\
@@ -242,7 +208,7 @@ async def delete_model(
 ):
     """Soft delete un modele d'axe de travail"""
     try:
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .update({"is_deleted": True})\
             .eq("id", model_id)\
             .is_("group_id", "null")\
@@ -273,7 +239,7 @@ async def restore_model(
 ):
     """Restaurer un modele supprime"""
     try:
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .update({"is_deleted": False})\
             .eq("id", model_id)\
             .is_("group_id", "null")\
@@ -304,7 +270,7 @@ async def archive_model(
 ):
     """Archiver un modele"""
     try:
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .update({"is_archived": True})\
             .eq("id", model_id)\
             .is_("group_id", "null")\
@@ -335,7 +301,7 @@ async def unarchive_model(
 ):
     """Desarchiver un modele"""
     try:
-        response = supabase_admin.table("work_lead_master")\
+        response = await db.table("work_lead_master")\
             .update({"is_archived": False})\
             .eq("id", model_id)\
             .is_("group_id", "null")\
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status
 from typing import List, Dict
 from app.models.work_lead_type import WorkLeadType, WorkLeadTypeCreate, WorkLeadTypeUpdate
-from app.auth import get_current_user, require_admin, CurrentUser, supabase_admin
+from app.auth import get_current_user, require_admin, CurrentUser
+from app.db import db
+from app.services.reference_cache import reference_cache, not_modified_response
 
 router = APIRouter(prefix="/api/work-lead-types", tags=["work-lead-types"])
 
@@ -22,21 +24,21 @@ def enrich_with_parent_names(items: List[Dict], all_types: List[Dict] = None) ->
 
 @router.get("/", response_model=List[WorkLeadType])
 async def list_work_lead_types(
+    request: Request,
+    response: Response,
     user: CurrentUser = Depends(get_current_user),
     include_deleted: bool = False
 ):
     """Liste tous les types d'axes de travail globaux (project_id = NULL)"""
     try:
-        query = supabase_admin.table("work_lead_type")\
-            .select("*")\
-            .is_("project_id", "null")
+        if await reference_cache.not_modified(request, response, "work_lead_type"):
+            return not_modified_response(response)
 
+        rows = [r for r in await reference_cache.rows("work_lead_type") if r.get("project_id") is None]
         if not include_deleted:
-            query = query.eq("is_deleted", False)
-
-        response = query.order("name").execute()
+            rows = [r for r in rows if not r.get("is_deleted", False)]
         # Enrichir avec les noms des parents
-        enriched = enrich_with_parent_names(response.data)
+        enriched = enrich_with_parent_names(rows)
         return enriched
     except Exception as e:
         raise HTTPException(
@@ -52,30 +54,19 @@ async def get_work_lead_type(
 ):
     """Recuperer un type d'axe de travail par ID"""
     try:
-        response = supabase_admin.table("work_lead_type")\
-            .select("*")\
-            .eq("id", work_lead_type_id)\
-            .execute()
+        item = await reference_cache.get("work_lead_type", work_lead_type_id)
 
-        if not response.data:
+        if not item:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Type d'axe de travail non trouve"
             )
 
-        item = response.data[0]
         # Enrichir avec le nom du parent si necessaire
+        parent = None
         if item.get("parent_id"):
-            parent_response = supabase_admin.table("work_lead_type")\
-                .select("name")\
-                .eq("id", item["parent_id"])\
-                .execute()
-            if parent_response.data:
-                item["parent_name"] = parent_response.data[0]["name"]
-            else:
-                item["parent_name"] = None
-        else:
-            item["parent_name"] = None
+            parent = await reference_cache.get("work_lead_type", item["parent_id"])
+        item["parent_name"] = parent["name"] if parent else None
 
         return item
     except HTTPException:
@@ -100,7 +91,7 @@ async def create_work_lead_type(
 
         # Verifier que le parent existe et n'a pas lui-meme de parent (un seul niveau)
         if insert_data.get("parent_id"):
-            parent_response = supabase_admin.table("work_lead_type")\
+            parent_response = await db.table("work_lead_type")\
                 .select("id, name, parent_id")\
                 .eq("id", insert_data["parent_id"])\
                 .is_("project_id", "null")\
@@ -117,9 +108,10 @@ async def create_work_lead_type(
                     detail="Le type parent ne peut pas etre une sous-categorie (un seul niveau autorise)"
                 )
 
-        response = supabase_admin.table("work_lead_type")\
+        response = await db.table("work_lead_type")\
             .insert(insert_data)\
             .execute()
+        reference_cache.invalidate("work_lead_type")
 
         if not response.data:
             raise HTTPException(
@@ -177,7 +169,7 @@ async def update_work_lead_type(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Un type ne peut pas etre son propre parent"
                 )
-            parent_response = supabase_admin.table("work_lead_type")\
+            parent_response = await db.table("work_lead_type")\
                 .select("id, name, parent_id")\
                 .eq("id", update_data["parent_id"])\
                 .is_("project_id", "null")\
@@ -197,7 +189,7 @@ async def update_work_lead_type(
 
         # Verifier que ce type n'a pas d'enfants si on essaie de lui donner un parent
         if "parent_id" in update_data and update_data["parent_id"]:
-            children_response = supabase_admin.table("work_lead_type")\
+            children_response = await db.table("work_lead_type")\
                 .select("id")\
                 .eq("parent_id", work_lead_type_id)\
                 .eq("is_deleted", False)\
@@ -208,11 +200,12 @@ async def update_work_lead_type(
                     detail="Ce type a des sous-categories, il ne peut pas devenir une sous-categorie"
                 )
 
-        response = supabase_admin.table("work_lead_type")\
+        response = await db.table("work_lead_type")\
             .update(update_data)\
             .eq("id", work_lead_type_id)\
             .is_("project_id", "null")\
             .execute()
+        reference_cache.invalidate("work_lead_type")
 
         if not response.data:
             raise HTTPException(
@@ -227,7 +220,7 @@ async def update_work_lead_type(
                 item["parent_name"] = parent_name
             else:
                 # Recuperer le nom du parent existant
-                p_resp = supabase_admin.table("work_lead_type")\
+                p_resp = await db.table("work_lead_type")\
                     .select("name")\
                     .eq("id", item["parent_id"])\
                     .execute()
@@ -252,12 +245,13 @@ async def delete_work_lead_type(
 ):
     """Soft delete un type d'axe de travail (admin uniquement)"""
     try:
-        response = supabase_admin.table("work_lead_type")\
+        response = await db.table("work_lead_type")\
             .update({"is_deleted": True})\
             .eq("id", work_lead_type_id)\
             .is_("project_id", "null")\
             .eq("is_deleted", False)\
             .execute()
+        reference_cache.invalidate("work_lead_type")
 
         if not response.data:
             raise HTTPException(
@@ -281,12 +275,13 @@ async def restore_work_lead_type(
 ):
     """Restaurer un type d'axe de travail supprime (admin uniquement)"""
     try:
-        response = supabase_admin.table("work_lead_type")\
+        response = await db.table("work_lead_type")\
             .update({"is_deleted": False})\
             .eq("id", work_lead_type_id)\
             .is_("project_id", "null")\
             .eq("is_deleted", True)\
             .execute()
+        reference_cache.invalidate("work_lead_type")
 
         if not response.data:
             raise HTTPException(
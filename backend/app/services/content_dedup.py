@@ -0,0 +1,98 @@
+"""
+Deduplication des fichiers par contenu (files.content_hash, SHA-256).
+
+Une meme video de debriefing ou un meme PDF est souvent envoye sur plusieurs
+seances ou projets. Chaque upload garde sa propre ligne files (entite
+d'origine, nom, auteur, suppression independante), mais un contenu deja
+present et traite (processing_status 'ready') n'est ni re-stocke ni
+re-traite: la nouvelle ligne reprend l'objet Storage et les derives du
+fichier existant.
+
+L'empreinte est calculee par morceaux, sans charger le fichier en memoire:
+- upload par l'API (POST /upload): le fichier spoole est relu une fois avant
+  l'envoi a Storage (lecture disque locale en plus de l'envoi, mais rien
+  n'est envoye pour un doublon) ;
+- upload direct, images et videos: par le worker pendant le telechargement
+  qu'il fait de toute facon, avant tout traitement (l'objet envoye en double
+  est supprime) ;
+- upload direct, autres fichiers: par le worker (job content_hash), qui
+  relit l'objet Storage en flux; le fichier est utilisable entre-temps.
+
+La reprise d'un fichier (RPC reuse_file_content) et la suppression d'une
+ligne (RPC delete_file_row, qui indique si l'objet Storage n'est plus
+utilise) sont decidees en base sous un verrou par empreinte: une suppression
+simultanee ne peut ni retirer un objet qu'un doublon vient de reprendre, ni
+laisser un objet orphelin.
+"""
+import logging
+from typing import Optional
+
+from supabase import Client
+
+from app.config import settings
+from app.db import db
+from app.models.file import ProcessingStatus
+
+logger = logging.getLogger(__name__)
+
+
+async def find_duplicate(content_hash: str) -> Optional[dict]:
+    """Plus ancien fichier pret de meme contenu (None si aucun ou dedup desactivee)"""
+    if not settings.file_dedup:
+        return None
+    response = await db.table("files")\
+        .select("*")\
+        .eq("content_hash", content_hash)\
+        .eq("processing_status", ProcessingStatus.ready.value)\
+        .order("created_at")\
+        .limit(1)\
+        .execute()
+    return response.data[0] if response.data else None
+
+
+async def reuse_content(file_id: str, content_hash: str) -> Optional[dict]:
+    """
+    Fait du fichier le doublon du plus ancien fichier pret de meme contenu
+    (objet Storage et derives repris). Retourne la ligne a jour, ou None si
+    aucun fichier pret n'a ce contenu (ou si la ligne n'existe plus).
+    """
+    response = await db.rpc("reuse_file_content", {
+        "p_file_id": file_id,
+        "p_content_hash": content_hash
+    }).execute()
+    return response.data[0] if response.data else None
+
+
+async def delete_file_row(file_id: str) -> Optional[dict]:
+    """
+    Supprime la ligne files et ses references. Retourne la ligne supprimee si
+    son objet Storage (et ses derives) n'est plus utilise par aucun autre
+    fichier, l'appelant le supprime alors de Storage; None sinon.
+    """
+    response = await db.rpc("delete_file_row", {"p_file_id": file_id}).execute()
+    return response.data[0] if response.data else None
+
+
+# ============================================
+# WORKER (client synchrone)
+# ============================================
+
+def reuse_duplicate(client: Client, bucket: str, file_id: str, file_path: str, content_hash: str) -> bool:
+    """
+    Job media d'un upload direct, apres lecture du contenu (empreinte calculee):
+    si un fichier pret a le meme contenu, reprend son objet et ses derives,
+    supprime l'objet envoye en double et retourne True (aucun traitement).
+    """
+    if not settings.file_dedup:
+        return False
+    response = client.rpc("reuse_file_content", {
+        "p_file_id": file_id,
+        "p_content_hash": content_hash
+    }).execute()
+    if not response.data:
+        return False
+    reused = response.data[0]
+    if reused["file_path"] != file_path:
+        client.storage.from_(bucket).remove([file_path])
+    logger.info(f"Fichier {file_id}: doublon, objet Storage {reused['file_path']} et derives reutilises")
+    return True
@@ -0,0 +1,162 @@
+"""
+Changements de statut de traitement des fichiers, relayes aux clients
+(GET /api/files/status/stream) au lieu d'un rechargement periodique des
+listes de fichiers.
+
+Le worker media ecrit files.processing_status (process_image_thumbnail,
+process_video, fail_media_job). Chaque processus de l'API tient un hub qui
+recoit ces changements:
+- par Supabase Realtime (UPDATE sur files, migration 016), sans lecture de
+  la table; une lecture de resynchronisation est faite toutes les
+  settings.file_events_resync_interval secondes (evenements manques pendant
+  une reconnexion) ;
+- sinon (Realtime desactive ou indisponible), par une seule lecture legere
+  des statuts de tous les fichiers suivis toutes les
+  settings.file_events_poll_interval secondes, quel que soit le nombre de
+  clients connectes.
+
+Aucune lecture n'est faite tant qu'aucun client ne suit de fichier.
+"""
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Dict, Iterable, List, Optional, Set
+
+from realtime import RealtimeSubscribeStates
+
+from app.config import settings
+from app.db import db
+from app.models.file import ProcessingStatus
+from app.services.query_memo import detached
+
+logger = logging.getLogger(__name__)
+
+STATUS_COLUMNS = ("id", "processing_status", "processing_error")
+# Statuts apres lesquels un fichier n'evolue plus (fin du suivi)
+TERMINAL_STATUSES = {ProcessingStatus.ready.value, ProcessingStatus.failed.value}
+
+
+async def fetch_file_statuses(file_ids: List[str]) -> List[dict]:
+    """Statut courant des fichiers (lecture directe, jamais memoisee)"""
+    with detached():
+        response = await db.table("files")\
+            .select(",".join(STATUS_COLUMNS))\
+            .in_("id", file_ids)\
+            .execute()
+    return response.data or []
+
+
+class FileStatusHub:
+    """Abonnements des flux SSE aux fichiers, alimentes par Realtime ou lecture periodique"""
+
+    def __init__(self):
+        self._watchers: Dict[str, Set[asyncio.Queue]] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._channel = None
+        self.realtime_connected = False
+        self.polls = 0
+
+    @property
+    def watched_ids(self) -> List[str]:
+        return list(self._watchers)
+
+    def watch(self, file_ids: Iterable[str]) -> asyncio.Queue:
+        """File d'attente recevant les changements de statut des fichiers"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for file_id in file_ids:
+            self._watchers.setdefault(file_id, set()).add(queue)
+        return queue
+
+    def unwatch(self, queue: asyncio.Queue, file_ids: Iterable[str]) -> None:
+        for file_id in file_ids:
+            queues = self._watchers.get(file_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._watchers[file_id]
+
+    def publish(self, row: dict) -> None:
+        """Transmet une ligne (id, processing_status, processing_error) aux abonnes"""
+        queues = self._watchers.get(str(row.get("id")))
+        if not queues:
+            return
+        change = {column: row.get(column) for column in STATUS_COLUMNS}
+        for queue in queues:
+            queue.put_nowait(change)
+
+    async def poll(self) -> None:
+        """Relit le statut de tous les fichiers suivis (une requete)"""
+        file_ids = self.watched_ids
+        if not file_ids:
+            return
+        self.polls += 1
+        for row in await fetch_file_statuses(file_ids):
+            self.publish(row)
+
+    # Realtime
+
+    def _on_change(self, payload: dict) -> None:
+        record = payload.get("data", {}).get("record")
+        if record:
+            self.publish(record)
+
+    def _on_subscribe_state(self, state: RealtimeSubscribeStates, error: Optional[Exception]) -> None:
+        connected = state == RealtimeSubscribeStates.SUBSCRIBED
+        if connected != self.realtime_connected:
+            if connected:
+                logger.info("Statuts des fichiers: abonnement Realtime actif")
+            else:
+                logger.warning(f"Statuts des fichiers: Realtime {state.value} ({error}), lecture periodique")
+        self.realtime_connected = connected
+
+    async def _subscribe_realtime(self) -> None:
+        try:
+            self._channel = db.channel("files-processing-status")
+            self._channel.on_postgres_changes(
+                "UPDATE",
+                callback=self._on_change,
+                table="files",
+                schema="public"
+            )
+            await self._channel.subscribe(self._on_subscribe_state)
+        except Exception as e:
+            logger.warning(f"Abonnement Realtime aux fichiers impossible ({e}), lecture periodique")
+
+    async def _run(self) -> None:
+        last_poll = 0.0
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(settings.file_events_poll_interval)
+            interval = settings.file_events_resync_interval if self.realtime_connected \
+                else settings.file_events_poll_interval
+            if loop.time() - last_poll < interval - 0.01:
+                continue
+            last_poll = loop.time()
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.warning(f"Lecture des statuts de fichiers echouee: {e}")
+
+    async def start(self) -> None:
+        """Demarrage de l'application: Realtime et lecture periodique en arriere-plan"""
+        if self._tasks:
+            return
+        self._tasks.append(asyncio.create_task(self._run()))
+        if settings.file_events_realtime:
+            # Connexion en parallele: les flux sont servis par lecture en attendant
+            self._tasks.append(asyncio.create_task(self._subscribe_realtime()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+        if self._channel is not None:
+            with suppress(Exception):
+                await db.remove_channel(self._channel)
+            self._channel = None
+        self.realtime_connected = False
+
+
+file_status_hub = FileStatusHub()
@@ -0,0 +1,82 @@
+"""
+Playlists HLS des videos, servies par l'API (GET /api/files/hls/{path}).
+
+Le bucket est prive: les playlists ecrites par le worker (FFmpeg, chemins
+relatifs) ne sont pas lisibles telles quelles par le lecteur. Elles sont
+relues depuis Storage puis reecrites a chaque demande: chaque segment recoit
+une URL signee (Storage ou API, comme les autres medias), chaque playlist de
+variante une URL signee de ce meme endpoint.
+
+L'index WebVTT de la planche d'apercus (GET /api/files/vtt/{path}) est servi
+de la meme facon: chaque cue reference la planche par son nom relatif
+("{id}_sprite.jpg#xywh=x,y,w,h"), remplace par son URL signee.
+
+Les playlists ne changent plus une fois la video traitee: leur texte est mis
+en cache (PLAYLIST_CACHE_TTL secondes), la reecriture ne coute alors que la
+signature des segments (elle-meme en cache, voir signed_urls).
+"""
+import posixpath
+from typing import Dict, List
+
+from app.db import db
+from app.services.cache import TTLCache
+
+PLAYLIST_CACHE_TTL = 600
+PLAYLIST_CONTENT_TYPE = "application/vnd.apple.mpegurl"
+VTT_CONTENT_TYPE = "text/vtt"
+VTT_FRAGMENT = "#xywh="
+
+_playlist_cache = TTLCache(maxsize=256, ttl=PLAYLIST_CACHE_TTL)
+
+
+async def load_playlist(bucket: str, path: str) -> str:
+    """Texte d'une playlist stockee (cache en memoire)"""
+    text = _playlist_cache.get((bucket, path))
+    if text is None:
+        text = (await db.storage.from_(bucket).download(path)).decode()
+        _playlist_cache.set((bucket, path), text)
+    return text
+
+
+def _resolve(playlist_path: str, uri: str) -> str:
+    return posixpath.normpath(posixpath.join(posixpath.dirname(playlist_path), uri))
+
+
+def playlist_uris(text: str, playlist_path: str) -> List[str]:
+    """Chemins Storage references par une playlist (variantes ou segments)"""
+    return [
+        _resolve(playlist_path, line.strip()) for line in text.splitlines()
+        if line.strip() and not line.startswith("#")
+    ]
+
+
+def rewrite_playlist(text: str, playlist_path: str, urls: Dict[str, str]) -> str:
+    """Remplace chaque chemin relatif par son URL signee (urls: {chemin Storage: URL})"""
+    lines = []
+    for line in text.splitlines():
+        if line.strip() and not line.startswith("#"):
+            line = urls[_resolve(playlist_path, line.strip())]
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def _vtt_image(line: str) -> bool:
+    return VTT_FRAGMENT in line and "-->" not in line
+
+
+def vtt_uris(text: str, vtt_path: str) -> List[str]:
+    """Chemins Storage des images referencees par un index WebVTT (planche)"""
+    return list(dict.fromkeys(
+        _resolve(vtt_path, line.strip().split("#", 1)[0]) for line in text.splitlines() if _vtt_image(line)
+    ))
+
+
+def rewrite_vtt(text: str, vtt_path: str, urls: Dict[str, str]) -> str:
+    """Remplace le nom relatif de la planche de chaque cue par son URL signee (fragment xywh garde)"""
+    lines = []
+    for line in text.splitlines():
+        if _vtt_image(line):
+            uri, fragment = line.strip().split("#", 1)
+            line = f"{urls[_resolve(vtt_path, uri)]}#{fragment}"
+        lines.append(line)
+    return "\n".join(lines) + "\n"
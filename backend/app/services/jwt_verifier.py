@@ -0,0 +1,99 @@
+"""
+Verification locale des access tokens Supabase (signature + expiration).
+Supporte les cles asymetriques publiees via JWKS (RS256/ES256) et le secret
+partage HS256 des projets self-hosted / legacy.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+import httpx
+from jose import jwt, JWTError
+
+logger = logging.getLogger(__name__)
+
+# Algorithmes acceptes (jamais "none")
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+SYMMETRIC_ALGORITHMS = ("HS256",)
+TOKEN_AUDIENCE = "authenticated"
+# Delai minimum entre deux rechargements JWKS declenches par un kid inconnu
+MIN_FORCED_REFRESH_INTERVAL = 30
+
+
+class JWTVerifier:
+    """Valide les tokens localement avec des cles JWKS mises en cache"""
+
+    def __init__(
+        self,
+        jwks_url: str,
+        jwt_secret: Optional[str] = None,
+        refresh_interval: int = 600,
+        audience: str = TOKEN_AUDIENCE
+    ):
+        self.jwks_url = jwks_url
+        self.jwt_secret = jwt_secret or None
+        self.refresh_interval = refresh_interval
+        self.audience = audience
+        self._keys: Dict[str, dict] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def refresh_keys(self) -> None:
+        """Recharge les cles publiques depuis l'endpoint JWKS"""
+        async with self._lock:
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.get(self.jwks_url)
+                response.raise_for_status()
+            keys = {k["kid"]: k for k in response.json().get("keys", []) if k.get("kid")}
+            # Conserver les anciennes cles si le JWKS est vide (rotation en cours)
+            if keys:
+                self._keys = keys
+            self._fetched_at = time.monotonic()
+
+    async def run_key_rotation(self) -> None:
+        """Boucle de fond: recharge periodiquement les cles (lancee au demarrage)"""
+        while True:
+            try:
+                await self.refresh_keys()
+            except Exception as e:
+                logger.warning(f"Rechargement JWKS echoue: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def _get_key(self, kid: Optional[str]) -> Optional[dict]:
+        key = self._keys.get(kid)
+        if key:
+            return key
+        # Kid inconnu: rotation possible, recharger (avec limite de frequence)
+        if time.monotonic() - self._fetched_at >= MIN_FORCED_REFRESH_INTERVAL or not self._keys:
+            try:
+                await self.refresh_keys()
+            except Exception as e:
+                logger.warning(f"Rechargement JWKS echoue: {e}")
+        return self._keys.get(kid)
+
+    async def verify(self, token: str) -> dict:
+        """
+        Verifie la signature, l'expiration et l'audience du token.
+        Retourne les claims ou leve JWTError.
+        """
+        header = jwt.get_unverified_header(token)
+        algorithm = header.get("alg")
+
+        if algorithm in SYMMETRIC_ALGORITHMS:
+            if not self.jwt_secret:
+                raise JWTError("Token HS256 recu mais SUPABASE_JWT_SECRET non configure")
+            key = self.jwt_secret
+        elif algorithm in ASYMMETRIC_ALGORITHMS:
+            key = await self._get_key(header.get("kid"))
+            if not key:
+                raise JWTError("Cle de signature inconnue")
+        else:
+            raise JWTError(f"Algorithme non supporte: {algorithm}")
+
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=self.audience
+        )
@@ -0,0 +1,187 @@
+"""
+File de traitements media persistante (table media_jobs).
+
+L'API ne fait qu'enfiler les jobs (enqueue_media_job). Le worker
+(python -m app.worker) les reserve par RPC (claim_media_jobs, FOR UPDATE
+SKIP LOCKED: plusieurs workers peuvent tourner en parallele sans prendre le
+meme job), les execute dans un pool de processus et enregistre le resultat.
+
+Les jobs sont reserves par type (job_type): le worker execute videos,
+images et empreintes de contenu (content_hash, fichiers sans traitement
+media envoyes directement a Storage) dans des pools de processus distincts.
+La duree de chaque job et de ses etapes est enregistree
+(media_jobs.duration_ms / timings); media_job_stats donne la profondeur des
+files et les durees recentes par type.
+
+Un job en echec est retente apres un delai croissant (backoff exponentiel
+borne par settings.media_job_retry_max) jusqu'a max_attempts, puis le
+fichier passe en 'failed'. Un job dont la reservation n'est plus prolongee
+(worker arrete ou plante) est remis en file par requeue_stale_media_jobs.
+
+Le worker purge aussi les uploads directs abandonnes (lignes files restees
+en 'pending_upload', et leur objet Storage): purge_pending_uploads.
+"""
+import logging
+import time
+from typing import Dict, List, Optional
+
+from supabase import Client
+
+from app.config import BUCKET_NAME, settings
+from app.db import db
+from app.models.file import FileType
+
+logger = logging.getLogger(__name__)
+
+PENDING_UPLOAD_PURGE_LIMIT = 1000  # Lignes par passage (une suppression Storage)
+
+JOB_IMAGE_THUMBNAIL = "image_thumbnail"
+JOB_VIDEO = "video"
+JOB_CONTENT_HASH = "content_hash"
+
+
+async def enqueue_media_job(file_id: str, file_type: FileType, file_size: Optional[int]) -> bool:
+    """
+    Enfile le traitement d'un fichier (thumbnail image, compression video).
+    Retourne False si le type de fichier ne necessite aucun traitement.
+    """
+    if file_type == FileType.image:
+        job = {"job_type": JOB_IMAGE_THUMBNAIL, "payload": {}}
+    elif file_type == FileType.video:
+        job = {"job_type": JOB_VIDEO, "payload": {"original_size": file_size}}
+    else:
+        return False
+    await db.table("media_jobs").insert({"file_id": file_id, **job}).execute()
+    return True
+
+
+async def enqueue_content_hash_job(file_id: str) -> None:
+    """
+    Upload direct d'un fichier sans traitement media: empreinte du contenu
+    (deduplication) calculee par le worker, hors de la requete.
+    """
+    await db.table("media_jobs").insert({"file_id": file_id, "job_type": JOB_CONTENT_HASH}).execute()
+
+
+async def get_job_stats() -> List[dict]:
+    """Profondeur des files et durees des jobs termines (derniere heure), par type"""
+    response = await db.rpc("media_job_stats").execute()
+    return response.data or []
+
+
+# ============================================
+# WORKER (client synchrone, hors boucle asyncio)
+# ============================================
+
+def retry_delay(attempts: int) -> int:
+    """Delai (secondes) avant le prochain essai: base, 2x base, 4x base... borne"""
+    return min(settings.media_job_retry_base * 2 ** max(attempts - 1, 0), settings.media_job_retry_max)
+
+
+def claim_jobs(client: Client, worker_id: str, limit: int, job_type: Optional[str] = None) -> List[dict]:
+    """Reserve jusqu'a `limit` jobs prets (d'un type donne, ou de tout type)"""
+    if limit <= 0:
+        return []
+    response = client.rpc("claim_media_jobs", {
+        "p_worker": worker_id,
+        "p_limit": limit,
+        "p_job_type": job_type
+    }).execute()
+    return response.data or []
+
+
+def heartbeat_jobs(client: Client, worker_id: str, job_ids: List[str]) -> None:
+    """Prolonge la reservation des jobs en cours"""
+    if job_ids:
+        client.rpc("heartbeat_media_jobs", {"p_worker": worker_id, "p_job_ids": job_ids}).execute()
+
+
+def complete_job(client: Client, job: dict, timings: Dict[str, int]) -> None:
+    client.rpc("complete_media_job", {
+        "p_job_id": job["id"],
+        "p_duration_ms": timings.get("total_ms"),
+        "p_timings": timings
+    }).execute()
+
+
+def fail_job(client: Client, job: dict, error: str) -> str:
+    """Enregistre l'echec, retourne le nouveau statut ('queued' ou 'failed')"""
+    response = client.rpc("fail_media_job", {
+        "p_job_id": job["id"],
+        "p_error": error,
+        "p_retry_delay": retry_delay(job["attempts"])
+    }).execute()
+    return response.data
+
+
+def requeue_stale_jobs(client: Client) -> int:
+    """Remet en file les jobs dont la reservation a expire"""
+    response = client.rpc("requeue_stale_media_jobs", {
+        "p_timeout_seconds": settings.media_job_lock_timeout
+    }).execute()
+    return response.data or 0
+
+
+def purge_pending_uploads(client: Client) -> int:
+    """
+    Supprime les uploads directs jamais finalises (lignes 'pending_upload'
+    plus anciennes que settings.pending_upload_max_age) puis leurs objets
+    Storage. Retourne le nombre de lignes supprimees.
+    """
+    response = client.rpc("purge_pending_uploads", {
+        "p_max_age_seconds": settings.pending_upload_max_age,
+        "p_limit": PENDING_UPLOAD_PURGE_LIMIT
+    }).execute()
+    paths = [row["file_path"] for row in response.data or []]
+    if paths:
+        try:
+            client.storage.from_(BUCKET_NAME).remove(paths)
+        except Exception as e:
+            logger.warning(f"Uploads abandonnes: objets Storage non supprimes ({e})")
+    return len(paths)
+
+
+def job_stats(client: Client) -> List[dict]:
+    return client.rpc("media_job_stats").execute().data or []
+
+
+def run_job(job: dict, ffmpeg_threads: int = 0) -> Dict[str, int]:
+    """
+    Execute un job (dans un processus du pool du worker).
+    ffmpeg_threads: threads par encodage video, sauf si le job precise
+    payload.ffmpeg_threads.
+    Retourne les durees mesurees (ms): etapes et total_ms.
+    Leve une exception en cas d'echec.
+    """
+    # Imports locaux: charges une fois par processus du pool
+    from app.db import supabase_admin
+    from app.services.media_processor import process_content_hash, process_image_thumbnail, process_video
+
+    start = time.perf_counter()
+    file_response = supabase_admin.table("files")\
+        .select("file_path")\
+        .eq("id", job["file_id"])\
+        .execute()
+    if not file_response.data:
+        # Fichier supprime entre-temps: rien a traiter
+        logger.info(f"Job {job['id']}: fichier {job['file_id']} introuvable, ignore")
+        return {"total_ms": int((time.perf_counter() - start) * 1000)}
+    file_path = file_response.data[0]["file_path"]
+
+    if job["job_type"] == JOB_IMAGE_THUMBNAIL:
+        timings = process_image_thumbnail(supabase_admin, job["file_id"], file_path, BUCKET_NAME)
+    elif job["job_type"] == JOB_VIDEO:
+        timings = process_video(
+            supabase_admin,
+            job["file_id"],
+            file_path,
+            BUCKET_NAME,
+            job["payload"].get("original_size"),
+            ffmpeg_threads=job["payload"].get("ffmpeg_threads") or ffmpeg_threads
+        )
+    elif job["job_type"] == JOB_CONTENT_HASH:
+        timings = process_content_hash(supabase_admin, job["file_id"], file_path, BUCKET_NAME)
+    else:
+        raise ValueError(f"Type de job inconnu: {job['job_type']}")
+    timings["total_ms"] = int((time.perf_counter() - start) * 1000)
+    return timings
@@ -1,22 +1,104 @@
 """
-Media processing service for image thumbnails and video compression.
-Uses Pillow for images and FFmpeg for videos.
+Media processing service for image thumbnails, image derivatives and video
+compression. Uses Pillow for images and FFmpeg for videos.
+
+Videos are probed first (ffprobe) and only re-encoded when needed: sources
+that browsers already play within the target size and bitrate are
+stream-copied into a faststart MP4, and tiny clips are kept as uploaded.
+The poster thumbnail and a scrubbing sprite sheet (with its WebVTT index)
+come from a single decode of the processed video. Long videos can also be
+packaged as HLS (rendition ladder, segmented) for adaptive playback.
 """
+import hashlib
 import os
 import logging
+import math
 import tempfile
-from typing import Optional, Tuple
-from PIL import Image
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from PIL import Image, ImageOps
 import ffmpeg
+from app.config import settings
+from app.services.content_dedup import reuse_duplicate
+from app.services.signed_urls import forget as forget_signed_urls
+from app.services.storage_upload import download_to_path, hash_object, upload_path, upload_paths
 
 logger = logging.getLogger(__name__)
 
 # Configuration
 THUMBNAIL_SIZE = (400, 400)
-VIDEO_MAX_DIMENSION = 1080  # Max width or height
+VIDEO_MAX_DIMENSION = 1080  # Max shorter side (1080p, landscape or portrait)
 VIDEO_CRF = 23  # Quality setting (lower = better quality, larger file)
 VIDEO_PRESET = "medium"  # Encoding speed preset
 VIDEO_THUMBNAIL_OFFSET = 1  # Seconds into video for thumbnail
+SPRITE_TILE_SIZE = (160, 160)  # Max tile size, aspect ratio kept
+SPRITE_COLUMNS = 10
+SPRITE_QUALITY = 5  # mjpeg q:v (2 = best, 31 = worst)
+# Sources kept without re-encoding: H.264 8-bit 4:2:0, AAC (or no audio)
+VIDEO_COPY_CODECS = {"h264"}
+VIDEO_COPY_PIX_FMTS = {"yuv420p", "yuvj420p"}
+AUDIO_COPY_CODECS = {"aac"}
+# MP4 brands served as is (QuickTime .mov and 3GP are remuxed to MP4)
+MP4_BRANDS = {"isom", "iso2", "iso4", "iso5", "iso6", "mp41", "mp42", "avc1", "M4V"}
+# Video processing actions (plan_video)
+VIDEO_SKIP = "skip"
+VIDEO_REMUX = "remux"
+VIDEO_ENCODE = "encode"
+VIDEO_DOWNSCALE = "downscale"
+# HLS: renditions (shorter side, px), max video bitrate and audio bitrate of each
+HLS_RENDITIONS = tuple(int(h) for h in settings.video_hls_renditions.split(",") if h.strip())
+HLS_BITRATES = {
+    240: ("400k", "64k"),
+    360: ("800k", "96k"),
+    480: ("1400k", "96k"),
+    720: ("2800k", "128k"),
+    1080: ("5000k", "128k"),
+}
+HLS_PRESET = "veryfast"  # One encode per rendition, on top of the MP4: bitrates are capped anyway
+HLS_MASTER_PLAYLIST = "master.m3u8"
+HLS_CONTENT_TYPES = {".m3u8": "application/vnd.apple.mpegurl", ".ts": "video/mp2t"}
+# Derivatives: longest side (px) of each step, formats (last one = fallback)
+DERIVATIVE_SIZES = tuple(int(size) for size in settings.image_derivative_sizes.split(",") if size.strip())
+DERIVATIVE_FORMATS = tuple(fmt.strip() for fmt in settings.image_derivative_formats.split(",") if fmt.strip())
+DERIVATIVE_ENCODERS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "avif": ("AVIF", "image/avif", {"quality": 60, "speed": 6}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def _vtt_timestamp(seconds: float) -> str:
+    """WebVTT timestamp (HH:MM:SS.mmm)."""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    return f"{hours:02d}:{minutes:02d}:{millis // 1000:02d}.{millis % 1000:03d}"
+
+
+def _stream_rotation(stream: dict) -> int:
+    """Display rotation in degrees (0, 90, 180, 270): rotate tag or display matrix."""
+    rotation = (stream.get("tags") or {}).get("rotate")
+    if rotation is None:
+        for side_data in stream.get("side_data_list") or []:
+            if "rotation" in side_data:
+                rotation = side_data["rotation"]
+                break
+    try:
+        return int(round(float(rotation or 0))) % 360
+    except (TypeError, ValueError):
+        return 0
+
+
+@contextmanager
+def _timed(timings: Dict[str, int], step: str) -> Iterator[None]:
+    """Adds the duration of the block to timings["<step>_ms"]."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        key = f"{step}_ms"
+        timings[key] = timings.get(key, 0) + int((time.perf_counter() - start) * 1000)
 
 
 class MediaProcessor:
@@ -56,31 +138,88 @@ class MediaProcessor:
             logger.error(f"Image thumbnail generation failed: {e}")
             return False
 
+    @staticmethod
+    def generate_image_derivatives(
+        input_path: str,
+        output_dir: str,
+        sizes: Sequence[int] = DERIVATIVE_SIZES,
+        formats: Sequence[str] = DERIVATIVE_FORMATS
+    ) -> List[dict]:
+        """
+        Generate a ladder of resized copies of an image, one per size and format.
+        Each size bounds the longest side; sizes larger than the original
+        collapse into a single copy at the original size (never upscaled).
+        EXIF orientation is applied. Transparency is kept for WebP/AVIF and
+        flattened on white for JPEG.
+        Returns [{"width", "height", "format", "content_type", "local_path", "size"}].
+        """
+        derivatives = []
+        with Image.open(input_path) as img:
+            # Decodage JPEG reduit (DCT scaling) a la plus grande taille utile
+            img.draft("RGB", (max(sizes), max(sizes)))
+            img = ImageOps.exif_transpose(img)
+            has_alpha = img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+            img = img.convert('RGBA' if has_alpha else 'RGB')
+            flat = None
+            if has_alpha and "jpeg" in formats:
+                flat = Image.new('RGB', img.size, (255, 255, 255))
+                flat.paste(img, mask=img.split()[-1])
+
+            longest = max(img.size)
+            steps = sorted({min(size, longest) for size in sizes}, reverse=True)
+            source, flat_source = img, flat
+            for step in steps:
+                # Reduire depuis l'etape precedente (plus rapide, qualite equivalente)
+                resized = source.copy()
+                resized.thumbnail((step, step), Image.Resampling.LANCZOS)
+                flat_resized = None
+                if flat_source is not None:
+                    flat_resized = flat_source.copy()
+                    flat_resized.thumbnail((step, step), Image.Resampling.LANCZOS)
+                for fmt in formats:
+                    pil_format, content_type, options = DERIVATIVE_ENCODERS[fmt]
+                    frame = flat_resized if fmt == "jpeg" and flat_resized is not None else resized
+                    output_path = os.path.join(output_dir, f"{resized.width}.{fmt}")
+                    frame.save(output_path, pil_format, **options)
+                    derivatives.append({
+                        "width": resized.width,
+                        "height": resized.height,
+                        "format": fmt,
+                        "content_type": content_type,
+                        "local_path": output_path,
+                        "size": os.path.getsize(output_path)
+                    })
+                source, flat_source = resized, flat_resized
+        return derivatives
+
     @staticmethod
     def compress_video(
         input_path: str,
         output_path: str,
         max_dimension: int = 1080,
         crf: int = VIDEO_CRF,
-        preset: str = VIDEO_PRESET
+        preset: str = VIDEO_PRESET,
+        threads: int = 0
     ) -> Tuple[bool, Optional[str]]:
         """
         Compress a video file to H.264 with max dimension 1080p.
         Preserves aspect ratio and handles rotation metadata from mobile devices.
+        threads: FFmpeg encoder threads (0 = FFmpeg default, one per core).
         Returns (success: bool, error_message: Optional[str])
         """
         try:
             # Build FFmpeg command using scale filter that:
             # - Preserves aspect ratio
-            # - Limits the larger dimension to max_dimension
+            # - Limits the shorter dimension to max_dimension (1080p: 1920x1080
+            #   landscape or 1080x1920 portrait)
             # - Ensures even dimensions (required by H.264)
             # - Works with auto-rotation (FFmpeg applies rotation before scale)
 
             # Scale expression: scale down to fit within max_dimension, preserve aspect ratio
             # -2 means "calculate to maintain aspect ratio, ensure even"
             scale_expr = (
-                f"scale='if(gte(iw,ih),min({max_dimension},iw),-2)'"
-                f":'if(gte(iw,ih),-2,min({max_dimension},ih))'"
+                f"scale='if(gte(iw,ih),-2,min({max_dimension},iw))'"
+                f":'if(gte(iw,ih),min({max_dimension},ih),-2)'"
             )
 
             stream = ffmpeg.input(input_path)
@@ -89,8 +228,8 @@ class MediaProcessor:
             stream = ffmpeg.filter(
                 stream,
                 'scale',
-                f'if(gte(iw,ih),min({max_dimension},iw),-2)',
-                f'if(gte(iw,ih),-2,min({max_dimension},ih))'
+                f'if(gte(iw,ih),-2,min({max_dimension},iw))',
+                f'if(gte(iw,ih),min({max_dimension},ih),-2)'
             )
 
             stream = ffmpeg.output(
@@ -99,9 +238,11 @@ class MediaProcessor:
                 vcodec='libx264',
                 crf=crf,
                 preset=preset,
+                pix_fmt='yuv420p',  # 8-bit 4:2:0, the only H.264 flavour all browsers play
                 acodec='aac',
                 audio_bitrate='128k',
-                movflags='faststart'  # Enable streaming
+                movflags='faststart',  # Enable streaming
+                **({'threads': threads} if threads else {})
             )
 
             ffmpeg.run(stream, overwrite_output=True, capture_stderr=True, quiet=True)
@@ -116,6 +257,115 @@ class MediaProcessor:
             logger.error(f"Video compression failed: {e}")
             return False, str(e)[:500]
 
+    @staticmethod
+    def probe_video(input_path: str) -> Optional[dict]:
+        """
+        Read video metadata with ffprobe.
+        Returns {duration, width, height (as displayed, rotation applied),
+        rotation, video_codec, pix_fmt, audio_codec, bitrate, size, brand},
+        or None if the file has no readable video stream.
+        """
+        try:
+            data = ffmpeg.probe(input_path)
+        except ffmpeg.Error as e:
+            logger.error(f"Video probe failed: {e.stderr.decode() if e.stderr else e}")
+            return None
+        except Exception as e:
+            logger.error(f"Video probe failed: {e}")
+            return None
+
+        streams = data.get("streams") or []
+        video = next(
+            (s for s in streams
+             if s.get("codec_type") == "video" and not (s.get("disposition") or {}).get("attached_pic")),
+            None
+        )
+        if video is None:
+            return None
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+        container = data.get("format") or {}
+
+        rotation = _stream_rotation(video)
+        width, height = int(video.get("width") or 0), int(video.get("height") or 0)
+        if rotation in (90, 270):
+            width, height = height, width
+        return {
+            "duration": round(float(container.get("duration") or video.get("duration") or 0), 3),
+            "width": width,
+            "height": height,
+            "rotation": rotation,
+            "video_codec": video.get("codec_name"),
+            "pix_fmt": video.get("pix_fmt"),
+            "audio_codec": audio.get("codec_name") if audio else None,
+            "bitrate": int(container.get("bit_rate") or 0) or None,
+            "size": int(container.get("size") or 0) or None,
+            "brand": ((container.get("tags") or {}).get("major_brand") or "").strip() or None
+        }
+
+    @staticmethod
+    def plan_video(
+        info: Optional[dict],
+        max_dimension: int = VIDEO_MAX_DIMENSION,
+        max_bitrate: int = settings.video_remux_max_bitrate,
+        skip_max_size: int = settings.video_skip_max_size
+    ) -> str:
+        """
+        Choose the cheapest processing giving a browser-friendly MP4 within the
+        target (H.264 8-bit, AAC or no audio, shorter side <= max_dimension,
+        max_bitrate):
+        - skip: playable MP4 within target of at most skip_max_size bytes,
+          kept as uploaded
+        - downscale: above max_dimension, re-encoded and scaled
+        - encode: other codecs, or bitrate above max_bitrate, re-encoded
+        - remux: playable source within target, streams copied (audio
+          re-encoded to AAC if needed) into a faststart MP4
+        Unknown metadata (probe failed) -> encode.
+        """
+        if not info:
+            return VIDEO_ENCODE
+        video_ok = info["video_codec"] in VIDEO_COPY_CODECS and info["pix_fmt"] in VIDEO_COPY_PIX_FMTS
+        audio_ok = info["audio_codec"] is None or info["audio_codec"] in AUDIO_COPY_CODECS
+        if min(info["width"], info["height"]) > max_dimension:
+            return VIDEO_DOWNSCALE
+        if not video_ok or (info["bitrate"] and info["bitrate"] > max_bitrate):
+            return VIDEO_ENCODE
+        if audio_ok and info["brand"] in MP4_BRANDS \
+                and info["size"] and info["size"] <= skip_max_size:
+            return VIDEO_SKIP
+        return VIDEO_REMUX
+
+    @staticmethod
+    def remux_video(
+        input_path: str,
+        output_path: str,
+        audio_codec: Optional[str] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Copy the video stream into a faststart MP4 (no re-encoding). Audio is
+        copied when already AAC, re-encoded to AAC otherwise. Rotation
+        metadata is kept.
+        Returns (success: bool, error_message: Optional[str])
+        """
+        try:
+            stream = ffmpeg.output(
+                ffmpeg.input(input_path),
+                output_path,
+                vcodec='copy',
+                acodec='copy' if audio_codec in AUDIO_COPY_CODECS else 'aac',
+                **({} if audio_codec in AUDIO_COPY_CODECS else {'audio_bitrate': '128k'}),
+                movflags='faststart'
+            )
+            ffmpeg.run(stream, overwrite_output=True, capture_stderr=True, quiet=True)
+            return True, None
+
+        except ffmpeg.Error as e:
+            error_msg = e.stderr.decode() if e.stderr else str(e)
+            logger.error(f"Video remux failed: {error_msg}")
+            return False, error_msg[:500]
+        except Exception as e:
+            logger.error(f"Video remux failed: {e}")
+            return False, str(e)[:500]
+
     @staticmethod
     def generate_video_thumbnail(
         input_path: str,
@@ -146,19 +396,202 @@ class MediaProcessor:
             logger.error(f"Video thumbnail generation failed: {e}")
             return False
 
+    @staticmethod
+    def generate_video_previews(
+        input_path: str,
+        poster_path: str,
+        sprite_path: str,
+        duration: float,
+        interval: float = settings.video_sprite_interval,
+        max_frames: int = settings.video_sprite_max_frames,
+        offset_seconds: float = VIDEO_THUMBNAIL_OFFSET,
+        size: Tuple[int, int] = THUMBNAIL_SIZE,
+        threads: int = 0
+    ) -> Optional[dict]:
+        """
+        Poster thumbnail and scrubbing sprite sheet in a single decode pass.
+        The decoded video is split: one branch keeps the frame at
+        offset_seconds (at most half the duration) for the poster, the other
+        keeps one frame every interval seconds (longer for videos above
+        max_frames frames) and tiles them, SPRITE_COLUMNS per row.
+        Returns the sprite layout {interval, count, columns, width, height}
+        (width/height: one tile), or None on failure.
+        """
+        interval = max(interval, duration / max_frames)
+        count = max(1, math.ceil(duration / interval))
+        columns = min(count, SPRITE_COLUMNS)
+        rows = math.ceil(count / columns)
+        try:
+            frames = ffmpeg.input(input_path, threads=threads).video.split()
+            poster = (
+                frames[0]
+                .filter('select', f'gte(t,{min(offset_seconds, duration / 2):g})')
+                .filter('scale', size[0], size[1], force_original_aspect_ratio='decrease')
+                .filter('pad', size[0], size[1], '(ow-iw)/2', '(oh-ih)/2')
+                .output(poster_path, vframes=1, format='image2', vcodec='mjpeg')
+            )
+            sprite = (
+                frames[1]
+                .filter('fps', fps=f'1/{interval:g}')
+                .filter('scale', SPRITE_TILE_SIZE[0], SPRITE_TILE_SIZE[1], force_original_aspect_ratio='decrease')
+                .filter('tile', f'{columns}x{rows}')
+                .output(sprite_path, vframes=1, format='image2', vcodec='mjpeg', **{'q:v': SPRITE_QUALITY})
+            )
+            ffmpeg.merge_outputs(poster, sprite).overwrite_output().run(capture_stderr=True, quiet=True)
+            with Image.open(sprite_path) as sheet:
+                width, height = sheet.width // columns, sheet.height // rows
+            return {"interval": interval, "count": count, "columns": columns, "width": width, "height": height}
+        except ffmpeg.Error as e:
+            logger.error(f"Video preview generation failed: {e.stderr.decode() if e.stderr else e}")
+            return None
+        except Exception as e:
+            logger.error(f"Video preview generation failed: {e}")
+            return None
+
+    @staticmethod
+    def package_hls(
+        input_path: str,
+        output_dir: str,
+        info: dict,
+        renditions: Sequence[int] = HLS_RENDITIONS,
+        segment_seconds: int = settings.video_hls_segment_seconds,
+        preset: str = HLS_PRESET,
+        threads: int = 0
+    ) -> Tuple[Optional[List[dict]], Optional[str]]:
+        """
+        Encode an HLS rendition ladder in one FFmpeg run (one decode, one
+        H.264 encode per rendition, capped CRF) and segment it:
+        output_dir/master.m3u8, output_dir/<name>/index.m3u8 and
+        output_dir/<name>/seg_NNN.ts. Only renditions up to the source
+        shorter side are kept (the smallest one if the source is smaller);
+        keyframes are forced at segment boundaries so all renditions switch
+        cleanly.
+        Returns ([{name, height, bitrate, segments}], None) or (None, error).
+        """
+        shorter = min(info["width"], info["height"])
+        heights = [h for h in sorted(renditions) if h <= shorter] or [min(renditions)]
+        has_audio = bool(info.get("audio_codec"))
+        try:
+            source = ffmpeg.input(input_path, threads=threads)
+            frames = source.video.split()
+            streams, options, stream_map = [], {}, []
+            for index, height in enumerate(heights):
+                video_bitrate, audio_bitrate = HLS_BITRATES[height]
+                streams.append(frames[index].filter(
+                    'scale',
+                    f'if(gte(iw,ih),-2,min({height},iw))',
+                    f'if(gte(iw,ih),min({height},ih),-2)'
+                ))
+                options[f'maxrate:v:{index}'] = video_bitrate
+                options[f'bufsize:v:{index}'] = f"{int(video_bitrate[:-1]) * 2}k"
+                if has_audio:
+                    streams.append(source.audio)
+                    options[f'b:a:{index}'] = audio_bitrate
+                stream_map.append(f"v:{index}{f',a:{index}' if has_audio else ''},name:{height}p")
+
+            (
+                ffmpeg
+                .output(
+                    *streams,
+                    os.path.join(output_dir, "%v", "index.m3u8"),
+                    vcodec='libx264',
+                    crf=VIDEO_CRF,
+                    preset=preset,
+                    pix_fmt='yuv420p',
+                    force_key_frames=f'expr:gte(t,n_forced*{segment_seconds})',
+                    sc_threshold=0,
+                    **({'acodec': 'aac', 'ac': 2} if has_audio else {}),
+                    format='hls',
+                    hls_time=segment_seconds,
+                    hls_playlist_type='vod',
+                    hls_segment_filename=os.path.join(output_dir, "%v", "seg_%03d.ts"),
+                    master_pl_name=HLS_MASTER_PLAYLIST,
+                    var_stream_map=" ".join(stream_map),
+                    **options,
+                    **({'threads': threads} if threads else {})
+                )
+                .overwrite_output()
+                .run(capture_stderr=True, quiet=True)
+            )
+            ladder = []
+            for height in heights:
+                name = f"{height}p"
+                segments = [f for f in os.listdir(os.path.join(output_dir, name)) if f.endswith(".ts")]
+                ladder.append({
+                    "name": name,
+                    "height": height,
+                    "bitrate": HLS_BITRATES[height][0],
+                    "segments": len(segments)
+                })
+            return ladder, None
+        except ffmpeg.Error as e:
+            error_msg = e.stderr.decode() if e.stderr else str(e)
+            logger.error(f"HLS packaging failed: {error_msg}")
+            return None, error_msg[:500]
+        except Exception as e:
+            logger.error(f"HLS packaging failed: {e}")
+            return None, str(e)[:500]
+
+    @staticmethod
+    def build_sprite_vtt(sprite_url: str, sprite: dict, duration: float) -> str:
+        """
+        WebVTT thumbnails index of a sprite sheet: one cue per tile,
+        "<sprite_url>#xywh=x,y,w,h" (media fragment of the tile).
+        """
+        lines = ["WEBVTT", ""]
+        width, height, columns = sprite["width"], sprite["height"], sprite["columns"]
+        for index in range(sprite["count"]):
+            start = index * sprite["interval"]
+            end = min(start + sprite["interval"], duration)
+            x, y = (index % columns) * width, (index // columns) * height
+            lines += [
+                f"{_vtt_timestamp(start)} --> {_vtt_timestamp(end)}",
+                f"{sprite_url}#xywh={x},{y},{width},{height}",
+                ""
+            ]
+        return "\n".join(lines)
+
+
+def process_content_hash(
+    supabase_admin,
+    file_id: str,
+    file_path: str,
+    bucket_name: str
+) -> Dict[str, int]:
+    """
+    Media job (worker) for direct uploads without media processing: hashes
+    the stored object while streaming it (no local copy), then either reuses
+    a ready duplicate (see content_dedup) or records files.content_hash.
+    Returns per-step durations (hash_ms, dedup_ms).
+    """
+    timings: Dict[str, int] = {}
+    with _timed(timings, "hash"):
+        content_hash = hash_object(bucket_name, file_path)
+    with _timed(timings, "dedup"):
+        if not reuse_duplicate(supabase_admin, bucket_name, file_id, file_path, content_hash):
+            supabase_admin.table("files").update({"content_hash": content_hash}).eq("id", file_id).execute()
+    return timings
+
 
 def process_image_thumbnail(
     supabase_admin,
     file_id: str,
     file_path: str,
     bucket_name: str
-) -> None:
+) -> Dict[str, int]:
     """
-    Background task to generate image thumbnail.
-    Downloads image, generates thumbnail, uploads to storage, updates DB.
+    Media job (worker) to generate image thumbnail and derivatives.
+    Downloads image to disk (SHA-256 computed on the fly: a duplicate of a
+    ready file reuses its outputs, see content_dedup), generates thumbnail
+    and derivative ladder, uploads to storage, updates DB (thumbnail_path,
+    derivatives, content_hash).
+    Raises on failure: the worker retries or marks the file as failed.
+    Returns per-step durations (download_ms, dedup_ms, process_ms, upload_ms).
     """
     temp_input = None
     temp_output = None
+    temp_dir = None
+    timings: Dict[str, int] = {}
 
     try:
         # Update status to processing
@@ -168,45 +601,61 @@ def process_image_thumbnail(
 
         # Download original image
         temp_input = tempfile.NamedTemporaryFile(delete=False, suffix='.img')
-        response = supabase_admin.storage.from_(bucket_name).download(file_path)
-        temp_input.write(response)
         temp_input.close()
+        hasher = hashlib.sha256()
+        with _timed(timings, "download"):
+            download_to_path(bucket_name, file_path, temp_input.name, hasher)
+        content_hash = hasher.hexdigest()
+        with _timed(timings, "dedup"):
+            if reuse_duplicate(supabase_admin, bucket_name, file_id, file_path, content_hash):
+                return timings
 
         # Generate thumbnail
         temp_output = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
         temp_output.close()
 
-        success = MediaProcessor.generate_image_thumbnail(
-            temp_input.name,
-            temp_output.name
-        )
+        with _timed(timings, "process"):
+            success = MediaProcessor.generate_image_thumbnail(
+                temp_input.name,
+                temp_output.name
+            )
 
         if not success:
             raise Exception("Thumbnail generation failed")
 
-        # Upload thumbnail
+        # Generate derivatives (sizes x formats)
+        temp_dir = tempfile.TemporaryDirectory()
+        with _timed(timings, "process"):
+            derivatives = MediaProcessor.generate_image_derivatives(temp_input.name, temp_dir.name)
+
+        # Upload thumbnail and derivatives
         thumbnail_path = f"thumbnails/{file_id}.jpg"
-        with open(temp_output.name, 'rb') as f:
-            supabase_admin.storage.from_(bucket_name).upload(
-                thumbnail_path,
-                f.read(),
-                {"content-type": "image/jpeg"}
-            )
+        with _timed(timings, "upload"):
+            upload_path(bucket_name, thumbnail_path, temp_output.name, "image/jpeg", upsert=True)
+            for derivative in derivatives:
+                derivative["path"] = f"derivatives/{file_id}/{derivative['width']}.{derivative['format']}"
+                upload_path(
+                    bucket_name,
+                    derivative["path"],
+                    derivative.pop("local_path"),
+                    derivative.pop("content_type"),
+                    upsert=True
+                )
 
         # Update database
         supabase_admin.table("files").update({
             "thumbnail_path": thumbnail_path,
+            "derivatives": derivatives,
+            "content_hash": content_hash,
             "processing_status": "ready"
         }).eq("id", file_id).execute()
 
-        logger.info(f"Image thumbnail generated for {file_id}")
+        logger.info(f"Image thumbnail and {len(derivatives)} derivatives generated for {file_id}")
+        return timings
 
     except Exception as e:
         logger.error(f"Image thumbnail processing failed for {file_id}: {e}")
-        supabase_admin.table("files").update({
-            "processing_status": "failed",
-            "processing_error": str(e)[:500]
-        }).eq("id", file_id).execute()
+        raise
 
     finally:
         # Cleanup temp files
@@ -214,6 +663,8 @@ def process_image_thumbnail(
             os.unlink(temp_input.name)
         if temp_output and os.path.exists(temp_output.name):
             os.unlink(temp_output.name)
+        if temp_dir:
+            temp_dir.cleanup()
 
 
 def process_video(
@@ -221,15 +672,28 @@ def process_video(
     file_id: str,
     file_path: str,
     bucket_name: str,
-    original_size: int
-) -> None:
+    original_size: int,
+    ffmpeg_threads: int = 0
+) -> Dict[str, int]:
     """
-    Background task to compress video and generate thumbnail.
-    Downloads video, compresses, generates thumbnail, uploads both, updates DB.
+    Media job (worker) to compress video and generate previews.
+    Streams video to disk (SHA-256 computed on the fly: a duplicate of a
+    ready file reuses its outputs without any encoding, see content_dedup),
+    probes it, then keeps, remuxes or re-encodes it
+    (MediaProcessor.plan_video), generates thumbnail and scrubbing sprite
+    sheet + WebVTT index (thumbnails/), optionally packages long videos as
+    HLS (settings.video_hls, hls/<file_id>/), streams results back to
+    storage (processed video last, replacing the original), updates DB (including files.media_info, with the sprite layout
+    and HLS ladder, and files.hls_path): memory use does not depend on
+    video size.
+    Raises on failure: the worker retries or marks the file as failed.
+    Returns per-step durations (download_ms, dedup_ms, probe_ms, process_ms, hls_ms, upload_ms).
     """
     temp_input = None
     temp_compressed = None
     temp_thumbnail = None
+    temp_dir = None
+    timings: Dict[str, int] = {}
 
     try:
         # Update status to processing
@@ -239,54 +703,144 @@ def process_video(
 
         # Download original video
         temp_input = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
-        response = supabase_admin.storage.from_(bucket_name).download(file_path)
-        temp_input.write(response)
         temp_input.close()
-
-        # Compress video
-        temp_compressed = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
-        temp_compressed.close()
-
-        success, error = MediaProcessor.compress_video(
-            temp_input.name,
-            temp_compressed.name
-        )
-
-        if not success:
-            raise Exception(f"Video compression failed: {error}")
-
-        # Generate thumbnail from compressed video
+        hasher = hashlib.sha256()
+        with _timed(timings, "download"):
+            download_to_path(bucket_name, file_path, temp_input.name, hasher)
+        content_hash = hasher.hexdigest()
+        with _timed(timings, "dedup"):
+            if reuse_duplicate(supabase_admin, bucket_name, file_id, file_path, content_hash):
+                return timings
+
+        with _timed(timings, "probe"):
+            source_info = MediaProcessor.probe_video(temp_input.name)
+        action = MediaProcessor.plan_video(source_info)
+
+        # Remux or compress video (skip: original kept as uploaded)
+        output_path = temp_input.name
+        if action != VIDEO_SKIP:
+            temp_compressed = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
+            temp_compressed.close()
+            output_path = temp_compressed.name
+
+            with _timed(timings, "process"):
+                success = False
+                if action == VIDEO_REMUX:
+                    success, error = MediaProcessor.remux_video(
+                        temp_input.name,
+                        output_path,
+                        source_info["audio_codec"]
+                    )
+                    if not success:
+                        action = VIDEO_ENCODE
+                if not success:
+                    success, error = MediaProcessor.compress_video(
+                        temp_input.name,
+                        output_path,
+                        threads=ffmpeg_threads
+                    )
+
+            if not success:
+                raise Exception(f"Video compression failed: {error}")
+
+        # Generate thumbnail and sprite sheet from compressed video
         temp_thumbnail = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
         temp_thumbnail.close()
+        temp_dir = tempfile.TemporaryDirectory()
+        sprite_local = os.path.join(temp_dir.name, "sprite.jpg")
+
+        with _timed(timings, "process"):
+            output_info = source_info if action == VIDEO_SKIP else MediaProcessor.probe_video(output_path)
+            duration = (output_info or {}).get("duration")
+            sprite = None
+            if duration:
+                sprite = MediaProcessor.generate_video_previews(
+                    output_path,
+                    temp_thumbnail.name,
+                    sprite_local,
+                    duration,
+                    threads=ffmpeg_threads
+                )
+            # Unknown duration or failed decode: poster only
+            thumbnail_success = sprite is not None or MediaProcessor.generate_video_thumbnail(
+                output_path,
+                temp_thumbnail.name
+            )
 
-        thumbnail_success = MediaProcessor.generate_video_thumbnail(
-            temp_compressed.name,
-            temp_thumbnail.name
-        )
-
-        # Read compressed video
-        with open(temp_compressed.name, 'rb') as f:
-            compressed_content = f.read()
-            compressed_size = len(compressed_content)
-
-        # Delete original and upload compressed (replace)
-        supabase_admin.storage.from_(bucket_name).remove([file_path])
-        supabase_admin.storage.from_(bucket_name).upload(
-            file_path,
-            compressed_content,
-            {"content-type": "video/mp4"}
-        )
-
-        # Upload thumbnail if successful
-        thumbnail_path = None
-        if thumbnail_success:
-            thumbnail_path = f"thumbnails/{file_id}.jpg"
-            with open(temp_thumbnail.name, 'rb') as f:
-                supabase_admin.storage.from_(bucket_name).upload(
-                    thumbnail_path,
-                    f.read(),
-                    {"content-type": "image/jpeg"}
+        # HLS ladder from the processed video (the MP4 stays the fallback)
+        hls_ladder = None
+        hls_dir = os.path.join(temp_dir.name, "hls")
+        if settings.video_hls and output_info and duration >= settings.video_hls_min_duration:
+            os.makedirs(hls_dir)
+            with _timed(timings, "hls"):
+                hls_ladder, error = MediaProcessor.package_hls(
+                    output_path,
+                    hls_dir,
+                    output_info,
+                    threads=ffmpeg_threads
                 )
+            if not hls_ladder:
+                logger.warning(f"HLS packaging failed for {file_id}, MP4 only: {error}")
+
+        with _timed(timings, "upload"):
+            # Upload thumbnail if successful
+            thumbnail_path = None
+            if thumbnail_success:
+                thumbnail_path = f"thumbnails/{file_id}.jpg"
+                upload_path(bucket_name, thumbnail_path, temp_thumbnail.name, "image/jpeg", upsert=True)
+
+            # Sprite sheet and its WebVTT index, next to the thumbnail (the
+            # index references the sprite by relative name, replaced by a
+            # signed URL when the API serves it: GET /api/files/vtt)
+            if sprite:
+                sprite["path"] = f"thumbnails/{file_id}_sprite.jpg"
+                sprite["vtt_path"] = f"thumbnails/{file_id}.vtt"
+                vtt_local = os.path.join(temp_dir.name, "sprite.vtt")
+                with open(vtt_local, "w", encoding="utf-8") as vtt:
+                    vtt.write(MediaProcessor.build_sprite_vtt(os.path.basename(sprite["path"]), sprite, duration))
+                upload_path(bucket_name, sprite["path"], sprite_local, "image/jpeg", upsert=True)
+                upload_path(bucket_name, sprite["vtt_path"], vtt_local, "text/vtt", upsert=True)
+
+            # Variant playlists and segments in parallel, master playlist last:
+            # once visible, everything it references is in storage. Upload
+            # failures are handled like packaging failures (MP4 only).
+            hls_path = None
+            if hls_ladder:
+                hls_prefix = f"hls/{file_id}"
+                hls_files = [
+                    (f"{hls_prefix}/{rendition['name']}/{name}",
+                     os.path.join(hls_dir, rendition["name"], name),
+                     HLS_CONTENT_TYPES[os.path.splitext(name)[1]])
+                    for rendition in hls_ladder
+                    for name in os.listdir(os.path.join(hls_dir, rendition["name"]))
+                ]
+                try:
+                    upload_paths(bucket_name, hls_files, settings.video_hls_upload_concurrency, upsert=True)
+                    upload_path(
+                        bucket_name,
+                        f"{hls_prefix}/{HLS_MASTER_PLAYLIST}",
+                        os.path.join(hls_dir, HLS_MASTER_PLAYLIST),
+                        HLS_CONTENT_TYPES[".m3u8"],
+                        upsert=True
+                    )
+                    hls_path = f"{hls_prefix}/{HLS_MASTER_PLAYLIST}"
+                except Exception as e:
+                    logger.warning(f"HLS upload failed for {file_id}, MP4 only: {e}")
+                    hls_ladder = None
+                    try:
+                        supabase_admin.storage.from_(bucket_name).remove([path for path, _, _ in hls_files])
+                    except Exception:
+                        pass  # Orphan segments are overwritten if the job runs again
+
+            # Replace original last, once every derived file is stored: if an
+            # upload above fails, the job is retried on the original upload
+            # (not re-encoded twice, content_hash stays that of the upload)
+            if action == VIDEO_SKIP:
+                compressed_size = os.path.getsize(output_path)
+            else:
+                compressed_size = upload_path(bucket_name, file_path, output_path, "video/mp4", upsert=True)
+                # Nouvelle URL signee pour que les navigateurs ne reutilisent pas l'original
+                forget_signed_urls(bucket_name, file_path)
 
         # Update database
         supabase_admin.table("files").update({
@@ -294,17 +848,24 @@ def process_video(
             "processing_status": "ready",
             "file_size": compressed_size,
             "original_file_size": original_size,
-            "mime_type": "video/mp4"  # Always MP4 after compression
+            "mime_type": "video/mp4",  # Always MP4 after processing
+            "hls_path": hls_path,
+            "content_hash": content_hash,  # Uploaded content (before compression)
+            "media_info": {
+                **(output_info or {}),
+                "action": action,
+                "source": source_info,
+                "sprite": sprite,
+                "hls": hls_ladder
+            }
         }).eq("id", file_id).execute()
 
-        logger.info(f"Video processed for {file_id}: {original_size} -> {compressed_size} bytes")
+        logger.info(f"Video processed for {file_id} ({action}): {original_size} -> {compressed_size} bytes")
+        return timings
 
     except Exception as e:
         logger.error(f"Video processing failed for {file_id}: {e}")
-        supabase_admin.table("files").update({
-            "processing_status": "failed",
-            "processing_error": str(e)[:500]
-        }).eq("id", file_id).execute()
+        raise
 
     finally:
         # Cleanup temp files
@@ -314,3 +875,5 @@ def process_video(
                     os.unlink(temp.name)
                 except Exception:
                     pass
+        if temp_dir:
+            temp_dir.cleanup()
@@ -0,0 +1,112 @@
+"""
+URLs de medias signees localement (HMAC) et servies par l'API.
+
+Alternative a la signature Supabase Storage (MEDIA_URL_MODE=local): l'URL
+pointe vers GET /api/files/media/{path}?exp=...&sig=..., signee avec
+settings.secret_key. Signer est une operation purement CPU (quelques
+microsecondes, aucun appel reseau).
+
+L'expiration est arrondie a EXPIRY_STEP secondes: un meme fichier garde la
+meme URL d'une liste a l'autre, ce qui permet au navigateur de la mettre en
+cache. Le endpoint de telechargement relaie l'objet depuis Storage en flux
+(en-tetes Range / conditionnels transmis, reponses 206 / 304 conservees).
+
+Les playlists HLS sont signees de la meme facon vers GET /api/files/hls/{path}
+(HLS_ROUTE), qui les reecrit avec des URLs signees pour chaque segment, et
+les index WebVTT des planches d'apercus vers GET /api/files/vtt/{path}
+(VTT_ROUTE), qui y signe l'URL de la planche.
+"""
+import base64
+import hashlib
+import hmac
+import math
+import time
+from typing import Dict, Iterable, Optional
+from urllib.parse import quote
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.config import settings
+from app.db import media_http_client
+
+MEDIA_ROUTE = "/api/files/media"
+HLS_ROUTE = "/api/files/hls"
+VTT_ROUTE = "/api/files/vtt"
+EXPIRY_STEP = 600
+
+# En-tetes du client transmis a Storage, et de Storage renvoyes au client
+_FORWARD_REQUEST_HEADERS = ("range", "if-range", "if-none-match", "if-modified-since")
+_FORWARD_RESPONSE_HEADERS = (
+    "content-type", "content-length", "content-range", "content-encoding",
+    "accept-ranges", "etag", "last-modified"
+)
+
+
+def _signature(bucket: str, path: str, expires_at: int) -> str:
+    message = f"{bucket}\n{path}\n{expires_at}".encode()
+    digest = hmac.new(settings.secret_key.encode(), message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def sign_media_url(bucket: str, path: str, expires_in: int, route: str = MEDIA_ROUTE) -> str:
+    """URL absolue signee vers le endpoint de telechargement (ou de playlists HLS / index WebVTT) de l'API"""
+    expires_at = math.ceil((time.time() + expires_in) / EXPIRY_STEP) * EXPIRY_STEP
+    return (
+        f"{settings.public_api_url.rstrip('/')}{route}/{quote(path)}"
+        f"?exp={expires_at}&sig={_signature(bucket, path, expires_at)}"
+    )
+
+
+def sign_media_urls(bucket: str, paths: Iterable[Optional[str]], expires_in: int) -> Dict[str, str]:
+    """Signe un ensemble de chemins: {path: url} (chemins vides ignores)"""
+    return {p: sign_media_url(bucket, p, expires_in) for p in dict.fromkeys(paths) if p}
+
+
+def verify_media_signature(bucket: str, path: str, expires_at: int, signature: str) -> bool:
+    """Signature valide et non expiree"""
+    if expires_at < time.time():
+        return False
+    return hmac.compare_digest(_signature(bucket, path, expires_at), signature)
+
+
+async def stream_storage_object(
+    bucket: str, path: str, request: Request, expires_at: int
+) -> Optional[StreamingResponse]:
+    """
+    Relaie un objet Storage en flux, avec support des requetes partielles (Range).
+    Retourne None si Storage ne trouve pas l'objet.
+    """
+    headers = {
+        "apikey": settings.supabase_secret_key,
+        "Authorization": f"Bearer {settings.supabase_secret_key}",
+        # Transmettre le corps tel quel (pas de decompression cote API)
+        "Accept-Encoding": request.headers.get("accept-encoding", "identity")
+    }
+    for name in _FORWARD_REQUEST_HEADERS:
+        if name in request.headers:
+            headers[name] = request.headers[name]
+
+    url = f"{settings.supabase_url.rstrip('/')}/storage/v1/object/authenticated/{bucket}/{quote(path)}"
+    upstream = await media_http_client.send(
+        media_http_client.build_request("GET", url, headers=headers), stream=True
+    )
+    if upstream.status_code >= 400 and upstream.status_code != 416:
+        await upstream.aclose()
+        return None
+
+    response_headers = {
+        name: upstream.headers[name] for name in _FORWARD_RESPONSE_HEADERS if name in upstream.headers
+    }
+    if upstream.status_code in (200, 206, 304):
+        # Cacheable par le navigateur jusqu'a l'expiration de l'URL
+        max_age = max(0, expires_at - int(time.time()))
+        response_headers["Cache-Control"] = f"private, max-age={max_age}"
+
+    return StreamingResponse(
+        upstream.aiter_raw(),
+        status_code=upstream.status_code,
+        headers=response_headers,
+        background=BackgroundTask(upstream.aclose)
+    )
@@ -0,0 +1,238 @@
+"""
+Deduplication des requetes PostgREST a l'echelle d'une requete HTTP.
+
+Un contexte (contextvar) est ouvert par le middleware pour chaque requete
+entrante. Tant qu'il est actif, le transport httpx partage (app.db) :
+- memoise les lectures GET /rest/v1/ identiques (meme URL, memes en-tetes),
+  y compris les lectures concurrentes encore en vol ;
+- tient une identity map des lignes deja chargees par (table, select, id):
+  une lecture `?select=...&id=eq.X` (filtres eq supplementaires verifies sur
+  la ligne) est servie sans appel reseau ;
+- vide memo et identity map a la premiere ecriture (POST/PATCH/PUT/DELETE,
+  RPC compris) pour ne jamais servir une ligne perimee.
+
+Les helpers des routers n'ont rien a changer: la reutilisation est
+transparente. Hors contexte (taches de fond, scripts) rien n'est memoise.
+"""
+import asyncio
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+
+import httpx
+
+REST_PREFIX = "/rest/v1/"
+OBJECT_MEDIA_TYPE = "application/vnd.pgrst.object+json"
+# Parametres PostgREST qui ne filtrent pas les lignes
+_NON_FILTER_PARAMS = {"select", "order", "limit", "offset"}
+# En-tetes qui changent la reponse pour une meme URL
+_KEY_HEADERS = ("accept", "prefer", "range", "authorization", "accept-profile")
+
+
+class QueryScope:
+    """Memo + identity map + compteurs d'une requete HTTP entrante"""
+
+    def __init__(self):
+        self.memo: Dict[tuple, "asyncio.Future"] = {}
+        self.identity: Dict[Tuple[str, str], Dict[str, dict]] = {}
+        self.generation = 0
+        self.issued = 0
+        self.memo_hits = 0
+        self.identity_hits = 0
+        self.writes = 0
+
+    def invalidate(self) -> None:
+        self.memo.clear()
+        self.identity.clear()
+        self.generation += 1
+
+    @property
+    def served(self) -> int:
+        return self.memo_hits + self.identity_hits
+
+    def stats(self) -> dict:
+        """Compteurs de la requete (requetes emises vs servies localement)"""
+        return {
+            "issued": self.issued,
+            "memo_hits": self.memo_hits,
+            "identity_hits": self.identity_hits,
+            "writes": self.writes
+        }
+
+
+_scope: ContextVar[Optional[QueryScope]] = ContextVar("query_scope", default=None)
+
+
+def current_scope() -> Optional[QueryScope]:
+    return _scope.get()
+
+
+@contextmanager
+def request_scope():
+    """Ouvre un contexte de deduplication pour la duree d'une requete"""
+    scope = QueryScope()
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+@contextmanager
+def detached():
+    """
+    Suspend le contexte de la requete: lectures toujours envoyees a Supabase.
+    Pour les reponses longues (flux SSE) qui relisent des lignes modifiees
+    entre-temps par un autre processus.
+    """
+    token = _scope.set(None)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def _table(request: httpx.Request) -> Optional[str]:
+    path = request.url.path
+    index = path.find(REST_PREFIX)
+    if index < 0:
+        return None
+    return path[index + len(REST_PREFIX):]
+
+
+def _pg_text(value) -> str:
+    """Representation texte PostgREST d'une valeur JSON (pour comparer aux filtres eq)"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    return str(value)
+
+
+def _identity_lookup(scope: QueryScope, table: str, request: httpx.Request) -> Optional[dict]:
+    """Retourne la ligne si la requete est une lecture par id servie par l'identity map"""
+    if "count=" in request.headers.get("prefer", ""):
+        return None
+    params = parse_qsl(request.url.query.decode(), keep_blank_values=True)
+    select = None
+    filters = {}
+    for name, value in params:
+        if name == "select":
+            select = value
+        elif (name == "limit" and value == "0") or (name == "offset" and value not in ("", "0")):
+            return None
+        elif name in _NON_FILTER_PARAMS:
+            continue
+        elif not value.startswith("eq.") or name in filters:
+            return None
+        else:
+            filters[name] = value[3:]
+    if select is None or "id" not in filters:
+        return None
+    row = scope.identity.get((table, select), {}).get(filters["id"])
+    if row is None:
+        return None
+    for column, expected in filters.items():
+        if column not in row:
+            return None
+        value = row[column]
+        # postgrest-py envoie les booleens Python tels quels (eq.True / eq.False)
+        if isinstance(value, bool):
+            expected = expected.lower()
+        if _pg_text(value) != expected:
+            return None
+    return row
+
+
+def _remember_rows(scope: QueryScope, table: str, request: httpx.Request, content: bytes) -> None:
+    select = dict(parse_qsl(request.url.query.decode(), keep_blank_values=True)).get("select")
+    if select is None:
+        return
+    try:
+        body = json.loads(content)
+    except ValueError:
+        return
+    rows = body if isinstance(body, list) else [body]
+    rows_by_id = scope.identity.setdefault((table, select), {})
+    for row in rows:
+        if isinstance(row, dict) and row.get("id") is not None:
+            rows_by_id[_pg_text(row["id"])] = row
+
+
+def _json_response(request: httpx.Request, body) -> httpx.Response:
+    return httpx.Response(
+        200,
+        content=json.dumps(body).encode(),
+        headers={"content-type": "application/json", "content-range": "0-0/*"},
+        request=request
+    )
+
+
+class MemoTransport(httpx.AsyncBaseTransport):
+    """Transport httpx qui deduplique les lectures PostgREST du contexte courant"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        scope = _scope.get()
+        table = _table(request) if scope is not None else None
+        if table is None:
+            return await self._transport.handle_async_request(request)
+
+        if request.method != "GET":
+            scope.writes += 1
+            scope.invalidate()
+            return await self._transport.handle_async_request(request)
+
+        row = _identity_lookup(scope, table, request)
+        if row is not None:
+            scope.identity_hits += 1
+            wants_object = OBJECT_MEDIA_TYPE in request.headers.get("accept", "")
+            return _json_response(request, row if wants_object else [row])
+
+        key = (str(request.url),) + tuple(request.headers.get(h, "") for h in _KEY_HEADERS)
+        pending = scope.memo.get(key)
+        if pending is not None:
+            try:
+                status_code, headers, content = await asyncio.shield(pending)
+                scope.memo_hits += 1
+                return httpx.Response(status_code, headers=headers, content=content, request=request)
+            except asyncio.CancelledError:
+                # Seule la lecture d'origine a ete annulee: emettre la requete
+                if not pending.cancelled():
+                    raise
+
+        generation = scope.generation
+        future = asyncio.get_running_loop().create_future()
+        scope.memo[key] = future
+        scope.issued += 1
+        try:
+            response = await self._transport.handle_async_request(request)
+            content = await response.aread()
+        except BaseException as e:
+            if scope.memo.get(key) is future:
+                del scope.memo[key]
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Eviter l'avertissement "exception never retrieved"
+                future.exception()
+            raise
+
+        headers = [(k, v) for k, v in response.headers.items()
+                   if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+        future.set_result((response.status_code, headers, content))
+        if response.status_code != 200 or scope.generation != generation:
+            # Erreur ou ecriture intervenue pendant la lecture: ne pas memoiser
+            if scope.memo.get(key) is future:
+                del scope.memo[key]
+        else:
+            _remember_rows(scope, table, request, content)
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
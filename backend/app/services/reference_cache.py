@@ -0,0 +1,127 @@
+"""
+Cache en processus des tables de reference: type_seance, type_support,
+type_profile et work_lead_type.
+
+Ces tables ne sont modifiees que par les routers d'administration, qui
+appellent `reference_cache.invalidate(table)` apres chaque ecriture. Les
+tables sont chargees au demarrage puis rechargees a la demande apres une
+invalidation ou a l'expiration du TTL (borne la perimation pour les autres
+workers, qui ne voient pas les invalidations locales).
+
+Chaque table a une version (empreinte du contenu, identique d'un worker a
+l'autre) utilisee pour les ETag des endpoints de lecture.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request, Response
+
+from app.config import settings
+from app.db import db
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_TABLES = ("type_seance", "type_support", "type_profile", "work_lead_type")
+
+
+class _TableSnapshot:
+    def __init__(self, rows: List[dict]):
+        self.rows = rows
+        self.by_id = {str(r["id"]): r for r in rows}
+        payload = json.dumps(rows, sort_keys=True, default=str).encode()
+        self.version = hashlib.sha1(payload).hexdigest()[:16]
+        self.loaded_at = time.monotonic()
+
+
+class ReferenceCache:
+    """Lignes completes des tables de reference, indexees par id"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._tables: Dict[str, _TableSnapshot] = {}
+        self._locks = {table: asyncio.Lock() for table in REFERENCE_TABLES}
+
+    async def _snapshot(self, table: str, max_age: Optional[float] = None) -> _TableSnapshot:
+        max_age = self.ttl if max_age is None else max_age
+        snapshot = self._tables.get(table)
+        if snapshot and time.monotonic() - snapshot.loaded_at < max_age:
+            return snapshot
+        async with self._locks[table]:
+            snapshot = self._tables.get(table)
+            if snapshot and time.monotonic() - snapshot.loaded_at < max_age:
+                return snapshot
+            response = await db.table(table).select("*").order("name").execute()
+            snapshot = _TableSnapshot(response.data)
+            self._tables[table] = snapshot
+            return snapshot
+
+    async def load_all(self) -> None:
+        """Chargement initial (demarrage de l'application)"""
+        for table in REFERENCE_TABLES:
+            try:
+                await self._snapshot(table)
+            except Exception as e:
+                logger.warning(f"Chargement cache reference {table} echoue: {e}")
+
+    def invalidate(self, *tables: str) -> None:
+        """A appeler apres toute ecriture sur une table de reference"""
+        for table in tables or REFERENCE_TABLES:
+            self._tables.pop(table, None)
+
+    async def rows(self, table: str) -> List[dict]:
+        """Toutes les lignes (supprimees comprises), triees par nom. Copies modifiables."""
+        snapshot = await self._snapshot(table)
+        return [dict(r) for r in snapshot.rows]
+
+    async def get(self, table: str, row_id: Any) -> Optional[dict]:
+        """
+        Une ligne par id (copie), ou None.
+        Un id inconnu declenche un rechargement (ligne creee par un autre worker),
+        au plus une fois par seconde et par table.
+        """
+        row = (await self._snapshot(table)).by_id.get(str(row_id))
+        if row is None:
+            row = (await self._snapshot(table, max_age=1)).by_id.get(str(row_id))
+        return dict(row) if row else None
+
+    async def exists(self, table: str, row_id: Any, include_deleted: bool = False) -> bool:
+        row = await self.get(table, row_id)
+        return row is not None and (include_deleted or not row.get("is_deleted", False))
+
+    async def version(self, *tables: str) -> str:
+        versions = [(await self._snapshot(t)).version for t in tables]
+        return "-".join(versions)
+
+    async def work_lead_types_lookup(self) -> dict:
+        """Types d'axes globaux non supprimes: id -> {id, name, parent_id}"""
+        return {
+            r["id"]: {"id": r["id"], "name": r["name"], "parent_id": r.get("parent_id")}
+            for r in await self.rows("work_lead_type")
+            if r.get("project_id") is None and not r.get("is_deleted", False)
+        }
+
+    async def not_modified(self, request: Request, response: Response, *tables: str) -> bool:
+        """
+        Pose l'ETag (version des tables + parametres de la requete) sur la reponse.
+        Retourne True si le client possede deja cette version (If-None-Match).
+        """
+        variant = hashlib.sha1(request.url.query.encode()).hexdigest()[:8]
+        etag = f'W/"{await self.version(*tables)}-{variant}"'
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, no-cache"
+        return etag in request.headers.get("if-none-match", "")
+
+
+reference_cache = ReferenceCache(ttl=settings.reference_cache_ttl)
+
+
+def not_modified_response(response: Response) -> Response:
+    """Reponse 304 reprenant l'ETag pose par not_modified()"""
+    return Response(
+        status_code=304,
+        headers={k: v for k, v in response.headers.items() if k.lower() in ("etag", "cache-control")}
+    )
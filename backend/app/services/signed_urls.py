@@ -0,0 +1,109 @@
+"""
+Generation groupee d'URLs signees Supabase Storage.
+
+Un seul appel POST /object/sign/{bucket} (create_signed_urls) signe toute une
+page de fichiers au lieu d'un appel par fichier et par thumbnail. Les lots de
+plus de SIGN_BATCH_SIZE chemins sont decoupes et signes en parallele.
+
+Les URLs signees sont mises en cache par chemin et reutilisees tant qu'il
+leur reste au moins SIGNED_URL_MIN_REMAINING secondes de validite: une meme
+galerie rouverte ne coute aucun appel Storage et garde des URLs stables,
+que le navigateur peut servir depuis son cache.
+"""
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from app.config import settings
+from app.db import db
+from app.services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+SIGN_BATCH_SIZE = 100
+
+# (bucket, path) -> (expires_in, URL signee)
+_url_cache = TTLCache(maxsize=settings.signed_url_cache_size)
+
+
+def _cached(bucket: str, path: str, expires_in: int) -> Optional[str]:
+    entry = _url_cache.get((bucket, path))
+    if entry and entry[0] == expires_in:
+        return entry[1]
+    return None
+
+
+def _remember(bucket: str, path: str, expires_in: int, url: Optional[str]) -> None:
+    # L'entree expire quand l'URL n'a plus que SIGNED_URL_MIN_REMAINING secondes
+    ttl = expires_in - settings.signed_url_min_remaining
+    if url and ttl > 0:
+        _url_cache.set((bucket, path), (expires_in, url), ttl=ttl)
+
+
+def forget(bucket: str, *paths: Optional[str]) -> None:
+    """Retire du cache les URLs de chemins supprimes ou remplaces"""
+    for path in paths:
+        if path:
+            _url_cache.pop((bucket, path))
+
+
+def cache_stats() -> dict:
+    """Compteurs du cache d'URLs signees (hits = appels Storage evites)"""
+    return _url_cache.stats()
+
+
+async def _sign_one(bucket: str, path: str, expires_in: int) -> Optional[str]:
+    try:
+        result = await db.storage.from_(bucket).create_signed_url(path, expires_in)
+        return result.get("signedURL") or result.get("signedUrl")
+    except Exception:
+        return None
+
+
+async def _sign_batch(bucket: str, paths: List[str], expires_in: int) -> Dict[str, Optional[str]]:
+    try:
+        items = await db.storage.from_(bucket).create_signed_urls(paths, expires_in)
+        return {
+            item["path"]: None if item.get("error") else (item.get("signedURL") or item.get("signedUrl"))
+            for item in items
+        }
+    except Exception as e:
+        # Storage renvoie signedURL = null pour un objet absent, ce que storage3
+        # refuse de valider: signer alors chemin par chemin (en parallele)
+        logger.debug(f"Signature groupee echouee ({len(paths)} chemins), repli unitaire: {e}")
+        urls = await asyncio.gather(*(_sign_one(bucket, p, expires_in) for p in paths))
+        return dict(zip(paths, urls))
+
+
+async def create_signed_urls(bucket: str, paths: Iterable[Optional[str]], expires_in: int) -> Dict[str, Optional[str]]:
+    """
+    Signe un ensemble de chemins: retourne {path: signed_url} (None si echec).
+    Les chemins vides et les doublons sont ignores.
+    """
+    urls: Dict[str, Optional[str]] = {}
+    to_sign = []
+    for path in dict.fromkeys(p for p in paths if p):
+        cached = _cached(bucket, path, expires_in)
+        if cached:
+            urls[path] = cached
+        else:
+            to_sign.append(path)
+    if not to_sign:
+        return urls
+    batches = [to_sign[i:i + SIGN_BATCH_SIZE] for i in range(0, len(to_sign), SIGN_BATCH_SIZE)]
+    for result in await asyncio.gather(*(_sign_batch(bucket, b, expires_in) for b in batches)):
+        for path, url in result.items():
+            _remember(bucket, path, expires_in, url)
+        urls.update(result)
+    return urls
+
+
+async def create_signed_url(bucket: str, path: Optional[str], expires_in: int) -> Optional[str]:
+    """Signe un chemin unique"""
+    if not path:
+        return None
+    url = _cached(bucket, path, expires_in)
+    if url is None:
+        url = await _sign_one(bucket, path, expires_in)
+        _remember(bucket, path, expires_in, url)
+    return url
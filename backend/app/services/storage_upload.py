@@ -0,0 +1,338 @@
+"""
+Upload en flux vers Supabase Storage (protocole resumable TUS).
+
+Le fichier recu est deja spoole sur disque par Starlette (UploadFile): il est
+envoye par blocs de TUS_CHUNK_SIZE octets, chaque bloc etant relu par
+morceaux pendant son envoi, sans jamais etre charge entierement en memoire.
+La taille est calculee au fil de l'envoi. Un bloc en echec est renvoye a
+partir de l'offset confirme par Storage (HEAD).
+
+Le nombre d'uploads simultanes vers Storage est borne par
+settings.max_concurrent_uploads (les suivants attendent leur tour).
+
+Le worker media (synchrone) transfere de meme entre Storage et des fichiers
+locaux: telechargement ecrit sur disque au fil de la reception
+(download_to_path), envoi relu depuis le disque par blocs (upload_path). La
+memoire utilisee par un job ne depend pas de la taille des fichiers. Les
+envois de nombreux petits fichiers (segments HLS) sont faits en parallele,
+en nombre borne (upload_paths).
+
+L'empreinte SHA-256 du contenu (deduplication, voir content_dedup) est
+calculee par morceaux: fichier spoole relu une fois avant l'envoi
+(hash_upload: un doublon n'est pas envoye), pendant le telechargement du
+worker (download_to_path, hasher) ou objet Storage relu en flux par le
+worker (hash_object, fichiers sans traitement media).
+"""
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterable, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+import httpx
+from fastapi import UploadFile
+
+from app.config import settings
+from app.db import db, http_client
+
+logger = logging.getLogger(__name__)
+
+# Taille de bloc imposee par Supabase Storage pour TUS (sauf dernier bloc)
+TUS_CHUNK_SIZE = 6 * 1024 * 1024
+TUS_VERSION = "1.0.0"
+CHUNK_RETRIES = 3
+# Morceaux lus / ecrits sur disque par le worker (memoire par transfert)
+STREAM_PIECE_SIZE = 256 * 1024
+
+_upload_slots = asyncio.Semaphore(settings.max_concurrent_uploads)
+
+
+def _auth_headers() -> dict:
+    return {
+        "apikey": settings.supabase_secret_key,
+        "Authorization": f"Bearer {settings.supabase_secret_key}",
+        "Tus-Resumable": TUS_VERSION
+    }
+
+
+def _metadata(**values: str) -> str:
+    return ",".join(f"{k} {base64.b64encode(v.encode()).decode()}" for k, v in values.items())
+
+
+def _create_headers(bucket: str, path: str, size: int, content_type: str, upsert: bool = False) -> dict:
+    headers = {
+        **_auth_headers(),
+        "Upload-Length": str(size),
+        "Upload-Metadata": _metadata(
+            bucketName=bucket,
+            objectName=path,
+            contentType=content_type,
+            cacheControl="3600"
+        )
+    }
+    if upsert:
+        headers["x-upsert"] = "true"
+    return headers
+
+
+def _storage_url(endpoint: str) -> str:
+    return f"{settings.supabase_url.rstrip('/')}/storage/v1/{endpoint}"
+
+
+async def _file_size(file: UploadFile) -> int:
+    if file.size is not None:
+        return file.size
+    await file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    await file.seek(0)
+    return size
+
+
+async def _create_upload(bucket: str, path: str, size: int, content_type: str) -> str:
+    """Cree la ressource TUS et retourne son URL"""
+    response = await http_client.post(
+        _storage_url("upload/resumable"),
+        headers=_create_headers(bucket, path, size, content_type)
+    )
+    if response.status_code != 201:
+        raise Exception(f"Creation upload TUS refusee ({response.status_code}): {response.text}")
+    return response.headers["location"]
+
+
+async def _server_offset(location: str) -> int:
+    response = await http_client.head(location, headers=_auth_headers())
+    response.raise_for_status()
+    return int(response.headers["upload-offset"])
+
+
+def _chunk_headers(offset: int) -> dict:
+    return {
+        **_auth_headers(),
+        "Upload-Offset": str(offset),
+        "Content-Type": "application/offset+octet-stream"
+    }
+
+
+def _confirmed_offset(response: httpx.Response) -> int:
+    if response.status_code != 204:
+        raise Exception(f"Bloc TUS refuse ({response.status_code}): {response.text}")
+    return int(response.headers["upload-offset"])
+
+
+async def _upload_pieces(file: UploadFile, offset: int, length: int) -> AsyncIterator[bytes]:
+    """Relit `length` octets du fichier spoole a partir de `offset` par morceaux de STREAM_PIECE_SIZE"""
+    await file.seek(offset)
+    while length > 0:
+        piece = await file.read(min(STREAM_PIECE_SIZE, length))
+        if not piece:
+            raise Exception(f"Fichier tronque a l'offset {offset}")
+        offset += len(piece)
+        length -= len(piece)
+        yield piece
+
+
+async def _send_chunk(location: str, offset: int, file: UploadFile, length: int) -> int:
+    """
+    Envoie un bloc, relu pendant l'envoi (un bloc entier en memoire resterait
+    reference par la requete httpx jusqu'au passage du ramasse-miettes).
+    Retourne le nouvel offset confirme par Storage.
+    """
+    response = await http_client.patch(
+        location,
+        content=_upload_pieces(file, offset, length),
+        headers={**_chunk_headers(offset), "Content-Length": str(length)}
+    )
+    return _confirmed_offset(response)
+
+
+async def _upload_resumable(bucket: str, path: str, file: UploadFile, size: int, content_type: str) -> int:
+    location = await _create_upload(bucket, path, size, content_type)
+    offset = 0
+    failures = 0
+    while offset < size:
+        try:
+            offset = await _send_chunk(location, offset, file, min(TUS_CHUNK_SIZE, size - offset))
+            failures = 0
+        except Exception as e:
+            failures += 1
+            if failures == CHUNK_RETRIES:
+                raise
+            logger.warning(f"Upload {path}: bloc a l'offset {offset} en echec ({e}), reprise")
+            # Reprendre a l'offset effectivement recu par Storage
+            offset = await _server_offset(location)
+    return offset
+
+
+async def hash_upload(file: UploadFile) -> str:
+    """Empreinte SHA-256 d'un UploadFile, relu par morceaux (fichier spoole)"""
+    digest = hashlib.sha256()
+    await file.seek(0)
+    while True:
+        piece = await file.read(STREAM_PIECE_SIZE)
+        if not piece:
+            break
+        digest.update(piece)
+    await file.seek(0)
+    return digest.hexdigest()
+
+
+async def upload_stream(bucket: str, path: str, file: UploadFile, content_type: str) -> int:
+    """
+    Envoie un UploadFile vers Storage sans le charger en memoire.
+    Retourne la taille envoyee (octets).
+    """
+    size = await _file_size(file)
+    async with _upload_slots:
+        await file.seek(0)
+        if size <= TUS_CHUNK_SIZE:
+            # Petit fichier: un seul appel, memoire bornee par TUS_CHUNK_SIZE
+            content = await file.read()
+            await db.storage.from_(bucket).upload(path, content, {"content-type": content_type})
+            return len(content)
+        return await _upload_resumable(bucket, path, file, size, content_type)
+
+
+# ============================================
+# WORKER (client synchrone, fichiers locaux)
+# ============================================
+
+_sync_client: Optional[httpx.Client] = None
+
+
+def _client() -> httpx.Client:
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = httpx.Client(timeout=httpx.Timeout(settings.db_timeout), follow_redirects=True)
+    return _sync_client
+
+
+def _file_pieces(f, offset: int, length: int) -> Iterator[bytes]:
+    """Relit `length` octets a partir de `offset` par morceaux de STREAM_PIECE_SIZE"""
+    f.seek(offset)
+    while length > 0:
+        piece = f.read(min(STREAM_PIECE_SIZE, length))
+        if not piece:
+            raise Exception(f"Fichier tronque a l'offset {f.tell()}")
+        length -= len(piece)
+        yield piece
+
+
+def download_to_path(bucket: str, path: str, local_path: str, hasher=None) -> int:
+    """
+    Telecharge un objet Storage vers un fichier local, morceau par morceau.
+    hasher (hashlib, optionnel): mis a jour avec chaque morceau recu.
+    Retourne la taille recue (octets).
+    """
+    size = 0
+    url = _storage_url(f"object/authenticated/{bucket}/{quote(path)}")
+    with _client().stream("GET", url, headers=_auth_headers()) as response:
+        if response.status_code != 200:
+            response.read()
+            raise Exception(f"Telechargement {path} refuse ({response.status_code}): {response.text}")
+        with open(local_path, "wb") as f:
+            for piece in response.iter_bytes(STREAM_PIECE_SIZE):
+                f.write(piece)
+                if hasher is not None:
+                    hasher.update(piece)
+                size += len(piece)
+    return size
+
+
+def hash_object(bucket: str, path: str) -> str:
+    """Empreinte SHA-256 d'un objet Storage, relu en flux (ni disque ni memoire)"""
+    digest = hashlib.sha256()
+    url = _storage_url(f"object/authenticated/{bucket}/{quote(path)}")
+    with _client().stream("GET", url, headers=_auth_headers()) as response:
+        if response.status_code != 200:
+            response.read()
+            raise Exception(f"Lecture {path} refusee ({response.status_code}): {response.text}")
+        for piece in response.iter_bytes(STREAM_PIECE_SIZE):
+            digest.update(piece)
+    return digest.hexdigest()
+
+
+def _upload_path_resumable(bucket: str, path: str, f, size: int, content_type: str, upsert: bool) -> int:
+    client = _client()
+    response = client.post(
+        _storage_url("upload/resumable"),
+        headers=_create_headers(bucket, path, size, content_type, upsert)
+    )
+    if response.status_code != 201:
+        raise Exception(f"Creation upload TUS refusee ({response.status_code}): {response.text}")
+    location = response.headers["location"]
+
+    offset = 0
+    failures = 0
+    while offset < size:
+        length = min(TUS_CHUNK_SIZE, size - offset)
+        try:
+            # Bloc relu depuis le disque pendant l'envoi (jamais en memoire entier)
+            response = client.patch(
+                location,
+                content=_file_pieces(f, offset, length),
+                headers={**_chunk_headers(offset), "Content-Length": str(length)}
+            )
+            offset = _confirmed_offset(response)
+            failures = 0
+        except Exception as e:
+            failures += 1
+            if failures == CHUNK_RETRIES:
+                raise
+            logger.warning(f"Upload {path}: bloc a l'offset {offset} en echec ({e}), reprise")
+            # Reprendre a l'offset effectivement recu par Storage
+            head = client.head(location, headers=_auth_headers())
+            head.raise_for_status()
+            offset = int(head.headers["upload-offset"])
+    return offset
+
+
+def upload_path(bucket: str, path: str, local_path: str, content_type: str, upsert: bool = False) -> int:
+    """
+    Envoie un fichier local vers Storage en le relisant au fil de l'envoi
+    (TUS par blocs de TUS_CHUNK_SIZE au-dela d'un bloc).
+    upsert: remplace l'objet existant. Retourne la taille envoyee (octets).
+    """
+    size = os.path.getsize(local_path)
+    with open(local_path, "rb") as f:
+        if size > TUS_CHUNK_SIZE:
+            return _upload_path_resumable(bucket, path, f, size, content_type, upsert)
+        # Petit fichier: un seul appel
+        headers = {
+            "apikey": settings.supabase_secret_key,
+            "Authorization": f"Bearer {settings.supabase_secret_key}",
+            "Content-Type": content_type,
+            "Content-Length": str(size),
+            "Cache-Control": "max-age=3600",
+            "x-upsert": "true" if upsert else "false"
+        }
+        response = _client().post(
+            _storage_url(f"object/{bucket}/{quote(path)}"),
+            content=_file_pieces(f, 0, size),
+            headers=headers
+        )
+        if response.status_code != 200:
+            raise Exception(f"Upload {path} refuse ({response.status_code}): {response.text}")
+        return size
+
+
+def upload_paths(
+    bucket: str,
+    files: Iterable[Tuple[str, str, str]],
+    concurrency: int,
+    upsert: bool = False
+) -> int:
+    """
+    Envoie des fichiers locaux (path, local_path, content_type) vers Storage,
+    au plus `concurrency` a la fois. Leve la premiere erreur rencontree.
+    Retourne la taille totale envoyee (octets).
+    """
+    _client()  # Client cree avant les threads (partage)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        sizes = pool.map(
+            lambda item: upload_path(bucket, item[0], item[1], item[2], upsert=upsert),
+            list(files)
+        )
+        return sum(sizes)
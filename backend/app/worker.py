@@ -0,0 +1,285 @@
+"""
+Worker de traitements media (thumbnails, compression video, empreintes de
+contenu).
+
+Lancement (depuis backend/):
+    python -m app.worker
+
+Chaque type de job a son propre pool de processus (voie): un encodage video
+long n'empeche pas les thumbnails d'images de passer. Par defaut la taille
+des voies et le nombre de threads FFmpeg par encodage sont deduits du nombre
+de coeurs disponibles (voir _concurrency), et les processus tournent avec
+une priorite reduite (nice) pour laisser la main a l'API sur la meme machine.
+
+Boucle: reserve autant de jobs que de processus libres dans chaque voie, les
+execute en parallele, prolonge leur reservation tant qu'ils tournent, puis
+enregistre succes (duree et etapes mesurees) ou echec (nouvel essai
+differe). Les jobs abandonnes par un worker arrete sont remis en file
+periodiquement, et les uploads directs jamais finalises supprimes. Un job
+qui depasse settings.media_job_timeout (la reservation, prolongee par le
+processus principal, n'expire pas si un encodage est bloque) est arrete:
+les processus de sa voie sont tues et le job passe en echec. L'etat des
+files est journalise toutes les settings.media_worker_status_interval
+secondes.
+
+SIGTERM / SIGINT: plus aucun job n'est reserve, les jobs en cours sont menes
+a terme avant l'arret.
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Tuple
+
+from app.config import settings
+from app.db import supabase_admin
+from app.services import media_jobs
+
+logger = logging.getLogger("app.worker")
+
+
+def _cpu_count() -> int:
+    """Coeurs utilisables par ce processus (limites cgroup/affinite incluses)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _concurrency() -> Tuple[int, int, int]:
+    """
+    (processus video, processus image, threads FFmpeg par encodage).
+    Valeurs de la configuration, ou deduites du nombre de coeurs si 0:
+    4 coeurs -> 1 encodage video a 3 threads + 1 processus image.
+    """
+    cores = _cpu_count()
+    image = settings.media_image_processes or max(1, cores // 4)
+    video = settings.media_video_processes or max(1, (cores - image) // 3)
+    threads = settings.media_ffmpeg_threads or max(1, (cores - image) // video)
+    return video, image, threads
+
+
+def _init_pool_process() -> None:
+    # Ctrl+C est gere par le processus principal (arret propre)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Groupe de processus propre: un job bloque est tue avec ses FFmpeg
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    if settings.media_worker_nice:
+        os.nice(settings.media_worker_nice)
+
+
+class Lane:
+    """Pool de processus dedie a un type de job"""
+
+    def __init__(self, job_type: str, processes: int):
+        self.job_type = job_type
+        self.processes = processes
+        self.running: Dict[Future, dict] = {}
+        self.started: Dict[Future, float] = {}
+        self.pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_pool_process
+        )
+
+    @property
+    def free(self) -> int:
+        return self.processes - len(self.running)
+
+    def expired(self, timeout: int) -> List[Future]:
+        """Jobs en cours depuis plus de `timeout` secondes"""
+        now = time.monotonic()
+        return [future for future, started in self.started.items()
+                if now - started > timeout and not future.done()]
+
+    def reset_pool(self) -> None:
+        """Processus tue (memoire, signal): le pool est inutilisable"""
+        logger.error(f"Pool {self.job_type} interrompu, recreation")
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = self._new_pool()
+
+    def kill_pool(self) -> None:
+        """
+        Job bloque: tue les processus du pool (pas d'API publique) et leurs
+        processus FFmpeg (meme groupe), puis recree le pool.
+        """
+        for process in list((self.pool._processes or {}).values()):
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (AttributeError, ProcessLookupError, PermissionError):
+                process.kill()
+        self.reset_pool()
+
+
+class MediaWorker:
+    """Reserve, execute et acquitte les jobs de la table media_jobs"""
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        video, image, self.ffmpeg_threads = _concurrency()
+        self.lanes: List[Lane] = [
+            Lane(media_jobs.JOB_VIDEO, video),
+            Lane(media_jobs.JOB_IMAGE_THUMBNAIL, image),
+            # Empreintes: lecture en flux, peu de CPU
+            Lane(media_jobs.JOB_CONTENT_HASH, 1)
+        ]
+        self.stopping = False
+        self._last_heartbeat = 0.0
+        self._last_requeue = 0.0
+        self._last_status = time.monotonic()
+
+    def stop(self, signum=None, frame=None) -> None:
+        if not self.stopping:
+            logger.info(f"Arret demande, {self._running_count()} job(s) en cours a terminer")
+        self.stopping = True
+
+    def _running_count(self) -> int:
+        return sum(len(lane.running) for lane in self.lanes)
+
+    def _claim(self, lane: Lane) -> int:
+        jobs = media_jobs.claim_jobs(supabase_admin, self.worker_id, lane.free, lane.job_type)
+        for job in jobs:
+            logger.info(f"Job {job['id']} ({job['job_type']}, essai {job['attempts']}) fichier {job['file_id']}")
+            future = lane.pool.submit(media_jobs.run_job, job, self.ffmpeg_threads)
+            lane.running[future] = job
+            lane.started[future] = time.monotonic()
+        return len(jobs)
+
+    def _finish(self, lane: Lane, future: Future) -> None:
+        job = lane.running.pop(future)
+        lane.started.pop(future, None)
+        error = future.exception()
+        if error is None:
+            timings = future.result()
+            media_jobs.complete_job(supabase_admin, job, timings)
+            logger.info(f"Job {job['id']} termine en {timings.get('total_ms')} ms {timings}")
+            return
+        self._fail(job, str(error) or type(error).__name__)
+
+    def _expire(self, lane: Lane) -> None:
+        """
+        Jobs au-dela de settings.media_job_timeout: les processus de la voie
+        sont tues (un processus du pool ne peut pas etre arrete seul), les
+        jobs depasses et ceux interrompus avec eux passent en echec (nouvel
+        essai differe), les jobs deja termines sont acquittes normalement.
+        """
+        expired = lane.expired(settings.media_job_timeout)
+        if not expired:
+            return
+        lane.kill_pool()
+        for future in list(lane.running):
+            if future in expired:
+                job = lane.running.pop(future)
+                lane.started.pop(future, None)
+                self._fail(job, f"Delai depasse ({settings.media_job_timeout} s)")
+            elif future.done() and not isinstance(future.exception(), BrokenProcessPool):
+                self._finish(lane, future)
+            else:
+                job = lane.running.pop(future)
+                lane.started.pop(future, None)
+                self._fail(job, "Interrompu (voie redemarree apres un job bloque)")
+
+    def _fail(self, job: dict, error: str) -> None:
+        new_status = media_jobs.fail_job(supabase_admin, job, error)
+        if new_status == "queued":
+            logger.warning(f"Job {job['id']} en echec ({error}), nouvel essai dans "
+                           f"{media_jobs.retry_delay(job['attempts'])}s")
+        else:
+            logger.error(f"Job {job['id']} en echec definitif apres {job['attempts']} essai(s): {error}")
+
+    def _log_status(self) -> None:
+        stats = {row["job_type"]: row for row in media_jobs.job_stats(supabase_admin)}
+        for lane in self.lanes:
+            row = stats.get(lane.job_type, {})
+            logger.info(
+                f"Voie {lane.job_type}: {len(lane.running)}/{lane.processes} en cours ici, "
+                f"{row.get('ready', 0)} pret(s) / {row.get('queued', 0)} en file, "
+                f"{row.get('processing', 0)} en cours (tous workers), "
+                f"{row.get('done_last_hour', 0)} termine(s) en 1h "
+                f"(moyenne {row.get('avg_duration_ms')} ms, p95 {row.get('p95_duration_ms')} ms)"
+            )
+
+    def _periodic(self) -> None:
+        now = time.monotonic()
+        # Prolonger la reservation bien avant son expiration
+        if self._running_count() and now - self._last_heartbeat >= settings.media_job_lock_timeout / 3:
+            job_ids = [job["id"] for lane in self.lanes for job in lane.running.values()]
+            media_jobs.heartbeat_jobs(supabase_admin, self.worker_id, job_ids)
+            self._last_heartbeat = now
+        if now - self._last_requeue >= settings.media_job_lock_timeout:
+            requeued = media_jobs.requeue_stale_jobs(supabase_admin)
+            if requeued:
+                logger.warning(f"{requeued} job(s) abandonne(s) remis en file")
+            purged = media_jobs.purge_pending_uploads(supabase_admin)
+            if purged:
+                logger.info(f"{purged} upload(s) direct(s) abandonne(s) supprime(s)")
+            self._last_requeue = now
+        if settings.media_worker_status_interval and \
+                now - self._last_status >= settings.media_worker_status_interval:
+            self._last_status = now
+            self._log_status()
+
+    def _iterate(self) -> None:
+        self._periodic()
+        if settings.media_job_timeout:
+            for lane in self.lanes:
+                self._expire(lane)
+        claimed = 0
+        if not self.stopping:
+            claimed = sum(self._claim(lane) for lane in self.lanes if lane.free > 0)
+        futures = {future: lane for lane in self.lanes for future in lane.running}
+        if not futures:
+            time.sleep(settings.media_job_poll_interval)
+            return
+        # Voies pleines ou files vides: attendre la fin d'un job (ou le prochain passage)
+        timeout = 0 if claimed else settings.media_job_poll_interval
+        done, _ = wait(list(futures), timeout=timeout, return_when=FIRST_COMPLETED)
+        broken = set()
+        for future in done:
+            lane = futures[future]
+            if isinstance(future.exception(), BrokenProcessPool):
+                broken.add(lane)
+            self._finish(lane, future)
+        for lane in broken:
+            lane.reset_pool()
+
+    def run(self) -> None:
+        logger.info(
+            f"Worker media {self.worker_id}: "
+            + ", ".join(f"{lane.job_type} x{lane.processes}" for lane in self.lanes)
+            + f", FFmpeg {self.ffmpeg_threads} thread(s) par encodage"
+        )
+        try:
+            while not self.stopping or self._running_count():
+                try:
+                    self._iterate()
+                except Exception as e:
+                    # Supabase indisponible...: reessayer au prochain passage
+                    logger.error(f"Erreur de la boucle du worker: {e}")
+                    time.sleep(settings.media_job_poll_interval)
+        finally:
+            for lane in self.lanes:
+                lane.pool.shutdown(wait=True)
+        logger.info("Worker media arrete")
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    worker = MediaWorker()
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Faux serveur Supabase pour les benchmarks: transports httpx qui repondent
+a PostgREST / Storage / Auth avec une latence reseau simulee et comptent
+les appels. Aucun acces reseau reel n'est effectue.
+"""
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+# Variables requises par app.config (les benchmarks n'appellent jamais Supabase)
+os.environ.setdefault("SUPABASE_URL", "http://supabase.bench")
+os.environ.setdefault("SUPABASE_PUBLISHABLE_KEY", "bench-publishable-key")
+os.environ.setdefault("SUPABASE_SECRET_KEY", "bench-secret-key")
+
+SUPABASE_URL = os.environ["SUPABASE_URL"]
+
+
+class MockSupabase:
+    """
+    Repond a toutes les requetes avec `handler(request)` apres `latency` secondes.
+    Le handler renvoie (status, body) ou (status, body, total): total = nombre
+    de lignes annonce dans Content-Range (requetes count="exact").
+    """
+
+    def __init__(self, latency: float = 0.05, handler=None):
+        self.latency = latency
+        self.handler = handler or default_handler
+        self.calls = []
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append((request.method, request.url.path))
+        status, body, *total = self.handler(request)
+        return httpx.Response(
+            status,
+            content=json.dumps(body).encode(),
+            headers={"content-type": "application/json", "content-range": f"0-0/{total[0] if total else 1}"}
+        )
+
+    def sync_transport(self) -> httpx.MockTransport:
+        def handle(request):
+            time.sleep(self.latency)
+            return self._respond(request)
+        return httpx.MockTransport(handle)
+
+    def async_transport(self) -> httpx.MockTransport:
+        async def handle(request):
+            await asyncio.sleep(self.latency)
+            return self._respond(request)
+        return httpx.MockTransport(handle)
+
+    def count(self, path_fragment: str = "") -> int:
+        return sum(1 for _, path in self.calls if path_fragment in path)
+
+    def reset(self) -> None:
+        self.calls.clear()
+
+
+def default_handler(request: httpx.Request):
+    """Une ligne generique pour toute requete PostgREST"""
+    return 200, [{"id": "00000000-0000-0000-0000-000000000001", "name": "row"}]
+
+
+async def run_load(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> float:
+    """Envoie `total` requetes GET avec `concurrency` clients simultanes, retourne req/s"""
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            response = await client.get(path)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start)
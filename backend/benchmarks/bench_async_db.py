@@ -0,0 +1,79 @@
+"""
+Benchmark: requetes/seconde d'un worker uvicorn avec le client Supabase
+synchrone (avant) et la couche async app.db (apres).
+
+Chaque route execute 3 requetes PostgREST sequentielles (cas typique:
+verification d'acces + lecture + lookup), chaque appel coutant LATENCY
+secondes de latence reseau simulee. Le tout tourne dans une seule boucle
+asyncio, comme un worker uvicorn.
+
+Usage (depuis backend/):
+    python -m benchmarks.bench_async_db [--latency 0.02] [--requests 300] [--concurrency 50]
+"""
+import argparse
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from supabase import AsyncClient, AsyncClientOptions, Client, ClientOptions
+from supabase_auth import AsyncMemoryStorage, SyncMemoryStorage
+
+from benchmarks._mock_supabase import MockSupabase, SUPABASE_URL, run_load
+
+QUERIES_PER_REQUEST = 3
+
+
+def build_app(mock: MockSupabase) -> FastAPI:
+    sync_client = Client(
+        SUPABASE_URL, "bench-secret-key",
+        options=ClientOptions(
+            storage=SyncMemoryStorage(),
+            httpx_client=httpx.Client(transport=mock.sync_transport())
+        )
+    )
+    async_client = AsyncClient(
+        SUPABASE_URL, "bench-secret-key",
+        options=AsyncClientOptions(
+            storage=AsyncMemoryStorage(),
+            httpx_client=httpx.AsyncClient(transport=mock.async_transport())
+        )
+    )
+    app = FastAPI()
+
+    # Avant: route async appelant le client synchrone (bloque la boucle)
+    @app.get("/before")
+    async def before():
+        for _ in range(QUERIES_PER_REQUEST):
+            sync_client.table("group").select("*").eq("id", "x").execute()
+        return {"ok": True}
+
+    # Apres: client async, les requetes concurrentes se recouvrent
+    @app.get("/after")
+    async def after():
+        for _ in range(QUERIES_PER_REQUEST):
+            await async_client.table("group").select("*").eq("id", "x").execute()
+        return {"ok": True}
+
+    return app
+
+
+async def main(latency: float, total: int, concurrency: int) -> None:
+    mock = MockSupabase(latency=latency)
+    app = build_app(mock)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+        print(f"latence={latency * 1000:.0f}ms, {QUERIES_PER_REQUEST} requetes/route, "
+              f"{total} requetes, concurrence={concurrency}")
+        for path in ("/before", "/after"):
+            mock.reset()
+            rps = await run_load(client, path, total, concurrency)
+            print(f"{path:8s} {rps:8.1f} req/s  ({mock.count('/rest/v1/')} appels PostgREST)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.requests, args.concurrency))
@@ -0,0 +1,132 @@
+"""
+Benchmark: stockage et CPU economises par la deduplication par contenu
+(files.content_hash, voir app.services.content_dedup).
+
+Scenario (par defaut): une video de debriefing 1080p envoyee sur 4 seances,
+un PDF de programme envoye sur 6 projets, 3 photos d'equipe envoyees sur 3
+seances.
+
+Avant: chaque envoi est stocke et traite (video: probe_video, plan_video,
+remux ou compress_video, puis vignette + planche d'apercus; photo: vignette
++ declinaisons; PDF: stocke tel quel).
+Apres: le premier envoi est stocke et traite; chaque envoi (premier compris)
+est hache en SHA-256 par morceaux, les suivants reprennent l'objet Storage et
+les derives du premier.
+
+Les envois d'un meme contenu etant identiques, le traitement est mesure une
+fois par contenu. CPU = temps utilisateur + systeme du processus (Pillow,
+SHA-256) et des processus FFmpeg (RUSAGE_CHILDREN). Le transfert reseau evite
+(envoi vers Storage, telechargement par le worker) n'est pas mesure.
+
+Usage (depuis backend/):
+    python -m benchmarks.bench_file_dedup [--seconds 30] [--videos 4] [--pdfs 6] [--photos 3] [--threads 0]
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+
+from benchmarks.bench_image_derivatives import make_photo
+from benchmarks.bench_video_transcode import cpu_children, make_clip, process_after
+
+from app.services.media_processor import VIDEO_SKIP, MediaProcessor
+from app.services.storage_upload import STREAM_PIECE_SIZE
+
+PDF_SIZE = 8 * 2 ** 20
+TEAM_PHOTOS = 3
+
+
+def cpu_total() -> float:
+    return time.process_time() + cpu_children()
+
+
+def sha256_file(path: str) -> str:
+    """Empreinte par morceaux, comme hash_upload / download_to_path"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for piece in iter(lambda: f.read(STREAM_PIECE_SIZE), b""):
+            digest.update(piece)
+    return digest.hexdigest()
+
+
+def process_video(source: str, work_dir: str, threads: int) -> list:
+    """Fichiers stockes pour une video (video traitee, vignette, planche)"""
+    stored = os.path.join(work_dir, "video.mp4")
+    poster = os.path.join(work_dir, "poster.jpg")
+    sprite = os.path.join(work_dir, "sprite.jpg")
+    action, _ = process_after(source, stored, threads)
+    if action == VIDEO_SKIP:
+        stored = source
+    info = MediaProcessor.probe_video(stored)
+    MediaProcessor.generate_video_previews(stored, poster, sprite, info["duration"], threads=threads)
+    return [stored, poster, sprite]
+
+
+def process_photo(source: str, work_dir: str) -> list:
+    """Fichiers stockes pour une photo (original, vignette, declinaisons)"""
+    thumbnail = os.path.join(work_dir, "thumb.jpg")
+    MediaProcessor.generate_image_thumbnail(source, thumbnail)
+    derivatives = MediaProcessor.generate_image_derivatives(source, work_dir)
+    return [source, thumbnail, *(d["local_path"] for d in derivatives)]
+
+
+def measure_content(name: str, source: str, copies: int, process) -> tuple:
+    """(octets avant, octets apres, cpu avant s, cpu apres s) pour un contenu"""
+    cpu = cpu_total()
+    stored = process()
+    cpu_process = cpu_total() - cpu
+    cpu = cpu_total()
+    for _ in range(copies):
+        sha256_file(source)
+    cpu_hash = (cpu_total() - cpu) / copies
+    size = sum(os.path.getsize(p) for p in stored)
+    mb = 2 ** 20
+    print(f"{name:22s} {copies:6d} {os.path.getsize(source) / mb:11.1f} {size / mb:11.1f} | "
+          f"{cpu_process:16.2f} {cpu_hash * 1000:15.1f}")
+    return size * copies, size, cpu_process * copies, cpu_process + cpu_hash * copies
+
+
+def main(seconds: float, videos: int, pdfs: int, photos: int, threads: int) -> None:
+    print(f"{'contenu':22s} {'envois':>6s} {'envoye (Mo)':>11s} {'stocke (Mo)':>11s} | "
+          f"{'traitement (cpu s)':>16s} {'sha256 (cpu ms)':>15s}")
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        video = os.path.join(work_dir, "debrief.mp4")
+        make_clip(video, 1920, 1080, "libx264", "16M", seconds)
+        video_dir = os.path.join(work_dir, "video")
+        os.makedirs(video_dir)
+        results.append(measure_content(
+            "video debriefing", video, videos, lambda: process_video(video, video_dir, threads)
+        ))
+
+        pdf = os.path.join(work_dir, "programme.pdf")
+        with open(pdf, "wb") as f:
+            f.write(os.urandom(PDF_SIZE))
+        results.append(measure_content("PDF programme", pdf, pdfs, lambda: [pdf]))
+
+        for i in range(TEAM_PHOTOS):
+            photo = os.path.join(work_dir, f"equipe_{i}.jpg")
+            photo_dir = os.path.join(work_dir, f"photo_{i}")
+            os.makedirs(photo_dir)
+            make_photo(photo, i)
+            results.append(measure_content(
+                f"photo d'equipe {i + 1}", photo, photos, lambda: process_photo(photo, photo_dir)
+            ))
+
+    before, after, cpu_before, cpu_after = (sum(r[i] for r in results) for i in range(4))
+    mb = 2 ** 20
+    print(f"Stockage: avant {before / mb:.1f} Mo, apres {after / mb:.1f} Mo "
+          f"({1 - after / before:.0%} economises); "
+          f"CPU: avant {cpu_before:.1f} s, apres {cpu_after:.1f} s ({1 - cpu_after / cpu_before:.0%} economises)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--videos", type=int, default=4)
+    parser.add_argument("--pdfs", type=int, default=6)
+    parser.add_argument("--photos", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0)
+    args = parser.parse_args()
+    main(args.seconds, args.videos, args.pdfs, args.photos, args.threads)
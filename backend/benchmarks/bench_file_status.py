@@ -0,0 +1,178 @@
+"""
+Benchmark: appels Supabase pendant le traitement d'un upload de 10 videos,
+vus par les FileManager ouverts sur la seance (--clients).
+
+Avant: tant qu'un fichier est en cours de traitement, le FileManager recharge
+la page (list_files) toutes les 5 secondes: deux comptages, la page de
+sources, la page de references et la signature des URLs de la page.
+Apres: un flux GET /api/files/status/stream (_status_events) pour les
+videos en cours. Chaque video terminee est relue et signee une fois.
+- lecture periodique: le hub relit les statuts des fichiers suivis toutes
+  les FILE_EVENTS_POLL_INTERVAL secondes (une requete pour tous les clients
+  du processus)
+- Realtime: les changements sont pousses par Supabase Realtime, le hub ne
+  relit la table que pour la resynchronisation (FILE_EVENTS_RESYNC_INTERVAL)
+
+Le temps est simule (--scale secondes reelles par seconde simulee): le
+worker traite --workers videos a la fois, --job-seconds secondes chacune.
+Le chargement initial de la page, identique dans les deux versions, n'est
+pas compte. Delai: temps moyen entre la fin d'un traitement et son
+affichage.
+
+Usage (depuis backend/):
+    python -m benchmarks.bench_file_status [--videos 10] [--workers 1] [--job-seconds 60] [--clients 1] [--scale 0.03]
+"""
+import argparse
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+import httpx
+
+from benchmarks._mock_supabase import MockSupabase
+
+import app.db
+from app.config import settings
+from app.models.file import EntityType
+from app.routers.file import BUCKET_NAME, _status_events, list_files
+from app.services import signed_urls
+from app.services.file_events import file_status_hub
+
+SESSION_ID = "5e5510f0-0000-4000-8000-000000000001"
+
+
+class UploadTimeline:
+    """Etat des videos en fonction du temps simule"""
+
+    def __init__(self, videos: int, workers: int, job_seconds: float, scale: float):
+        self.ids = [f"00000000-0000-4000-8000-{i:012d}" for i in range(videos)]
+        self.done_at = {file_id: (i // workers + 1) * job_seconds for i, file_id in enumerate(self.ids)}
+        self.scale = scale
+        self.start = 0.0
+
+    def now(self) -> float:
+        return (asyncio.get_running_loop().time() - self.start) / self.scale
+
+    def row(self, file_id: str) -> dict:
+        done = self.now() >= self.done_at[file_id]
+        return {
+            "id": file_id,
+            "origin_entity_type": "session",
+            "origin_entity_id": SESSION_ID,
+            "file_type": "video",
+            "file_name": f"video{file_id[-2:]}.mp4",
+            "file_path": f"session/{SESSION_ID}/{file_id}_video.mp4",
+            "file_size": 80 * 2 ** 20,
+            "mime_type": "video/mp4",
+            "uploaded_by": SESSION_ID,
+            "created_at": "2026-10-16T10:00:00+00:00",
+            "thumbnail_path": f"session/{SESSION_ID}/thumbnails/{file_id}_thumb.jpg" if done else None,
+            "processing_status": "ready" if done else "processing",
+            "processing_error": None
+        }
+
+    def handler(self, request: httpx.Request):
+        path = request.url.path
+        if path.startswith("/storage/v1/object/sign/"):
+            body = json.loads(request.content)
+            return 200, [
+                {"path": p, "signedURL": f"/object/sign/{BUCKET_NAME}/{p}?token=t", "error": None}
+                for p in body["paths"]
+            ]
+        if path.endswith("/files_reference"):
+            return 200, [], 0
+        params = parse_qs(request.url.query.decode())
+        ids = self.ids
+        if "id" in params:
+            ids = params["id"][0][len("in.("):-1].split(",")
+        rows = [self.row(file_id) for file_id in ids]
+        columns = params.get("select", ["*"])[0]
+        if columns != "*":
+            rows = [{c: r[c] for c in columns.split(",")} for r in rows]
+        return 200, rows, len(rows)
+
+
+async def run_before(timeline: UploadTimeline, delays: list) -> None:
+    """Rechargement de la page toutes les 5 s tant qu'une video est en cours"""
+    seen = set()
+    while True:
+        await asyncio.sleep(5 * timeline.scale)
+        page = await list_files(EntityType.session, SESSION_ID, offset=0, limit=20, user=None)
+        for f in page.items:
+            if f.processing_status == "ready" and f.id not in seen:
+                seen.add(f.id)
+                delays.append(timeline.now() - timeline.done_at[f.id])
+        if not any(f.processing_status == "processing" for f in page.items):
+            return
+
+
+async def run_after(timeline: UploadTimeline, delays: list) -> None:
+    """Un flux SSE pour les videos en cours, jusqu'a la fin des traitements"""
+    async for event in _status_events(timeline.ids):
+        if event.startswith("event: file"):
+            f = json.loads(event.split("data: ", 1)[1])
+            delays.append(timeline.now() - timeline.done_at[f["id"]])
+
+
+async def push_realtime(timeline: UploadTimeline) -> None:
+    """Evenements Realtime: le worker ecrit le statut en fin de traitement"""
+    for file_id, done_at in sorted(timeline.done_at.items(), key=lambda item: item[1]):
+        await asyncio.sleep(max(0.0, done_at - timeline.now()) * timeline.scale)
+        file_status_hub.publish(timeline.row(file_id))
+
+
+async def measure(label: str, args, mock: MockSupabase) -> None:
+    timeline = UploadTimeline(args.videos, args.workers, args.job_seconds, args.scale)
+    mock.handler = timeline.handler
+    signed_urls._url_cache.clear()
+    # URLs des fichiers deja signees au chargement initial de la page
+    await signed_urls.create_signed_urls(BUCKET_NAME, [timeline.row(i)["file_path"] for i in timeline.ids], 3600)
+    mock.reset()
+    delays = []
+    timeline.start = asyncio.get_running_loop().time()
+
+    if label == "avant (5 s)":
+        await asyncio.gather(*(run_before(timeline, delays) for _ in range(args.clients)))
+    else:
+        realtime = label.endswith("Realtime")
+        await file_status_hub.start()
+        file_status_hub.realtime_connected = realtime
+        pusher = asyncio.create_task(push_realtime(timeline)) if realtime else None
+        await asyncio.gather(*(run_after(timeline, delays) for _ in range(args.clients)))
+        if pusher:
+            await pusher
+        await file_status_hub.stop()
+
+    db_calls, storage_calls = mock.count("/rest/v1/"), mock.count("/storage/v1/")
+    avg_delay = sum(delays) / len(delays) if delays else 0
+    print(f"{label:26s} {db_calls:9d} {storage_calls:15d} {db_calls + storage_calls:7d} "
+          f"{avg_delay:10.1f} {timeline.now():9.0f}")
+
+
+async def main(args) -> None:
+    mock = MockSupabase(latency=0)
+    app.db._http_client._transport._transport = mock.async_transport()
+    settings.file_events_realtime = False
+    scale = args.scale
+    poll, resync, keepalive = settings.file_events_poll_interval, settings.file_events_resync_interval, \
+        settings.file_events_keepalive
+    settings.file_events_poll_interval = poll * scale
+    settings.file_events_resync_interval = resync * scale
+    settings.file_events_keepalive = keepalive * scale
+
+    print(f"{args.videos} videos, {args.workers} traitement(s) en parallele de {args.job_seconds:g} s, "
+          f"{args.clients} client(s), lecture periodique {poll:g} s, resynchronisation Realtime {resync:g} s")
+    print(f"{'version':26s} {'appels DB':>9s} {'appels Storage':>15s} {'total':>7s} "
+          f"{'delai (s)':>10s} {'duree (s)':>9s}")
+    for label in ("avant (5 s)", "apres, lecture periodique", "apres, Realtime"):
+        await measure(label, args, mock)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--videos", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--job-seconds", type=float, default=60)
+    parser.add_argument("--clients", type=int, default=1)
+    parser.add_argument("--scale", type=float, default=0.03)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,109 @@
+"""
+Benchmark: octets telecharges par le navigateur pour la galerie d'une seance.
+
+Scenario (par defaut): 24 photos de 4000x3000, grille de vignettes de 200 px
+CSS, ecran DPR 2, 6 photos ouvertes en plein ecran (1200 px CSS de large
+maximum), et la mediatheque de l'editeur (grille de 150 px CSS) ouverte une fois.
+
+Avant: vignette JPEG 400x400 pour la grille, original pour le plein ecran et
+pour la mediatheque.
+Apres: srcset des declinaisons (MediaProcessor.generate_image_derivatives),
+le navigateur prend la plus petite declinaison d'au moins la largeur affichee
+x DPR, en WebP (ou le repli JPEG pour les navigateurs sans WebP).
+
+Les photos sont synthetiques (bruit + degrades, qualite JPEG 92); --images
+permet de mesurer sur un dossier de vraies photos.
+
+Usage (depuis backend/):
+    python -m benchmarks.bench_image_derivatives [--photos 24] [--opened 6] [--dpr 2] [--images DIR]
+"""
+import argparse
+import glob
+import os
+import tempfile
+
+from PIL import Image, ImageFilter
+
+# Variables requises par app.config (ce benchmark n'appelle jamais Supabase)
+os.environ.setdefault("SUPABASE_URL", "http://supabase.bench")
+os.environ.setdefault("SUPABASE_PUBLISHABLE_KEY", "bench-publishable-key")
+os.environ.setdefault("SUPABASE_SECRET_KEY", "bench-secret-key")
+
+from app.services.media_processor import MediaProcessor
+
+GRID_CSS_WIDTH = 200
+PICKER_CSS_WIDTH = 150
+FULLSCREEN_CSS_WIDTH = 1200
+
+
+def make_photo(path: str, seed: int) -> None:
+    """Photo synthetique 4000x3000 (detail fin + degrades)"""
+    noise = Image.effect_noise((2000, 1500), 40 + seed % 20)
+    gradient = Image.linear_gradient("L").resize((2000, 1500)).rotate(seed * 37 % 360)
+    img = Image.merge("RGB", (noise, gradient, noise.filter(ImageFilter.GaussianBlur(1))))
+    img.resize((4000, 3000), Image.Resampling.BICUBIC).save(path, "JPEG", quality=92)
+
+
+def pick(derivatives: list, fmt: str, needed_px: int) -> int:
+    """Taille de la declinaison choisie par le navigateur (srcset + sizes)"""
+    candidates = sorted((d for d in derivatives if d["format"] == fmt), key=lambda d: d["width"])
+    for d in candidates:
+        if d["width"] >= needed_px:
+            return d["size"]
+    return candidates[-1]["size"]
+
+
+def measure(paths: list, opened: int, dpr: float, work_dir: str) -> dict:
+    """Octets par version et par vue: {version: [grille, mediatheque, plein ecran]}"""
+    totals = {"avant": [0, 0, 0], "apres (webp)": [0, 0, 0], "apres (jpeg)": [0, 0, 0]}
+    for i, path in enumerate(paths):
+        original = os.path.getsize(path)
+        thumb_path = os.path.join(work_dir, f"thumb{i}.jpg")
+        MediaProcessor.generate_image_thumbnail(path, thumb_path)
+        out_dir = tempfile.mkdtemp(dir=work_dir)
+        derivatives = MediaProcessor.generate_image_derivatives(path, out_dir, formats=("webp", "jpeg"))
+
+        is_opened = i < opened
+        views = totals["avant"]
+        views[0] += os.path.getsize(thumb_path)
+        views[1] += original
+        views[2] += original if is_opened else 0
+        for label, fmt in (("apres (webp)", "webp"), ("apres (jpeg)", "jpeg")):
+            views = totals[label]
+            views[0] += pick(derivatives, fmt, GRID_CSS_WIDTH * dpr)
+            views[1] += pick(derivatives, fmt, PICKER_CSS_WIDTH * dpr)
+            views[2] += pick(derivatives, fmt, FULLSCREEN_CSS_WIDTH * dpr) if is_opened else 0
+    return totals
+
+
+def main(photos: int, opened: int, dpr: float, images_dir: str) -> None:
+    with tempfile.TemporaryDirectory() as work_dir:
+        if images_dir:
+            paths = sorted(glob.glob(os.path.join(images_dir, "*.jp*g")))[:photos]
+        else:
+            paths = []
+            for i in range(photos):
+                paths.append(os.path.join(work_dir, f"photo{i}.jpg"))
+                make_photo(paths[-1], i)
+        originals = sum(os.path.getsize(p) for p in paths)
+        print(f"{len(paths)} photos ({originals / len(paths) / 2 ** 20:.1f} Mo en moyenne), "
+              f"{opened} ouvertes en plein ecran, DPR {dpr:g}")
+        totals = measure(paths, opened, dpr, work_dir)
+
+    mb = 2 ** 20
+    before = sum(totals["avant"])
+    print(f"{'version':14s} {'grille':>8s} {'mediatheque':>12s} {'plein ecran':>12s} {'total (Mo)':>11s} {'vs avant':>9s}")
+    for label, (grid, picker, fullscreen) in totals.items():
+        total = grid + picker + fullscreen
+        print(f"{label:14s} {grid / mb:8.2f} {picker / mb:12.2f} {fullscreen / mb:12.2f} "
+              f"{total / mb:11.2f} {total / before:9.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--photos", type=int, default=24)
+    parser.add_argument("--opened", type=int, default=6)
+    parser.add_argument("--dpr", type=float, default=2)
+    parser.add_argument("--images", default="")
+    args = parser.parse_args()
+    main(args.photos, args.opened, args.dpr, args.images)
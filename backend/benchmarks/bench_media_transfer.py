@@ -0,0 +1,111 @@
+"""
+Benchmark: memoire d'un job video pour le transfert Storage <-> disque
+(telechargement de l'original, envoi de la version compressee).
+
+Avant: download() charge tout l'objet en memoire puis l'ecrit sur disque; la
+version compressee est relue entierement (f.read()) avant l'upload.
+Apres: download_to_path / upload_path (app.services.storage_upload), lecture
+et ecriture par morceaux de STREAM_PIECE_SIZE, upload TUS par blocs relus
+depuis le disque pendant l'envoi.
+
+Le faux Storage consomme les corps de requete sans les conserver: la memoire
+mesuree (tracemalloc, pic) est celle du worker.
+
+Usage (depuis backend/):
+    python -m benchmarks.bench_media_transfer [--size-mb 200]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import httpx
+
+from benchmarks._mock_supabase import SUPABASE_URL
+
+from app.services import storage_upload
+from app.services.storage_upload import download_to_path, upload_path
+
+BUCKET = "rise4tlg-files"
+PATH = "session/s1/video.mp4"
+
+
+class FakeStorage(httpx.BaseTransport):
+    """Storage minimal: GET objet, upload simple, upload TUS (POST/PATCH/HEAD)"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.received = 0
+
+    def _object(self):
+        left = self.size
+        while left:
+            n = min(left, 64 * 1024)
+            left -= n
+            yield b"\0" * n
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.method == "GET":
+            return httpx.Response(200, content=self._object())
+        if request.method == "POST" and path.endswith("/upload/resumable"):
+            self.received = 0
+            return httpx.Response(201, headers={"location": f"{SUPABASE_URL}/storage/v1/upload/resumable/u1"})
+        if request.method == "PATCH":
+            self.received += sum(len(piece) for piece in request.stream)
+            return httpx.Response(204, headers={"upload-offset": str(self.received)})
+        if request.method == "HEAD":
+            return httpx.Response(200, headers={"upload-offset": str(self.received)})
+        self.received = sum(len(piece) for piece in request.stream)
+        return httpx.Response(200, json={"Key": path})
+
+
+def transfer_before(client: httpx.Client, local_path: str) -> None:
+    """Reproduction de l'ancien process_video (objets entiers en memoire)"""
+    url = f"{SUPABASE_URL}/storage/v1/object/{BUCKET}/{PATH}"
+    content = client.get(url).content
+    with open(local_path, "wb") as f:
+        f.write(content)
+    del content
+    with open(local_path, "rb") as f:
+        compressed_content = f.read()
+    client.post(url, content=compressed_content)
+
+
+def transfer_after(client: httpx.Client, local_path: str) -> None:
+    download_to_path(BUCKET, PATH, local_path)
+    upload_path(BUCKET, PATH, local_path, "video/mp4", upsert=True)
+
+
+def measure(transfer, size: int) -> tuple:
+    client = httpx.Client(transport=FakeStorage(size))
+    storage_upload._sync_client = client
+    temp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
+    temp.close()
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        transfer(client, temp.name)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak / 2 ** 20, elapsed * 1000
+    finally:
+        os.unlink(temp.name)
+
+
+def main(size_mb: int) -> None:
+    size = size_mb * 2 ** 20
+    print(f"video de {size_mb} Mo, pic memoire Python (tracemalloc)")
+    print(f"{'version':10s} {'pic (Mo)':>10s} {'temps (ms)':>11s}")
+    for label, transfer in (("avant", transfer_before), ("apres", transfer_after)):
+        peak, ms = measure(transfer, size)
+        print(f"{label:10s} {peak:10.1f} {ms:11.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=200)
+    args = parser.parse_args()
+    main(args.size_mb)
@@ -0,0 +1,205 @@
+"""
+Benchmark: latence d'un clic de statut sur un axe de travail de groupe
+(PUT /api/coach/groups/{group_id}/sessions/{session_id}/work-lead-masters)
+selon la taille du groupe.
+
+Avant: upsert de session_master_work_lead_master puis boucle Python par projet
+(lookup/insert work_lead, copie des files_reference une par une,
+select + insert/update session_work_lead).
+Apres: un seul appel RPC propagate_work_lead_master_status (migration 011).
+
+Les verifications d'acces communes aux deux versions ne sont pas mesurees.
+Chaque appel HTTP coute LATENCY secondes; le cout d'execution SQL cote
+Postgres n'est pas simule (quelques ms pour une fonction set-based).
+
+Deux scenarios:
+- premier clic: les work_lead des projets n'existent pas encore (creation +
+  partage des fichiers du master)
+- clic suivant: work_lead et session_work_lead existent deja
+
+Usage (depuis backend/):
+    python -m benchmarks.bench_propagation [--latency 0.01] [--files 3] [--clicks 3]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from supabase import AsyncClient, AsyncClientOptions
+from supabase_auth import AsyncMemoryStorage
+
+from benchmarks._mock_supabase import MockSupabase, SUPABASE_URL
+
+GROUP_SIZES = (5, 10, 20, 30, 50)
+SESSION_MASTER_ID = "00000000-0000-0000-0000-0000000000aa"
+WORK_LEAD_MASTER_ID = "00000000-0000-0000-0000-0000000000bb"
+PROFILE_ID = "00000000-0000-0000-0000-0000000000cc"
+
+
+def make_handler(group_size: int, first_click: bool, files_count: int):
+    def handler(request: httpx.Request):
+        table = request.url.path.rsplit("/", 1)[-1]
+        if "/rpc/" in request.url.path:
+            return 200, group_size
+        if request.method != "GET":
+            return 200, [{"id": "00000000-0000-0000-0000-000000000001"}]
+        if table == "session":
+            return 200, [{"id": f"s{i}", "project_id": f"p{i}"} for i in range(group_size)]
+        if table == "work_lead":
+            return 200, [] if first_click else [{"id": "wl"}]
+        if table == "files":
+            return 200, [{"id": f"f{i}"} for i in range(files_count)]
+        if table == "files_reference":
+            return 200, []
+        if table == "session_work_lead":
+            return 200, [] if first_click else [{"session_id": "s", "override_master": False}]
+        if table == "session_master_work_lead_master":
+            return 200, [] if first_click else [{"session_master_id": SESSION_MASTER_ID}]
+        return 200, [{"id": WORK_LEAD_MASTER_ID, "name": "Axe", "content": None, "work_lead_type_id": "t"}]
+    return handler
+
+
+async def click_before(db: AsyncClient, status: str) -> None:
+    """Reproduction de la sequence d'appels de l'ancienne implementation"""
+    existing = await db.table("session_master_work_lead_master")\
+        .select("session_master_id")\
+        .eq("session_master_id", SESSION_MASTER_ID)\
+        .eq("work_lead_master_id", WORK_LEAD_MASTER_ID)\
+        .execute()
+    if existing.data:
+        await db.table("session_master_work_lead_master")\
+            .update({"status": status, "profile_id": PROFILE_ID})\
+            .eq("session_master_id", SESSION_MASTER_ID)\
+            .eq("work_lead_master_id", WORK_LEAD_MASTER_ID)\
+            .execute()
+    else:
+        await db.table("session_master_work_lead_master")\
+            .insert({
+                "session_master_id": SESSION_MASTER_ID,
+                "work_lead_master_id": WORK_LEAD_MASTER_ID,
+                "status": status,
+                "profile_id": PROFILE_ID
+            })\
+            .execute()
+
+    wlm = (await db.table("work_lead_master")
+           .select("id, name, content, work_lead_type_id")
+           .eq("id", WORK_LEAD_MASTER_ID)
+           .execute()).data[0]
+    sessions = await db.table("session")\
+        .select("id, project_id")\
+        .eq("session_master_id", SESSION_MASTER_ID)\
+        .eq("is_deleted", False)\
+        .execute()
+
+    for session_data in sessions.data:
+        existing_wl = await db.table("work_lead")\
+            .select("id")\
+            .eq("project_id", session_data["project_id"])\
+            .eq("work_lead_master_id", WORK_LEAD_MASTER_ID)\
+            .eq("is_deleted", False)\
+            .execute()
+        if existing_wl.data:
+            work_lead_id = existing_wl.data[0]["id"]
+        else:
+            new_wl = await db.table("work_lead").insert({
+                "project_id": session_data["project_id"],
+                "work_lead_master_id": WORK_LEAD_MASTER_ID,
+                "work_lead_type_id": wlm["work_lead_type_id"],
+                "name": wlm["name"],
+                "content": wlm.get("content")
+            }).execute()
+            work_lead_id = new_wl.data[0]["id"]
+            source_files = await db.table("files").select("id")\
+                .eq("origin_entity_type", "work_lead_master")\
+                .eq("origin_entity_id", WORK_LEAD_MASTER_ID)\
+                .execute()
+            for file_record in source_files.data:
+                await db.table("files_reference").insert({
+                    "files_id": file_record["id"],
+                    "entity_type": "work_lead",
+                    "entity_id": work_lead_id
+                }).execute()
+            shared_files = await db.table("files_reference").select("files_id")\
+                .eq("entity_type", "work_lead_master")\
+                .eq("entity_id", WORK_LEAD_MASTER_ID)\
+                .execute()
+            for ref_record in shared_files.data:
+                await db.table("files_reference").insert({
+                    "files_id": ref_record["files_id"],
+                    "entity_type": "work_lead",
+                    "entity_id": work_lead_id
+                }).execute()
+
+        existing_swl = await db.table("session_work_lead")\
+            .select("session_id, override_master")\
+            .eq("session_id", session_data["id"])\
+            .eq("work_lead_id", work_lead_id)\
+            .execute()
+        if existing_swl.data:
+            if existing_swl.data[0].get("override_master") == False:
+                await db.table("session_work_lead")\
+                    .update({"status": status, "profile_id": PROFILE_ID})\
+                    .eq("session_id", session_data["id"])\
+                    .eq("work_lead_id", work_lead_id)\
+                    .execute()
+        else:
+            await db.table("session_work_lead").insert({
+                "session_id": session_data["id"],
+                "work_lead_id": work_lead_id,
+                "status": status,
+                "override_master": False,
+                "profile_id": PROFILE_ID
+            }).execute()
+
+
+async def click_after(db: AsyncClient, status: str) -> None:
+    """Implementation actuelle: une transaction Postgres"""
+    await db.rpc("propagate_work_lead_master_status", {
+        "p_session_master_id": SESSION_MASTER_ID,
+        "p_work_lead_master_id": WORK_LEAD_MASTER_ID,
+        "p_status": status,
+        "p_profile_id": PROFILE_ID
+    }).execute()
+
+
+async def measure(click, mock: MockSupabase, clicks: int) -> tuple:
+    db = AsyncClient(
+        SUPABASE_URL, "bench-secret-key",
+        options=AsyncClientOptions(
+            storage=AsyncMemoryStorage(),
+            httpx_client=httpx.AsyncClient(transport=mock.async_transport())
+        )
+    )
+    timings = []
+    for _ in range(clicks):
+        mock.reset()
+        start = time.perf_counter()
+        await click(db, "WORKING")
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, len(mock.calls)
+
+
+async def main(latency: float, files_count: int, clicks: int) -> None:
+    print(f"latence={latency * 1000:.0f}ms/appel, {files_count} fichiers sur l'axe, "
+          f"mediane sur {clicks} clics")
+    print(f"{'scenario':14s} {'bateaux':>7s} {'avant (ms)':>11s} {'appels':>7s} "
+          f"{'apres (ms)':>11s} {'appels':>7s}")
+    for first_click in (True, False):
+        label = "premier clic" if first_click else "clic suivant"
+        for size in GROUP_SIZES:
+            mock = MockSupabase(latency=latency, handler=make_handler(size, first_click, files_count))
+            before_ms, before_calls = await measure(click_before, mock, clicks)
+            after_ms, after_calls = await measure(click_after, mock, clicks)
+            print(f"{label:14s} {size:7d} {before_ms:11.0f} {before_calls:7d} "
+                  f"{after_ms:11.0f} {after_calls:7d}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--files", type=int, default=3)
+    parser.add_argument("--clicks", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.files, args.clicks))
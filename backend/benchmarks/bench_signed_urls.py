@@ -0,0 +1,132 @@
+"""
+Benchmark: signature des URLs d'une page de fichiers
+(GET /api/files/{entity_type}/{entity_id}?limit=100).
+
+Avant: create_signed_url sequentiel, un appel Storage par fichier plus un
+par thumbnail.
+Apres: _add_urls_to_files (app.services.signed_urls), un appel
+create_signed_urls groupe pour toute la page a la premiere ouverture, puis
+aucun appel a la reouverture tant que les URLs en cache restent valides.
+Local: URLs signees par l'API (HMAC, MEDIA_URL_MODE=local), sans appel reseau.
+
+Les lectures PostgREST (comptage + page) sont identiques dans les deux
+versions et ne sont pas mesurees. Chaque appel HTTP coute LATENCY secondes.
+
+Usage (depuis backend/):
+    python -m benchmarks.bench_signed_urls [--latency 0.02] [--files 100] [--runs 3] [--missing 0]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from benchmarks._mock_supabase import MockSupabase
+
+import app.db
+from app.services import signed_urls
+from app.services.media_urls import sign_media_urls
+from app.routers.file import BUCKET_NAME, SIGNED_URL_EXPIRY, _add_urls_to_files
+
+
+def make_files(count: int) -> list:
+    """Une page de fichiers: 2/3 d'images/videos avec thumbnail"""
+    return [
+        {
+            "id": f"f{i}",
+            "file_path": f"project/p1/f{i}_photo.jpg",
+            "thumbnail_path": f"project/p1/thumbnails/f{i}_thumb.jpg" if i % 3 else None
+        }
+        for i in range(count)
+    ]
+
+
+def make_handler(missing: set):
+    def handler(request: httpx.Request):
+        body = json.loads(request.content)
+        if "paths" in body:
+            return 200, [
+                {
+                    "path": p,
+                    "signedURL": None if p in missing else f"/object/sign/{BUCKET_NAME}/{p}?token=t",
+                    "error": "Either the object does not exist or you do not have access to it" if p in missing else None
+                }
+                for p in body["paths"]
+            ]
+        path = request.url.path.split(f"/object/sign/{BUCKET_NAME}/", 1)[-1]
+        if path in missing:
+            return 400, {"statusCode": "404", "error": "not_found", "message": "Object not found"}
+        return 200, {"signedURL": f"/object/sign/{BUCKET_NAME}/{path}?token=t"}
+    return handler
+
+
+async def sign_before(files: list) -> None:
+    """Reproduction de l'ancienne implementation (_add_urls_to_file par fichier)"""
+    bucket = app.db.db.storage.from_(BUCKET_NAME)
+
+    async def sign(path):
+        try:
+            result = await bucket.create_signed_url(path, SIGNED_URL_EXPIRY)
+            return result.get("signedURL") or result.get("signedUrl")
+        except Exception:
+            return None
+
+    for f in files:
+        f["signed_url"] = await sign(f["file_path"])
+        f["thumbnail_url"] = await sign(f["thumbnail_path"]) if f.get("thumbnail_path") else None
+
+
+async def sign_after(files: list) -> None:
+    await _add_urls_to_files(files)
+
+
+async def sign_local(files: list) -> None:
+    paths = [p for f in files for p in (f["file_path"], f.get("thumbnail_path"))]
+    urls = sign_media_urls(BUCKET_NAME, paths, SIGNED_URL_EXPIRY)
+    for f in files:
+        f["signed_url"] = urls.get(f["file_path"])
+        f["thumbnail_url"] = urls.get(f["thumbnail_path"]) if f.get("thumbnail_path") else None
+
+
+async def measure(sign, mock: MockSupabase, count: int, runs: int, warm: bool = False) -> tuple:
+    timings = []
+    for _ in range(runs):
+        files = make_files(count)
+        if warm:
+            await sign(make_files(count))
+        else:
+            signed_urls._url_cache.clear()
+        mock.reset()
+        start = time.perf_counter()
+        await sign(files)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, len(mock.calls)
+
+
+async def main(latency: float, count: int, runs: int, missing_count: int) -> None:
+    missing = {f["file_path"] for f in make_files(count)[:missing_count]}
+    mock = MockSupabase(latency=latency, handler=make_handler(missing))
+    app.db._http_client._transport._transport = mock.async_transport()
+
+    print(f"latence={latency * 1000:.0f}ms/appel, {count} fichiers, "
+          f"{missing_count} objets absents du bucket, mediane sur {runs} executions")
+    print(f"{'version':22s} {'temps (ms)':>11s} {'appels Storage':>15s}")
+    for label, sign, warm in (("avant", sign_before, False),
+                              ("apres, 1re ouverture", sign_after, False),
+                              ("apres, reouverture", sign_after, True),
+                              ("local (HMAC)", sign_local, False)):
+        ms, calls = await measure(sign, mock, count, runs, warm)
+        print(f"{label:22s} {ms:11.2f} {calls:15d}")
+    print(f"cache: {signed_urls.cache_stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--missing", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.files, args.runs, args.missing))
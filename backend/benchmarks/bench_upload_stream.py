@@ -0,0 +1,97 @@
+"""
+Benchmark (et verification): memoire de l'API pendant l'upload d'un fichier
+de plusieurs Go (POST /upload -> storage_upload.upload_stream).
+
+Avant: upload_file lisait tout le fichier (await file.read()) avant l'envoi
+a Storage: le pic de memoire suivait la taille du fichier (non execute ici,
+un fichier de 4 Go demanderait 4 Go de RAM).
+Apres: upload_stream relit le fichier spoole par blocs TUS de
+TUS_CHUNK_SIZE octets, un PATCH par bloc.
+
+Le fichier est un fichier creux (sparse) de --size-gb Go, passe a
+upload_stream comme un UploadFile. Le faux Storage (TUS: POST / PATCH / HEAD)
+consomme les blocs sans les conserver. Le pic de RSS du processus
+(ru_maxrss) est mesure apres un premier upload d'echauffement; le script
+echoue (code 1) si l'upload l'augmente de plus de MAX_CHUNKS blocs.
+
+Usage (depuis backend/):
+    python -m benchmarks.bench_upload_stream [--size-gb 4]
+"""
+import argparse
+import asyncio
+import resource
+import tempfile
+import time
+
+import httpx
+from fastapi import UploadFile
+
+from benchmarks._mock_supabase import SUPABASE_URL
+
+from app.services import storage_upload
+from app.services.storage_upload import TUS_CHUNK_SIZE, upload_stream
+
+BUCKET = "rise4tlg-files"
+MAX_CHUNKS = 4  # Bloc lu + copies httpx / requete en cours
+
+
+class FakeTusStorage(httpx.AsyncBaseTransport):
+    """Endpoint TUS minimal: les blocs recus sont comptes, jamais conserves"""
+
+    def __init__(self):
+        self.received = 0
+        self.patches = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            self.received = 0
+            return httpx.Response(201, headers={"location": f"{SUPABASE_URL}/storage/v1/upload/resumable/u1"})
+        if request.method == "PATCH":
+            self.patches += 1
+            async for piece in request.stream:
+                self.received += len(piece)
+            return httpx.Response(204, headers={"upload-offset": str(self.received)})
+        return httpx.Response(200, headers={"upload-offset": str(self.received)})
+
+
+def peak_rss() -> int:
+    """Pic de RSS du processus (octets; ru_maxrss est en Ko sous Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def upload_sparse(size: int) -> int:
+    with tempfile.TemporaryFile() as f:
+        f.truncate(size)  # Fichier creux: aucun bloc ecrit sur disque
+        return await upload_stream(BUCKET, "session/s1/big.bin", UploadFile(f, size=size, filename="big.bin"),
+                                   "application/octet-stream")
+
+
+async def run(size: int) -> tuple:
+    storage = FakeTusStorage()
+    storage_upload.http_client = httpx.AsyncClient(transport=storage)
+    await upload_sparse(3 * TUS_CHUNK_SIZE)  # Echauffement (allocations httpx, premiers blocs)
+    baseline = peak_rss()
+    start = time.perf_counter()
+    sent = await upload_sparse(size)
+    return sent, storage.patches, peak_rss() - baseline, time.perf_counter() - start
+
+
+def main(size_gb: float) -> None:
+    size = int(size_gb * 2 ** 30)
+    sent, patches, growth, elapsed = asyncio.run(run(size))
+    mb = 2 ** 20
+    bound = MAX_CHUNKS * TUS_CHUNK_SIZE
+    print(f"Upload de {size / 2 ** 30:.1f} Go: {sent / mb:.0f} Mo envoyes en {patches} blocs TUS, {elapsed:.1f} s")
+    print(f"Hausse du pic de RSS: {growth / mb:.1f} Mo (limite {bound / mb:.0f} Mo = {MAX_CHUNKS} blocs)")
+    if sent != size:
+        raise SystemExit(f"ECHEC: {sent} octets confirmes sur {size}")
+    if growth > bound:
+        raise SystemExit("ECHEC: memoire non bornee par la taille des blocs")
+    print("OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-gb", type=float, default=4)
+    args = parser.parse_args()
+    main(args.size_gb)
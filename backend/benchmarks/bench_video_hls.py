@@ -0,0 +1,130 @@
+"""
+Benchmark: demarrage et coupures de la lecture d'une video longue sur une
+connexion lente, avec le MP4 seul ou avec HLS.
+
+Avant: MP4 1080p (compress_video), lu en telechargement progressif: la
+lecture demarre apres l'en-tete (moov) et START_BUFFER secondes de video, et
+s'interrompt des que le debit de la connexion est inferieur a celui du
+fichier.
+Apres: echelle HLS (package_hls): le lecteur charge les playlists et le
+premier segment de la premiere variante, puis choisit la variante la plus
+haute dont BANDWIDTH tient dans ABR_MARGIN du debit.
+
+Le temps de reseau est calcule a partir des tailles reelles des fichiers
+produits (clip synthetique testsrc2 + bruit), sans latence. Sont aussi
+mesures: le CPU de l'encodage HLS (en plus du MP4) et l'envoi des segments
+vers Storage (Storage simule, --latency secondes par requete), un par un
+ou par VIDEO_HLS_UPLOAD_CONCURRENCY envois simultanes (upload_paths).
+
+Usage (depuis backend/):
+    python -m benchmarks.bench_video_hls [--seconds 60] [--threads 0] [--latency 0.15]
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+
+import httpx
+
+from benchmarks._mock_supabase import MockSupabase
+from benchmarks.bench_video_transcode import make_clip, measure
+
+from app.config import settings
+from app.services import storage_upload
+from app.services.media_processor import HLS_MASTER_PLAYLIST, MediaProcessor
+
+LINKS_MBPS = (1, 2, 4, 10)
+START_BUFFER = 2  # Secondes de video avant le debut de la lecture progressive
+ABR_MARGIN = 0.8
+
+
+def mp4_playback(path: str, duration: float, link_bps: float) -> tuple:
+    """(demarrage s, attente totale pendant la lecture s) d'un MP4 faststart"""
+    size = os.path.getsize(path)
+    media_bps = size * 8 / duration
+    moov = size * 0.01  # Ordre de grandeur de l'index (faststart: en tete)
+    start = (moov * 8 + START_BUFFER * media_bps) / link_bps
+    # Lecture progressive: fin du telechargement avant la fin de la lecture
+    stall = max(0.0, size * 8 / link_bps - start - duration)
+    return start, stall
+
+
+def hls_playback(hls_dir: str, ladder: list, duration: float, link_bps: float) -> tuple:
+    """(demarrage s, attente s, variante choisie) d'une lecture HLS"""
+    with open(os.path.join(hls_dir, HLS_MASTER_PLAYLIST)) as master:
+        bandwidths = [int(b) for b in re.findall(r"BANDWIDTH=(\d+)", master.read())]
+    first = os.path.join(hls_dir, ladder[0]["name"])
+    start = (
+        os.path.getsize(os.path.join(hls_dir, HLS_MASTER_PLAYLIST))
+        + os.path.getsize(os.path.join(first, "index.m3u8"))
+        + os.path.getsize(os.path.join(first, "seg_000.ts"))
+    ) * 8 / link_bps
+    chosen = max((i for i, b in enumerate(bandwidths) if b <= link_bps * ABR_MARGIN), default=0)
+    rendition = os.path.join(hls_dir, ladder[chosen]["name"])
+    size = sum(os.path.getsize(os.path.join(rendition, f)) for f in os.listdir(rendition) if f.endswith(".ts"))
+    stall = max(0.0, size * 8 / link_bps - start - duration)
+    return start, stall, ladder[chosen]["name"]
+
+
+def upload_segments(hls_dir: str, ladder: list, latency: float) -> tuple:
+    """(s un par un, s en parallele, nombre de fichiers) pour l'envoi vers Storage simule"""
+    mock = MockSupabase(latency=latency, handler=lambda request: (200, {"Key": "ok"}))
+    storage_upload._sync_client = httpx.Client(transport=mock.sync_transport())
+    files = [
+        (f"hls/bench/{r['name']}/{name}", os.path.join(hls_dir, r["name"], name), "video/mp2t")
+        for r in ladder for name in os.listdir(os.path.join(hls_dir, r["name"]))
+    ]
+    start = time.perf_counter()
+    for path, local_path, content_type in files:
+        storage_upload.upload_path("bench", path, local_path, content_type, upsert=True)
+    sequential = time.perf_counter() - start
+    start = time.perf_counter()
+    storage_upload.upload_paths("bench", files, settings.video_hls_upload_concurrency, upsert=True)
+    return sequential, time.perf_counter() - start, len(files)
+
+
+def main(seconds: float, threads: int, latency: float) -> None:
+    with tempfile.TemporaryDirectory() as work_dir:
+        source = os.path.join(work_dir, "source.mp4")
+        mp4 = os.path.join(work_dir, "video.mp4")
+        hls_dir = os.path.join(work_dir, "hls")
+        os.makedirs(hls_dir)
+        make_clip(source, 1920, 1080, "libx264", "16M", seconds)
+
+        cpu_mp4, _, _ = measure(lambda: MediaProcessor.compress_video(source, mp4, threads=threads))
+        info = MediaProcessor.probe_video(mp4)
+        cpu_hls, _, (ladder, error) = measure(
+            lambda: MediaProcessor.package_hls(mp4, hls_dir, info, threads=threads)
+        )
+        if not ladder:
+            raise SystemExit(f"HLS: {error}")
+        duration = info["duration"]
+        hls_size = sum(
+            os.path.getsize(os.path.join(root, f)) for root, _, names in os.walk(hls_dir) for f in names
+        )
+        mb = 2 ** 20
+        print(f"Video {duration:.0f} s: MP4 {os.path.getsize(mp4) / mb:.1f} Mo (CPU {cpu_mp4:.1f} s), "
+              f"HLS {', '.join(r['name'] for r in ladder)} {hls_size / mb:.1f} Mo (CPU {cpu_hls:.1f} s en plus)")
+
+        print(f"{'connexion':>10s} | {'MP4: demarrage (s)':>18s} {'coupures (s)':>12s} | "
+              f"{'HLS: demarrage (s)':>18s} {'coupures (s)':>12s} {'variante':>8s}")
+        for mbps in LINKS_MBPS:
+            link_bps = mbps * 1e6
+            mp4_start, mp4_stall = mp4_playback(mp4, duration, link_bps)
+            hls_start, hls_stall, chosen = hls_playback(hls_dir, ladder, duration, link_bps)
+            print(f"{mbps:>5d} Mbit/s | {mp4_start:18.1f} {mp4_stall:12.1f} | "
+                  f"{hls_start:18.1f} {hls_stall:12.1f} {chosen:>8s}")
+
+        sequential, parallel, count = upload_segments(hls_dir, ladder, latency)
+        print(f"Envoi de {count} fichiers HLS ({latency * 1000:.0f} ms par requete): un par un {sequential:.1f} s, "
+              f"{settings.video_hls_upload_concurrency} simultanes {parallel:.1f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.15)
+    args = parser.parse_args()
+    main(args.seconds, args.threads, args.latency)
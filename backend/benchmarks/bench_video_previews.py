@@ -0,0 +1,66 @@
+"""
+Benchmark: octets telecharges pour parcourir les videos d'une seance, et CPU
+de generation des apercus, sur des clips synthetiques (testsrc2 + bruit).
+
+Avant: une vignette (generate_video_thumbnail, seek puis une image); pour
+trouver un moment, le navigateur telecharge la video traitee.
+Apres: vignette + planche d'apercus + index WebVTT en une seule lecture
+(generate_video_previews, build_sprite_vtt); le survol ne telecharge que la
+planche (la vignette est chargee dans les deux cas).
+
+CPU = temps utilisateur + systeme des processus FFmpeg (RUSAGE_CHILDREN).
+
+Usage (depuis backend/):
+    python -m benchmarks.bench_video_previews [--seconds 60] [--threads 0]
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.bench_video_transcode import make_clip, measure
+
+from app.services.media_processor import MediaProcessor
+
+# (nom, largeur, hauteur, debit video, duree relative)
+CLIPS = [
+    ("exercice 720p", 1280, 720, "4M", 1),
+    ("telephone portrait", 720, 1280, "4M", 0.5),
+    ("clip court", 854, 480, "2M", 0.1),
+]
+
+
+def main(seconds: float, threads: int) -> None:
+    kb = 1024
+    print(f"{'clip':20s} {'duree (s)':>9s} {'video (Ko)':>11s} | {'avant: cpu (s)':>14s} | "
+          f"{'apres: cpu (s)':>14s} {'planche (Ko)':>12s} {'vtt (Ko)':>8s} {'images':>6s}")
+    totals = [0, 0, 0.0, 0.0]
+    with tempfile.TemporaryDirectory() as work_dir:
+        video = os.path.join(work_dir, "video.mp4")
+        poster = os.path.join(work_dir, "poster.jpg")
+        sprite_path = os.path.join(work_dir, "sprite.jpg")
+        for name, width, height, bitrate, duration in CLIPS:
+            make_clip(video, width, height, "libx264", bitrate, seconds * duration)
+            info = MediaProcessor.probe_video(video)
+
+            cpu_before, _, _ = measure(lambda: MediaProcessor.generate_video_thumbnail(video, poster))
+            cpu_after, _, sprite = measure(lambda: MediaProcessor.generate_video_previews(
+                video, poster, sprite_path, info["duration"], threads=threads
+            ))
+            vtt_size = len(MediaProcessor.build_sprite_vtt("x_sprite.jpg", sprite, info["duration"]).encode())
+            sprite_size, video_size = os.path.getsize(sprite_path), os.path.getsize(video)
+            totals = [totals[0] + video_size, totals[1] + sprite_size + vtt_size,
+                      totals[2] + cpu_before, totals[3] + cpu_after]
+            print(f"{name:20s} {info['duration']:9.1f} {video_size / kb:11.0f} | {cpu_before:14.2f} | "
+                  f"{cpu_after:14.2f} {sprite_size / kb:12.1f} {vtt_size / kb:8.1f} {sprite['count']:6d}")
+
+    print(f"Parcours: avant {totals[0] / kb:.0f} Ko (videos), apres {totals[1] / kb:.0f} Ko "
+          f"(planches + index, {totals[1] / totals[0]:.1%}); "
+          f"CPU des apercus: avant {totals[2]:.1f} s, apres {totals[3]:.1f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--threads", type=int, default=0)
+    args = parser.parse_args()
+    main(args.seconds, args.threads)
@@ -0,0 +1,155 @@
+"""
+Benchmark: CPU du traitement des videos, sur des clips synthetiques generes
+avec FFmpeg (testsrc2 + bruit, audio sine) qui imitent nos uploads.
+
+Avant: MediaProcessor.compress_video pour chaque video (re-encodage libx264
+CRF 23 "medium" vers la meme cible 1080p, meme quand la source est deja en
+H.264/AAC <= 1080p).
+Apres: probe_video (ffprobe) + plan_video, puis selon l'action:
+- skip: clip court deja lisible et dans la cible, garde tel quel
+- remux: H.264/AAC <= 1080p sous VIDEO_REMUX_MAX_BITRATE, copie des flux
+- encode / downscale: re-encodage (codec non lisible, debit trop eleve,
+  resolution > 1080p, meme pour un clip court)
+
+Avant les mesures, plan_video est verifie sur des metadonnees types
+(PLAN_CASES); le script echoue (code 1) si une action differe.
+
+CPU = temps utilisateur + systeme des processus FFmpeg/ffprobe (RUSAGE_CHILDREN).
+Le telechargement et l'upload (identiques ou evites) ne sont pas mesures.
+
+Usage (depuis backend/):
+    python -m benchmarks.bench_video_transcode [--threads 0] [--seconds 20]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import tempfile
+import time
+
+# Variables requises par app.config (ce benchmark n'appelle jamais Supabase)
+os.environ.setdefault("SUPABASE_URL", "http://supabase.bench")
+os.environ.setdefault("SUPABASE_PUBLISHABLE_KEY", "bench-publishable-key")
+os.environ.setdefault("SUPABASE_SECRET_KEY", "bench-secret-key")
+
+from app.services.media_processor import (
+    VIDEO_DOWNSCALE,
+    VIDEO_ENCODE,
+    VIDEO_REMUX,
+    VIDEO_SKIP,
+    MediaProcessor
+)
+
+# (nom, largeur, hauteur, codec video, debit video, duree relative)
+CLIPS = [
+    ("telephone 1080p", 1920, 1080, "libx264", "16M", 1),
+    ("telephone portrait", 1080, 1920, "libx264", "16M", 1),
+    ("camera 1440p", 2560, 1440, "libx264", "24M", 0.5),
+    ("1080p haut debit", 1920, 1080, "libx264", "32M", 0.5),
+    ("720p MPEG-4", 1280, 720, "mpeg4", "5M", 0.5),
+    ("clip court 480p", 854, 480, "libx264", "2M", 0.15),
+    ("clip court 2160p", 3840, 2160, "libx264", "4M", 0.05),
+]
+
+# Metadonnees probe_video d'un MP4 H.264/AAC leger, variees par cas
+SMALL_MP4 = {
+    "width": 1280, "height": 720, "video_codec": "h264", "pix_fmt": "yuv420p",
+    "audio_codec": "aac", "bitrate": 2_000_000, "size": 2 * 2 ** 20, "brand": "isom"
+}
+
+# (nom, ecarts par rapport a SMALL_MP4, action attendue)
+PLAN_CASES = [
+    ("MP4 court 720p", {}, VIDEO_SKIP),
+    ("MP4 court 2160p", {"width": 3840, "height": 2160}, VIDEO_DOWNSCALE),
+    ("MP4 court portrait 2160p", {"width": 2160, "height": 3840}, VIDEO_DOWNSCALE),
+    ("MP4 court haut debit", {"bitrate": 40_000_000}, VIDEO_ENCODE),
+    ("MP4 court MPEG-4", {"video_codec": "mpeg4"}, VIDEO_ENCODE),
+    ("MP4 court audio MP3", {"audio_codec": "mp3"}, VIDEO_REMUX),
+    ("MOV court", {"brand": "qt"}, VIDEO_REMUX),
+    ("MP4 long 720p", {"size": 200 * 2 ** 20}, VIDEO_REMUX),
+]
+
+
+def make_clip(path: str, width: int, height: int, vcodec: str, bitrate: str, seconds: float) -> None:
+    """Clip synthetique: mire animee bruitee (debit realiste) + son sinusoidal AAC"""
+    subprocess.run([
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate=30,noise=alls=12:allf=t",
+        "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=48000",
+        "-t", f"{seconds:g}", "-pix_fmt", "yuv420p",
+        "-c:v", vcodec, "-b:v", bitrate, "-maxrate", bitrate, "-bufsize", bitrate,
+        *(["-preset", "veryfast"] if vcodec == "libx264" else []),
+        "-c:a", "aac", "-b:a", "128k", path
+    ], check=True)
+
+
+def cpu_children() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def measure(step) -> tuple:
+    """(cpu s, temps s, resultat) d'une etape executant FFmpeg"""
+    cpu, start = cpu_children(), time.perf_counter()
+    result = step()
+    return cpu_children() - cpu, time.perf_counter() - start, result
+
+
+def check_plans() -> None:
+    for name, overrides, expected in PLAN_CASES:
+        action = MediaProcessor.plan_video({**SMALL_MP4, **overrides}, skip_max_size=5 * 2 ** 20)
+        if action != expected:
+            raise SystemExit(f"ECHEC plan_video ({name}): {action}, attendu {expected}")
+    print(f"plan_video: {len(PLAN_CASES)} cas OK")
+
+
+def process_after(input_path: str, output_path: str, threads: int) -> tuple:
+    info = MediaProcessor.probe_video(input_path)
+    action = MediaProcessor.plan_video(info)
+    if action == VIDEO_SKIP:
+        return action, os.path.getsize(input_path)
+    if action == VIDEO_REMUX:
+        MediaProcessor.remux_video(input_path, output_path, info["audio_codec"])
+    else:
+        MediaProcessor.compress_video(input_path, output_path, threads=threads)
+    return action, os.path.getsize(output_path)
+
+
+def main(threads: int, seconds: float) -> None:
+    check_plans()
+    mb = 2 ** 20
+    print(f"{'clip':20s} {'source (Mo)':>11s} {'Mbit/s':>7s} | {'avant: cpu (s)':>14s} {'Mo':>6s} | "
+          f"{'action':>9s} {'apres: cpu (s)':>14s} {'Mo':>6s}")
+    totals = [0.0, 0.0, 0.0, 0.0]
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name, width, height, vcodec, bitrate, duration in CLIPS:
+            source = os.path.join(work_dir, "source.mp4")
+            before_path = os.path.join(work_dir, "before.mp4")
+            after_path = os.path.join(work_dir, "after.mp4")
+            make_clip(source, width, height, vcodec, bitrate, seconds * duration)
+
+            cpu_before, wall_before, _ = measure(
+                lambda: MediaProcessor.compress_video(source, before_path, threads=threads)
+            )
+            cpu_after, wall_after, (action, size_after) = measure(
+                lambda: process_after(source, after_path, threads)
+            )
+            size_before = os.path.getsize(before_path)
+            totals = [totals[0] + cpu_before, totals[1] + cpu_after,
+                      totals[2] + wall_before, totals[3] + wall_after]
+            source_size = os.path.getsize(source)
+            mbps = source_size * 8 / (seconds * duration) / 1e6
+            print(f"{name:20s} {source_size / mb:11.1f} {mbps:7.1f} | {cpu_before:14.2f} {size_before / mb:6.1f} | "
+                  f"{action:>9s} {cpu_after:14.2f} {size_after / mb:6.1f}")
+
+    print(f"CPU total: avant {totals[0]:.1f} s, apres {totals[1]:.1f} s "
+          f"({1 - totals[1] / totals[0]:.0%} de moins); "
+          f"temps: avant {totals[2]:.1f} s, apres {totals[3]:.1f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--seconds", type=float, default=20)
+    args = parser.parse_args()
+    main(args.threads, args.seconds)
@@ -0,0 +1,46 @@
+-- ============================================
+-- Migration: Vues de statut courant des axes de travail
+-- Date: 2026-10-16
+-- Description: Exposer en une requete le statut courant (derniere entree
+-- pivot par updated_at) d'un ensemble de work_lead / work_lead_master.
+-- Remplace les requetes order(updated_at).limit(1) emises par ligne.
+-- Pas d'entree pivot => pas de ligne dans la vue => statut NEW (cote API).
+-- ============================================
+
+-- Index composites: DISTINCT ON (id) ... ORDER BY id, updated_at DESC
+CREATE INDEX IF NOT EXISTS idx_session_work_lead_work_lead_updated
+    ON session_work_lead(work_lead_id, updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_session_master_work_lead_master_wlm_updated
+    ON session_master_work_lead_master(work_lead_master_id, updated_at DESC);
+
+-- Statut courant par work_lead
+CREATE OR REPLACE VIEW work_lead_current_status
+WITH (security_invoker = true) AS
+SELECT DISTINCT ON (work_lead_id)
+    work_lead_id,
+    status,
+    updated_at
+FROM session_work_lead
+ORDER BY work_lead_id, updated_at DESC;
+
+-- Statut courant par work_lead_master
+CREATE OR REPLACE VIEW work_lead_master_current_status
+WITH (security_invoker = true) AS
+SELECT DISTINCT ON (work_lead_master_id)
+    work_lead_master_id,
+    status,
+    updated_at
+FROM session_master_work_lead_master
+ORDER BY work_lead_master_id, updated_at DESC;
+
+-- Comments for documentation
+COMMENT ON VIEW work_lead_current_status IS 'Statut courant de chaque work_lead (entree session_work_lead la plus recente). Absent = NEW';
+COMMENT ON VIEW work_lead_master_current_status IS 'Statut courant de chaque work_lead_master (entree session_master_work_lead_master la plus recente). Absent = NEW';
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- DROP VIEW IF EXISTS work_lead_current_status;
+-- DROP VIEW IF EXISTS work_lead_master_current_status;
+-- DROP INDEX IF EXISTS idx_session_work_lead_work_lead_updated;
+-- DROP INDEX IF EXISTS idx_session_master_work_lead_master_wlm_updated;
+-- ============================================
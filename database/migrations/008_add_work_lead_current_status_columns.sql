@@ -0,0 +1,159 @@
+-- ============================================
+-- Migration: Statut courant denormalise sur work_lead / work_lead_master
+-- Date: 2026-10-16
+-- Description: current_status / current_status_at maintenus par trigger
+-- depuis les tables pivots (entree la plus recente par updated_at).
+-- Les lectures deviennent un simple acces colonne, indexable pour les
+-- filtres et tris par statut.
+--   Pas d'entree pivot => current_status = 'NEW', current_status_at = NULL
+-- Depend de: 007_add_work_lead_current_status_views.sql (backfill)
+-- ============================================
+
+-- ============================================
+-- 1. Colonnes
+-- ============================================
+ALTER TABLE work_lead ADD COLUMN IF NOT EXISTS current_status TEXT NOT NULL DEFAULT 'NEW'
+    CHECK (current_status IN ('NEW', 'TODO', 'WORKING', 'DANGER', 'OK'));
+ALTER TABLE work_lead ADD COLUMN IF NOT EXISTS current_status_at TIMESTAMP WITH TIME ZONE;
+
+ALTER TABLE work_lead_master ADD COLUMN IF NOT EXISTS current_status TEXT NOT NULL DEFAULT 'NEW'
+    CHECK (current_status IN ('NEW', 'TODO', 'WORKING', 'DANGER', 'OK'));
+ALTER TABLE work_lead_master ADD COLUMN IF NOT EXISTS current_status_at TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS idx_work_lead_current_status ON work_lead(project_id, current_status);
+CREATE INDEX IF NOT EXISTS idx_work_lead_master_current_status ON work_lead_master(group_id, current_status);
+
+-- ============================================
+-- 2. Fonctions de recalcul
+-- ============================================
+CREATE OR REPLACE FUNCTION refresh_work_lead_current_status(p_work_lead_id UUID) RETURNS VOID AS $$
+BEGIN
+    UPDATE work_lead
+    SET current_status = COALESCE(latest.status, 'NEW'),
+        current_status_at = latest.updated_at
+    FROM (SELECT p_work_lead_id AS id) target
+        LEFT JOIN LATERAL (
+            SELECT status, updated_at
+            FROM session_work_lead
+            WHERE work_lead_id = target.id
+            ORDER BY updated_at DESC
+            LIMIT 1
+        ) latest ON TRUE
+    WHERE work_lead.id = target.id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION refresh_work_lead_master_current_status(p_work_lead_master_id UUID) RETURNS VOID AS $$
+BEGIN
+    UPDATE work_lead_master
+    SET current_status = COALESCE(latest.status, 'NEW'),
+        current_status_at = latest.updated_at
+    FROM (SELECT p_work_lead_master_id AS id) target
+        LEFT JOIN LATERAL (
+            SELECT status, updated_at
+            FROM session_master_work_lead_master
+            WHERE work_lead_master_id = target.id
+            ORDER BY updated_at DESC
+            LIMIT 1
+        ) latest ON TRUE
+    WHERE work_lead_master.id = target.id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- 3. Triggers sur les tables pivots
+-- ============================================
+CREATE OR REPLACE FUNCTION sync_work_lead_current_status() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM refresh_work_lead_current_status(OLD.work_lead_id);
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.work_lead_id IS DISTINCT FROM OLD.work_lead_id) THEN
+        PERFORM refresh_work_lead_current_status(NEW.work_lead_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sync_work_lead_master_current_status() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM refresh_work_lead_master_current_status(OLD.work_lead_master_id);
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.work_lead_master_id IS DISTINCT FROM OLD.work_lead_master_id) THEN
+        PERFORM refresh_work_lead_master_current_status(NEW.work_lead_master_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS sync_session_work_lead_current_status ON session_work_lead;
+CREATE TRIGGER sync_session_work_lead_current_status
+AFTER INSERT OR UPDATE OR DELETE ON session_work_lead
+FOR EACH ROW EXECUTE FUNCTION sync_work_lead_current_status();
+
+DROP TRIGGER IF EXISTS sync_session_master_work_lead_master_current_status ON session_master_work_lead_master;
+CREATE TRIGGER sync_session_master_work_lead_master_current_status
+AFTER INSERT OR UPDATE OR DELETE ON session_master_work_lead_master
+FOR EACH ROW EXECUTE FUNCTION sync_work_lead_master_current_status();
+
+-- ============================================
+-- 4. updated_at: ne pas le modifier lors d'une mise a jour faite par trigger
+--    (un changement de statut pivot n'est pas une edition de l'axe)
+-- ============================================
+DROP TRIGGER IF EXISTS update_work_lead_updated_at ON work_lead;
+CREATE TRIGGER update_work_lead_updated_at BEFORE
+UPDATE ON work_lead FOR EACH ROW
+WHEN (pg_trigger_depth() < 1)
+EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_work_lead_master_updated_at ON work_lead_master;
+CREATE TRIGGER update_work_lead_master_updated_at BEFORE
+UPDATE ON work_lead_master FOR EACH ROW
+WHEN (pg_trigger_depth() < 1)
+EXECUTE FUNCTION update_updated_at_column();
+
+-- ============================================
+-- 5. Backfill (triggers updated_at desactives: requete de premier niveau,
+--    pg_trigger_depth() = 0, updated_at serait remis a NOW() sur chaque axe)
+-- ============================================
+ALTER TABLE work_lead DISABLE TRIGGER update_work_lead_updated_at;
+ALTER TABLE work_lead_master DISABLE TRIGGER update_work_lead_master_updated_at;
+
+UPDATE work_lead
+SET current_status = s.status,
+    current_status_at = s.updated_at
+FROM work_lead_current_status s
+WHERE s.work_lead_id = work_lead.id;
+
+UPDATE work_lead_master
+SET current_status = s.status,
+    current_status_at = s.updated_at
+FROM work_lead_master_current_status s
+WHERE s.work_lead_master_id = work_lead_master.id;
+
+ALTER TABLE work_lead ENABLE TRIGGER update_work_lead_updated_at;
+ALTER TABLE work_lead_master ENABLE TRIGGER update_work_lead_master_updated_at;
+
+-- Comments for documentation
+COMMENT ON COLUMN work_lead.current_status IS 'Statut courant (entree session_work_lead la plus recente, NEW si aucune). Maintenu par trigger';
+COMMENT ON COLUMN work_lead.current_status_at IS 'updated_at de l''entree pivot ayant fixe current_status';
+COMMENT ON COLUMN work_lead_master.current_status IS 'Statut courant (entree session_master_work_lead_master la plus recente, NEW si aucune). Maintenu par trigger';
+COMMENT ON COLUMN work_lead_master.current_status_at IS 'updated_at de l''entree pivot ayant fixe current_status';
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- DROP TRIGGER IF EXISTS sync_session_work_lead_current_status ON session_work_lead;
+-- DROP TRIGGER IF EXISTS sync_session_master_work_lead_master_current_status ON session_master_work_lead_master;
+-- DROP FUNCTION IF EXISTS sync_work_lead_current_status();
+-- DROP FUNCTION IF EXISTS sync_work_lead_master_current_status();
+-- DROP FUNCTION IF EXISTS refresh_work_lead_current_status(UUID);
+-- DROP FUNCTION IF EXISTS refresh_work_lead_master_current_status(UUID);
+-- DROP INDEX IF EXISTS idx_work_lead_current_status;
+-- DROP INDEX IF EXISTS idx_work_lead_master_current_status;
+-- ALTER TABLE work_lead DROP COLUMN IF EXISTS current_status;
+-- ALTER TABLE work_lead DROP COLUMN IF EXISTS current_status_at;
+-- ALTER TABLE work_lead_master DROP COLUMN IF EXISTS current_status;
+-- ALTER TABLE work_lead_master DROP COLUMN IF EXISTS current_status_at;
+-- (recreer ensuite les triggers updated_at sans clause WHEN)
+-- ============================================
@@ -0,0 +1,34 @@
+-- ============================================
+-- Migration: Vue group_summary (compteurs agreges par groupe)
+-- Date: 2026-10-16
+-- Description: Groupe + nom du type de support + nombre de projets et de
+-- sessions (session_master non supprimees) en une seule ligne.
+-- Evite deux requetes count="exact" par groupe dans la liste des groupes coach.
+-- ============================================
+
+CREATE OR REPLACE VIEW group_summary
+WITH (security_invoker = true) AS
+SELECT
+    g.*,
+    ts.name AS type_support_name,
+    (
+        SELECT COUNT(*)
+        FROM group_project gp
+        WHERE gp.group_id = g.id
+    )::INTEGER AS projects_count,
+    (
+        SELECT COUNT(*)
+        FROM session_master sm
+        WHERE sm.group_id = g.id
+            AND sm.is_deleted = FALSE
+    )::INTEGER AS sessions_count
+FROM "group" g
+    LEFT JOIN type_support ts ON ts.id = g.type_support_id;
+
+-- Comments for documentation
+COMMENT ON VIEW group_summary IS 'Groupe avec type_support_name, projects_count et sessions_count (session_master non supprimees)';
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- DROP VIEW IF EXISTS group_summary;
+-- ============================================
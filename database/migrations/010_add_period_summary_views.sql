@@ -0,0 +1,64 @@
+-- ============================================
+-- Migration: Vues de compteurs des periodes
+-- Date: 2026-10-16
+-- Description: Compteurs calcules en une requete pour toutes les periodes
+-- d'un groupe (period_master_summary) ou d'un projet (period_summary):
+--   - period_master_summary: nom du createur, nombre de periodes projet
+--     (participants), nombre de session_master dont date_start est dans la periode
+--   - period_summary: nombre de sessions dont date_start est dans la periode
+-- Remplace les 3 requetes par periode cote coach et 1 cote navigant.
+-- ============================================
+
+-- Index composites pour les jointures par plage de dates
+CREATE INDEX IF NOT EXISTS idx_session_master_group_date_start
+    ON session_master(group_id, date_start) WHERE is_deleted = FALSE;
+CREATE INDEX IF NOT EXISTS idx_session_project_date_start
+    ON session(project_id, date_start) WHERE is_deleted = FALSE;
+
+-- Periodes de groupe + compteurs
+CREATE OR REPLACE VIEW period_master_summary
+WITH (security_invoker = true) AS
+SELECT
+    pm.*,
+    NULLIF(TRIM(COALESCE(pr.first_name, '') || ' ' || COALESCE(pr.last_name, '')), '') AS profile_name,
+    (
+        SELECT COUNT(*)
+        FROM period p
+        WHERE p.period_master_id = pm.id
+            AND p.is_deleted = FALSE
+    )::INTEGER AS project_count,
+    (
+        SELECT COUNT(*)
+        FROM session_master sm
+        WHERE sm.group_id = pm.group_id
+            AND sm.is_deleted = FALSE
+            AND sm.date_start BETWEEN pm.date_start AND pm.date_end
+    )::INTEGER AS session_master_count
+FROM period_master pm
+    LEFT JOIN profile pr ON pr.id = pm.profile_id;
+
+-- Periodes projet + compteur de sessions
+CREATE OR REPLACE VIEW period_summary
+WITH (security_invoker = true) AS
+SELECT
+    p.*,
+    (
+        SELECT COUNT(*)
+        FROM session s
+        WHERE s.project_id = p.project_id
+            AND s.is_deleted = FALSE
+            AND s.date_start BETWEEN p.date_start AND p.date_end
+    )::INTEGER AS session_count
+FROM period p;
+
+-- Comments for documentation
+COMMENT ON VIEW period_master_summary IS 'Period master avec profile_name, project_count (periodes projet non supprimees) et session_master_count (date_start dans la periode)';
+COMMENT ON VIEW period_summary IS 'Periode projet avec session_count (sessions non supprimees dont date_start est dans la periode)';
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- DROP VIEW IF EXISTS period_master_summary;
+-- DROP VIEW IF EXISTS period_summary;
+-- DROP INDEX IF EXISTS idx_session_master_group_date_start;
+-- DROP INDEX IF EXISTS idx_session_project_date_start;
+-- ============================================
@@ -0,0 +1,119 @@
+-- ============================================
+-- Migration: Propagation serveur du statut work_lead_master
+-- Date: 2026-10-16
+-- Description: Fonction transactionnelle appelee en RPC par
+-- PUT /api/coach/groups/{group_id}/sessions/{session_id}/work-lead-masters.
+-- En une seule transaction, pour tous les projets de la session_master:
+--   p_status renseigne:
+--     1. upsert session_master_work_lead_master
+--     2. creation des work_lead manquants (copie name/content/type)
+--        + partage des fichiers du work_lead_master via files_reference
+--     3. upsert session_work_lead (mise a jour seulement si override_master = FALSE)
+--   p_status NULL:
+--     1. suppression des session_work_lead synchronises (override_master = FALSE)
+--     2. suppression de l'association session_master_work_lead_master
+-- Remplace les centaines d'appels HTTP sequentiels de la boucle Python.
+-- ============================================
+
+CREATE OR REPLACE FUNCTION propagate_work_lead_master_status(
+    p_session_master_id UUID,
+    p_work_lead_master_id UUID,
+    p_status TEXT,
+    p_profile_id UUID
+) RETURNS INTEGER AS $$
+DECLARE
+    affected INTEGER := 0;
+BEGIN
+    IF p_status IS NULL THEN
+        DELETE FROM session_work_lead swl
+        USING session s, work_lead wl
+        WHERE s.session_master_id = p_session_master_id
+            AND s.is_deleted = FALSE
+            AND swl.session_id = s.id
+            AND wl.id = swl.work_lead_id
+            AND wl.project_id = s.project_id
+            AND wl.work_lead_master_id = p_work_lead_master_id
+            AND wl.is_deleted = FALSE
+            AND swl.override_master = FALSE;
+        GET DIAGNOSTICS affected = ROW_COUNT;
+
+        DELETE FROM session_master_work_lead_master
+        WHERE session_master_id = p_session_master_id
+            AND work_lead_master_id = p_work_lead_master_id;
+
+        RETURN affected;
+    END IF;
+
+    -- 1. Association session_master <-> work_lead_master
+    INSERT INTO session_master_work_lead_master (session_master_id, work_lead_master_id, status, profile_id)
+    VALUES (p_session_master_id, p_work_lead_master_id, p_status, p_profile_id)
+    ON CONFLICT (session_master_id, work_lead_master_id) DO UPDATE
+        SET status = EXCLUDED.status,
+            profile_id = EXCLUDED.profile_id;
+
+    -- 2. Work leads manquants + partage des fichiers du master
+    WITH created AS (
+        INSERT INTO work_lead (project_id, work_lead_master_id, work_lead_type_id, name, content)
+        SELECT targets.project_id, wlm.id, wlm.work_lead_type_id, wlm.name, wlm.content
+        FROM (
+                SELECT DISTINCT project_id
+                FROM session
+                WHERE session_master_id = p_session_master_id
+                    AND is_deleted = FALSE
+            ) targets
+            JOIN work_lead_master wlm ON wlm.id = p_work_lead_master_id
+        WHERE NOT EXISTS (
+                SELECT 1
+                FROM work_lead wl
+                WHERE wl.project_id = targets.project_id
+                    AND wl.work_lead_master_id = p_work_lead_master_id
+                    AND wl.is_deleted = FALSE
+            )
+        RETURNING id
+    )
+    INSERT INTO files_reference (files_id, entity_type, entity_id)
+    SELECT master_files.files_id, 'work_lead', created.id
+    FROM created
+        CROSS JOIN (
+            SELECT id AS files_id
+            FROM files
+            WHERE origin_entity_type = 'work_lead_master'
+                AND origin_entity_id = p_work_lead_master_id
+            UNION ALL
+            SELECT files_id
+            FROM files_reference
+            WHERE entity_type = 'work_lead_master'
+                AND entity_id = p_work_lead_master_id
+        ) master_files;
+
+    -- 3. Statut des work leads pour chaque session de la session_master
+    INSERT INTO session_work_lead (session_id, work_lead_id, status, override_master, profile_id)
+    SELECT DISTINCT ON (s.id) s.id, wl.id, p_status, FALSE, p_profile_id
+    FROM session s
+        JOIN work_lead wl ON wl.project_id = s.project_id
+            AND wl.work_lead_master_id = p_work_lead_master_id
+            AND wl.is_deleted = FALSE
+    WHERE s.session_master_id = p_session_master_id
+        AND s.is_deleted = FALSE
+    ORDER BY s.id, wl.created_at
+    ON CONFLICT (session_id, work_lead_id) DO UPDATE
+        SET status = EXCLUDED.status,
+            profile_id = EXCLUDED.profile_id
+        WHERE session_work_lead.override_master = FALSE;
+    GET DIAGNOSTICS affected = ROW_COUNT;
+
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Reserve au backend (cle secrete): pas d'appel direct depuis le client
+REVOKE ALL ON FUNCTION propagate_work_lead_master_status(UUID, UUID, TEXT, UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION propagate_work_lead_master_status(UUID, UUID, TEXT, UUID) TO service_role;
+
+-- Comments for documentation
+COMMENT ON FUNCTION propagate_work_lead_master_status(UUID, UUID, TEXT, UUID) IS 'Met a jour (ou supprime si p_status NULL) le statut d''un work_lead_master sur une session_master et le propage aux work_lead des projets. Retourne le nombre de session_work_lead modifies';
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- DROP FUNCTION IF EXISTS propagate_work_lead_master_status(UUID, UUID, TEXT, UUID);
+-- ============================================
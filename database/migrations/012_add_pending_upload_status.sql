@@ -0,0 +1,32 @@
+-- ============================================
+-- Migration: Statut pending_upload (upload direct vers Storage)
+-- Date: 2026-10-16
+-- Description: Upload en deux temps sans transit par l'API:
+--   1. POST /api/files/upload-url cree la ligne files en 'pending_upload'
+--      et renvoie une URL d'upload signee Storage au client
+--   2. POST /api/files/{file_id}/complete verifie l'objet, enregistre
+--      taille / MIME et passe la ligne en 'pending' (traitement) ou 'ready'
+-- Les lignes restees en 'pending_upload' (upload abandonne) sont exclues des
+-- listes et reperables via l'index partiel.
+-- ============================================
+
+ALTER TABLE files DROP CONSTRAINT IF EXISTS files_processing_status_check;
+ALTER TABLE files ADD CONSTRAINT files_processing_status_check
+    CHECK (processing_status IN ('pending_upload', 'ready', 'pending', 'processing', 'failed'));
+
+DROP INDEX IF EXISTS idx_files_processing_status;
+CREATE INDEX IF NOT EXISTS idx_files_processing_status ON files(processing_status)
+WHERE processing_status IN ('pending_upload', 'pending', 'processing');
+
+COMMENT ON COLUMN files.processing_status IS 'Media processing status: pending_upload (direct upload not completed yet), ready (done/no processing needed), pending (waiting), processing (in progress), failed';
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- DELETE FROM files WHERE processing_status = 'pending_upload';
+-- ALTER TABLE files DROP CONSTRAINT IF EXISTS files_processing_status_check;
+-- ALTER TABLE files ADD CONSTRAINT files_processing_status_check
+--     CHECK (processing_status IN ('ready', 'pending', 'processing', 'failed'));
+-- DROP INDEX IF EXISTS idx_files_processing_status;
+-- CREATE INDEX IF NOT EXISTS idx_files_processing_status ON files(processing_status)
+-- WHERE processing_status IN ('pending', 'processing');
+-- ============================================
@@ -0,0 +1,189 @@
+-- ============================================
+-- Migration: File de traitements media persistante
+-- Date: 2026-10-16
+-- Description: Remplace les BackgroundTasks FastAPI pour les thumbnails et
+-- la compression video. L'API insere une ligne media_jobs; le worker
+-- (python -m app.worker) reserve les jobs via RPC:
+--   claim_media_jobs        reserve jusqu'a N jobs (FOR UPDATE SKIP LOCKED)
+--   heartbeat_media_jobs    prolonge la reservation des jobs en cours
+--   complete_media_job      job termine
+--   fail_media_job          nouvel essai differe (backoff) ou echec definitif
+--   requeue_stale_media_jobs remet en file les jobs 'processing' abandonnes
+--                           (worker arrete ou plante)
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS media_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    file_id UUID NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    job_type TEXT NOT NULL CHECK (job_type IN ('image_thumbnail', 'video')),
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status TEXT NOT NULL DEFAULT 'queued' CHECK (
+        status IN ('queued', 'processing', 'done', 'failed')
+    ),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_by TEXT,
+    locked_at TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Jobs prets a etre reserves
+CREATE INDEX IF NOT EXISTS idx_media_jobs_queued ON media_jobs(run_after)
+WHERE status = 'queued';
+-- Jobs en cours (detection des reservations expirees)
+CREATE INDEX IF NOT EXISTS idx_media_jobs_processing ON media_jobs(locked_at)
+WHERE status = 'processing';
+-- Un seul job actif par fichier et par type
+CREATE UNIQUE INDEX IF NOT EXISTS idx_media_jobs_active_file ON media_jobs(file_id, job_type)
+WHERE status IN ('queued', 'processing');
+
+ALTER TABLE media_jobs ENABLE ROW LEVEL SECURITY;
+
+DROP TRIGGER IF EXISTS update_media_jobs_updated_at ON media_jobs;
+CREATE TRIGGER update_media_jobs_updated_at
+    BEFORE UPDATE ON media_jobs
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE OR REPLACE FUNCTION claim_media_jobs(p_worker TEXT, p_limit INTEGER)
+RETURNS SETOF media_jobs
+LANGUAGE sql
+AS $$
+    UPDATE media_jobs j
+    SET status = 'processing',
+        locked_by = p_worker,
+        locked_at = NOW(),
+        attempts = j.attempts + 1
+    WHERE j.id IN (
+        SELECT id
+        FROM media_jobs
+        WHERE status = 'queued'
+            AND run_after <= NOW()
+        ORDER BY run_after
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING j.*;
+$$;
+
+CREATE OR REPLACE FUNCTION heartbeat_media_jobs(p_worker TEXT, p_job_ids UUID[])
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH touched AS (
+        UPDATE media_jobs
+        SET locked_at = NOW()
+        WHERE id = ANY(p_job_ids)
+            AND status = 'processing'
+            AND locked_by = p_worker
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM touched;
+$$;
+
+CREATE OR REPLACE FUNCTION complete_media_job(p_job_id UUID)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    UPDATE media_jobs
+    SET status = 'done',
+        locked_by = NULL,
+        locked_at = NULL,
+        last_error = NULL
+    WHERE id = p_job_id;
+$$;
+
+-- Retourne le statut resultant: 'queued' (nouvel essai apres p_retry_delay
+-- secondes, fichier remis en 'pending') ou 'failed' (nombre maximal d'essais
+-- atteint, fichier en 'failed')
+CREATE OR REPLACE FUNCTION fail_media_job(p_job_id UUID, p_error TEXT, p_retry_delay INTEGER)
+RETURNS TEXT
+LANGUAGE sql
+AS $$
+    WITH failed AS (
+        UPDATE media_jobs
+        SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+            run_after = NOW() + make_interval(secs => p_retry_delay),
+            locked_by = NULL,
+            locked_at = NULL,
+            last_error = LEFT(p_error, 2000)
+        WHERE id = p_job_id
+        RETURNING file_id, status
+    ),
+    file_update AS (
+        UPDATE files f
+        SET processing_status = CASE WHEN failed.status = 'failed' THEN 'failed' ELSE 'pending' END,
+            processing_error = LEFT(p_error, 500)
+        FROM failed
+        WHERE f.id = failed.file_id
+        RETURNING 1
+    )
+    SELECT status FROM failed;
+$$;
+
+CREATE OR REPLACE FUNCTION requeue_stale_media_jobs(p_timeout_seconds INTEGER)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH requeued AS (
+        UPDATE media_jobs
+        SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+            run_after = NOW(),
+            locked_by = NULL,
+            locked_at = NULL,
+            last_error = 'Reservation expiree (worker arrete ou bloque)'
+        WHERE status = 'processing'
+            AND locked_at < NOW() - make_interval(secs => p_timeout_seconds)
+        RETURNING file_id, status
+    ),
+    file_update AS (
+        UPDATE files f
+        SET processing_status = CASE WHEN requeued.status = 'failed' THEN 'failed' ELSE 'pending' END,
+            processing_error = CASE WHEN requeued.status = 'failed'
+                THEN 'Traitement interrompu' ELSE f.processing_error END
+        FROM requeued
+        WHERE f.id = requeued.file_id
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM requeued;
+$$;
+
+REVOKE EXECUTE ON FUNCTION claim_media_jobs(TEXT, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION heartbeat_media_jobs(TEXT, UUID[]) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION complete_media_job(UUID) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION fail_media_job(UUID, TEXT, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION requeue_stale_media_jobs(INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_media_jobs(TEXT, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION heartbeat_media_jobs(TEXT, UUID[]) TO service_role;
+GRANT EXECUTE ON FUNCTION complete_media_job(UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION fail_media_job(UUID, TEXT, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION requeue_stale_media_jobs(INTEGER) TO service_role;
+
+COMMENT ON TABLE media_jobs IS 'Persistent media processing queue (thumbnails, video compression), consumed by the worker process';
+COMMENT ON COLUMN media_jobs.run_after IS 'Earliest time the job may be claimed (retry backoff)';
+COMMENT ON COLUMN media_jobs.locked_at IS 'Last claim or heartbeat by locked_by; stale locks are requeued';
+
+-- Reprise des fichiers en attente de traitement au moment de la migration
+INSERT INTO media_jobs (file_id, job_type, payload)
+SELECT f.id,
+    CASE WHEN f.file_type = 'video' THEN 'video' ELSE 'image_thumbnail' END,
+    CASE WHEN f.file_type = 'video'
+        THEN jsonb_build_object('original_size', f.file_size)
+        ELSE '{}'::jsonb
+    END
+FROM files f
+WHERE f.processing_status IN ('pending', 'processing')
+    AND f.file_type IN ('image', 'video')
+ON CONFLICT DO NOTHING;
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- DROP FUNCTION IF EXISTS claim_media_jobs(TEXT, INTEGER);
+-- DROP FUNCTION IF EXISTS heartbeat_media_jobs(TEXT, UUID[]);
+-- DROP FUNCTION IF EXISTS complete_media_job(UUID);
+-- DROP FUNCTION IF EXISTS fail_media_job(UUID, TEXT, INTEGER);
+-- DROP FUNCTION IF EXISTS requeue_stale_media_jobs(INTEGER);
+-- DROP TABLE IF EXISTS media_jobs;
+-- ============================================
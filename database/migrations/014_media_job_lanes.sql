@@ -0,0 +1,123 @@
+-- ============================================
+-- Migration: Files de traitements media par type et mesures
+-- Date: 2026-10-16
+-- Description: Le worker media execute les videos et les images dans deux
+-- pools de processus separes: un encodage long ne bloque plus les thumbnails.
+--   claim_media_jobs    filtre optionnel par job_type, horodate started_at
+--   complete_media_job  enregistre la duree et les etapes mesurees du job
+--   media_job_stats     profondeur de file et durees par type de job
+-- ============================================
+
+ALTER TABLE media_jobs ADD COLUMN IF NOT EXISTS started_at TIMESTAMPTZ;
+ALTER TABLE media_jobs ADD COLUMN IF NOT EXISTS duration_ms INTEGER;
+ALTER TABLE media_jobs ADD COLUMN IF NOT EXISTS timings JSONB;
+
+-- Reservation par type de job
+DROP INDEX IF EXISTS idx_media_jobs_queued;
+CREATE INDEX IF NOT EXISTS idx_media_jobs_queued ON media_jobs(job_type, run_after)
+WHERE status = 'queued';
+-- Statistiques des jobs termines recemment
+CREATE INDEX IF NOT EXISTS idx_media_jobs_done ON media_jobs(job_type, updated_at)
+WHERE status = 'done';
+
+DROP FUNCTION IF EXISTS claim_media_jobs(TEXT, INTEGER);
+CREATE OR REPLACE FUNCTION claim_media_jobs(p_worker TEXT, p_limit INTEGER, p_job_type TEXT DEFAULT NULL)
+RETURNS SETOF media_jobs
+LANGUAGE sql
+AS $$
+    UPDATE media_jobs j
+    SET status = 'processing',
+        locked_by = p_worker,
+        locked_at = NOW(),
+        started_at = NOW(),
+        attempts = j.attempts + 1
+    WHERE j.id IN (
+        SELECT id
+        FROM media_jobs
+        WHERE status = 'queued'
+            AND run_after <= NOW()
+            AND (p_job_type IS NULL OR job_type = p_job_type)
+        ORDER BY run_after
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING j.*;
+$$;
+
+DROP FUNCTION IF EXISTS complete_media_job(UUID);
+CREATE OR REPLACE FUNCTION complete_media_job(p_job_id UUID, p_duration_ms INTEGER DEFAULT NULL, p_timings JSONB DEFAULT NULL)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    UPDATE media_jobs
+    SET status = 'done',
+        locked_by = NULL,
+        locked_at = NULL,
+        last_error = NULL,
+        duration_ms = p_duration_ms,
+        timings = p_timings
+    WHERE id = p_job_id;
+$$;
+
+-- Une ligne par type de job: file d'attente, jobs en cours, echecs et
+-- durees des jobs termines sur la derniere heure
+CREATE OR REPLACE FUNCTION media_job_stats()
+RETURNS TABLE (
+    job_type TEXT,
+    queued BIGINT,
+    ready BIGINT,
+    processing BIGINT,
+    failed BIGINT,
+    oldest_queued_at TIMESTAMPTZ,
+    done_last_hour BIGINT,
+    avg_duration_ms INTEGER,
+    p95_duration_ms INTEGER
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        t.job_type,
+        (SELECT COUNT(*) FROM media_jobs q WHERE q.job_type = t.job_type AND q.status = 'queued'),
+        (SELECT COUNT(*) FROM media_jobs q WHERE q.job_type = t.job_type AND q.status = 'queued' AND q.run_after <= NOW()),
+        (SELECT COUNT(*) FROM media_jobs q WHERE q.job_type = t.job_type AND q.status = 'processing'),
+        (SELECT COUNT(*) FROM media_jobs q WHERE q.job_type = t.job_type AND q.status = 'failed'),
+        (SELECT MIN(q.created_at) FROM media_jobs q WHERE q.job_type = t.job_type AND q.status = 'queued'),
+        d.done,
+        d.avg_ms,
+        d.p95_ms
+    FROM (VALUES ('image_thumbnail'), ('video')) AS t(job_type)
+    CROSS JOIN LATERAL (
+        SELECT
+            COUNT(*) AS done,
+            AVG(m.duration_ms)::INTEGER AS avg_ms,
+            (PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY m.duration_ms))::INTEGER AS p95_ms
+        FROM media_jobs m
+        WHERE m.job_type = t.job_type
+            AND m.status = 'done'
+            AND m.updated_at > NOW() - INTERVAL '1 hour'
+    ) d;
+$$;
+
+REVOKE EXECUTE ON FUNCTION claim_media_jobs(TEXT, INTEGER, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION complete_media_job(UUID, INTEGER, JSONB) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION media_job_stats() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_media_jobs(TEXT, INTEGER, TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION complete_media_job(UUID, INTEGER, JSONB) TO service_role;
+GRANT EXECUTE ON FUNCTION media_job_stats() TO service_role;
+
+COMMENT ON COLUMN media_jobs.started_at IS 'Start of the current (or last) attempt';
+COMMENT ON COLUMN media_jobs.duration_ms IS 'Wall-clock duration of the successful attempt, measured by the worker';
+COMMENT ON COLUMN media_jobs.timings IS 'Per-step durations in ms (download, process, upload...)';
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- DROP FUNCTION IF EXISTS media_job_stats();
+-- DROP FUNCTION IF EXISTS complete_media_job(UUID, INTEGER, JSONB);
+-- DROP FUNCTION IF EXISTS claim_media_jobs(TEXT, INTEGER, TEXT);
+-- (then re-run the function definitions of 013_add_media_jobs.sql)
+-- DROP INDEX IF EXISTS idx_media_jobs_done;
+-- ALTER TABLE media_jobs DROP COLUMN IF EXISTS timings;
+-- ALTER TABLE media_jobs DROP COLUMN IF EXISTS duration_ms;
+-- ALTER TABLE media_jobs DROP COLUMN IF EXISTS started_at;
+-- ============================================
@@ -0,0 +1,23 @@
+-- ============================================
+-- Migration: Declinaisons d'images (tailles et formats)
+-- Date: 2026-10-16
+-- Description: Le worker media genere pour chaque image une echelle de
+-- declinaisons (ex: 200/400/1200 px, WebP + JPEG). Elles sont decrites dans
+-- files.derivatives et renvoyees par l'API sous forme de srcset.
+-- ============================================
+
+ALTER TABLE files ADD COLUMN IF NOT EXISTS derivatives JSONB;
+
+COMMENT ON COLUMN files.derivatives IS 'Image derivatives: [{"width", "height", "format", "path", "size"}], generated by the media worker';
+
+-- Optionnel: generer les declinaisons des images existantes (le worker les
+-- retraite progressivement; elles repassent en 'processing' le temps du job)
+-- INSERT INTO media_jobs (file_id, job_type)
+-- SELECT id, 'image_thumbnail' FROM files
+-- WHERE file_type = 'image' AND processing_status = 'ready' AND derivatives IS NULL
+-- ON CONFLICT DO NOTHING;
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- ALTER TABLE files DROP COLUMN IF EXISTS derivatives;
+-- ============================================
@@ -0,0 +1,27 @@
+-- ============================================
+-- Migration: Diffusion des changements de statut des fichiers
+-- Date: 2026-10-16
+-- Description: Ajoute la table files a la publication supabase_realtime.
+-- L'API s'abonne aux UPDATE de files (cle secrete) et relaie les changements
+-- de processing_status ecrits par le worker media aux clients abonnes
+-- (GET /api/files/status/stream). RLS active sans policy sur files: les
+-- clients anon/authenticated ne recoivent aucun evenement.
+-- Sans cette migration, l'API interroge la table a intervalle regulier.
+-- ============================================
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_publication WHERE pubname = 'supabase_realtime')
+        AND NOT EXISTS (
+            SELECT 1 FROM pg_publication_tables
+            WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'files'
+        )
+    THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE files;
+    END IF;
+END $$;
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- ALTER PUBLICATION supabase_realtime DROP TABLE files;
+-- ============================================
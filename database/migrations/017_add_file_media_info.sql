@@ -0,0 +1,18 @@
+-- ============================================
+-- Migration: Metadonnees des videos (ffprobe)
+-- Date: 2026-10-16
+-- Description: Le worker media lit chaque video avec ffprobe avant de la
+-- traiter et choisit le traitement le moins couteux (conservee telle quelle,
+-- remux sans re-encodage, re-encodage, re-encodage avec reduction). Les
+-- metadonnees de la video servie et de la source, et l'action choisie, sont
+-- enregistrees dans files.media_info.
+-- ============================================
+
+ALTER TABLE files ADD COLUMN IF NOT EXISTS media_info JSONB;
+
+COMMENT ON COLUMN files.media_info IS 'Video metadata (ffprobe) of the stored file: {"duration", "width", "height", "rotation", "video_codec", "audio_codec", "bitrate", ..., "action": skip|remux|encode|downscale, "source": {same keys for the uploaded file}}';
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- ALTER TABLE files DROP COLUMN IF EXISTS media_info;
+-- ============================================
@@ -0,0 +1,21 @@
+-- ============================================
+-- Migration: Lecture adaptative HLS des videos
+-- Date: 2026-10-16
+-- Description: Avec VIDEO_HLS=true, le worker media encode les longues videos
+-- en plusieurs qualites (360p / 720p / 1080p), decoupees en segments HLS
+-- sous hls/{file_id}/ dans Storage, en plus du MP4. Le chemin de la playlist
+-- principale est enregistre dans files.hls_path; l'API la sert avec des URLs
+-- signees pour chaque segment. media_info decrit aussi la planche d'apercus
+-- (sprite) et les qualites HLS.
+-- ============================================
+
+ALTER TABLE files ADD COLUMN IF NOT EXISTS hls_path TEXT;
+
+COMMENT ON COLUMN files.hls_path IS 'Storage path of the HLS master playlist (hls/{file_id}/master.m3u8), NULL when the video is only available as MP4';
+
+COMMENT ON COLUMN files.media_info IS 'Video metadata (ffprobe) of the stored file: {"duration", "width", "height", "rotation", "video_codec", "audio_codec", "bitrate", ..., "action": skip|remux|encode|downscale, "source": {same keys for the uploaded file}, "sprite": {"path", "vtt_path", "interval", "count", "columns", "width", "height"}, "hls": [{"name", "height", "bitrate", "segments"}]}';
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- ALTER TABLE files DROP COLUMN IF EXISTS hls_path;
+-- ============================================
@@ -0,0 +1,23 @@
+-- ============================================
+-- Migration: Deduplication des fichiers par contenu
+-- Date: 2026-10-16
+-- Description: Empreinte SHA-256 du contenu envoye (files.content_hash),
+-- calculee pendant la lecture du fichier (API ou worker media). Avec
+-- FILE_DEDUP=true, un fichier identique a un fichier deja pret n'est ni
+-- re-stocke ni re-traite: la nouvelle ligne files reprend son objet Storage,
+-- sa vignette, ses derives et sa video compressee. L'objet partage n'est
+-- supprime qu'avec le dernier fichier qui l'utilise.
+-- ============================================
+
+ALTER TABLE files ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_files_content_hash ON files(content_hash)
+WHERE content_hash IS NOT NULL;
+
+COMMENT ON COLUMN files.content_hash IS 'SHA-256 (hex) of the uploaded content, before any compression; files with the same hash share the same storage object and processing outputs';
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- DROP INDEX IF EXISTS idx_files_content_hash;
+-- ALTER TABLE files DROP COLUMN IF EXISTS content_hash;
+-- ============================================
@@ -0,0 +1,65 @@
+-- ============================================
+-- Migration: Job d'empreinte des fichiers envoyes directement a Storage
+-- Date: 2026-10-16
+-- Description: Les fichiers sans traitement media (PDF, documents...) envoyes
+-- directement a Storage recoivent leur empreinte SHA-256 (deduplication,
+-- migration 019) par un job 'content_hash' du worker, qui relit l'objet en
+-- flux, au lieu de la requete de finalisation de l'upload.
+--   media_jobs.job_type  nouveau type 'content_hash'
+--   media_job_stats      une ligne pour ce type
+-- ============================================
+
+ALTER TABLE media_jobs DROP CONSTRAINT IF EXISTS media_jobs_job_type_check;
+ALTER TABLE media_jobs ADD CONSTRAINT media_jobs_job_type_check
+    CHECK (job_type IN ('image_thumbnail', 'video', 'content_hash'));
+
+-- Une ligne par type de job: file d'attente, jobs en cours, echecs et
+-- durees des jobs termines sur la derniere heure
+CREATE OR REPLACE FUNCTION media_job_stats()
+RETURNS TABLE (
+    job_type TEXT,
+    queued BIGINT,
+    ready BIGINT,
+    processing BIGINT,
+    failed BIGINT,
+    oldest_queued_at TIMESTAMPTZ,
+    done_last_hour BIGINT,
+    avg_duration_ms INTEGER,
+    p95_duration_ms INTEGER
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        t.job_type,
+        (SELECT COUNT(*) FROM media_jobs q WHERE q.job_type = t.job_type AND q.status = 'queued'),
+        (SELECT COUNT(*) FROM media_jobs q WHERE q.job_type = t.job_type AND q.status = 'queued' AND q.run_after <= NOW()),
+        (SELECT COUNT(*) FROM media_jobs q WHERE q.job_type = t.job_type AND q.status = 'processing'),
+        (SELECT COUNT(*) FROM media_jobs q WHERE q.job_type = t.job_type AND q.status = 'failed'),
+        (SELECT MIN(q.created_at) FROM media_jobs q WHERE q.job_type = t.job_type AND q.status = 'queued'),
+        d.done,
+        d.avg_ms,
+        d.p95_ms
+    FROM (VALUES ('image_thumbnail'), ('video'), ('content_hash')) AS t(job_type)
+    CROSS JOIN LATERAL (
+        SELECT
+            COUNT(*) AS done,
+            AVG(m.duration_ms)::INTEGER AS avg_ms,
+            (PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY m.duration_ms))::INTEGER AS p95_ms
+        FROM media_jobs m
+        WHERE m.job_type = t.job_type
+            AND m.status = 'done'
+            AND m.updated_at > NOW() - INTERVAL '1 hour'
+    ) d;
+$$;
+
+COMMENT ON COLUMN media_jobs.job_type IS 'image_thumbnail, video, or content_hash (SHA-256 of a direct upload without media processing)';
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- DELETE FROM media_jobs WHERE job_type = 'content_hash';
+-- ALTER TABLE media_jobs DROP CONSTRAINT IF EXISTS media_jobs_job_type_check;
+-- ALTER TABLE media_jobs ADD CONSTRAINT media_jobs_job_type_check
+--     CHECK (job_type IN ('image_thumbnail', 'video'));
+-- (then re-run the media_job_stats definition of 014_media_job_lanes.sql)
+-- ============================================
@@ -0,0 +1,107 @@
+-- ============================================
+-- Migration: Partage atomique des objets Storage entre fichiers identiques
+-- Date: 2026-10-16
+-- Description: Un doublon (meme files.content_hash) reprend l'objet Storage et
+-- les derives d'un fichier pret; l'objet n'est supprime qu'avec le dernier
+-- fichier qui l'utilise. Les deux decisions sont prises en base, sous un
+-- verrou par empreinte (pg_advisory_xact_lock), pour qu'une suppression et
+-- une reprise simultanees ne puissent ni supprimer un objet encore utilise
+-- ni en oublier un:
+--   reuse_file_content  fait d'un fichier le doublon du plus ancien fichier
+--                       pret de meme empreinte (ligne mise a jour, ou rien)
+--   delete_file_row     supprime un fichier et ses references; renvoie la
+--                       ligne supprimee si son objet Storage (et ses
+--                       derives) n'est plus utilise, rien sinon
+-- ============================================
+
+CREATE OR REPLACE FUNCTION reuse_file_content(p_file_id UUID, p_content_hash TEXT)
+RETURNS SETOF files
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    source files%ROWTYPE;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtextextended(p_content_hash, 0));
+
+    SELECT * INTO source
+    FROM files
+    WHERE content_hash = p_content_hash
+        AND processing_status = 'ready'
+        AND id <> p_file_id
+    ORDER BY created_at
+    LIMIT 1;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    UPDATE files
+    SET file_path = source.file_path,
+        file_size = source.file_size,
+        original_file_size = source.original_file_size,
+        mime_type = source.mime_type,
+        thumbnail_path = source.thumbnail_path,
+        derivatives = source.derivatives,
+        media_info = source.media_info,
+        hls_path = source.hls_path,
+        content_hash = source.content_hash,
+        processing_status = 'ready',
+        processing_error = NULL
+    WHERE id = p_file_id
+    RETURNING *;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION delete_file_row(p_file_id UUID)
+RETURNS SETOF files
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    locked_hash TEXT;
+    target files%ROWTYPE;
+BEGIN
+    -- Verrou de l'empreinte avant celui de la ligne (meme ordre que
+    -- reuse_file_content); l'empreinte a pu changer entre-temps: recommencer
+    LOOP
+        SELECT content_hash INTO locked_hash FROM files WHERE id = p_file_id;
+        IF NOT FOUND THEN
+            RETURN;
+        END IF;
+        IF locked_hash IS NOT NULL THEN
+            PERFORM pg_advisory_xact_lock(hashtextextended(locked_hash, 0));
+        END IF;
+        SELECT * INTO target FROM files WHERE id = p_file_id FOR UPDATE;
+        IF NOT FOUND THEN
+            RETURN;
+        END IF;
+        EXIT WHEN target.content_hash IS NOT DISTINCT FROM locked_hash;
+    END LOOP;
+
+    DELETE FROM files_reference WHERE files_id = p_file_id;
+    DELETE FROM files WHERE id = p_file_id;
+
+    -- Ligne supprimee renvoyee si plus aucun fichier n'utilise son objet
+    IF target.content_hash IS NULL OR NOT EXISTS (
+        SELECT 1
+        FROM files
+        WHERE content_hash = target.content_hash
+            AND file_path = target.file_path
+    ) THEN
+        RETURN NEXT target;
+    END IF;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION reuse_file_content(UUID, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION delete_file_row(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION reuse_file_content(UUID, TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION delete_file_row(UUID) TO service_role;
+
+COMMENT ON FUNCTION reuse_file_content(UUID, TEXT) IS 'Points a file at the storage object and outputs of the oldest ready file with the same content hash (locked per hash); returns the updated row, or nothing if there is no such file';
+COMMENT ON FUNCTION delete_file_row(UUID) IS 'Deletes a file row and its references (locked per content hash); returns the deleted row when no other file uses its storage object (the caller then removes it and its outputs), nothing otherwise';
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- DROP FUNCTION IF EXISTS delete_file_row(UUID);
+-- DROP FUNCTION IF EXISTS reuse_file_content(UUID, TEXT);
+-- ============================================
@@ -0,0 +1,38 @@
+-- ============================================
+-- Migration: Purge des uploads directs abandonnes
+-- Date: 2026-10-16
+-- Description: Une ligne files reste en 'pending_upload' si le client ne
+-- finalise jamais son upload direct (POST /api/files/{file_id}/complete).
+-- Le worker media supprime periodiquement les lignes plus anciennes que
+-- PENDING_UPLOAD_MAX_AGE (au-dela de la validite de l'URL d'upload signee),
+-- puis les objets Storage correspondants (lignes renvoyees par la fonction).
+-- Depend de: 012_add_pending_upload_status.sql
+-- ============================================
+
+CREATE OR REPLACE FUNCTION purge_pending_uploads(p_max_age_seconds INTEGER, p_limit INTEGER)
+RETURNS SETOF files
+LANGUAGE sql
+AS $$
+    DELETE FROM files
+    WHERE id IN (
+        SELECT id
+        FROM files
+        WHERE processing_status = 'pending_upload'
+            AND created_at < NOW() - make_interval(secs => p_max_age_seconds)
+        ORDER BY created_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+        AND processing_status = 'pending_upload'
+    RETURNING *;
+$$;
+
+REVOKE EXECUTE ON FUNCTION purge_pending_uploads(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION purge_pending_uploads(INTEGER, INTEGER) TO service_role;
+
+COMMENT ON FUNCTION purge_pending_uploads(INTEGER, INTEGER) IS 'Deletes up to p_limit files rows left in pending_upload for more than p_max_age_seconds (abandoned direct uploads); returns the deleted rows (the caller removes their storage objects)';
+
+-- ============================================
+-- ROLLBACK (run manually if needed):
+-- DROP FUNCTION IF EXISTS purge_pending_uploads(INTEGER, INTEGER);
+-- ============================================
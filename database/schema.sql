@@ -196,10 +196,29 @@ CREATE INDEX idx_session_master_group_id ON session_master(group_id);
 CREATE INDEX idx_session_master_type_seance_id ON session_master(type_seance_id);
 CREATE INDEX idx_session_master_coach_id ON session_master(coach_id);
 CREATE INDEX idx_session_master_date_start ON session_master(date_start);
+CREATE INDEX idx_session_master_group_date_start ON session_master(group_id, date_start)
+WHERE is_deleted = FALSE;
 CREATE INDEX idx_session_master_is_deleted ON session_master(is_deleted)
 WHERE is_deleted = FALSE;
 CREATE TRIGGER update_session_master_updated_at BEFORE
 UPDATE ON session_master FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+-- Vue: groupe + compteurs (projets, sessions non supprimees)
+CREATE OR REPLACE VIEW group_summary WITH (security_invoker = true) AS
+SELECT g.*,
+    ts.name AS type_support_name,
+    (
+        SELECT COUNT(*)
+        FROM group_project gp
+        WHERE gp.group_id = g.id
+    )::INTEGER AS projects_count,
+    (
+        SELECT COUNT(*)
+        FROM session_master sm
+        WHERE sm.group_id = g.id
+            AND sm.is_deleted = FALSE
+    )::INTEGER AS sessions_count
+FROM "group" g
+    LEFT JOIN type_support ts ON ts.id = g.type_support_id;
 -- Trigger: Vérifier que coach_id est un Coach (type_profile_id = 3)
 CREATE OR REPLACE FUNCTION check_session_master_coach_is_coach() RETURNS TRIGGER AS $$ BEGIN IF NEW.coach_id IS NOT NULL
     AND NOT EXISTS (
@@ -237,6 +256,8 @@ CREATE INDEX idx_session_project_id ON session(project_id);
 CREATE INDEX idx_session_session_master_id ON session(session_master_id);
 CREATE INDEX idx_session_type_seance_id ON session(type_seance_id);
 CREATE INDEX idx_session_date_start ON session(date_start);
+CREATE INDEX idx_session_project_date_start ON session(project_id, date_start)
+WHERE is_deleted = FALSE;
 CREATE INDEX idx_session_is_deleted ON session(is_deleted)
 WHERE is_deleted = FALSE;
 CREATE TRIGGER update_session_updated_at BEFORE
@@ -288,6 +309,9 @@ CREATE TABLE IF NOT EXISTS work_lead_master (
     content TEXT,
     is_archived BOOLEAN DEFAULT FALSE,
     is_deleted BOOLEAN DEFAULT FALSE,
+    current_status TEXT NOT NULL DEFAULT 'NEW' CHECK (current_status IN ('NEW', 'TODO', 'WORKING', 'DANGER', 'OK')),
+    -- maintenu par trigger depuis session_master_work_lead_master
+    current_status_at TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -295,8 +319,11 @@ CREATE INDEX idx_work_lead_master_group_id ON work_lead_master(group_id);
 CREATE INDEX idx_work_lead_master_work_lead_type_id ON work_lead_master(work_lead_type_id);
 CREATE INDEX idx_work_lead_master_is_deleted ON work_lead_master(is_deleted)
 WHERE is_deleted = FALSE;
+CREATE INDEX idx_work_lead_master_current_status ON work_lead_master(group_id, current_status);
+-- pg_trigger_depth: ne pas toucher updated_at lors du recalcul de current_status
 CREATE TRIGGER update_work_lead_master_updated_at BEFORE
-UPDATE ON work_lead_master FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+UPDATE ON work_lead_master FOR EACH ROW
+    WHEN (pg_trigger_depth() < 1) EXECUTE FUNCTION update_updated_at_column();
 -- Work Lead (axe de travail au niveau projet)
 CREATE TABLE IF NOT EXISTS work_lead (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -308,6 +335,9 @@ CREATE TABLE IF NOT EXISTS work_lead (
         content TEXT,
         is_archived BOOLEAN DEFAULT FALSE,
         is_deleted BOOLEAN DEFAULT FALSE,
+        current_status TEXT NOT NULL DEFAULT 'NEW' CHECK (current_status IN ('NEW', 'TODO', 'WORKING', 'DANGER', 'OK')),
+        -- maintenu par trigger depuis session_work_lead
+        current_status_at TIMESTAMP WITH TIME ZONE,
         created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
         updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -316,8 +346,10 @@ CREATE INDEX idx_work_lead_work_lead_master_id ON work_lead(work_lead_master_id)
 CREATE INDEX idx_work_lead_work_lead_type_id ON work_lead(work_lead_type_id);
 CREATE INDEX idx_work_lead_is_deleted ON work_lead(is_deleted)
 WHERE is_deleted = FALSE;
+CREATE INDEX idx_work_lead_current_status ON work_lead(project_id, current_status);
 CREATE TRIGGER update_work_lead_updated_at BEFORE
-UPDATE ON work_lead FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+UPDATE ON work_lead FOR EACH ROW
+    WHEN (pg_trigger_depth() < 1) EXECUTE FUNCTION update_updated_at_column();
 -- Pivot: Session <-> Work Lead
 CREATE TABLE IF NOT EXISTS session_work_lead (
     session_id UUID NOT NULL REFERENCES session(id) ON DELETE CASCADE,
@@ -354,6 +386,94 @@ CREATE INDEX idx_session_master_work_lead_master_status ON session_master_work_l
 CREATE INDEX idx_session_master_work_lead_master_profile_id ON session_master_work_lead_master(profile_id);
 CREATE TRIGGER update_session_master_work_lead_master_updated_at BEFORE
 UPDATE ON session_master_work_lead_master FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+CREATE INDEX idx_session_work_lead_work_lead_updated ON session_work_lead(work_lead_id, updated_at DESC);
+CREATE INDEX idx_session_master_work_lead_master_wlm_updated ON session_master_work_lead_master(work_lead_master_id, updated_at DESC);
+-- Statut courant (entree pivot la plus recente, absente = NEW)
+CREATE OR REPLACE VIEW work_lead_current_status WITH (security_invoker = true) AS
+SELECT DISTINCT ON (work_lead_id) work_lead_id,
+    status,
+    updated_at
+FROM session_work_lead
+ORDER BY work_lead_id,
+    updated_at DESC;
+CREATE OR REPLACE VIEW work_lead_master_current_status WITH (security_invoker = true) AS
+SELECT DISTINCT ON (work_lead_master_id) work_lead_master_id,
+    status,
+    updated_at
+FROM session_master_work_lead_master
+ORDER BY work_lead_master_id,
+    updated_at DESC;
+-- Maintien de work_lead.current_status / work_lead_master.current_status
+CREATE OR REPLACE FUNCTION refresh_work_lead_current_status(p_work_lead_id UUID) RETURNS VOID AS $$ BEGIN
+UPDATE work_lead
+SET current_status = COALESCE(latest.status, 'NEW'),
+    current_status_at = latest.updated_at
+FROM (
+        SELECT p_work_lead_id AS id
+    ) target
+    LEFT JOIN LATERAL (
+        SELECT status,
+            updated_at
+        FROM session_work_lead
+        WHERE work_lead_id = target.id
+        ORDER BY updated_at DESC
+        LIMIT 1
+    ) latest ON TRUE
+WHERE work_lead.id = target.id;
+END;
+$$ LANGUAGE plpgsql;
+CREATE OR REPLACE FUNCTION refresh_work_lead_master_current_status(p_work_lead_master_id UUID) RETURNS VOID AS $$ BEGIN
+UPDATE work_lead_master
+SET current_status = COALESCE(latest.status, 'NEW'),
+    current_status_at = latest.updated_at
+FROM (
+        SELECT p_work_lead_master_id AS id
+    ) target
+    LEFT JOIN LATERAL (
+        SELECT status,
+            updated_at
+        FROM session_master_work_lead_master
+        WHERE work_lead_master_id = target.id
+        ORDER BY updated_at DESC
+        LIMIT 1
+    ) latest ON TRUE
+WHERE work_lead_master.id = target.id;
+END;
+$$ LANGUAGE plpgsql;
+CREATE OR REPLACE FUNCTION sync_work_lead_current_status() RETURNS TRIGGER AS $$ BEGIN IF TG_OP IN ('UPDATE', 'DELETE') THEN PERFORM refresh_work_lead_current_status(OLD.work_lead_id);
+END IF;
+IF TG_OP = 'INSERT'
+OR (
+    TG_OP = 'UPDATE'
+    AND NEW.work_lead_id IS DISTINCT FROM OLD.work_lead_id
+) THEN PERFORM refresh_work_lead_current_status(NEW.work_lead_id);
+END IF;
+RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+CREATE OR REPLACE FUNCTION sync_work_lead_master_current_status() RETURNS TRIGGER AS $$ BEGIN IF TG_OP IN ('UPDATE', 'DELETE') THEN PERFORM refresh_work_lead_master_current_status(OLD.work_lead_master_id);
+END IF;
+IF TG_OP = 'INSERT'
+OR (
+    TG_OP = 'UPDATE'
+    AND NEW.work_lead_master_id IS DISTINCT FROM OLD.work_lead_master_id
+) THEN PERFORM refresh_work_lead_master_current_status(NEW.work_lead_master_id);
+END IF;
+RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER sync_session_work_lead_current_status
+AFTER
+INSERT
+    OR
+UPDATE
+    OR DELETE ON session_work_lead FOR EACH ROW EXECUTE FUNCTION sync_work_lead_current_status();
+CREATE TRIGGER sync_session_master_work_lead_master_current_status
+AFTER
+INSERT
+    OR
+UPDATE
+    OR DELETE ON session_master_work_lead_master FOR EACH ROW EXECUTE FUNCTION sync_work_lead_master_current_status();
 -- ============================================
 -- PERIODS (Periodes d'entrainement)
 -- ============================================
@@ -400,6 +520,40 @@ CREATE INDEX idx_period_is_deleted ON period(is_deleted)
 WHERE is_deleted = FALSE;
 CREATE TRIGGER update_period_updated_at BEFORE
 UPDATE ON period FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+-- Vues: periodes + compteurs (sessions dont date_start est dans la periode)
+CREATE OR REPLACE VIEW period_master_summary WITH (security_invoker = true) AS
+SELECT pm.*,
+    NULLIF(
+        TRIM(
+            COALESCE(pr.first_name, '') || ' ' || COALESCE(pr.last_name, '')
+        ),
+        ''
+    ) AS profile_name,
+    (
+        SELECT COUNT(*)
+        FROM period p
+        WHERE p.period_master_id = pm.id
+            AND p.is_deleted = FALSE
+    )::INTEGER AS project_count,
+    (
+        SELECT COUNT(*)
+        FROM session_master sm
+        WHERE sm.group_id = pm.group_id
+            AND sm.is_deleted = FALSE
+            AND sm.date_start BETWEEN pm.date_start AND pm.date_end
+    )::INTEGER AS session_master_count
+FROM period_master pm
+    LEFT JOIN profile pr ON pr.id = pm.profile_id;
+CREATE OR REPLACE VIEW period_summary WITH (security_invoker = true) AS
+SELECT p.*,
+    (
+        SELECT COUNT(*)
+        FROM session s
+        WHERE s.project_id = p.project_id
+            AND s.is_deleted = FALSE
+            AND s.date_start BETWEEN p.date_start AND p.date_end
+    )::INTEGER AS session_count
+FROM period p;
 -- ============================================
 -- FICHIERS
 -- ============================================
@@ -442,17 +596,23 @@ CREATE TABLE IF NOT EXISTS files (
     thumbnail_path TEXT,
     -- Path to thumbnail in Supabase Storage (400x400)
     processing_status TEXT DEFAULT 'ready' CHECK (
-        processing_status IN ('ready', 'pending', 'processing', 'failed')
+        processing_status IN ('pending_upload', 'ready', 'pending', 'processing', 'failed')
     ),
     processing_error TEXT,
     -- Error message if processing failed
-    original_file_size INTEGER -- Original size before video compression
+    original_file_size INTEGER, -- Original size before video compression
+    derivatives JSONB, -- Image derivatives [{width, height, format, path, size}]
+    media_info JSONB, -- Video metadata (ffprobe), processing action, sprite sheet, HLS ladder
+    hls_path TEXT, -- HLS master playlist (hls/{file_id}/master.m3u8), NULL if MP4 only
+    content_hash TEXT -- SHA-256 of the uploaded content, shared storage object between duplicates
 );
 CREATE INDEX idx_files_origin ON files(origin_entity_type, origin_entity_id);
 CREATE INDEX idx_files_uploaded_by ON files(uploaded_by);
 CREATE INDEX idx_files_file_type ON files(file_type);
 CREATE INDEX idx_files_processing_status ON files(processing_status)
-WHERE processing_status IN ('pending', 'processing');
+WHERE processing_status IN ('pending_upload', 'pending', 'processing');
+CREATE INDEX idx_files_content_hash ON files(content_hash)
+WHERE content_hash IS NOT NULL;
 -- Table files_reference (références secondaires vers un fichier)
 CREATE TABLE IF NOT EXISTS files_reference (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -475,6 +635,418 @@ CREATE TABLE IF NOT EXISTS files_reference (
 );
 CREATE INDEX idx_files_reference_files_id ON files_reference(files_id);
 CREATE INDEX idx_files_reference_entity ON files_reference(entity_type, entity_id);
+-- Doublons de contenu: objet Storage partage, reprise et suppression sous verrou par empreinte (RPC)
+CREATE OR REPLACE FUNCTION reuse_file_content(p_file_id UUID, p_content_hash TEXT)
+RETURNS SETOF files
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    source files%ROWTYPE;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtextextended(p_content_hash, 0));
+
+    SELECT * INTO source
+    FROM files
+    WHERE content_hash = p_content_hash
+        AND processing_status = 'ready'
+        AND id <> p_file_id
+    ORDER BY created_at
+    LIMIT 1;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    UPDATE files
+    SET file_path = source.file_path,
+        file_size = source.file_size,
+        original_file_size = source.original_file_size,
+        mime_type = source.mime_type,
+        thumbnail_path = source.thumbnail_path,
+        derivatives = source.derivatives,
+        media_info = source.media_info,
+        hls_path = source.hls_path,
+        content_hash = source.content_hash,
+        processing_status = 'ready',
+        processing_error = NULL
+    WHERE id = p_file_id
+    RETURNING *;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION delete_file_row(p_file_id UUID)
+RETURNS SETOF files
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    locked_hash TEXT;
+    target files%ROWTYPE;
+BEGIN
+    -- Verrou de l'empreinte avant celui de la ligne (meme ordre que
+    -- reuse_file_content); l'empreinte a pu changer entre-temps: recommencer
+    LOOP
+        SELECT content_hash INTO locked_hash FROM files WHERE id = p_file_id;
+        IF NOT FOUND THEN
+            RETURN;
+        END IF;
+        IF locked_hash IS NOT NULL THEN
+            PERFORM pg_advisory_xact_lock(hashtextextended(locked_hash, 0));
+        END IF;
+        SELECT * INTO target FROM files WHERE id = p_file_id FOR UPDATE;
+        IF NOT FOUND THEN
+            RETURN;
+        END IF;
+        EXIT WHEN target.content_hash IS NOT DISTINCT FROM locked_hash;
+    END LOOP;
+
+    DELETE FROM files_reference WHERE files_id = p_file_id;
+    DELETE FROM files WHERE id = p_file_id;
+
+    -- Ligne supprimee renvoyee si plus aucun fichier n'utilise son objet
+    IF target.content_hash IS NULL OR NOT EXISTS (
+        SELECT 1
+        FROM files
+        WHERE content_hash = target.content_hash
+            AND file_path = target.file_path
+    ) THEN
+        RETURN NEXT target;
+    END IF;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION reuse_file_content(UUID, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION delete_file_row(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION reuse_file_content(UUID, TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION delete_file_row(UUID) TO service_role;
+
+COMMENT ON FUNCTION reuse_file_content(UUID, TEXT) IS 'Points a file at the storage object and outputs of the oldest ready file with the same content hash (locked per hash); returns the updated row, or nothing if there is no such file';
+COMMENT ON FUNCTION delete_file_row(UUID) IS 'Deletes a file row and its references (locked per content hash); returns the deleted row when no other file uses its storage object (the caller then removes it and its outputs), nothing otherwise';
+-- Uploads directs abandonnes (pending_upload): purge periodique par le worker media (RPC)
+CREATE OR REPLACE FUNCTION purge_pending_uploads(p_max_age_seconds INTEGER, p_limit INTEGER)
+RETURNS SETOF files
+LANGUAGE sql
+AS $$
+    DELETE FROM files
+    WHERE id IN (
+        SELECT id
+        FROM files
+        WHERE processing_status = 'pending_upload'
+            AND created_at < NOW() - make_interval(secs => p_max_age_seconds)
+        ORDER BY created_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+        AND processing_status = 'pending_upload'
+    RETURNING *;
+$$;
+
+REVOKE EXECUTE ON FUNCTION purge_pending_uploads(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION purge_pending_uploads(INTEGER, INTEGER) TO service_role;
+
+COMMENT ON FUNCTION purge_pending_uploads(INTEGER, INTEGER) IS 'Deletes up to p_limit files rows left in pending_upload for more than p_max_age_seconds (abandoned direct uploads); returns the deleted rows (the caller removes their storage objects)';
+-- Propagation du statut d'un work_lead_master vers les work_lead des projets (RPC)
+CREATE OR REPLACE FUNCTION propagate_work_lead_master_status(
+    p_session_master_id UUID,
+    p_work_lead_master_id UUID,
+    p_status TEXT,
+    p_profile_id UUID
+) RETURNS INTEGER AS $$
+DECLARE
+    affected INTEGER := 0;
+BEGIN
+    IF p_status IS NULL THEN
+        DELETE FROM session_work_lead swl
+        USING session s, work_lead wl
+        WHERE s.session_master_id = p_session_master_id
+            AND s.is_deleted = FALSE
+            AND swl.session_id = s.id
+            AND wl.id = swl.work_lead_id
+            AND wl.project_id = s.project_id
+            AND wl.work_lead_master_id = p_work_lead_master_id
+            AND wl.is_deleted = FALSE
+            AND swl.override_master = FALSE;
+        GET DIAGNOSTICS affected = ROW_COUNT;
+
+        DELETE FROM session_master_work_lead_master
+        WHERE session_master_id = p_session_master_id
+            AND work_lead_master_id = p_work_lead_master_id;
+
+        RETURN affected;
+    END IF;
+
+    -- 1. Association session_master <-> work_lead_master
+    INSERT INTO session_master_work_lead_master (session_master_id, work_lead_master_id, status, profile_id)
+    VALUES (p_session_master_id, p_work_lead_master_id, p_status, p_profile_id)
+    ON CONFLICT (session_master_id, work_lead_master_id) DO UPDATE
+        SET status = EXCLUDED.status,
+            profile_id = EXCLUDED.profile_id;
+
+    -- 2. Work leads manquants + partage des fichiers du master
+    WITH created AS (
+        INSERT INTO work_lead (project_id, work_lead_master_id, work_lead_type_id, name, content)
+        SELECT targets.project_id, wlm.id, wlm.work_lead_type_id, wlm.name, wlm.content
+        FROM (
+                SELECT DISTINCT project_id
+                FROM session
+                WHERE session_master_id = p_session_master_id
+                    AND is_deleted = FALSE
+            ) targets
+            JOIN work_lead_master wlm ON wlm.id = p_work_lead_master_id
+        WHERE NOT EXISTS (
+                SELECT 1
+                FROM work_lead wl
+                WHERE wl.project_id = targets.project_id
+                    AND wl.work_lead_master_id = p_work_lead_master_id
+                    AND wl.is_deleted = FALSE
+            )
+        RETURNING id
+    )
+    INSERT INTO files_reference (files_id, entity_type, entity_id)
+    SELECT master_files.files_id, 'work_lead', created.id
+    FROM created
+        CROSS JOIN (
+            SELECT id AS files_id
+            FROM files
+            WHERE origin_entity_type = 'work_lead_master'
+                AND origin_entity_id = p_work_lead_master_id
+            UNION ALL
+            SELECT files_id
+            FROM files_reference
+            WHERE entity_type = 'work_lead_master'
+                AND entity_id = p_work_lead_master_id
+        ) master_files;
+
+    -- 3. Statut des work leads pour chaque session de la session_master
+    INSERT INTO session_work_lead (session_id, work_lead_id, status, override_master, profile_id)
+    SELECT DISTINCT ON (s.id) s.id, wl.id, p_status, FALSE, p_profile_id
+    FROM session s
+        JOIN work_lead wl ON wl.project_id = s.project_id
+            AND wl.work_lead_master_id = p_work_lead_master_id
+            AND wl.is_deleted = FALSE
+    WHERE s.session_master_id = p_session_master_id
+        AND s.is_deleted = FALSE
+    ORDER BY s.id, wl.created_at
+    ON CONFLICT (session_id, work_lead_id) DO UPDATE
+        SET status = EXCLUDED.status,
+            profile_id = EXCLUDED.profile_id
+        WHERE session_work_lead.override_master = FALSE;
+    GET DIAGNOSTICS affected = ROW_COUNT;
+
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Reserve au backend (cle secrete): pas d'appel direct depuis le client
+REVOKE ALL ON FUNCTION propagate_work_lead_master_status(UUID, UUID, TEXT, UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION propagate_work_lead_master_status(UUID, UUID, TEXT, UUID) TO service_role;
+
+-- File de traitements media (consommee par le worker: python -m app.worker)
+CREATE TABLE IF NOT EXISTS media_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    file_id UUID NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    job_type TEXT NOT NULL CHECK (job_type IN ('image_thumbnail', 'video', 'content_hash')),
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status TEXT NOT NULL DEFAULT 'queued' CHECK (
+        status IN ('queued', 'processing', 'done', 'failed')
+    ),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_by TEXT,
+    locked_at TIMESTAMPTZ,
+    last_error TEXT,
+    started_at TIMESTAMPTZ,
+    duration_ms INTEGER,
+    timings JSONB,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Jobs prets a etre reserves (par type)
+CREATE INDEX IF NOT EXISTS idx_media_jobs_queued ON media_jobs(job_type, run_after)
+WHERE status = 'queued';
+-- Statistiques des jobs termines recemment
+CREATE INDEX IF NOT EXISTS idx_media_jobs_done ON media_jobs(job_type, updated_at)
+WHERE status = 'done';
+-- Jobs en cours (detection des reservations expirees)
+CREATE INDEX IF NOT EXISTS idx_media_jobs_processing ON media_jobs(locked_at)
+WHERE status = 'processing';
+-- Un seul job actif par fichier et par type
+CREATE UNIQUE INDEX IF NOT EXISTS idx_media_jobs_active_file ON media_jobs(file_id, job_type)
+WHERE status IN ('queued', 'processing');
+
+DROP TRIGGER IF EXISTS update_media_jobs_updated_at ON media_jobs;
+CREATE TRIGGER update_media_jobs_updated_at
+    BEFORE UPDATE ON media_jobs
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE OR REPLACE FUNCTION claim_media_jobs(p_worker TEXT, p_limit INTEGER, p_job_type TEXT DEFAULT NULL)
+RETURNS SETOF media_jobs
+LANGUAGE sql
+AS $$
+    UPDATE media_jobs j
+    SET status = 'processing',
+        locked_by = p_worker,
+        locked_at = NOW(),
+        started_at = NOW(),
+        attempts = j.attempts + 1
+    WHERE j.id IN (
+        SELECT id
+        FROM media_jobs
+        WHERE status = 'queued'
+            AND run_after <= NOW()
+            AND (p_job_type IS NULL OR job_type = p_job_type)
+        ORDER BY run_after
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING j.*;
+$$;
+
+CREATE OR REPLACE FUNCTION heartbeat_media_jobs(p_worker TEXT, p_job_ids UUID[])
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH touched AS (
+        UPDATE media_jobs
+        SET locked_at = NOW()
+        WHERE id = ANY(p_job_ids)
+            AND status = 'processing'
+            AND locked_by = p_worker
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM touched;
+$$;
+
+CREATE OR REPLACE FUNCTION complete_media_job(p_job_id UUID, p_duration_ms INTEGER DEFAULT NULL, p_timings JSONB DEFAULT NULL)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    UPDATE media_jobs
+    SET status = 'done',
+        locked_by = NULL,
+        locked_at = NULL,
+        last_error = NULL,
+        duration_ms = p_duration_ms,
+        timings = p_timings
+    WHERE id = p_job_id;
+$$;
+
+-- Retourne le statut resultant: 'queued' (nouvel essai apres p_retry_delay
+-- secondes, fichier remis en 'pending') ou 'failed' (nombre maximal d'essais
+-- atteint, fichier en 'failed')
+CREATE OR REPLACE FUNCTION fail_media_job(p_job_id UUID, p_error TEXT, p_retry_delay INTEGER)
+RETURNS TEXT
+LANGUAGE sql
+AS $$
+    WITH failed AS (
+        UPDATE media_jobs
+        SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+            run_after = NOW() + make_interval(secs => p_retry_delay),
+            locked_by = NULL,
+            locked_at = NULL,
+            last_error = LEFT(p_error, 2000)
+        WHERE id = p_job_id
+        RETURNING file_id, status
+    ),
+    file_update AS (
+        UPDATE files f
+        SET processing_status = CASE WHEN failed.status = 'failed' THEN 'failed' ELSE 'pending' END,
+            processing_error = LEFT(p_error, 500)
+        FROM failed
+        WHERE f.id = failed.file_id
+        RETURNING 1
+    )
+    SELECT status FROM failed;
+$$;
+
+CREATE OR REPLACE FUNCTION requeue_stale_media_jobs(p_timeout_seconds INTEGER)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH requeued AS (
+        UPDATE media_jobs
+        SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+            run_after = NOW(),
+            locked_by = NULL,
+            locked_at = NULL,
+            last_error = 'Reservation expiree (worker arrete ou bloque)'
+        WHERE status = 'processing'
+            AND locked_at < NOW() - make_interval(secs => p_timeout_seconds)
+        RETURNING file_id, status
+    ),
+    file_update AS (
+        UPDATE files f
+        SET processing_status = CASE WHEN requeued.status = 'failed' THEN 'failed' ELSE 'pending' END,
+            processing_error = CASE WHEN requeued.status = 'failed'
+                THEN 'Traitement interrompu' ELSE f.processing_error END
+        FROM requeued
+        WHERE f.id = requeued.file_id
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM requeued;
+$$;
+
+-- Une ligne par type de job: file d'attente, jobs en cours, echecs et
+-- durees des jobs termines sur la derniere heure
+CREATE OR REPLACE FUNCTION media_job_stats()
+RETURNS TABLE (
+    job_type TEXT,
+    queued BIGINT,
+    ready BIGINT,
+    processing BIGINT,
+    failed BIGINT,
+    oldest_queued_at TIMESTAMPTZ,
+    done_last_hour BIGINT,
+    avg_duration_ms INTEGER,
+    p95_duration_ms INTEGER
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        t.job_type,
+        (SELECT COUNT(*) FROM media_jobs q WHERE q.job_type = t.job_type AND q.status = 'queued'),
+        (SELECT COUNT(*) FROM media_jobs q WHERE q.job_type = t.job_type AND q.status = 'queued' AND q.run_after <= NOW()),
+        (SELECT COUNT(*) FROM media_jobs q WHERE q.job_type = t.job_type AND q.status = 'processing'),
+        (SELECT COUNT(*) FROM media_jobs q WHERE q.job_type = t.job_type AND q.status = 'failed'),
+        (SELECT MIN(q.created_at) FROM media_jobs q WHERE q.job_type = t.job_type AND q.status = 'queued'),
+        d.done,
+        d.avg_ms,
+        d.p95_ms
+    FROM (VALUES ('image_thumbnail'), ('video'), ('content_hash')) AS t(job_type)
+    CROSS JOIN LATERAL (
+        SELECT
+            COUNT(*) AS done,
+            AVG(m.duration_ms)::INTEGER AS avg_ms,
+            (PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY m.duration_ms))::INTEGER AS p95_ms
+        FROM media_jobs m
+        WHERE m.job_type = t.job_type
+            AND m.status = 'done'
+            AND m.updated_at > NOW() - INTERVAL '1 hour'
+    ) d;
+$$;
+
+REVOKE EXECUTE ON FUNCTION claim_media_jobs(TEXT, INTEGER, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION heartbeat_media_jobs(TEXT, UUID[]) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION complete_media_job(UUID, INTEGER, JSONB) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION fail_media_job(UUID, TEXT, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION requeue_stale_media_jobs(INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_media_jobs(TEXT, INTEGER, TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION heartbeat_media_jobs(TEXT, UUID[]) TO service_role;
+GRANT EXECUTE ON FUNCTION complete_media_job(UUID, INTEGER, JSONB) TO service_role;
+GRANT EXECUTE ON FUNCTION fail_media_job(UUID, TEXT, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION requeue_stale_media_jobs(INTEGER) TO service_role;
+REVOKE EXECUTE ON FUNCTION media_job_stats() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION media_job_stats() TO service_role;
+
+COMMENT ON TABLE media_jobs IS 'Persistent media processing queue (thumbnails, video compression, content hashes), consumed by the worker process';
+COMMENT ON COLUMN media_jobs.job_type IS 'image_thumbnail, video, or content_hash (SHA-256 of a direct upload without media processing)';
+COMMENT ON COLUMN media_jobs.run_after IS 'Earliest time the job may be claimed (retry backoff)';
+COMMENT ON COLUMN media_jobs.locked_at IS 'Last claim or heartbeat by locked_by; stale locks are requeued';
+COMMENT ON COLUMN media_jobs.started_at IS 'Start of the current (or last) attempt';
+COMMENT ON COLUMN media_jobs.duration_ms IS 'Wall-clock duration of the successful attempt, measured by the worker';
+COMMENT ON COLUMN media_jobs.timings IS 'Per-step durations in ms (download, process, upload...)';
 -- ============================================
 -- MÉTÉO
 -- ============================================
@@ -523,6 +1095,7 @@ ALTER TABLE session_work_lead ENABLE ROW LEVEL SECURITY;
 ALTER TABLE session_master_work_lead_master ENABLE ROW LEVEL SECURITY;
 ALTER TABLE files ENABLE ROW LEVEL SECURITY;
 ALTER TABLE files_reference ENABLE ROW LEVEL SECURITY;
+ALTER TABLE media_jobs ENABLE ROW LEVEL SECURITY;
 ALTER TABLE weather_data ENABLE ROW LEVEL SECURITY;
 ALTER TABLE period_master ENABLE ROW LEVEL SECURITY;
 ALTER TABLE period ENABLE ROW LEVEL SECURITY;
@@ -937,6 +1510,23 @@ CREATE POLICY "Navigant access own periods" ON period FOR ALL TO authenticated U
     )
     AND is_deleted = FALSE
 );
+-- ============================================
+-- REALTIME
+-- ============================================
+
+-- Changements de statut des fichiers relayes par l'API (files/status/stream)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_publication WHERE pubname = 'supabase_realtime')
+        AND NOT EXISTS (
+            SELECT 1 FROM pg_publication_tables
+            WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'files'
+        )
+    THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE files;
+    END IF;
+END $$;
+
 -- ============================================
 -- FIN DU SCHEMA
 -- ============================================
\ No newline at end of file
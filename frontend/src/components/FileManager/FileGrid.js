@@ -1,5 +1,7 @@
 import { useState, useEffect, useCallback, useMemo } from 'react'
 import { fileService } from '../../services/fileService'
+import ResponsiveImage from '../shared/ResponsiveImage'
+import VideoScrubPreview from '../shared/VideoScrubPreview'
 
 /**
  * FileGrid - Composant de presentation pour afficher des fichiers
@@ -180,17 +182,19 @@ function FileGrid({
                 onClick={() => !fileService.isProcessing(file) && handleImageClick(file)}
               >
                 {fileService.isImage(file) && fileService.getDisplayUrl(file) ? (
-                  <img
+                  <ResponsiveImage
+                    file={file}
                     src={fileService.getDisplayUrl(file)}
+                    sizes="(min-width: 1024px) 20vw, (min-width: 768px) 25vw, (min-width: 640px) 33vw, 50vw"
                     alt={file.file_name}
                     className="w-full h-full object-cover"
                   />
                 ) : fileService.isVideo(file) ? (
                   <div className="relative w-full h-full">
-                    {/* Thumbnail video ou fallback sur video element */}
+                    {/* Thumbnail video (apercus au survol) ou fallback sur video element */}
                     {file.thumbnail_url ? (
-                      <img
-                        src={file.thumbnail_url}
+                      <VideoScrubPreview
+                        file={file}
                         alt={file.file_name}
                         className="w-full h-full object-cover"
                       />
@@ -208,7 +212,7 @@ function FileGrid({
                     )}
                     {/* Overlay play icon (seulement si pas en traitement) */}
                     {!fileService.isProcessing(file) && (
-                      <div className="absolute inset-0 flex items-center justify-center bg-black/30">
+                      <div className="absolute inset-0 flex items-center justify-center bg-black/30 pointer-events-none">
                         <svg className="w-12 h-12 text-white/80" fill="currentColor" viewBox="0 0 24 24">
                           <path d="M8 5v14l11-7z" />
                         </svg>
@@ -320,8 +324,10 @@ function FileGrid({
               {/* Icone */}
               <div className="flex-shrink-0 mr-3">
                 {fileService.isImage(file) && fileService.getDisplayUrl(file) ? (
-                  <img
+                  <ResponsiveImage
+                    file={file}
                     src={fileService.getDisplayUrl(file)}
+                    sizes="40px"
                     alt={file.file_name}
                     className="w-10 h-10 object-cover rounded cursor-pointer"
                     onClick={() => handleImageClick(file)}
@@ -619,15 +625,18 @@ function FileGrid({
 
             {/* Image ou Video */}
             {fileService.isImage(selectedFile) ? (
-              <img
+              <ResponsiveImage
+                file={selectedFile}
                 src={selectedFile.signed_url}
+                sizes="100vw"
                 alt={selectedFile.file_name}
                 className="max-w-[calc(100%-6rem)] max-h-full object-contain"
                 onClick={() => setShowFullscreen(false)}
               />
             ) : (
               <video
-                src={selectedFile.signed_url}
+                src={fileService.getPlaybackUrl(selectedFile)}
+                poster={selectedFile.thumbnail_url || undefined}
                 controls
                 autoPlay
                 className="max-w-[calc(100%-6rem)] max-h-full"
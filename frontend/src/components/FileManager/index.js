@@ -42,7 +42,9 @@ function FileManager({
   const [showDeleteModal, setShowDeleteModal] = useState(false)
   const [deleteInfo, setDeleteInfo] = useState(null)
   const fileInputRef = useRef(null)
-  const loadFilesRef = useRef(null) // Ref pour eviter re-abonnement du polling
+  const loadFilesRef = useRef(null) // Ref pour eviter re-abonnement du suivi des traitements
+  const streamRef = useRef(null) // Flux de suivi en cours: { ids, controller }
+  const [streamRetry, setStreamRetry] = useState(0)
 
   // Charger les fichiers (pagine)
   const loadFiles = useCallback(async () => {
@@ -62,7 +64,7 @@ function FileManager({
     }
   }, [entityType, entityId, offset, limit])
 
-  // Garder une ref a jour de loadFiles pour le polling
+  // Garder une ref a jour de loadFiles pour le suivi des traitements
   useEffect(() => {
     loadFilesRef.current = loadFiles
   }, [loadFiles])
@@ -78,20 +80,54 @@ function FileManager({
     }
   }, [refreshTrigger]) // eslint-disable-line react-hooks/exhaustive-deps
 
-  // Polling automatique quand des fichiers sont en cours de traitement
-  // Utilise une ref pour eviter le re-abonnement quand loadFiles change
-  useEffect(() => {
-    const hasProcessingFiles = files.some(f => fileService.isProcessing(f))
-
-    if (!hasProcessingFiles) return
+  // Suivi des fichiers en cours de traitement (flux SSE): seules les lignes
+  // concernees sont mises a jour, sans recharger la page
+  const processingKey = files
+    .filter(f => fileService.isProcessing(f))
+    .map(f => f.id)
+    .sort()
+    .join(',')
 
-    const pollInterval = setInterval(() => {
-      console.log('Polling for processing files...')
-      loadFilesRef.current?.()
-    }, 5000) // Poll toutes les 5 secondes
+  useEffect(() => {
+    const ids = processingKey ? processingKey.split(',') : []
+    const current = streamRef.current
+    // Fichiers deja suivis par le flux en cours (ou plus rien a suivre)
+    if (current ? ids.every(id => current.ids.has(id)) : !ids.length) return
+    current?.controller.abort()
+
+    const stream = { ids: new Set(ids), controller: new AbortController() }
+    streamRef.current = stream
+    const updateFile = (id, changes) => {
+      setFiles(prev => prev.map(f => (f.id === id ? { ...f, ...changes } : f)))
+    }
 
-    return () => clearInterval(pollInterval)
-  }, [files])
+    fileService.watchProcessing(ids, {
+      onStatus: ({ id, processing_status, processing_error }) => {
+        updateFile(id, { processing_status, processing_error })
+      },
+      // is_reference / reference_id: ceux de la ligne affichee
+      onFile: ({ is_reference, reference_id, ...file }) => updateFile(file.id, file),
+      onRemoved: () => loadFilesRef.current?.()
+    }, stream.controller.signal)
+      .catch((err) => {
+        if (stream.controller.signal.aborted) return
+        // Flux interrompu: recharger la page puis reprendre le suivi
+        console.error('Erreur suivi des traitements:', err)
+        setTimeout(() => {
+          loadFilesRef.current?.()
+          setStreamRetry(n => n + 1)
+        }, 5000)
+      })
+      .finally(() => {
+        if (streamRef.current === stream) streamRef.current = null
+      })
+  }, [processingKey, streamRetry])
+
+  // Arreter le suivi au demontage
+  useEffect(() => () => {
+    streamRef.current?.controller.abort()
+    streamRef.current = null
+  }, [])
 
   // Gestion drag & drop
   const handleDrag = useCallback((e) => {
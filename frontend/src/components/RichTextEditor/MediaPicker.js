@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react'
 import { fileService } from '../../services/fileService'
+import ResponsiveImage from '../shared/ResponsiveImage'
 
 /**
  * Modal de selection d'image depuis la mediatheque
@@ -90,8 +91,10 @@ function MediaPicker({ isOpen, onClose, onSelect, entityType, entityId }) {
                     onClick={() => onSelect(image)}
                     className="aspect-square relative overflow-hidden rounded-lg border-2 border-transparent hover:border-indigo-500 transition-colors group"
                   >
-                    <img
-                      src={image.signed_url}
+                    <ResponsiveImage
+                      file={image}
+                      src={image.thumbnail_url || image.signed_url}
+                      sizes="(min-width: 640px) 150px, 33vw"
                       alt={image.file_name}
                       className="w-full h-full object-cover"
                     />
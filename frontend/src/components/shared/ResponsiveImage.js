@@ -0,0 +1,38 @@
+/**
+ * Image responsive a partir des declinaisons d'un fichier (file.srcset)
+ *
+ * Le navigateur choisit la taille adaptee a l'affichage (sizes) et le format
+ * le plus leger qu'il supporte (AVIF, puis WebP, puis JPEG). Sans
+ * declinaisons (fichier ancien ou en cours de traitement), affiche src.
+ *
+ * Props:
+ * - file: Object - Fichier renvoye par l'API (srcset: { webp, avif, jpeg })
+ * - src: string - URL de repli (thumbnail ou original)
+ * - sizes: string - Largeur affichee, syntaxe HTML sizes (ex: "200px", "100vw")
+ * - alt, className, onClick: transmis a <img>
+ */
+function ResponsiveImage({ file, src, sizes, alt, className = '', onClick }) {
+  const srcset = file?.srcset || {}
+
+  if (!srcset.avif && !srcset.webp && !srcset.jpeg) {
+    return <img src={src} alt={alt} className={className} onClick={onClick} />
+  }
+
+  return (
+    <picture className="contents">
+      {srcset.avif && <source type="image/avif" srcSet={srcset.avif} sizes={sizes} />}
+      {srcset.webp && <source type="image/webp" srcSet={srcset.webp} sizes={sizes} />}
+      <img
+        src={src}
+        srcSet={srcset.jpeg}
+        sizes={sizes}
+        alt={alt}
+        className={className}
+        onClick={onClick}
+        loading="lazy"
+      />
+    </picture>
+  )
+}
+
+export default ResponsiveImage
@@ -0,0 +1,74 @@
+import { useState } from 'react'
+
+/**
+ * Apercu d'une video au survol, a partir de sa planche d'apercus
+ *
+ * Affiche la vignette (file.thumbnail_url); au survol, la position de la
+ * souris choisit l'image de la planche (file.sprite_url, disposition dans
+ * file.media_info.sprite). La planche n'est chargee qu'au premier survol,
+ * la video seulement a la lecture.
+ *
+ * Props:
+ * - file: Object - Fichier video renvoye par l'API
+ * - alt, className: transmis a l'<img> de la vignette
+ */
+function formatTime(seconds) {
+  const minutes = Math.floor(seconds / 60)
+  return `${minutes}:${String(Math.floor(seconds % 60)).padStart(2, '0')}`
+}
+
+function VideoScrubPreview({ file, alt, className = '' }) {
+  const [index, setIndex] = useState(null)
+  const sprite = file.media_info?.sprite
+  const poster = <img src={file.thumbnail_url} alt={alt} className={className} />
+
+  if (!file.sprite_url || !sprite) {
+    return poster
+  }
+
+  const rows = Math.ceil(sprite.count / sprite.columns)
+  const column = index % sprite.columns
+  const row = Math.floor(index / sprite.columns)
+  const landscape = sprite.width >= sprite.height
+
+  const handleMouseMove = (e) => {
+    const rect = e.currentTarget.getBoundingClientRect()
+    const ratio = Math.min(Math.max((e.clientX - rect.left) / rect.width, 0), 0.9999)
+    setIndex(Math.floor(ratio * sprite.count))
+  }
+
+  return (
+    <div
+      className="relative w-full h-full"
+      onMouseMove={handleMouseMove}
+      onMouseLeave={() => setIndex(null)}
+    >
+      {poster}
+      {index !== null && (
+        <div className="absolute inset-0 z-10 flex items-center justify-center bg-black">
+          <div
+            style={{
+              aspectRatio: `${sprite.width} / ${sprite.height}`,
+              width: landscape ? '100%' : 'auto',
+              height: landscape ? 'auto' : '100%',
+              backgroundImage: `url(${file.sprite_url})`,
+              backgroundSize: `${sprite.columns * 100}% ${rows * 100}%`,
+              backgroundPosition: `${sprite.columns > 1 ? (column / (sprite.columns - 1)) * 100 : 0}% ${
+                rows > 1 ? (row / (rows - 1)) * 100 : 0
+              }%`
+            }}
+          />
+          <span className="absolute bottom-1 right-1 px-1 rounded bg-black/70 text-white text-xs">
+            {formatTime(index * sprite.interval)}
+          </span>
+          <div
+            className="absolute bottom-0 left-0 h-0.5 bg-white/80"
+            style={{ width: `${((index + 1) / sprite.count) * 100}%` }}
+          />
+        </div>
+      )}
+    </div>
+  )
+}
+
+export default VideoScrubPreview
@@ -47,6 +47,9 @@ export function AuthProvider({ children }) {
     try {
       const newProfile = await profileService.switchProfile(profileId)
       setActiveProfile(newProfile)
+      // Le backend peut verifier les tokens localement: obtenir un token
+      // portant le nouveau profil actif dans ses metadata
+      await authService.refreshSession()
       return newProfile
     } catch (err) {
       console.error('Erreur changement profil:', err)
@@ -26,6 +26,13 @@ export const authService = {
     return session
   },
 
+  // Recuperer un nouveau token (metadata a jour, ex: profil actif)
+  async refreshSession() {
+    const { data: { session }, error } = await supabase.auth.refreshSession()
+    if (error) throw error
+    return session
+  },
+
   onAuthStateChange(callback) {
     return supabase.auth.onAuthStateChange(callback)
   },
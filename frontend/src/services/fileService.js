@@ -1,4 +1,5 @@
 import api from './api'
+import { supabase } from './supabase'
 import imageCompression from 'browser-image-compression'
 
 // Configuration de compression des images
@@ -10,6 +11,10 @@ const IMAGE_COMPRESSION_OPTIONS = {
   initialQuality: 0.8     // Qualite 80%
 }
 
+// Lecture HLS native (sans bibliotheque): Safari, navigateurs iOS et Android
+const canPlayHls = typeof document !== 'undefined' &&
+  document.createElement('video').canPlayType('application/vnd.apple.mpegurl') !== ''
+
 export const fileService = {
   // ============================================
   // UPLOAD
@@ -54,6 +59,10 @@ export const fileService = {
 
   /**
    * Upload un fichier vers une entite (avec compression auto pour les images)
+   * Le fichier est envoye directement a Supabase Storage via une URL signee:
+   * 1. POST /api/files/upload-url -> enregistrement 'pending_upload' + token
+   * 2. upload direct vers Storage (le fichier ne transite pas par l'API)
+   * 3. POST /api/files/{id}/complete -> verification + lancement du traitement
    * @param {File} file - Fichier a uploader
    * @param {string} entityType - Type d'entite (project, group, session, etc.)
    * @param {string} entityId - ID de l'entite
@@ -69,17 +78,23 @@ export const fileService = {
       fileToUpload = await this.compressImage(file)
     }
 
-    const formData = new FormData()
-    formData.append('file', fileToUpload)
-    formData.append('origin_entity_type', entityType)
-    formData.append('origin_entity_id', entityId)
-    if (fileType) {
-      formData.append('file_type', fileType)
+    const contentType = fileToUpload.type || 'application/octet-stream'
+    const { data: ticket } = await api.post('/api/files/upload-url', {
+      origin_entity_type: entityType,
+      origin_entity_id: entityId,
+      file_name: file.name,
+      mime_type: contentType,
+      file_type: fileType
+    })
+
+    const { error } = await supabase.storage
+      .from(ticket.bucket)
+      .uploadToSignedUrl(ticket.file_path, ticket.token, fileToUpload, { contentType })
+    if (error) {
+      throw error
     }
 
-    const response = await api.post('/api/files/upload', formData, {
-      headers: { 'Content-Type': 'multipart/form-data' }
-    })
+    const response = await api.post(`/api/files/${ticket.file_id}/complete`)
     return response.data
   },
 
@@ -114,6 +129,52 @@ export const fileService = {
     return response.data
   },
 
+  /**
+   * Suit le traitement de fichiers (flux SSE /api/files/status/stream)
+   * fetch plutot qu'EventSource: le token passe dans l'en-tete Authorization
+   * @param {string[]} fileIds - Fichiers en cours de traitement
+   * @param {Object} handlers - onStatus({ id, processing_status, processing_error }),
+   *   onFile(file) quand un fichier est traite (URLs signees), onRemoved({ id })
+   * @param {AbortSignal} signal - Interrompt le suivi
+   * @returns {Promise<void>} Resolue quand tous les fichiers sont traites,
+   *   rejetee si le flux echoue
+   */
+  async watchProcessing(fileIds, { onStatus, onFile, onRemoved } = {}, signal) {
+    const { data: { session } } = await supabase.auth.getSession()
+    const response = await fetch(
+      `${api.defaults.baseURL}/api/files/status/stream?ids=${fileIds.join(',')}`,
+      { headers: { Authorization: `Bearer ${session?.access_token}` }, signal }
+    )
+    if (!response.ok) {
+      throw new Error(`Suivi des traitements: HTTP ${response.status}`)
+    }
+
+    const handlers = { status: onStatus, file: onFile, removed: onRemoved }
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    while (true) {
+      const { done, value } = await reader.read()
+      if (done) return
+      buffer += decoder.decode(value, { stream: true })
+      let end
+      while ((end = buffer.indexOf('\n\n')) !== -1) {
+        const message = buffer.slice(0, end)
+        buffer = buffer.slice(end + 2)
+        let event = 'message'
+        let data = ''
+        for (const line of message.split('\n')) {
+          if (line.startsWith('event: ')) event = line.slice(7)
+          else if (line.startsWith('data: ')) data += line.slice(6)
+        }
+        if (!data) continue
+        const payload = JSON.parse(data)
+        if (event === 'error') throw new Error(payload.detail)
+        handlers[event]?.(payload)
+      }
+    }
+  },
+
   // ============================================
   // DELETE
   // ============================================
@@ -253,6 +314,18 @@ export const fileService = {
     return file.thumbnail_url || file.signed_url
   },
 
+  /**
+   * Retourne l'URL de lecture d'une video: playlist HLS (qualite adaptee au
+   * debit, lecture des le premier segment) si le navigateur lit HLS
+   * nativement (Safari, iOS, Android), sinon le MP4 (signed_url)
+   */
+  getPlaybackUrl(file) {
+    if (file.hls_url && canPlayHls) {
+      return file.hls_url
+    }
+    return file.signed_url
+  },
+
   /**
    * Telecharge un fichier (force le telechargement meme pour les types geres par le navigateur)
    */